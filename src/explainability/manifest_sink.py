@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Sink asincrono per i manifest di risposta (scrittura fuori dal percorso della richiesta).
+
+`search` accoda il manifest già costruito e ritorna; un thread writer svuota la coda a batch:
+- `store="files"`: un `<response_id>.json` per risposta (stesso formato di `safe_write_manifest`);
+- `store="jsonl"`: una riga per manifest in `manifests-YYYY-MM-DD.jsonl` (UTC), un solo append
+  (e un solo fsync, se richiesto) per batch invece di un file per risposta.
+
+Coda limitata: se piena, `submit` attende al massimo `block_timeout_s` e poi scarta il manifest
+(contatore `dropped` + evento `explainability.manifest_sink.dropped`). `close()` (registrato anche
+con `atexit`) svuota la coda prima di fermare il writer.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Literal, Mapping, Optional
+
+from explainability.serialization import safe_write_manifest
+from pipeline.file_utils import safe_append_text
+from pipeline.logging_utils import get_structured_logger
+
+LOGGER = get_structured_logger("explainability.manifest_sink")
+
+ManifestStore = Literal["files", "jsonl"]
+
+_STOP = object()
+
+
+class AsyncManifestSink:
+    """Coda limitata + thread writer per i manifest explainability."""
+
+    def __init__(
+        self,
+        *,
+        store: ManifestStore = "files",
+        max_queue: int = 1024,
+        batch_size: int = 64,
+        block_timeout_s: float = 0.0,
+        fsync: bool = False,
+    ) -> None:
+        if store not in ("files", "jsonl"):
+            raise ValueError(f"store non supportato: {store}")
+        self._store: ManifestStore = store
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._batch_size = max(1, int(batch_size))
+        self._block_timeout_s = max(0.0, float(block_timeout_s))
+        self._fsync = bool(fsync)
+        # `_lock` serializza chiusura, avvio del writer e accodamento; i contatori hanno un lock
+        # proprio perché il writer li aggiorna mentre un submit può attendere sulla coda piena.
+        self._lock = threading.Lock()
+        self._counters_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._counters = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0}
+
+    @property
+    def store(self) -> ManifestStore:
+        return self._store
+
+    def target_path(self, output_dir: Path, response_id: str, *, timestamp: float | None = None) -> Path:
+        """Path in cui finirà il manifest (file per-risposta o JSONL del giorno)."""
+        if self._store == "files":
+            return Path(output_dir) / f"{response_id}.json"
+        day = time.strftime("%Y-%m-%d", time.gmtime(timestamp if timestamp is not None else time.time()))
+        return Path(output_dir) / f"manifests-{day}.jsonl"
+
+    def stats(self) -> dict[str, int]:
+        with self._counters_lock:
+            out = dict(self._counters)
+        out["queue_depth"] = self._queue.qsize()
+        return out
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[key] += amount
+
+    def _start_locked(self) -> bool:
+        """Avvia (o riavvia, se morto) il writer; chiamare con `_lock` acquisito. True al primo avvio."""
+        current = self._thread
+        if current is not None and current.is_alive():
+            return False
+        first = current is None
+        self._thread = threading.Thread(target=self._run, name="manifest-sink", daemon=True)
+        self._thread.start()
+        return first
+
+    def submit(self, manifest: Mapping[str, Any], *, output_dir: Path, response_id: str) -> bool:
+        """Accoda il manifest; False se scartato (sink chiuso o coda piena oltre `block_timeout_s`).
+
+        Controllo di `_closed` e accodamento avvengono sotto lo stesso lock di `close()`:
+        nessun manifest può finire in coda dopo `_STOP`.
+        """
+        item = (dict(manifest), Path(output_dir), str(response_id), time.time())
+        reason: Optional[str] = None
+        started = False
+        with self._lock:
+            if self._closed:
+                reason = "closed"
+            else:
+                started = self._start_locked()
+                try:
+                    if self._block_timeout_s > 0:
+                        self._queue.put(item, timeout=self._block_timeout_s)
+                    else:
+                        self._queue.put_nowait(item)
+                except queue.Full:
+                    reason = "queue_full"
+        if started:
+            atexit.register(self.close)
+        if reason is not None:
+            self._bump("dropped")
+            extra: dict[str, Any] = {"response_id": response_id, "reason": reason}
+            if reason == "queue_full":
+                extra["queue_depth"] = self._queue.qsize()
+            LOGGER.warning("explainability.manifest_sink.dropped", extra=extra)
+            return False
+        self._bump("enqueued")
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Attende che tutti i manifest accodati siano scritti (o falliti); False su timeout."""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + max(0.0, float(timeout))
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Svuota la coda e ferma il writer; idempotente."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return
+        if thread.is_alive():
+            try:
+                # Con timeout: da atexit la chiusura non deve mai bloccare l'uscita dell'interprete.
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                LOGGER.warning("explainability.manifest_sink.close_timeout", extra=self.stats())
+            else:
+                thread.join(timeout)
+        atexit.unregister(self.close)
+        LOGGER.info("explainability.manifest_sink.closed", extra=self.stats())
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            items = [item for item in batch if item is not _STOP]
+            stop = len(items) != len(batch)
+            try:
+                self._write_batch(items)
+            except Exception as exc:
+                # Il writer non deve morire: un errore imprevisto costa solo il batch corrente.
+                LOGGER.error(
+                    "explainability.manifest_sink.batch_failed",
+                    extra={"response_ids": [item[2] for item in items], "error": repr(exc)},
+                )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, items: list[tuple[dict[str, Any], Path, str, float]]) -> None:
+        if self._store == "files":
+            for manifest, output_dir, response_id, _ts in items:
+                try:
+                    safe_write_manifest(manifest, output_dir=output_dir, response_id=response_id)  # type: ignore[arg-type]
+                except Exception as exc:
+                    self._write_failed(output_dir / f"{response_id}.json", [response_id], exc)
+                else:
+                    self._bump("written")
+            return
+        grouped: dict[Path, list[tuple[str, str]]] = {}
+        for manifest, output_dir, response_id, ts in items:
+            target = self.target_path(output_dir, response_id, timestamp=ts)
+            try:
+                line = json.dumps(manifest, ensure_ascii=False, separators=(",", ":"))
+            except (TypeError, ValueError) as exc:
+                self._write_failed(target, [response_id], exc)
+                continue
+            grouped.setdefault(target, []).append((response_id, line))
+        for target, rows in grouped.items():
+            try:
+                safe_append_text(
+                    target.parent,
+                    target,
+                    "".join(f"{line}\n" for _rid, line in rows),
+                    fsync=self._fsync,
+                )
+            except Exception as exc:
+                self._write_failed(target, [rid for rid, _line in rows], exc)
+            else:
+                self._bump("written", len(rows))
+
+    def _write_failed(self, target: Path, response_ids: list[str], exc: Exception) -> None:
+        self._bump("failed", len(response_ids))
+        LOGGER.error(
+            "explainability.manifest_sink.write_failed",
+            extra={"output_path": str(target), "response_ids": response_ids, "error": repr(exc)},
+        )
+
+
+__all__ = ["AsyncManifestSink", "ManifestStore"]
@@ -0,0 +1,232 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Append concorrente di record testuali (audit JSONL, manifest).
+
+Ogni record viene scritto con una sola `write()` su un descrittore aperto con `O_APPEND`:
+il kernel posiziona la scrittura in coda al file in modo atomico, quindi più processi
+possono appendere allo stesso file senza perdere righe.
+
+- Lock advisory `fcntl.flock` (POSIX): di default solo per record grandi
+  (> `ADVISORY_LOCK_THRESHOLD` byte), dove alcuni filesystem possono spezzare la write;
+  `advisory_lock=True` lo forza sempre. Attesa con timeout (`lock_timeout`).
+- Senza `fcntl` (Windows) lo stesso lock è un `msvcrt.locking` sul file accanto
+  `<path>.lock`: `O_APPEND` della CRT non è atomico fra processi per record grandi.
+- Batching in-process (group commit): i thread che appendono allo stesso file mentre
+  una write è in corso accodano il proprio record; il primo thread libero scrive tutta la
+  coda con una sola write. Ogni `append()` ritorna solo dopo che il proprio record è su
+  disco (o solleva l'errore della write che lo conteneva).
+- Gli appender condivisi (`get_appender`) sono in una cache LRU limitata
+  (`MAX_CACHED_APPENDERS`): i path giornalieri dei JSONL non la fanno crescere all'infinito.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .exceptions import ConfigError
+
+try:  # pragma: no cover - dipende dalla piattaforma
+    import fcntl as _fcntl
+except ImportError:  # pragma: no cover - Windows
+    _fcntl = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - dipende dalla piattaforma
+    import msvcrt as _msvcrt
+except ImportError:  # pragma: no cover - POSIX
+    _msvcrt = None  # type: ignore[assignment]
+
+ADVISORY_LOCK_THRESHOLD = 4096
+LOCK_FILE_SUFFIX = ".lock"
+MAX_CACHED_APPENDERS = 64
+_LOCK_POLL_S = 0.005
+_O_APPEND_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+
+
+def _open_append(path: str) -> int:
+    return os.open(path, _O_APPEND_FLAGS, 0o644)
+
+
+def _try_flock(fd: int) -> bool:
+    try:
+        _fcntl.flock(fd, _fcntl.LOCK_EX | _fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _try_msvcrt_lock(fd: int) -> bool:
+    try:
+        # Primo byte del lock file (il descrittore è appena aperto, posizione 0).
+        _msvcrt.locking(fd, _msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _wait_lock(try_lock: Callable[[int], bool], fd: int, *, path: str, timeout: float) -> None:
+    deadline = time.monotonic() + max(timeout, 0.0)
+    while not try_lock(fd):
+        if time.monotonic() > deadline:
+            raise ConfigError("Timeout nell'acquisire il lock per l'append.", file_path=path)
+        time.sleep(_LOCK_POLL_S)
+
+
+def _open_lock_file(path: str) -> int:
+    return os.open(path + LOCK_FILE_SUFFIX, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+
+
+def _release_lock_file(fd: int) -> None:
+    try:
+        with contextlib.suppress(OSError):
+            os.lseek(fd, 0, os.SEEK_SET)
+            _msvcrt.locking(fd, _msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def write_record(
+    path: str,
+    data: bytes,
+    *,
+    fsync: bool = False,
+    advisory_lock: Optional[bool] = None,
+    lock_timeout: float = 5.0,
+) -> None:
+    """Appende `data` a `path` con una sola write `O_APPEND` (lock advisory opzionale)."""
+    use_lock = (_fcntl is not None or _msvcrt is not None) and (
+        advisory_lock if advisory_lock is not None else len(data) > ADVISORY_LOCK_THRESHOLD
+    )
+    lock_fd: Optional[int] = None
+    fd = _open_append(path)
+    try:
+        if use_lock and _fcntl is not None:
+            _wait_lock(_try_flock, fd, path=path, timeout=lock_timeout)
+        elif use_lock:
+            lock_fd = _open_lock_file(path)
+            _wait_lock(_try_msvcrt_lock, lock_fd, path=path, timeout=lock_timeout)
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        if fsync:
+            try:
+                os.fsync(fd)
+            except OSError as exc:  # pragma: no cover - dipende dall'FS
+                raise ConfigError("fsync(file) fallito.", file_path=path) from exc
+    finally:
+        # La close rilascia anche il lock flock; il lock file Windows va sbloccato esplicitamente.
+        os.close(fd)
+        if lock_fd is not None:
+            _release_lock_file(lock_fd)
+
+
+class _Slot:
+    __slots__ = ("data", "done", "error")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class BatchingAppender:
+    """Appender per un singolo file con group commit fra i thread del processo."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        fsync: bool = False,
+        advisory_lock: Optional[bool] = None,
+        lock_timeout: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.fsync = fsync
+        self.advisory_lock = advisory_lock
+        self.lock_timeout = lock_timeout
+        self._cond = threading.Condition()
+        self._pending: List[_Slot] = []
+        self._flushing = False
+        self.records = 0
+        self.writes = 0
+
+    def append(self, data: bytes) -> None:
+        slot = _Slot(data)
+        with self._cond:
+            self._pending.append(slot)
+            while not slot.done:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flushing = True
+                batch, self._pending = self._pending, []
+                error: Optional[BaseException] = None
+                self._cond.release()
+                try:
+                    write_record(
+                        self.path,
+                        b"".join(item.data for item in batch),
+                        fsync=self.fsync,
+                        advisory_lock=self.advisory_lock,
+                        lock_timeout=self.lock_timeout,
+                    )
+                except BaseException as exc:  # noqa: BLE001 - propagato a tutti i record del batch
+                    error = exc
+                finally:
+                    self._cond.acquire()
+                for item in batch:
+                    item.done = True
+                    item.error = error
+                self.records += len(batch)
+                self.writes += 1
+                self._flushing = False
+                self._cond.notify_all()
+        if slot.error is not None:
+            raise slot.error
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"records": self.records, "writes": self.writes}
+
+
+_APPENDERS: "OrderedDict[Tuple[str, bool, Optional[bool], float], BatchingAppender]" = OrderedDict()
+_APPENDERS_LOCK = threading.Lock()
+
+
+def get_appender(
+    path: str,
+    *,
+    fsync: bool = False,
+    advisory_lock: Optional[bool] = None,
+    lock_timeout: float = 5.0,
+) -> BatchingAppender:
+    """Appender condiviso nel processo per (path, fsync, advisory_lock, lock_timeout).
+
+    La cache è LRU con al più `MAX_CACHED_APPENDERS` voci: un appender rimosso resta valido per
+    chi lo sta usando (perde solo il group commit con i nuovi chiamanti).
+    """
+    key = (path, fsync, advisory_lock, float(lock_timeout))
+    with _APPENDERS_LOCK:
+        appender = _APPENDERS.get(key)
+        if appender is None:
+            appender = BatchingAppender(path, fsync=fsync, advisory_lock=advisory_lock, lock_timeout=lock_timeout)
+            _APPENDERS[key] = appender
+            while len(_APPENDERS) > MAX_CACHED_APPENDERS:
+                _APPENDERS.popitem(last=False)
+        else:
+            _APPENDERS.move_to_end(key)
+        return appender
+
+
+__all__ = [
+    "ADVISORY_LOCK_THRESHOLD",
+    "LOCK_FILE_SUFFIX",
+    "MAX_CACHED_APPENDERS",
+    "BatchingAppender",
+    "get_appender",
+    "write_record",
+]
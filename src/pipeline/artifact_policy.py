@@ -1,9 +1,10 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from pipeline.exceptions import ArtifactPolicyViolation, ConfigError
 from pipeline.normalized_index import validate_index
@@ -19,6 +20,8 @@ _MIME_BY_EXTENSION = {
     ".yml": "text/yaml",
 }
 
+_NON_CONTENT_MARKDOWN = frozenset({"readme.md", "summary.md"})
+
 
 @dataclass(frozen=True)
 class _CoreArtifactSpec:
@@ -143,6 +146,11 @@ def _verify_spec(layout: WorkspaceLayout, spec: _CoreArtifactSpec) -> list[_Arti
     if not spec.path.is_file():
         violations.append(_ArtifactViolation(spec.name, spec.path, "not_a_file"))
         return violations
+    return _verify_spec_type(spec)
+
+
+def _verify_spec_type(spec: _CoreArtifactSpec) -> list[_ArtifactViolation]:
+    violations: list[_ArtifactViolation] = []
     ext = spec.path.suffix.lower()
     allowed_exts = _normalized_exts(spec.extensions)
     if allowed_exts and ext not in allowed_exts:
@@ -155,13 +163,69 @@ def _verify_spec(layout: WorkspaceLayout, spec: _CoreArtifactSpec) -> list[_Arti
     return violations
 
 
-def _verify_content_markdown(layout: WorkspaceLayout) -> list[_ArtifactViolation]:
+def _scan_entries(directory: Path) -> dict[str, os.DirEntry[str]] | None:
+    """Una sola `os.scandir` per directory; None se la directory non è leggibile/esistente."""
     try:
-        from semantic.embedding_service import list_content_markdown
-    except Exception as exc:  # pragma: no cover
-        return [_ArtifactViolation("book/content", layout.book_dir, f"import_failed:{type(exc).__name__}")]
-    content_files = list_content_markdown(layout.book_dir)
-    if content_files:
+        with os.scandir(directory) as iterator:
+            return {entry.name: entry for entry in iterator}
+    except OSError:
+        return None
+
+
+def _verify_specs(layout: WorkspaceLayout, specs: Sequence[_CoreArtifactSpec]) -> list[_ArtifactViolation]:
+    """Verifica gli spec raggruppati per directory: un controllo di perimetro e una scansione per area."""
+    by_dir: dict[Path, list[_CoreArtifactSpec]] = {}
+    for spec in specs:
+        by_dir.setdefault(spec.path.parent, []).append(spec)
+    results: dict[str, list[_ArtifactViolation]] = {}
+    for directory, group in by_dir.items():
+        try:
+            ensure_within(layout.repo_root_dir, directory)
+        except Exception:
+            for spec in group:
+                results[spec.name] = [_ArtifactViolation(spec.name, spec.path, "outside_workspace")]
+            continue
+        entries = _scan_entries(directory) or {}
+        for spec in group:
+            entry = entries.get(spec.path.name)
+            if entry is None:
+                results[spec.name] = [_ArtifactViolation(spec.name, spec.path, "missing")]
+            elif entry.is_symlink():
+                # Caso raro: il target va risolto e verificato nel perimetro.
+                results[spec.name] = _verify_spec(layout, spec)
+            elif not entry.is_file(follow_symlinks=False):
+                results[spec.name] = [_ArtifactViolation(spec.name, spec.path, "not_a_file")]
+            else:
+                results[spec.name] = _verify_spec_type(spec)
+    return [violation for spec in specs for violation in results[spec.name]]
+
+
+def _has_content_markdown(book_dir: Path) -> bool:
+    """True al primo Markdown di contenuto (esclusi README/SUMMARY e symlink) sotto `book_dir`."""
+    stack = [str(book_dir)]
+    while stack:
+        try:
+            iterator = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+                name = entry.name.lower()
+                if name.endswith(".md") and name not in _NON_CONTENT_MARKDOWN:
+                    return True
+    return False
+
+
+def _verify_content_markdown(layout: WorkspaceLayout) -> list[_ArtifactViolation]:
+    if _has_content_markdown(layout.book_dir):
         return []
     placeholder = layout.book_dir / "<content>.md"
     return [_ArtifactViolation("book/content", placeholder, "missing")]
@@ -199,9 +263,7 @@ def enforce_core_artifacts(
     layout: WorkspaceLayout,
     stub_expected: bool = False,
 ) -> None:
-    violations: list[_ArtifactViolation] = []
-    for spec in _expected_specs_for_phase(phase, layout, stub_expected=stub_expected):
-        violations.extend(_verify_spec(layout, spec))
+    violations = _verify_specs(layout, _expected_specs_for_phase(phase, layout, stub_expected=stub_expected))
     if phase.strip().lower() == "raw_ingest":
         violations.extend(_verify_raw_index(layout))
     if phase.strip().lower() == "semantic_onboarding":
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Caricamento differito delle dipendenze opzionali pesanti.
+
+`lazy_module("spacy")` restituisce subito un proxy: l'import reale avviene al primo accesso
+a un attributo e il modulo viene poi memorizzato. Se la dipendenza manca, l'accesso solleva
+`CapabilityUnavailableError` con l'hint di installazione del registro `HEAVY_OPTIONAL_MODULES`.
+`is_module_available` verifica la presenza via spec/filesystem, senza importare nulla.
+
+Gli entrypoint (CLI, UI) non devono importare questi moduli a import-time: il budget è
+verificato da `tools/import_budget.py` (`-X importtime`).
+"""
+
+from __future__ import annotations
+
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import threading
+from importlib import import_module
+from types import ModuleType
+from typing import Any, Iterable, Optional
+
+from pipeline.exceptions import CapabilityUnavailableError
+
+HEAVY_OPTIONAL_MODULES: dict[str, str] = {
+    "spacy": "pip install spacy (e il modello: python -m spacy download it_core_news_md)",
+    "keybert": "pip install keybert",
+    "sentence_transformers": "pip install sentence-transformers",
+    "pypdf": "pip install pypdf",
+    "googleapiclient": "pip install .[drive]",
+    "opentelemetry": "pip install opentelemetry-sdk",
+    "openai": "pip install .[openai]",
+    "streamlit": "pip install streamlit",
+}
+
+
+def _install_hint(name: str) -> str:
+    return HEAVY_OPTIONAL_MODULES.get(name.split(".", 1)[0], f"pip install {name.split('.', 1)[0]}")
+
+
+def is_module_available(name: str) -> bool:
+    """True se `name` è già caricato o trovabile via spec, senza importarlo (né i package padre)."""
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    head, *rest = name.split(".")
+    try:
+        spec = importlib.util.find_spec(head)
+    except (ImportError, ValueError):
+        return False
+    if spec is None:
+        return False
+    locations = list(spec.submodule_search_locations or [])
+    for index, part in enumerate(rest):
+        found = _find_submodule(locations, part, package_only=index < len(rest) - 1)
+        if found is None:
+            return False
+        locations = found
+    return True
+
+
+def _find_submodule(locations: Iterable[str], name: str, *, package_only: bool) -> Optional[list[str]]:
+    """Cerca `name` nelle search location: location del package, [] se modulo, None se assente."""
+    suffixes = importlib.machinery.all_suffixes()
+    for location in locations:
+        package_dir = os.path.join(location, name)
+        if os.path.isdir(package_dir):
+            return [package_dir]
+        if not package_only and any(os.path.isfile(package_dir + suffix) for suffix in suffixes):
+            return []
+    return None
+
+
+class LazyModule(ModuleType):
+    """Proxy di modulo che esegue l'import al primo accesso a un attributo."""
+
+    def __init__(self, name: str, *, hint: Optional[str] = None, capability: Optional[str] = None) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_hint"] = hint or _install_hint(name)
+        self.__dict__["_lazy_capability"] = capability or name.split(".", 1)[0]
+        self.__dict__["_lazy_target"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        target = self.__dict__["_lazy_target"]
+        if target is not None:
+            return target
+        with self.__dict__["_lazy_lock"]:
+            target = self.__dict__["_lazy_target"]
+            if target is None:
+                try:
+                    target = import_module(self.__name__)
+                except ImportError as exc:
+                    raise CapabilityUnavailableError(
+                        f"Dipendenza opzionale '{self.__name__}' non disponibile: {self.__dict__['_lazy_hint']}",
+                        capability=self.__dict__["_lazy_capability"],
+                        detail="missing_or_unavailable",
+                    ) from exc
+                self.__dict__["_lazy_target"] = target
+        return target
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_target"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "deferred"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+_LAZY_MODULES: dict[str, LazyModule] = {}
+_LAZY_MODULES_LOCK = threading.Lock()
+
+
+def lazy_module(name: str, *, hint: Optional[str] = None, capability: Optional[str] = None) -> LazyModule:
+    """Proxy condiviso nel processo per il modulo `name` (nessun import finché non serve)."""
+    with _LAZY_MODULES_LOCK:
+        proxy = _LAZY_MODULES.get(name)
+        if proxy is None:
+            proxy = LazyModule(name, hint=hint, capability=capability)
+            _LAZY_MODULES[name] = proxy
+        return proxy
+
+
+__all__ = ["HEAVY_OPTIONAL_MODULES", "LazyModule", "is_module_available", "lazy_module"]
@@ -1,8 +1,9 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import threading
 from importlib import import_module
-from typing import TYPE_CHECKING, Type, cast
+from typing import TYPE_CHECKING, Any, Type, cast
 
 from pipeline.exceptions import CapabilityUnavailableError
 
@@ -10,17 +11,28 @@ if TYPE_CHECKING:  # pragma: no cover
     from openai import OpenAI
 
 
-_openai_ctor: Type["OpenAI"] | None = None
-try:
-    module = import_module("openai")
-    _openai_ctor = cast(Type["OpenAI"], getattr(module, "OpenAI"))
-except ImportError:  # pragma: no cover
-    _openai_ctor = None
+# L'SDK openai costa ~1s di import: viene risolto solo alla prima richiesta del costruttore.
+_UNRESOLVED: Any = object()
+_openai_ctor: Type["OpenAI"] | None = _UNRESOLVED
+_resolve_lock = threading.Lock()
+
+
+def _resolve_openai_ctor() -> Type["OpenAI"] | None:
+    global _openai_ctor
+    with _resolve_lock:
+        if _openai_ctor is _UNRESOLVED:
+            try:
+                module = import_module("openai")
+                _openai_ctor = cast(Type["OpenAI"], getattr(module, "OpenAI"))
+            except ImportError:  # pragma: no cover
+                _openai_ctor = None
+        return _openai_ctor
 
 
 def get_openai_ctor() -> Type["OpenAI"]:
-    if not callable(_openai_ctor):
+    ctor = _resolve_openai_ctor() if _openai_ctor is _UNRESOLVED else _openai_ctor
+    if not callable(ctor):
         raise CapabilityUnavailableError(
             "OpenAI capability not available. Install extra dependencies with: pip install .[openai]"
         )
-    return cast(Type["OpenAI"], _openai_ctor)
+    return cast(Type["OpenAI"], ctor)
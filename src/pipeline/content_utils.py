@@ -6,10 +6,11 @@ import hashlib
 import logging
 import os
 import re
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable, Literal, Mapping, Protocol, TypeAlias, cast
+from typing import Any, Iterable, Iterator, Literal, Mapping, Protocol, TypeAlias, cast
 from urllib.parse import quote
 
 from pipeline.beta_flags import is_beta_strict
@@ -19,6 +20,7 @@ from pipeline.frontmatter_utils import dump_frontmatter as _shared_dump_frontmat
 from pipeline.frontmatter_utils import read_frontmatter
 from pipeline.logging_utils import get_structured_logger
 from pipeline.path_utils import ensure_within_and_resolve, iter_safe_paths
+from pipeline.text_chunking import iter_char_window_chunks, iter_markdown_heading_segments
 from pipeline.tracing import start_decision_span
 from pipeline.types import ChunkRecord
 from pipeline.workspace_layout import WorkspaceLayout
@@ -389,11 +391,10 @@ def _chunk_pdf_text(text: str, *, chunk_chars: int = 1200, max_chunks: int = 4)
     if not text:
         return []
     out: list[str] = []
-    total = len(text)
-    for idx in range(0, total, chunk_chars):
+    for window in iter_char_window_chunks(text, size=chunk_chars):
         if len(out) >= max_chunks:
             break
-        chunk = text[idx : idx + chunk_chars].strip()
+        chunk = window.strip()
         if chunk:
             out.append(chunk)
     return out
@@ -492,8 +493,12 @@ def _write_markdown_for_pdf(
     cfg: SemanticConfig,
     *,
     slug: str | None = None,
+    text: str | None = None,
 ) -> Path:
-    """Genera un file Markdown 1:1 per il PDF indicato, includendo frontmatter completo."""
+    """Genera un file Markdown 1:1 per il PDF indicato, includendo frontmatter completo.
+
+    `text` permette di passare il testo già estratto (e normalizzato) dal process pool.
+    """
     rel_pdf = pdf_path.relative_to(raw_root)
     md_candidate = target_root / rel_pdf.with_suffix(".md")
     md_path = cast(Path, ensure_within_and_resolve(target_root, md_candidate))
@@ -504,7 +509,8 @@ def _write_markdown_for_pdf(
     tags_sorted = sorted({str(t).strip() for t in tags_raw if str(t).strip()})
 
     logger = get_structured_logger("pipeline.content_utils", context={"slug": slug})
-    text = _extract_pdf_text(pdf_path, slug=slug, logger=logger)
+    if text is None:
+        text = _extract_pdf_text(pdf_path, slug=slug, logger=logger)
     excerpt = _extract_pdf_excerpt(pdf_path, slug=slug, logger=logger, text=text)
     chunks = _chunk_pdf_text(text, chunk_chars=900, max_chunks=4)
     chunk_summaries = _build_chunk_summaries(chunks)
@@ -565,6 +571,75 @@ def _write_markdown_for_pdf(
     return md_path
 
 
+def _extract_pdf_text_job(pdf_path: str) -> tuple[str | None, str | None]:
+    """Job picklable per il process pool: restituisce (testo normalizzato, errore)."""
+    try:
+        from nlp.nlp_keywords import extract_text_from_pdf
+
+        raw_text = extract_text_from_pdf(pdf_path)
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+    return _normalize_excerpt(raw_text), None
+
+
+def _make_pdf_executor(workers: int) -> Executor:
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _resolve_convert_workers(cfg: SemanticConfig, total: int) -> int:
+    configured = int(getattr(cfg, "convert_workers", 1) or 0)
+    if configured <= 0:
+        configured = os.cpu_count() or 1
+    return max(1, min(configured, total))
+
+
+def _iter_extracted_pdf_texts(
+    pdfs: list[Path],
+    *,
+    workers: int,
+    slug: str | None,
+    logger: logging.Logger,
+) -> Iterator[tuple[Path, str]]:
+    """Estrae il testo dei PDF su un process pool restituendo i risultati nell'ordine di input.
+
+    La finestra di job in volo è limitata per non tenere in memoria il testo dell'intero corpus.
+    """
+    capacity = max(workers * 2, 1)
+    pending: deque[tuple[Path, Future[tuple[str | None, str | None]]]] = deque()
+    executor = _make_pdf_executor(workers)
+
+    def _collect() -> tuple[Path, str]:
+        pdf_path, future = pending.popleft()
+        text, error = future.result()
+        if error is not None:
+            _safe_log(
+                logger,
+                "error",
+                "pipeline.content.pdf_extract_failed",
+                extra={"slug": slug, "file_path": str(pdf_path), "error": error},
+            )
+            raise PipelineError("PDF text extraction failed.", slug=slug, file_path=str(pdf_path))
+        if not text:
+            raise PipelineError(
+                "PDF text extraction returned empty content.",
+                slug=slug,
+                file_path=str(pdf_path),
+            )
+        return pdf_path, text
+
+    try:
+        for pdf in pdfs:
+            pending.append((pdf, executor.submit(_extract_pdf_text_job, str(pdf))))
+            if len(pending) >= capacity:
+                yield _collect()
+        while pending:
+            yield _collect()
+    finally:
+        for _pdf, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
 def _group_safe_pdfs_by_category(
     raw_root: Path,
     safe_pdfs: list[Path],
@@ -955,12 +1030,23 @@ def convert_files_to_structured_markdown(
     )
 
     slug = getattr(ctx, "slug", None)
-    for pdf in root_pdfs:
-        written.add(_write_markdown_for_pdf(pdf, raw_root, target, candidates, cfg, slug=slug))
-
-    for _cat_dir, pdfs in cat_items:
-        for pdf in pdfs:
-            written.add(_write_markdown_for_pdf(pdf, raw_root, target, candidates, cfg, slug=slug))
+    ordered_pdfs = [*root_pdfs, *(pdf for _cat_dir, pdfs in cat_items for pdf in pdfs)]
+    workers = _resolve_convert_workers(cfg, len(ordered_pdfs))
+    written_paths: list[Path] = []
+    if workers <= 1:
+        for pdf in ordered_pdfs:
+            written_paths.append(_write_markdown_for_pdf(pdf, raw_root, target, candidates, cfg, slug=slug))
+    else:
+        _safe_log(
+            logger,
+            "info",
+            "pipeline.content.convert_parallel",
+            extra={"slug": slug, "workers": workers, "pdfs": len(ordered_pdfs)},
+        )
+        # Estrazione sul pool; frontmatter compare/write nel processo principale, in ordine deterministico.
+        for pdf, text in _iter_extracted_pdf_texts(ordered_pdfs, workers=workers, slug=slug, logger=logger):
+            written_paths.append(_write_markdown_for_pdf(pdf, raw_root, target, candidates, cfg, slug=slug, text=text))
+    written.update(written_paths)
 
     _cleanup_orphan_markdown(target, written, logger=logger)
     log_frontmatter_cache_stats(logger, slug=slug)
@@ -1055,32 +1141,6 @@ def _format_source_path(path: Path, base: Path | None) -> str:
         return str(path)
 
 
-_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
-
-
 def _segment_markdown_by_heading(text: str) -> list[tuple[str | None, str]]:
     """Divide un markdown in chunk iniziando da ogni heading (#/##)."""
-    lines = text.splitlines()
-    chunks: list[tuple[str | None, str]] = []
-    current_heading: str | None = None
-    current_lines: list[str] = []
-
-    for line in lines:
-        stripped = line.strip()
-        match = _HEADING_PATTERN.match(stripped)
-        if match:
-            if current_lines:
-                chunk_text = "\n".join(current_lines).strip()
-                if chunk_text:
-                    chunks.append((current_heading, chunk_text))
-            current_heading = match.group(2).strip()
-            current_lines = [line]
-            continue
-        current_lines.append(line)
-
-    if current_lines:
-        chunk_text = "\n".join(current_lines).strip()
-        if chunk_text:
-            chunks.append((current_heading, chunk_text))
-
-    return chunks
+    return list(iter_markdown_heading_segments(text))
@@ -19,6 +19,8 @@ Indice (ruolo funzioni):
   - `atomic=False`: scrive direttamente e puo fare fsync sul file.
   - Esegue `fsync` della directory padre solo se `fsync=True`.
 - `safe_write_bytes(path, data, *, atomic=True, fsync=False)`: come sopra, per **bytes**.
+- `safe_append_text(root_dir, target, data, *, fsync=False, ...)`: append di record con una sola
+  write `O_APPEND` (vedi `pipeline.append_writer`), senza lock file.
 
 Note:
 - Nessun fsync implicito quando `fsync=False`; tutti gli fsync sono deterministici e falliscono fast.
@@ -29,10 +31,10 @@ from __future__ import annotations
 
 import os
 import tempfile
-import time
 from pathlib import Path
 from typing import Optional
 
+from .append_writer import get_appender
 from .exceptions import ConfigError
 from .logging_utils import get_structured_logger
 from .path_utils import (
@@ -296,12 +298,15 @@ def safe_append_text(
     encoding: str = "utf-8",
     lock_timeout: float = 5.0,
     fsync: bool = False,
+    advisory_lock: Optional[bool] = None,
 ) -> None:
-    """Appende testo in modo sicuro usando path-safety, lock file e append diretto.
+    """Appende testo in modo sicuro: path-safety e append `O_APPEND` senza lock file.
 
-    Nota: su Windows puo emergere PermissionError durante create/unlink concorrenti
-    del lock file. Lo trattiamo come contesa del lock (al pari di FileExistsError),
-    con piccoli retry fino a lock_timeout.
+    Il record (`data`, tipicamente una o più righe complete) viene scritto con una sola
+    write in coda al file tramite `pipeline.append_writer`: nessun lock file da creare e
+    rimuovere, niente polling fra processi. I thread concorrenti sullo stesso file vengono
+    raggruppati in un'unica write (group commit); `advisory_lock`/`lock_timeout` governano
+    il lock `fcntl` opzionale (di default solo per record grandi).
 
     - Con `fsync=True` sincronizza file e directory in modo deterministico.
     """
@@ -314,59 +319,20 @@ def safe_append_text(
     resolved = _resolve_within_base(resolved_base, candidate)
     resolved.parent.mkdir(parents=True, exist_ok=True)
 
-    parent_path = resolved.parent
-    resolved_str = _extended_str(resolved)
-    lock_path = resolved.parent / f"{resolved.name}.lock"
-    lock_path_str = _extended_str(lock_path)
-
-    deadline = time.monotonic() + max(lock_timeout, 0.0)
-    lock_fd: Optional[int] = None
-
-    while True:
-        try:
-            lock_fd = os.open(lock_path_str, os.O_CREAT | os.O_EXCL | os.O_RDWR)
-            break
-        except (FileExistsError, PermissionError):
-            if time.monotonic() > deadline:
-                raise ConfigError(
-                    "Timeout nell'acquisire il lock per l'append.",
-                    file_path=str(resolved),
-                )
-            time.sleep(0.05)
-            continue
-        except OSError as exc:
-            raise ConfigError(
-                "Impossibile creare il lock file.",
-                file_path=str(resolved),
-            ) from exc
-
+    appender = get_appender(
+        _extended_str(resolved),
+        fsync=fsync,
+        advisory_lock=advisory_lock,
+        lock_timeout=lock_timeout,
+    )
     try:
-        try:
-            with open(resolved_str, "a", encoding=encoding, newline="") as f:
-                f.write(data)
-                if fsync:
-                    f.flush()
-                    _fsync_file(f.fileno(), path=resolved)
-            if fsync:
-                _fsync_dir(parent_path)
-        except Exception as exc:
-            raise ConfigError(
-                "Append fallito.",
-                file_path=str(resolved),
-            ) from exc
-    finally:
-        if lock_fd is not None:
-            try:
-                os.close(lock_fd)
-            except Exception as exc:
-                _best_effort_cleanup(
-                    "file_utils.lock_close_failed",
-                    extra={"lock_path": str(lock_path), "error": repr(exc)},
-                )
-        try:
-            Path(lock_path_str).unlink(missing_ok=True)
-        except Exception as exc:
-            _logger.warning(
-                "file_utils.lock_remove_failed",
-                extra={"lock_path": str(lock_path), "reason": str(exc)},
-            )
+        appender.append(data.encode(encoding))
+        if fsync:
+            _fsync_dir(resolved.parent)
+    except ConfigError:
+        raise
+    except Exception as exc:
+        raise ConfigError(
+            "Append fallito.",
+            file_path=str(resolved),
+        ) from exc
@@ -13,6 +13,7 @@ Regole:
 
 import logging
 import re
+import threading
 from pathlib import Path
 from typing import Any, Dict, Mapping, Tuple
 
@@ -29,8 +30,9 @@ except ModuleNotFoundError as exc:  # pragma: no cover - dipendenza runtime obbl
 
 LOG = logging.getLogger(__name__)
 
-# Cache: {resolved_path: (mtime_ns, size, (meta, body))}
+# Cache: {resolved_path: (mtime_ns, size, (meta, body))}; condivisa tra thread (enrich parallelo).
 _CACHE: Dict[Path, Tuple[int, int, Tuple[Dict[str, Any], str]]] = {}
+_CACHE_LOCK = threading.Lock()
 
 
 def parse_frontmatter(md_text: str) -> Tuple[Dict[str, Any], str]:
@@ -90,7 +92,8 @@ def read_frontmatter(
         sig = _stat_signature(safe)
         if sig is not None:
             mtime_ns, size = sig
-            cached = _CACHE.get(safe)
+            with _CACHE_LOCK:
+                cached = _CACHE.get(safe)
             if cached and cached[0] == mtime_ns and cached[1] == size:
                 return cached[2]
 
@@ -101,7 +104,8 @@ def read_frontmatter(
         sig = _stat_signature(safe)
         if sig is not None:
             mtime_ns, size = sig
-            _CACHE[safe] = (mtime_ns, size, (meta, body))
+            with _CACHE_LOCK:
+                _CACHE[safe] = (mtime_ns, size, (meta, body))
         else:
             # cache write skipped (già loggato da _stat_signature)
             pass
@@ -111,7 +115,8 @@ def read_frontmatter(
 
 def clear_frontmatter_cache() -> None:
     try:
-        _CACHE.clear()
+        with _CACHE_LOCK:
+            _CACHE.clear()
     except Exception:
         # Anche questo è best-effort, ma non silenzioso.
         LOG.debug("frontmatter.cache.clear_failed", exc_info=True)
@@ -3,9 +3,10 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Optional, Protocol
+from typing import Any, Optional, Protocol
 
 from pipeline.beta_flags import is_beta_strict
+from pipeline.capabilities.lazy import is_module_available, lazy_module
 from pipeline.config_utils import get_client_config, get_drive_id
 from pipeline.context import ClientContext
 from pipeline.exceptions import CapabilityUnavailableError, ConfigError
@@ -13,11 +14,16 @@ from pipeline.logging_utils import phase_scope
 from pipeline.path_utils import ensure_within, iter_safe_pdfs
 from semantic.api import copy_local_pdfs_to_raw
 
-try:
-    from pipeline.drive_utils import download_drive_pdfs_to_local, get_drive_service
-except ImportError:  # pragma: no cover
-    download_drive_pdfs_to_local = None
-    get_drive_service = None
+# pipeline.drive_utils (googleapiclient/google-auth, ~170ms) viene importato solo quando serve Drive.
+_drive_utils = lazy_module("pipeline.drive_utils", hint="pip install .[drive]", capability="drive")
+
+
+def get_drive_service(context: ClientContext) -> Any:
+    return _drive_utils.get_drive_service(context)
+
+
+def download_drive_pdfs_to_local(**kwargs: Any) -> Any:
+    return _drive_utils.download_drive_pdfs_to_local(**kwargs)
 
 
 class IngestProvider(Protocol):
@@ -47,7 +53,8 @@ class DriveIngestProvider:
         if not raw_folder_id:
             raise ConfigError("integrations.drive.raw_folder_id mancante in config.yaml.")
 
-        if not callable(get_drive_service) or not callable(download_drive_pdfs_to_local):
+        # Verifica senza import: il proxy lazy fallirebbe solo alla prima chiamata, con un errore generico.
+        if not is_module_available("googleapiclient"):
             raise CapabilityUnavailableError(
                 "Drive capability not available. Install extra dependencies with: pip install .[drive]"
             )
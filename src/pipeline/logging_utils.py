@@ -385,6 +385,19 @@ def _set_logger_filter(lg: logging.Logger, flt: logging.Filter, key: str) -> Non
     lg.addFilter(flt)
 
 
+# Fasi attive per thread (stack): con fasi concorrenti sullo stesso logger ogni record prende la
+# fase più interna del thread che lo emette; i thread senza fase propria ereditano quella del filtro.
+_PHASE_LOCAL = threading.local()
+
+
+def _thread_phase_stack() -> list[str]:
+    stack = getattr(_PHASE_LOCAL, "stack", None)
+    if stack is None:
+        stack = []
+        _PHASE_LOCAL.stack = stack
+    return stack
+
+
 class _PhaseInjectFilter(logging.Filter):
     """Inietta il campo 'phase' sui record se mancante (utile dentro phase_scope)."""
 
@@ -395,7 +408,8 @@ class _PhaseInjectFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
         if not hasattr(record, "phase"):
             try:
-                record.phase = self.phase
+                stack = getattr(_PHASE_LOCAL, "stack", None)
+                record.phase = stack[-1] if stack else self.phase
             except Exception as exc:
                 _report_telemetry_error("phase.inject.filter", exc)
         return True
@@ -678,6 +692,7 @@ class phase_scope:
         except Exception as exc:
             self._phase_filter = None
             _report_telemetry_error("phase_scope.enter.add_filter", exc)
+        _thread_phase_stack().append(self.stage)
         extra = self._base_extra()
         extra.update({"event": "phase_started", "status": "start"})
         self.logger.info("phase_started", extra=extra)
@@ -689,6 +704,9 @@ class phase_scope:
         exc: Optional[BaseException],
         tb: Optional[TracebackType],
     ) -> Literal[False]:
+        stack = _thread_phase_stack()
+        if stack and stack[-1] == self.stage:
+            stack.pop()
         duration_ms: Optional[int] = None
         if self._t0 is not None:
             try:
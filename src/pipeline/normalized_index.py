@@ -4,6 +4,8 @@
 from __future__ import annotations
 
 import json
+import os
+import posixpath
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
@@ -49,14 +51,45 @@ def load_index(repo_root_dir: Path, index_path: Path) -> list[dict[str, object]]
     return data
 
 
+def _scan_relative_paths(root: Path) -> set[str]:
+    """Un solo walk `os.scandir` di `root`: path relativi POSIX di file e directory (symlink esclusi)."""
+    found: set[str] = set()
+    stack: list[tuple[str, str]] = [(str(root), "")]
+    while stack:
+        current, prefix = stack.pop()
+        try:
+            iterator = os.scandir(current)
+        except OSError:
+            continue
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                rel = prefix + entry.name
+                found.add(rel)
+                if is_dir:
+                    stack.append((entry.path, rel + "/"))
+    return found
+
+
 def validate_index(
     *,
     repo_root_dir: Path,
     normalized_dir: Path,
     index_path: Path,
 ) -> list[dict[str, object]]:
+    """Valida INDEX.json; l'esistenza degli output OK è verificata contro una sola scansione di normalized/.
+
+    I record non in forma canonica o assenti dalla scansione (symlink, case-folding) ricadono sul
+    controllo puntuale con resolve, che produce l'errore di path-safety o di file mancante.
+    """
     records = load_index(repo_root_dir, index_path)
     seen_outputs: set[str] = set()
+    present: set[str] | None = None
     for item in records:
         if not isinstance(item, dict):
             raise ConfigError("normalized/INDEX.json contiene record non validi.", file_path=str(index_path))
@@ -77,6 +110,10 @@ def validate_index(
                     file_path=str(index_path),
                 )
             seen_outputs.add(rel)
+            if present is None:
+                present = _scan_relative_paths(normalized_dir)
+            if rel in present and posixpath.normpath(rel) == rel:
+                continue
             candidate = ensure_within_and_resolve(normalized_dir, normalized_dir / rel)
             if not candidate.exists():
                 raise ConfigError(
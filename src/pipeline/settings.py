@@ -312,6 +312,7 @@ class RetrieverThrottleSection:
     candidate_limit: int = 4000
     parallelism: int = 1
     sleep_ms_between_calls: int = 0
+    adaptive_limit: bool = False
 
     @classmethod
     def from_mapping(cls, data: Mapping[str, Any], *, config_path: Path) -> "RetrieverThrottleSection":
@@ -344,6 +345,12 @@ class RetrieverThrottleSection:
                 default=cls.sleep_ms_between_calls,
                 minimum=0,
             ),
+            adaptive_limit=_extract_bool(
+                data.get("adaptive_limit"),
+                "pipeline.retriever.throttle.adaptive_limit",
+                config_path=config_path,
+                default=cls.adaptive_limit,
+            ),
         )
 
 
@@ -351,6 +358,7 @@ class RetrieverThrottleSection:
 class RetrieverSection:
     auto_by_budget: bool = False
     throttle: RetrieverThrottleSection = field(default_factory=RetrieverThrottleSection)
+    quantization: str = "none"
 
     @classmethod
     def from_mapping(cls, data: Mapping[str, Any], *, config_path: Path) -> "RetrieverSection":
@@ -365,6 +373,53 @@ class RetrieverSection:
                 default=cls.auto_by_budget,
             ),
             throttle=RetrieverThrottleSection.from_mapping(throttle_mapping, config_path=config_path),
+            quantization=_extract_enum(
+                data.get("quantization"),
+                "pipeline.retriever.quantization",
+                config_path=config_path,
+                default=cls.quantization,
+                alias_map={"none": "none", "off": "none", "int8": "int8"},
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class IngestSection:
+    pipelined: bool = False
+    reader_workers: int = 0  # 0 -> min(8, cpu_count)
+    embed_batch_size: int = 256
+    queue_size: int = 4
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any], *, config_path: Path) -> "IngestSection":
+        return cls(
+            pipelined=_extract_bool(
+                data.get("pipelined"),
+                "pipeline.ingest.pipelined",
+                config_path=config_path,
+                default=cls.pipelined,
+            ),
+            reader_workers=_extract_int(
+                data.get("reader_workers"),
+                "pipeline.ingest.reader_workers",
+                config_path=config_path,
+                default=cls.reader_workers,
+                minimum=0,
+            ),
+            embed_batch_size=_extract_int(
+                data.get("embed_batch_size"),
+                "pipeline.ingest.embed_batch_size",
+                config_path=config_path,
+                default=cls.embed_batch_size,
+                minimum=1,
+            ),
+            queue_size=_extract_int(
+                data.get("queue_size"),
+                "pipeline.ingest.queue_size",
+                config_path=config_path,
+                default=cls.queue_size,
+                minimum=1,
+            ),
         )
 
 
@@ -511,6 +566,13 @@ class Settings:
             config_path=self.config_path,
         )
 
+    @cached_property
+    def ingest_settings(self) -> IngestSection:
+        return IngestSection.from_mapping(
+            self._section_mapping("pipeline.ingest", required=False),
+            config_path=self.config_path,
+        )
+
     @cached_property
     def ops_settings(self) -> OpsSection:
         return OpsSection.from_mapping(
@@ -557,6 +619,10 @@ class Settings:
     def retriever_throttle(self) -> RetrieverThrottleSection:
         return self.retriever_settings.throttle
 
+    @property
+    def retriever_quantization(self) -> str:
+        return self.retriever_settings.quantization
+
     @property
     def ops_log_level(self) -> str:
         return self.ops_settings.log_level
@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Snapshot di processo delle `Settings` cliente, validati su mtime/size del config.
+
+`load_client_settings(ctx, reload=True)` ricostruisce e ri-valida l'intero albero `Settings` a ogni
+chiamata; per letture frequenti (es. impostazioni retriever per query) il costo supera quello della
+query. Qui le `Settings` già parse sono condivise per chiave (slug, config path, mtime_ns, size):
+- si fa solo `stat` del file e si ricarica quando mtime o size cambiano;
+- i file modificati da meno di `_RACY_WINDOW_NS` non vengono messi in cache (mtime grossolane);
+- contatori hits/misses esposti da `settings_snapshot_stats()`.
+
+Gli snapshot sono in sola lettura: `SettingsSnapshot.retriever` è una sezione frozen e
+`SettingsSnapshot.as_dict()` ritorna una copia profonda che il chiamante può modificare.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from pipeline.exceptions import ConfigError
+from pipeline.logging_utils import get_structured_logger
+from pipeline.settings import RetrieverSection, Settings
+
+_LOGGER = get_structured_logger("pipeline.settings_snapshot")
+
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    slug: str
+    config_path: Path
+    mtime_ns: int
+    size: int
+    settings: Settings
+
+    @property
+    def retriever(self) -> RetrieverSection:
+        return self.settings.retriever_settings
+
+    def as_dict(self) -> Dict[str, Any]:
+        return copy.deepcopy(self.settings.data)
+
+
+class SettingsSnapshotCache:
+    """Cache thread-safe di `SettingsSnapshot` per (slug, config path)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, Path], SettingsSnapshot] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, slug: str, config_path: Path, *, repo_root: Path) -> SettingsSnapshot:
+        """Snapshot corrente del config; ConfigError se il file manca o non è valido."""
+        cfg_path = Path(config_path).resolve()
+        try:
+            st = cfg_path.stat()
+        except OSError as exc:
+            raise ConfigError("Config cliente non trovato.", slug=slug, file_path=str(cfg_path)) from exc
+        key = (slug, cfg_path)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        settings = Settings.load(Path(repo_root), config_path=cfg_path, slug=slug)
+        # Copia privata: `yaml_read` condivide il payload in cache con altri lettori.
+        settings.data = copy.deepcopy(settings.data)
+        snapshot = SettingsSnapshot(slug, cfg_path, int(st.st_mtime_ns), int(st.st_size), settings)
+        if time.time_ns() - st.st_mtime_ns >= _RACY_WINDOW_NS:
+            with self._lock:
+                self._entries[key] = snapshot
+        _LOGGER.debug(
+            "settings_snapshot.loaded",
+            extra={"slug": slug, "file_path": str(cfg_path), "mtime_ns": int(st.st_mtime_ns)},
+        )
+        return snapshot
+
+    def invalidate(self, slug: Optional[str] = None) -> None:
+        with self._lock:
+            if slug is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == slug]:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_SNAPSHOTS = SettingsSnapshotCache()
+
+
+def get_settings_snapshot(slug: str, config_path: Path, *, repo_root: Path) -> SettingsSnapshot:
+    """Snapshot di processo per il config del cliente (ricaricato solo se il file cambia)."""
+    return _SNAPSHOTS.get(slug, config_path, repo_root=repo_root)
+
+
+def invalidate_settings_snapshots(slug: Optional[str] = None) -> None:
+    _SNAPSHOTS.invalidate(slug)
+
+
+def settings_snapshot_stats() -> dict[str, int]:
+    return _SNAPSHOTS.stats()
+
+
+__all__ = [
+    "SettingsSnapshot",
+    "SettingsSnapshotCache",
+    "get_settings_snapshot",
+    "invalidate_settings_snapshots",
+    "settings_snapshot_stats",
+]
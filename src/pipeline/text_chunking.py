@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# src/pipeline/text_chunking.py
+from __future__ import annotations
+
+"""Chunker testuali condivisi (finestre a token, a caratteri e per heading).
+
+Tutti i chunker sono generatori lazy e restituiscono slice della stringa
+originale: i confini delle finestre sono calcolati su indici (token o caratteri)
+e convertiti in offset di carattere, senza ri-decodificare le finestre
+sovrapposte né materializzare liste intermedie.
+
+Contratto finestre:
+- ``iter_window_spans(total, size=S, overlap=O)`` produce ``(start, end)`` per
+  ``start`` in ``range(0, total, max(1, S - O))`` con ``end = min(start + S, total)``;
+  è la stessa semantica del chunker storico a token (incluse le code finali
+  contenute nella finestra precedente).
+- ``iter_token_window_chunks`` calcola gli offset di carattere solo sui confini
+  delle finestre (``decode_bytes`` per segmento, come ``decode_with_offsets`` di
+  tiktoken ma senza il loop Python per token); encoder privi di quelle API
+  degradano al decode per finestra.
+"""
+
+import re
+from typing import Any, Iterable, Iterator, Sequence
+
+__all__ = [
+    "iter_window_spans",
+    "iter_char_window_chunks",
+    "iter_token_window_chunks",
+    "iter_markdown_heading_segments",
+]
+
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
+_UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+
+
+def iter_window_spans(total: int, *, size: int, overlap: int = 0) -> Iterator[tuple[int, int]]:
+    """Genera le coppie ``(start, end)`` delle finestre sovrapposte su ``total`` elementi."""
+    if size <= 0:
+        raise ValueError("size deve essere > 0")
+    step = max(1, size - max(0, overlap))
+    for start in range(0, total, step):
+        yield start, min(start + size, total)
+
+
+def iter_char_window_chunks(text: str, *, size: int, overlap: int = 0) -> Iterator[str]:
+    """Finestre a caratteri sulla stringa originale (nessuno strip/filtro: lo decide il chiamante)."""
+    for start, end in iter_window_spans(len(text), size=size, overlap=overlap):
+        yield text[start:end]
+
+
+def _iter_boundary_char_offsets(encoder: Any, tokens: Sequence[int], boundaries: Iterable[int]) -> Iterator[int]:
+    """Offset di carattere per indici-token crescenti, decodificando ogni token una sola volta.
+
+    I segmenti tra due confini passano per ``decode_bytes`` (nativo in tiktoken) e i caratteri
+    si contano come byte UTF-8 non di continuazione. Un token che inizia a metà carattere
+    riporta l'offset del carattere che lo contiene (stessa semantica di ``decode_with_offsets``).
+    """
+    total = len(tokens)
+    cursor = 0
+    chars = 0
+    for index in boundaries:
+        if index > cursor:
+            chars += len(encoder.decode_bytes(tokens[cursor:index]).translate(None, _UTF8_CONTINUATION))
+            cursor = index
+        offset = chars
+        if 0 < index < total:
+            head = encoder.decode_single_token_bytes(tokens[index])[:1]
+            if head and 0x80 <= head[0] < 0xC0:
+                offset -= 1
+        yield offset
+
+
+def iter_token_window_chunks(
+    text: str,
+    *,
+    encoder: Any,
+    target_tokens: int = 400,
+    overlap_tokens: int = 40,
+) -> Iterator[str]:
+    """Finestre di ``target_tokens`` token (overlap ``overlap_tokens``) come slice del testo.
+
+    Il testo viene codificato una sola volta e gli offset di carattere sono calcolati solo
+    sui confini delle finestre. Un carattere multi-byte diviso tra due token resta intero
+    nella finestra in cui inizia (il decode per finestra lo sostituirebbe con U+FFFD).
+    Encoder senza ``decode_bytes``/``decode_single_token_bytes`` degradano al decode per finestra.
+    """
+    tokens = encoder.encode(text)
+    total = len(tokens)
+    if total == 0:
+        return
+    spans = iter_window_spans(total, size=target_tokens, overlap=overlap_tokens)
+    if not (hasattr(encoder, "decode_bytes") and hasattr(encoder, "decode_single_token_bytes")):
+        for start, end in spans:
+            yield encoder.decode(tokens[start:end])
+        return
+
+    span_list = list(spans)
+    boundaries = sorted({idx for span in span_list for idx in span if idx < total})
+    text_len = len(text)
+    char_at: dict[int, int] = {}
+    next_span = 0
+    # Confini crescenti: ogni finestra (con end < total) si emette appena il suo end è risolto.
+    for index, offset in zip(boundaries, _iter_boundary_char_offsets(encoder, tokens, boundaries), strict=True):
+        char_at[index] = min(offset, text_len)
+        while next_span < len(span_list) and span_list[next_span][1] <= index:
+            span_start, span_end = span_list[next_span]
+            yield text[char_at[span_start] : char_at[span_end]]
+            next_span += 1
+    for span_start, _span_end in span_list[next_span:]:
+        yield text[char_at[span_start] :]
+
+
+def iter_markdown_heading_segments(text: str) -> Iterator[tuple[str | None, str]]:
+    """Segmenti ``(heading, testo)`` che iniziano a ogni heading markdown (# .. ######)."""
+    current_heading: str | None = None
+    current_lines: list[str] = []
+
+    for line in text.splitlines():
+        match = _HEADING_PATTERN.match(line.strip())
+        if match:
+            if current_lines:
+                chunk_text = "\n".join(current_lines).strip()
+                if chunk_text:
+                    yield current_heading, chunk_text
+            current_heading = match.group(2).strip()
+            current_lines = [line]
+            continue
+        current_lines.append(line)
+
+    if current_lines:
+        chunk_text = "\n".join(current_lines).strip()
+        if chunk_text:
+            yield current_heading, chunk_text
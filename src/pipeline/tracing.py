@@ -9,6 +9,7 @@ import os
 import random
 from typing import Any, ContextManager, Iterator, Literal, Mapping, Optional
 
+from pipeline.capabilities.lazy import is_module_available
 from pipeline.observability_config import get_tracing_state
 
 # NB: niente get_structured_logger a import-time, altrimenti --help triggera ensure_tracer().
@@ -30,16 +31,20 @@ def _log_tracing_disabled(reason: str, extra: Mapping[str, Any] | None = None) -
     _log.info("observability.tracing.disabled", extra=payload)
 
 
+# Solo l'API (leggera) a import-time: SDK ed exporter OTLP vengono importati in ensure_tracer().
+_OTEL_SDK_MODULES = (
+    "opentelemetry.sdk.resources",
+    "opentelemetry.sdk.trace",
+    "opentelemetry.sdk.trace.export",
+    "opentelemetry.exporter.otlp.proto.http.trace_exporter",
+)
 try:
     from opentelemetry import trace as _otel_trace
-    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-    from opentelemetry.sdk.resources import Resource
-    from opentelemetry.sdk.trace import TracerProvider
-    from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
-    _OTEL_IMPORT_OK = True
+    _OTEL_IMPORT_OK = all(is_module_available(name) for name in _OTEL_SDK_MODULES)
 except Exception:  # pragma: no cover
     _OTEL_IMPORT_OK = False
+if not _OTEL_IMPORT_OK:
     _OTEL_IMPORT_REASON = "opentelemetry_missing"
 
 _TRACING_READY = False
@@ -79,6 +84,11 @@ def ensure_tracer(*, context: Mapping[str, Any] | None = None, enable_tracing: b
     if not endpoint:
         _log_tracing_disabled("missing_endpoint")
         return
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
     service = os.getenv("TIMMY_SERVICE_NAME", "timmy-kb")
     env = os.getenv("TIMMY_ENV", "dev")
     resource = Resource.create({"service.name": service, "deployment.environment": env})
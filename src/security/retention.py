@@ -1,83 +1,263 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # src/security/retention.py
+"""Retention dei file temporanei del workspace (snapshot Vision e simili).
+
+La purge è uno scan in streaming con `os.scandir`:
+- i pattern glob (relativi al perimetro) sono risolti segmento per segmento senza materializzare
+  l'elenco dei candidati; symlink (file o directory) non vengono mai seguiti né rimossi, quindi
+  ogni candidato resta nel perimetro senza `realpath` per file;
+- mtime/size arrivano da `DirEntry.stat(follow_symlinks=False)` (cache della entry);
+- le rimozioni sono raggruppate per directory (`unlink` relativo a un dir fd dove supportato);
+- `RetentionSweep.run(max_files=..., time_budget_s=...)` lavora a slice e riprende dal punto
+  in cui si era fermata; `dry_run=True` riporta solo file e byte recuperabili.
+"""
+
 from __future__ import annotations
 
+import fnmatch
 import os
-from datetime import datetime, timedelta, timezone
+import re
+import stat as stat_mod
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from pipeline.logging_utils import get_structured_logger
-from pipeline.path_utils import ensure_within_and_resolve
 
 LOGGER = get_structured_logger("security.retention")
 
 _DEFAULT_PATTERNS: tuple[str, ...] = ("semantic/*.snapshot.txt",)
+_MAGIC = re.compile(r"[*?\[]")
+_UNLINK_DIR_FD = os.unlink in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
 
+_Batch = Tuple[str, List[os.DirEntry[str]]]
 
-def purge_old_artifacts(perimeter_root: Path, days: int, *, patterns: Iterable[str] | None = None) -> int:
-    """
-    Rimuove file temporanei più vecchi di `days` giorni all'interno di `perimeter_root`.
 
-    Args:
-        perimeter_root: radice del workspace cliente (es. output/timmy-kb-<slug>).
-        days: soglia massima di retention in giorni (deve essere > 0).
-        patterns: glob relative a `perimeter_root` da scandire (default: snapshot Vision).
+@dataclass
+class RetentionReport:
+    """Esito cumulativo di una sweep (in dry-run `removed`/`reclaimed_bytes` restano a zero)."""
 
-    Returns:
-        Numero di file rimossi con successo.
-    """
-    if days <= 0:
-        LOGGER.debug("retention.skip.invalid_days", extra={"perimeter_root": str(perimeter_root), "days": days})
-        return 0
+    dry_run: bool
+    scanned: int = 0
+    expired: int = 0
+    removed: int = 0
+    failed: int = 0
+    reclaimable_bytes: int = 0
+    reclaimed_bytes: int = 0
+    complete: bool = False
+    elapsed_ms: int = 0
 
-    base_path = Path(perimeter_root)
-    if not base_path.exists():
-        LOGGER.debug("retention.skip.missing_base", extra={"perimeter_root": str(base_path)})
-        return 0
 
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    total_removed = 0
-    used_patterns = tuple(patterns or _DEFAULT_PATTERNS)
+def _split_pattern(pattern: str) -> Optional[List[str]]:
+    parts = [part for part in pattern.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or pattern.startswith(("/", "\\")) or ".." in parts or ":" in parts[0]:
+        return None
+    return parts
+
+
+def _iter_dirs(current: str, parts: Sequence[str]) -> Iterator[str]:
+    """Directory (non symlink) che corrispondono ai segmenti di directory del pattern."""
+    if not parts:
+        yield current
+        return
+    head, rest = parts[0], parts[1:]
+    if head == "**":
+        yield from _iter_dirs(current, rest)
+        for sub in _scan_subdirs(current):
+            yield from _iter_dirs(sub, parts)
+        return
+    if not _MAGIC.search(head):
+        candidate = os.path.join(current, head)
+        if os.path.isdir(candidate) and not os.path.islink(candidate):
+            yield from _iter_dirs(candidate, rest)
+        return
+    for sub in _scan_subdirs(current):
+        if fnmatch.fnmatch(os.path.basename(sub), head):
+            yield from _iter_dirs(sub, rest)
+
+
+def _scan_subdirs(current: str) -> List[str]:
+    try:
+        with os.scandir(current) as iterator:
+            return sorted(
+                entry.path for entry in iterator if not entry.is_symlink() and entry.is_dir(follow_symlinks=False)
+            )
+    except OSError:
+        return []
+
 
-    for pattern in used_patterns:
-        for candidate in base_path.glob(pattern):
+def _iter_batches(base: str, patterns: Sequence[str], batch_size: int) -> Iterator[_Batch]:
+    for pattern in patterns:
+        parts = _split_pattern(pattern)
+        if parts is None:
+            LOGGER.warning("retention.skip.outside_base", extra={"perimeter_root": base, "candidate": pattern})
+            continue
+        name_pattern = parts[-1]
+        for directory in _iter_dirs(base, parts[:-1]):
             try:
-                safe_path = ensure_within_and_resolve(base_path, candidate)
-            except Exception:
-                LOGGER.warning(
-                    "retention.skip.outside_base",
-                    extra={"perimeter_root": str(base_path), "candidate": str(candidate)},
-                )
+                iterator = os.scandir(directory)
+            except OSError:
                 continue
+            with iterator:
+                batch: List[os.DirEntry[str]] = []
+                for entry in iterator:
+                    if not fnmatch.fnmatch(entry.name, name_pattern) or entry.is_symlink():
+                        continue
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        yield directory, batch
+                        batch = []
+                if batch:
+                    yield directory, batch
+
+
+class RetentionSweep:
+    """Purge incrementale: ogni `run()` elabora una slice e accumula il report."""
+
+    def __init__(
+        self,
+        perimeter_root: Path,
+        days: int,
+        *,
+        patterns: Iterable[str] | None = None,
+        dry_run: bool = False,
+        batch_size: int = 256,
+    ) -> None:
+        self.base_path = Path(perimeter_root)
+        self.days = days
+        self.patterns = tuple(dict.fromkeys(patterns or _DEFAULT_PATTERNS))
+        self.report = RetentionReport(dry_run=dry_run)
+        self._cutoff = time.time() - days * 86400
+        self._batches = _iter_batches(str(self.base_path), self.patterns, max(1, int(batch_size)))
+        self._carry: Optional[_Batch] = None
+
+    @property
+    def done(self) -> bool:
+        return self.report.complete
+
+    def run(self, *, max_files: Optional[int] = None, time_budget_s: Optional[float] = None) -> RetentionReport:
+        """Elabora fino a `max_files` candidati o fino a `time_budget_s` secondi (granularità: batch)."""
+        report = self.report
+        if report.complete:
+            return report
+        started = time.perf_counter()
+        budget = None if max_files is None else max(0, int(max_files))
+        while budget is None or budget > 0:
+            if time_budget_s is not None and time.perf_counter() - started >= time_budget_s:
+                break
+            batch = self._carry or next(self._batches, None)
+            self._carry = None
+            if batch is None:
+                report.complete = True
+                break
+            directory, entries = batch
+            if budget is not None:
+                if len(entries) > budget:
+                    self._carry = (directory, entries[budget:])
+                    entries = entries[:budget]
+                budget -= len(entries)
+            self._process(directory, entries)
+        report.elapsed_ms += int((time.perf_counter() - started) * 1000)
+        return report
 
+    def _process(self, directory: str, entries: Sequence[os.DirEntry[str]]) -> None:
+        report = self.report
+        victims: List[Tuple[str, int]] = []
+        for entry in entries:
+            report.scanned += 1
             try:
-                stat = safe_path.stat()
+                st = entry.stat(follow_symlinks=False)
             except OSError:
                 continue
-
-            mtime = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
-            if mtime >= cutoff:
+            if not stat_mod.S_ISREG(st.st_mode) or st.st_mtime >= self._cutoff:
                 continue
+            report.expired += 1
+            report.reclaimable_bytes += st.st_size
+            victims.append((entry.name, st.st_size))
+        if victims and not report.dry_run:
+            self._unlink_batch(directory, victims)
 
+    def _unlink_batch(self, directory: str, victims: Sequence[Tuple[str, int]]) -> None:
+        dir_fd: Optional[int] = None
+        if _UNLINK_DIR_FD:
             try:
-                os.remove(safe_path)
-                total_removed += 1
-            except OSError as exc:
-                LOGGER.warning(
-                    "retention.remove.failed",
-                    extra={"path": str(safe_path), "error": str(exc)},
-                )
-
-    if total_removed:
-        LOGGER.info(
-            "retention.remove.completed",
-            extra={"perimeter_root": str(base_path), "removed": total_removed, "days": days},
-        )
-    else:
+                dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            except OSError:
+                dir_fd = None
+        try:
+            for name, size in victims:
+                try:
+                    if dir_fd is not None:
+                        os.unlink(name, dir_fd=dir_fd)
+                    else:
+                        os.unlink(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                except OSError as exc:
+                    self.report.failed += 1
+                    LOGGER.warning(
+                        "retention.remove.failed",
+                        extra={"path": os.path.join(directory, name), "error": str(exc)},
+                    )
+                    continue
+                self.report.removed += 1
+                self.report.reclaimed_bytes += size
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+
+
+def sweep_old_artifacts(
+    perimeter_root: Path,
+    days: int,
+    *,
+    patterns: Iterable[str] | None = None,
+    dry_run: bool = False,
+    max_files: Optional[int] = None,
+    time_budget_s: Optional[float] = None,
+) -> RetentionReport:
+    """Purge (o dry-run) in una sola slice; `report.complete=False` se il budget si è esaurito."""
+    base_path = Path(perimeter_root)
+    if days <= 0 or not base_path.exists():
         LOGGER.debug(
-            "retention.remove.nothing",
+            "retention.skip.invalid_days" if days <= 0 else "retention.skip.missing_base",
             extra={"perimeter_root": str(base_path), "days": days},
         )
+        return RetentionReport(dry_run=dry_run, complete=True)
+    sweep = RetentionSweep(base_path, days, patterns=patterns, dry_run=dry_run)
+    report = sweep.run(max_files=max_files, time_budget_s=time_budget_s)
+    extra = {
+        "perimeter_root": str(base_path),
+        "days": days,
+        "dry_run": dry_run,
+        "scanned": report.scanned,
+        "expired": report.expired,
+        "removed": report.removed,
+        "reclaimable_bytes": report.reclaimable_bytes,
+        "complete": report.complete,
+        "ms": report.elapsed_ms,
+    }
+    if report.removed or (dry_run and report.expired):
+        LOGGER.info("retention.remove.completed", extra=extra)
+    else:
+        LOGGER.debug("retention.remove.nothing", extra=extra)
+    return report
+
+
+def purge_old_artifacts(perimeter_root: Path, days: int, *, patterns: Iterable[str] | None = None) -> int:
+    """
+    Rimuove file temporanei più vecchi di `days` giorni all'interno di `perimeter_root`.
+
+    Args:
+        perimeter_root: radice del workspace cliente (es. output/timmy-kb-<slug>).
+        days: soglia massima di retention in giorni (deve essere > 0).
+        patterns: glob relative a `perimeter_root` da scandire (default: snapshot Vision).
+
+    Returns:
+        Numero di file rimossi con successo.
+    """
+    return sweep_old_artifacts(perimeter_root, days, patterns=patterns).removed
+
 
-    return total_removed
+__all__ = ["RetentionReport", "RetentionSweep", "purge_old_artifacts", "sweep_old_artifacts"]
@@ -5,7 +5,7 @@ from __future__ import annotations
 import logging
 import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Protocol, Sequence, TypeAlias, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Protocol, Sequence, TypeAlias, TypeVar, cast
 
 from pipeline.exceptions import ConfigError, PipelineError
 from pipeline.logging_utils import get_structured_logger, phase_scope
@@ -15,6 +15,7 @@ from semantic import embedding_service, tagging_service
 from semantic.convert_service import convert_markdown
 from semantic.embedding_service import list_content_markdown
 from semantic.frontmatter_service import enrich_frontmatter, write_summary_and_readme
+from semantic.stage_graph import Stage, run_stage_graph
 from semantic.tags_extractor import copy_local_pdfs_to_raw as _copy_local_pdfs_to_raw
 from semantic.types import EmbeddingsClient
 from semantic.vocab_loader import load_reviewed_vocab as _load_reviewed_vocab
@@ -294,7 +295,10 @@ def _run_build_workflow(
     enrich_fn: EnrichStage | None = None,
     summary_fn: SummaryStage | None = None,
 ) -> BuildWorkflowResult:
-    """Esegue convert -> enrich -> summary/readme restituendo repo_root_dir, mds e arricchiti.
+    """Esegue convert/vocab -> enrich -> summary/readme restituendo repo_root_dir, mds e arricchiti.
+
+    Gli stage sono un DAG eseguito da `semantic.stage_graph.run_stage_graph`: conversione e
+    caricamento del vocabolario si sovrappongono; `stage_wrapper` riceve gli stessi nomi di prima.
 
     Durante il run usa la cache LRU del frontmatter (gestita da `pipeline.content_utils`) per
     velocizzare le riletture; al termine svuota sempre la cache con `clear_frontmatter_cache()`
@@ -308,31 +312,12 @@ def _run_build_workflow(
         raise ConfigError("repo_root_dir non coerente con WorkspaceLayout.", slug=slug)
     repo_root_dir = layout.repo_root_dir
 
-    def _wrap(stage_name: str, func: Callable[[], Any]) -> Any:
-        if stage_wrapper is None:
-            return func()
-        return stage_wrapper(stage_name, func)
-
     convert_impl: ConvertStage = convert_fn or convert_markdown
     vocab_impl: VocabStage = vocab_fn or _require_reviewed_vocab
     enrich_impl: EnrichStage = enrich_fn or enrich_frontmatter
     summary_impl: SummaryStage = summary_fn or write_summary_and_readme
 
-    try:
-        mds: List[Path] = cast(
-            List[Path],
-            _wrap("convert_markdown", lambda: convert_impl(context, logger, slug=slug)),
-        )
-
-        vocab: Dict[str, Dict[str, Sequence[str]]] = cast(
-            Dict[str, Dict[str, Sequence[str]]],
-            _wrap("require_reviewed_vocab", lambda: vocab_impl(repo_root_dir, logger, slug=slug)),
-        )
-
-        touched: List[Path] = cast(
-            List[Path],
-            _wrap("enrich_frontmatter", lambda: enrich_impl(context, logger, vocab, slug=slug)),
-        )
+    def _log_enriched(touched: List[Path]) -> None:
         try:
             logger.info(
                 "semantic.book.frontmatter",
@@ -343,7 +328,35 @@ def _run_build_workflow(
                 "semantic.book.frontmatter",
                 extra={"slug": slug, "enriched": None, "error": str(exc)},
             )
-        _wrap("write_summary_and_readme", lambda: summary_impl(context, logger, slug=slug))
+
+    def _enrich(inputs: Mapping[str, Any]) -> List[Path]:
+        touched = cast(List[Path], enrich_impl(context, logger, inputs["require_reviewed_vocab"], slug=slug))
+        _log_enriched(touched)
+        return touched
+
+    # DAG: la lettura del vocabolario (tags.db) non dipende dalla conversione e parte in parallelo.
+    # Summary/README richiedono solo i markdown convertiti ma restano dopo l'arricchimento:
+    # `write_summary_and_readme` riscrive semantic/layout_proposal.yaml, che enrich legge.
+    stages = (
+        Stage("convert_markdown", lambda _inputs: convert_impl(context, logger, slug=slug)),
+        Stage(
+            "require_reviewed_vocab",
+            lambda _inputs: vocab_impl(repo_root_dir, logger, slug=slug),
+            phase="require_reviewed_vocab",
+        ),
+        Stage("enrich_frontmatter", _enrich, inputs=("convert_markdown", "require_reviewed_vocab")),
+        Stage(
+            "write_summary_and_readme",
+            lambda _inputs: summary_impl(context, logger, slug=slug),
+            inputs=("convert_markdown",),
+            after=("enrich_frontmatter",),
+        ),
+    )
+
+    try:
+        results = run_stage_graph(stages, logger=logger, slug=slug, stage_wrapper=stage_wrapper)
+        mds = cast(List[Path], results["convert_markdown"])
+        touched = cast(List[Path], results["enrich_frontmatter"])
         return repo_root_dir, mds, touched
     finally:
         _cleanup_frontmatter_cache(logger, context, slug=slug)
@@ -474,6 +487,7 @@ def index_markdown_to_db(
             embeddings_client=embeddings_client,
             db_path=effective_db_path,
             chunk_records=chunk_records,
+            semantic_dir=layout.semantic_dir,
         ),
     )
 
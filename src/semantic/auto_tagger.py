@@ -247,9 +247,14 @@ def extract_semantic_candidates(
     cfg: SemanticConfig,
     *,
     safe_pdfs: Sequence[Path] | None = None,
+    only: Sequence[Path] | None = None,
 ) -> dict[str, dict[str, Any]]:
-    """Genera candidati dai Markdown sotto `normalized_dir` usando euristiche path/filename e opzionalmente SpaCy."""
-    candidates = _extract_semantic_candidates_heuristic(normalized_dir, cfg, pdfs=safe_pdfs)
+    """Genera candidati dai Markdown sotto `normalized_dir` usando euristiche path/filename e opzionalmente SpaCy.
+
+    `only` limita l'analisi (euristica e SpaCy) ai Markdown indicati, per i rebuild incrementali.
+    """
+    pdfs = safe_pdfs if only is None else list(only)
+    candidates = _extract_semantic_candidates_heuristic(normalized_dir, cfg, pdfs=pdfs)
 
     backend_env = os.getenv("TAGS_NLP_BACKEND", cfg.nlp_backend).strip().lower()
     if backend_env != "spacy":
@@ -266,6 +271,7 @@ def extract_semantic_candidates(
             cfg,
             model_name=model_name,
             logger=LOGGER,
+            only=only,
         )
         candidates = _merge_spacy_candidates(candidates, spacy_candidates)
         if spacy_candidates:
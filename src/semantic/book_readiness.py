@@ -12,13 +12,18 @@ Criteri di "book pronta":
 
 Questo modulo NON dipende da Streamlit o dalla UI.
 La funzione principale è `check_book_dir`, che può essere usata
-sia dalla UI che dai CLI.
+sia dalla UI che dai CLI. Il verdetto è in cache (firma mtime delle
+directory); i writer della pipeline chiamano `invalidate_book_readiness`.
 """
 
 from __future__ import annotations
 
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from pipeline.logging_utils import get_structured_logger
 
@@ -36,22 +41,112 @@ except Exception as exc:  # pragma: no cover - default di sicurezza
     )
 
 
-def _iter_markdown_files(book_dir: Path) -> List[Path]:
-    """
-    Restituisce tutti i file .md sotto `book_dir`, in modo robusto.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class _Verdict:
+    ready: bool
+    errors: Tuple[str, ...]
+    first_content: str | None
+    # (directory, mtime_ns) delle directory da cui dipende il verdetto.
+    signature: Tuple[Tuple[str, int], ...]
+
+
+_CACHE: Dict[str, _Verdict] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _dir_mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
 
-    Non fa assunzioni sulla struttura delle sottocartelle.
+def _probe(book_dir: Path) -> _Verdict:
+    """Scansione con uscita anticipata: root di book/, poi sottocartelle fino al primo .md di contenuto.
+
+    Il verdetto "pronta" dipende solo dalla root e dalle directory sul percorso del primo file di
+    contenuto; quello "non pronta" da tutte le directory visitate (nessun .md di contenuto trovato).
     """
-    if not book_dir.exists() or not book_dir.is_dir():
-        return []
+    root = str(book_dir)
+    visited: List[Tuple[str, int]] = []
+    names: set[str] = set()
+    first_content: str | None = None
+    any_md = False
+    # (directory, catena di directory antenate) per ricostruire la firma del percorso.
+    stack: List[Tuple[str, Tuple[str, ...]]] = [(root, ())]
+    content_chain: Tuple[str, ...] = ()
+    while stack and first_content is None:
+        current, chain = stack.pop()
+        mtime = _dir_mtime(current)
+        if mtime is None:
+            continue
+        visited.append((current, mtime))
+        try:
+            with os.scandir(current) as iterator:
+                subdirs: List[str] = []
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    if current == root:
+                        names.add(entry.name)
+                    if not entry.name.endswith(".md"):
+                        continue
+                    any_md = True
+                    if current == root and entry.name in (README_MD_NAME, SUMMARY_MD_NAME):
+                        continue
+                    if first_content is None:
+                        first_content = entry.path
+                        content_chain = (*chain, current)
+        except OSError:
+            continue
+        stack.extend((sub, (*chain, current)) for sub in sorted(subdirs, reverse=True))
+
+    errors: list[str] = []
+    if not any_md:
+        errors.append("Nessun file .md trovato in book/.")
+    else:
+        if README_MD_NAME not in names:
+            errors.append(f"File README mancante: {README_MD_NAME}")
+        if SUMMARY_MD_NAME not in names:
+            errors.append(f"File SUMMARY mancante: {SUMMARY_MD_NAME}")
+        if first_content is None:
+            errors.append("Nessun file Markdown di contenuto trovato in book/ (solo README/SUMMARY).")
+    if first_content is not None:
+        mtimes = dict(visited)
+        signature = tuple((path, mtimes[path]) for path in content_chain)
+    else:
+        signature = tuple(visited)
+    return _Verdict(not errors, tuple(errors), first_content, signature)
+
+
+def _signature_valid(verdict: _Verdict) -> bool:
+    return all(_dir_mtime(path) == mtime for path, mtime in verdict.signature)
+
 
-    return sorted(book_dir.rglob("*.md"))
+def invalidate_book_readiness(book_dir: Path | None = None) -> None:
+    """Scarta il verdetto in cache (tutti i book se `book_dir` è None); chiamata dai writer del book."""
+    with _CACHE_LOCK:
+        if book_dir is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(str(Path(book_dir)), None)
 
 
 def check_book_dir(book_dir: Path) -> Tuple[bool, list[str]]:
     """
     Verifica che la cartella `book/` sia strutturalmente pronta.
 
+    Il verdetto è in cache per directory e resta valido finché non cambiano le mtime delle
+    directory da cui dipende (o finché un writer della pipeline chiama `invalidate_book_readiness`):
+    il polling della UI costa qualche `stat`, indipendentemente dalla dimensione del book.
+
     Parameters
     ----------
     book_dir:
@@ -64,60 +159,40 @@ def check_book_dir(book_dir: Path) -> Tuple[bool, list[str]]:
         - ready: True se la cartella è "ok" per l'anteprima.
         - errors: elenco di messaggi di errore (vuoto se ready=True).
     """
-    errors: list[str] = []
-
     if not book_dir:
-        errors.append("Percorso book_dir mancante o non valido.")
-        return False, errors
+        return False, ["Percorso book_dir mancante o non valido."]
 
     if not book_dir.exists():
-        errors.append(f"Directory inesistente: {book_dir!s}")
-        return False, errors
+        return False, [f"Directory inesistente: {book_dir!s}"]
 
     if not book_dir.is_dir():
-        errors.append(f"Non è una directory: {book_dir!s}")
-        return False, errors
-
-    md_files = _iter_markdown_files(book_dir)
-    if not md_files:
-        errors.append("Nessun file .md trovato in book/.")
-        return False, errors
-
-    # README.md e SUMMARY.md di root
-    readme_path = book_dir / README_MD_NAME
-    summary_path = book_dir / SUMMARY_MD_NAME
-
-    if not readme_path.exists():
-        errors.append(f"File README mancante: {readme_path.name}")
-    if not summary_path.exists():
-        errors.append(f"File SUMMARY mancante: {summary_path.name}")
-
-    # File di contenuto: tutti i .md tranne README/SUMMARY root
-    content_mds: list[Path] = []
-    for path in md_files:
-        # escludiamo solo i README/SUMMARY nella root di book
-        if path == readme_path or path == summary_path:
-            continue
-        content_mds.append(path)
-
-    if not content_mds:
-        errors.append("Nessun file Markdown di contenuto trovato in book/ " "(solo README/SUMMARY).")
-
-    ready = not errors
-
-    # Logging di supporto per debug/observability
-    if ready:
+        return False, [f"Non è una directory: {book_dir!s}"]
+
+    key = str(Path(book_dir))
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and _signature_valid(cached):
+        return cached.ready, list(cached.errors)
+
+    verdict = _probe(Path(book_dir))
+    newest = max((mtime for _path, mtime in verdict.signature), default=0)
+    if time.time_ns() - newest >= _RACY_WINDOW_NS:
+        with _CACHE_LOCK:
+            _CACHE[key] = verdict
+
+    # Logging di supporto per debug/observability (solo quando il verdetto viene ricalcolato)
+    if verdict.ready:
         logger.info(
             "book.readiness.ok",
-            extra={"book_dir": str(book_dir), "content_files": len(content_mds)},
+            extra={"book_dir": str(book_dir), "first_content": verdict.first_content},
         )
     else:
         logger.warning(
             "book.readiness.fail",
-            extra={"book_dir": str(book_dir), "errors": errors},
+            extra={"book_dir": str(book_dir), "errors": list(verdict.errors)},
         )
 
-    return ready, errors
+    return verdict.ready, list(verdict.errors)
 
 
 def is_book_ready(book_dir: Path) -> bool:
@@ -128,3 +203,6 @@ def is_book_ready(book_dir: Path) -> bool:
     """
     ready, _ = check_book_dir(book_dir)
     return ready
+
+
+__all__ = ["check_book_dir", "invalidate_book_readiness", "is_book_ready"]
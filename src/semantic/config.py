@@ -59,6 +59,8 @@ _DEFAULTS: dict[str, Any] = {
     "stop_tags": ["bozza", "varie"],  # blacklist locale
     "nlp_backend": "spacy",  # default SpaCy, heuristic di default se assente
     "spacy_model": "it_core_news_sm",
+    "convert_workers": 1,  # processi per l'estrazione PDF nella fase convert (0 = tutti i core)
+    "enrich_workers": 1,  # thread per l'arricchimento frontmatter (0 = tutti i core)
 }
 
 # Chiavi accettate nella sezione semantic_defaults e negli overrides runtime
@@ -78,6 +80,8 @@ class SemanticConfig:
     stop_tags: set[str] = field(default_factory=set)
     nlp_backend: str = "heuristic"
     spacy_model: str = "it_core_news_sm"
+    convert_workers: int = 1
+    enrich_workers: int = 1
 
     # Riferimenti utili per l'orchestrazione
     repo_root_dir: Path = Path(".")  # workspace root (resolve in load)
@@ -158,7 +162,7 @@ def _normalize_tagger_section(d: dict[str, Any]) -> dict[str, Any]:
     for k, v in d.items():
         if k not in _ALLOWED_KEYS:
             continue
-        if k in {"max_pages", "top_k"}:
+        if k in {"max_pages", "top_k", "convert_workers", "enrich_workers"}:
             try:
                 out[k] = int(v)
             except Exception as exc:
@@ -298,6 +302,8 @@ def load_semantic_config(
         stop_tags=_coerce_stop_tags(acc.get("stop_tags")),
         nlp_backend=_coerce_str(acc.get("nlp_backend"), _DEFAULTS["nlp_backend"]),
         spacy_model=_coerce_str(acc.get("spacy_model"), _DEFAULTS["spacy_model"]),
+        convert_workers=max(0, _coerce_int(acc.get("convert_workers"), _DEFAULTS["convert_workers"])),
+        enrich_workers=max(0, _coerce_int(acc.get("enrich_workers"), _DEFAULTS["enrich_workers"])),
         repo_root_dir=repo_root_dir,
         semantic_dir=semantic_dir,
         raw_dir=raw_dir,
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import datetime as _dt
 import logging
+import os
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -17,13 +18,23 @@ from pipeline.logging_utils import phase_scope
 from pipeline.path_utils import ensure_within, ensure_within_and_resolve, read_text_safe
 from pipeline.workspace_layout import WorkspaceLayout
 from semantic.auto_tagger import extract_semantic_candidates
+from semantic.book_readiness import invalidate_book_readiness
 from semantic.config import load_semantic_config
 from semantic.context_paths import ContextPaths, resolve_context_paths
 from semantic.embedding_service import list_content_markdown
+from semantic.stage_fingerprints import (
+    StageFingerprints,
+    digest_json,
+    file_sha256,
+    log_stage_delta,
+    semantic_config_digest,
+)
 from semantic.types import ClientContextProtocol
 
 __all__ = ["convert_markdown", "discover_normalized_inputs", "_call_convert_md"]
 
+CONVERT_STAGE = "convert_markdown"
+
 
 @dataclass(frozen=True)
 class NormalizedDiscovery:
@@ -71,8 +82,10 @@ def convert_markdown(
         safe_mds=safe_mds,
         discarded_unsafe=discarded_unsafe,
         start_ts=start_ts,
+        semantic_dir=layout.semantic_dir,
     )
 
+    invalidate_book_readiness(book_dir)
     if not result:
         raise ConfigError(
             "Nessun Markdown valido trovato in normalized/ e nessun contenuto preesistente.",
@@ -224,26 +237,71 @@ def _write_markdown_for_normalized(
     return book_path
 
 
+def _convert_env_digest(repo_root_dir: Path) -> str:
+    return digest_json(
+        {
+            "config": semantic_config_digest(repo_root_dir),
+            "spacy_model": os.getenv("SPACY_MODEL", ""),
+            "nlp_backend": os.getenv("TAGS_NLP_BACKEND", ""),
+        }
+    )
+
+
 def _convert_normalized_markdown(
     paths: ContextPaths,
     book_dir: Path,
     safe_mds: Sequence[Path],
     *,
     logger: logging.Logger,
+    semantic_dir: Path | None = None,
 ) -> List[Path]:
     cfg = load_semantic_config(paths.repo_root_dir, slug=paths.slug)
-    candidates = extract_semantic_candidates(paths.normalized_dir, cfg)
+    normalized_dir = paths.normalized_dir
+    todo = list(safe_mds)
+    manifest: StageFingerprints | None = None
+    env = ""
+    fingerprints: dict[str, str] = {}
+    if semantic_dir is not None:
+        # Rebuild incrementale: si rianalizzano solo i Markdown normalizzati cambiati (o senza output).
+        manifest = StageFingerprints.load(semantic_dir)
+        env = _convert_env_digest(paths.repo_root_dir)
+        fingerprints = {md.relative_to(normalized_dir).as_posix(): file_sha256(md) for md in safe_mds}
+        delta = manifest.delta(CONVERT_STAGE, env, fingerprints)
+        if not delta.full:
+            changed = set(delta.changed)
+            todo = [
+                md
+                for md in safe_mds
+                if md.relative_to(normalized_dir).as_posix() in changed
+                or not (book_dir / md.relative_to(normalized_dir)).is_file()
+            ]
+        log_stage_delta(logger, CONVERT_STAGE, delta, slug=paths.slug)
+
+    if todo and len(todo) < len(safe_mds):
+        candidates = extract_semantic_candidates(normalized_dir, cfg, only=todo)
+    elif todo:
+        candidates = extract_semantic_candidates(normalized_dir, cfg)
+    else:
+        candidates = {}
+    pending = set(todo)
     written: list[Path] = []
     for md_path in safe_mds:
+        if md_path not in pending:
+            rel_md = md_path.relative_to(normalized_dir)
+            written.append(cast(Path, ensure_within_and_resolve(book_dir, book_dir / rel_md)))
+            continue
         written.append(
             _write_markdown_for_normalized(
                 md_path,
-                paths.normalized_dir,
+                normalized_dir,
                 book_dir,
                 candidates,
                 slug=paths.slug,
             )
         )
+    if manifest is not None:
+        manifest.record(CONVERT_STAGE, env, fingerprints)
+        manifest.save()
     return written
 
 
@@ -287,6 +345,7 @@ def _run_markdown_conversion(
     safe_mds: Sequence[Path],
     discarded_unsafe: int,
     start_ts: float,
+    semantic_dir: Path | None = None,
 ) -> List[Path]:
 
     slug = paths.slug
@@ -308,7 +367,9 @@ def _run_markdown_conversion(
 
     with phase_scope(logger, stage="convert_markdown", customer=slug) as scope:
         if safe_list:
-            content_mds = _convert_normalized_markdown(paths, book_dir, safe_list, logger=logger)
+            content_mds = _convert_normalized_markdown(
+                paths, book_dir, safe_list, logger=logger, semantic_dir=semantic_dir
+            )
         else:
             content_mds = cast(List[Path], list_content_markdown(book_dir))
             user_content = [p for p in content_mds if p.name not in {"README.md", "SUMMARY.md"}]
@@ -6,6 +6,7 @@ from __future__ import annotations
 import hashlib
 import logging
 import time
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence
@@ -18,12 +19,15 @@ from pipeline.frontmatter_utils import read_frontmatter as _read_fm
 from pipeline.logging_utils import phase_scope
 from pipeline.path_utils import ensure_within, iter_safe_paths, sorted_paths
 from pipeline.types import ChunkRecord
+from semantic.stage_fingerprints import StageFingerprints, digest_json, file_sha256, log_stage_delta
 from semantic.types import EmbeddingsClient as _EmbeddingsClient
 from storage.kb_db import init_db as _init_kb_db
 from storage.kb_db import insert_chunks as _insert_chunks
 
 __all__ = ["list_content_markdown", "index_markdown_to_db"]
 
+INDEX_STAGE = "index_markdown_to_db"
+
 
 def list_content_markdown(book_dir: Path) -> List[Path]:
     """Elenca i Markdown 'di contenuto' in book_dir, escludendo README/SUMMARY."""
@@ -275,6 +279,25 @@ def _compute_embeddings_for_markdown(
     )
 
 
+def _fully_persisted(
+    fingerprints: Dict[str, str],
+    collected: _CollectedMarkdown,
+    persisted_paths: Sequence[str],
+    logger: logging.Logger,
+    slug: str,
+) -> Dict[str, str]:
+    """Impronte dei soli file con tutti i chunk persistiti: gli altri vengono rifatti al run successivo."""
+    expected = Counter(collected.rel_paths)
+    stored = Counter(persisted_paths)
+    incomplete = {rel for rel, count in expected.items() if stored.get(rel, 0) < count}
+    if incomplete:
+        logger.info(
+            "semantic.index.incomplete_files",
+            extra={"slug": slug, "count": len(incomplete), "files": sorted(incomplete)[:5]},
+        )
+    return {rel: digest for rel, digest in fingerprints.items() if rel not in incomplete}
+
+
 def _log_index_skips(
     logger: logging.Logger,
     slug: str,
@@ -441,8 +464,13 @@ def index_markdown_to_db(
     embeddings_client: _EmbeddingsClient,
     db_path: Optional[Path],
     chunk_records: Sequence[ChunkRecord] | None = None,
+    semantic_dir: Optional[Path] = None,
 ) -> int:
-    """Indicizza i Markdown presenti in `book_dir` nel DB con embeddings."""
+    """Indicizza i Markdown presenti in `book_dir` nel DB con embeddings.
+
+    Con `semantic_dir` (e senza `chunk_records` espliciti) l'indicizzazione è incrementale: si
+    ricalcolano gli embeddings solo dei file cambiati dall'ultimo run riuscito sullo stesso DB.
+    """
     if db_path is None:
         raise ConfigError(
             "db_path must be provided explicitly via WorkspaceLayout / ClientContext. "
@@ -455,6 +483,9 @@ def index_markdown_to_db(
     start_ts = time.perf_counter()
 
     collected: _CollectedMarkdown
+    manifest: Optional[StageFingerprints] = None
+    env = ""
+    fingerprints: Dict[str, str] = {}
     if chunk_records is not None:
         total_files = len(chunk_records)
         collected = _collect_chunk_records(chunk_records, logger, slug)
@@ -487,6 +518,29 @@ def index_markdown_to_db(
                 extra={"slug": slug, "ms": duration_ms, "artifacts": {"inserted": 0, "files": 0}},
             )
             return 0
+        if semantic_dir is not None:
+            manifest = StageFingerprints.load(semantic_dir)
+            if not Path(db_path).exists():
+                manifest.forget([INDEX_STAGE])
+            env = digest_json(
+                {
+                    "scope": scope,
+                    "db_path": Path(db_path).resolve(),
+                    "model": getattr(embeddings_client, "model", None) or type(embeddings_client).__name__,
+                }
+            )
+            fingerprints = {path.relative_to(book_dir).as_posix(): file_sha256(path) for path in files}
+            delta = manifest.delta(INDEX_STAGE, env, fingerprints)
+            log_stage_delta(logger, INDEX_STAGE, delta, slug=slug)
+            changed = set(delta.changed)
+            files = [path for path in files if path.relative_to(book_dir).as_posix() in changed]
+            if not files:
+                duration_ms = int((time.perf_counter() - start_ts) * 1000)
+                logger.info(
+                    "semantic.index.done",
+                    extra={"slug": slug, "ms": duration_ms, "artifacts": {"inserted": 0, "files": 0}, "skipped": True},
+                )
+                return 0
         total_files = len(files)
         logger.info(
             "semantic.index.collect.start",
@@ -541,6 +595,9 @@ def index_markdown_to_db(
             "semantic.index.done",
             extra={"slug": slug, "ms": duration_ms, "artifacts": {"inserted": 0, "files": total_files}},
         )
+        if manifest is not None:
+            manifest.record(INDEX_STAGE, env, _fully_persisted(fingerprints, collected, (), logger, slug))
+            manifest.save()
         return 0
 
     with phase_scope(logger, stage="index_markdown_to_db", customer=slug) as phase:
@@ -606,4 +663,11 @@ def index_markdown_to_db(
             phase.set_artifacts(inserted_total)
         except Exception:
             phase.set_artifacts(None)
-        return inserted_total
+    if manifest is not None:
+        manifest.record(
+            INDEX_STAGE,
+            env,
+            _fully_persisted(fingerprints, collected, embeddings_result.rel_paths, logger, slug),
+        )
+        manifest.save()
+    return inserted_total
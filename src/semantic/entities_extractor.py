@@ -10,14 +10,18 @@ passato già caricato). Serve come step intermedio prima di salvare nel DB
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Sequence, Tuple
-
-from spacy.language import Language
-from spacy.matcher import PhraseMatcher
-from spacy.tokens import Doc, Span
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, Tuple
 
+from pipeline.capabilities.lazy import lazy_module
 from semantic.lexicon import LexiconEntry
 
+if TYPE_CHECKING:  # pragma: no cover
+    from spacy.language import Language
+    from spacy.matcher import PhraseMatcher
+    from spacy.tokens import Doc, Span
+
+_spacy_matcher = lazy_module("spacy.matcher")
+
 # Tipi di supporto
 Lexicon = Dict[str, Dict[str, LexiconEntry]]
 
@@ -48,7 +52,7 @@ def make_phrase_matcher(
     attr: str = "LOWER",
 ) -> PhraseMatcher:
     """Crea un PhraseMatcher popolato con tutti i termini del lexicon."""
-    matcher = PhraseMatcher(nlp.vocab, attr=attr)
+    matcher = _spacy_matcher.PhraseMatcher(nlp.vocab, attr=attr)
     for area_key, entities in lexicon.items():
         for entity_id, entity in entities.items():
             patterns = []
@@ -43,6 +43,20 @@ def load_entities_for_doc(conn: sqlite3.Connection, doc_uid: str) -> List[Entity
     return [EntityRecord(area_key=str(r[0]), entity_id=str(r[1]), label="") for r in rows]
 
 
+def load_approved_entities_index(conn: sqlite3.Connection) -> Dict[str, List[EntityRecord]]:
+    """Legge in un'unica query tutte le entità approvate, indicizzate per doc_uid."""
+    rows = conn.execute("""
+        SELECT doc_uid, area_key, entity_id
+        FROM doc_entities
+        WHERE status = 'approved'
+        ORDER BY doc_uid, id
+        """).fetchall()
+    index: Dict[str, List[EntityRecord]] = {}
+    for r in rows:
+        index.setdefault(str(r[0]), []).append(EntityRecord(area_key=str(r[1]), entity_id=str(r[2]), label=""))
+    return index
+
+
 def build_entity_label_index(mapping: Mapping[str, Any]) -> Dict[str, Dict[str, str]]:
     """Indice area_key -> entity_id -> label canonica dal semantic_mapping."""
     index: Dict[str, Dict[str, str]] = {}
@@ -109,12 +123,35 @@ def enrich_frontmatter_with_entities(
     doc_uid = str(frontmatter.get("doc_uid", "")).strip()
     if not doc_uid:
         return frontmatter
+    return _apply_entities(frontmatter, load_entities_for_doc(conn, doc_uid), mapping)
+
+
+def enrich_frontmatter_with_entities_index(
+    frontmatter: Dict[str, Any],
+    entities_by_doc: Mapping[str, List[EntityRecord]],
+    mapping: Mapping[str, Any],
+    *,
+    label_index: Dict[str, Dict[str, str]] | None = None,
+) -> Dict[str, Any]:
+    """Variante di `enrich_frontmatter_with_entities` su indice già caricato (vedi `load_approved_entities_index`)."""
+    doc_uid = str(frontmatter.get("doc_uid", "")).strip()
+    if not doc_uid:
+        return frontmatter
+    return _apply_entities(frontmatter, entities_by_doc.get(doc_uid) or [], mapping, label_index=label_index)
 
-    raw_entities = load_entities_for_doc(conn, doc_uid)
+
+def _apply_entities(
+    frontmatter: Dict[str, Any],
+    raw_entities: List[EntityRecord],
+    mapping: Mapping[str, Any],
+    *,
+    label_index: Dict[str, Dict[str, str]] | None = None,
+) -> Dict[str, Any]:
     if not raw_entities:
         return frontmatter
 
-    label_index = build_entity_label_index(mapping)
+    if label_index is None:
+        label_index = build_entity_label_index(mapping)
     entities = enrich_entity_labels(raw_entities, label_index)
     relations = build_relations_for_doc(mapping, entities)
 
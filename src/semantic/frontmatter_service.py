@@ -4,11 +4,14 @@
 from __future__ import annotations
 
 import logging
+import os
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, cast
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, cast
 
 from pipeline.content_utils import generate_readme_markdown as _gen_readme
 from pipeline.content_utils import generate_summary_markdown as _gen_summary
@@ -22,11 +25,25 @@ from pipeline.path_utils import ensure_within, ensure_within_and_resolve, read_t
 from pipeline.qa_gate import require_qa_gate_pass
 from pipeline.vision_paths import vision_yaml_workspace_path
 from pipeline.workspace_layout import WorkspaceLayout
+from semantic.book_readiness import invalidate_book_readiness
 from semantic.config import load_semantic_config
 from semantic.context_paths import resolve_context_paths
 from semantic.embedding_service import list_content_markdown
-from semantic.entities_frontmatter import enrich_frontmatter_with_entities
+from semantic.entities_frontmatter import (
+    EntityRecord,
+    build_entity_label_index,
+    enrich_frontmatter_with_entities_index,
+    load_approved_entities_index,
+)
 from semantic.layout_enricher import merge_non_distruttivo, suggest_layout
+from semantic.stage_fingerprints import (
+    StageFingerprints,
+    digest_json,
+    file_sha256,
+    file_signature,
+    log_stage_delta,
+    semantic_config_digest,
+)
 from semantic.types import ClientContextProtocol
 from storage.tags_store import get_conn as _get_tags_conn
 
@@ -43,6 +60,9 @@ __all__ = [
     "_parse_frontmatter",
 ]
 
+ENRICH_STAGE = "enrich_frontmatter"
+SUMMARY_STAGE = "write_summary_and_readme"
+
 
 def _get_vision_statement_path(repo_root_dir: Path) -> Path:
     return vision_yaml_workspace_path(repo_root_dir)
@@ -313,6 +333,142 @@ def _persist_layout_proposal(layout: WorkspaceLayout, logger: logging.Logger, *,
     )
 
 
+@dataclass(frozen=True)
+class _EnrichmentPlan:
+    """Dati preparati una sola volta per l'intero book (fase di preparazione)."""
+
+    book_dir: Path
+    vocab: Dict[str, Dict[str, Sequence[str]]]
+    inv: Dict[str, Set[str]]
+    layout_keys: list[str]
+    vision_entities_by_lower: Dict[str, str]
+    relation_hints_by_entity: Dict[str, list[dict[str, str]]]
+    tags_db: Path
+    entities_by_doc: Optional[Mapping[str, list[EntityRecord]]]
+    entities_error: Optional[BaseException]
+    semantic_mapping: Mapping[str, Any]
+    entity_label_index: Dict[str, Dict[str, str]]
+
+
+@dataclass(frozen=True)
+class _FrontmatterUpdate:
+    md: Path
+    tags: List[str]
+    tags_raw: List[str]
+    canonical_from_raw: List[str]
+
+
+def _index_vision_entities(vision_entities: Sequence[str]) -> Dict[str, str]:
+    by_lower: Dict[str, str] = {}
+    for ent in vision_entities:
+        by_lower.setdefault(ent.lower(), ent)
+    return by_lower
+
+
+def _index_relation_hints(relations_all: Sequence[Any]) -> Dict[str, list[dict[str, str]]]:
+    """Indicizza le relazioni per entità (from/to) preservando l'ordine del mapping."""
+    index: Dict[str, list[dict[str, str]]] = {}
+    for rel in relations_all:
+        if not isinstance(rel, dict):
+            continue
+        src = str(rel.get("from", "")).strip()
+        dst = str(rel.get("to", "")).strip()
+        rtype = str(rel.get("type", "")).strip()
+        if not (src and dst and rtype):
+            continue
+        index.setdefault(src, []).append({"type": rtype, "target": dst})
+        if dst != src:
+            index.setdefault(dst, []).append({"type": rtype, "target": src})
+    return index
+
+
+def _prefetch_doc_entities(
+    tags_db: Path,
+) -> Tuple[Optional[Dict[str, list[EntityRecord]]], Optional[BaseException]]:
+    """Carica le doc_entities approvate con una sola connessione e una sola query.
+
+    L'errore viene restituito (non sollevato): fallisce solo se un documento con `doc_uid`
+    ne ha effettivamente bisogno, come nel percorso per-file.
+    """
+    if not tags_db.exists():
+        return None, None
+    try:
+        with _get_tags_conn(str(tags_db)) as conn:
+            return load_approved_entities_index(conn), None
+    except Exception as exc:
+        return None, exc
+
+
+def _enrich_markdown_file(
+    md: Path,
+    plan: _EnrichmentPlan,
+    read_fm: Callable[..., Tuple[Dict[str, Any], str]],
+    *,
+    slug: str,
+) -> Optional[_FrontmatterUpdate]:
+    book_dir = plan.book_dir
+    name = md.name
+    title = re.sub(r"[_\/\-\s]+", " ", Path(name).stem).strip().replace("  ", " ") or "Documento"
+    try:
+        meta, body = read_fm(book_dir, md, encoding="utf-8", use_cache=True)
+    except OSError as exc:
+        raise PipelineError(
+            f"Frontmatter read failed for slug={slug}.",
+            slug=slug,
+            file_path=md,
+        ) from exc
+
+    raw_list = _as_list_str(meta.get("tags_raw"))
+    canonical_from_raw = _canonicalize_tags(raw_list, plan.inv)
+    tags = canonical_from_raw or _guess_tags_for_name(name, plan.vocab, inv=plan.inv)
+    new_meta = _merge_frontmatter(meta, title=title, tags=tags)
+    section = _layout_section_from_md(md, book_dir, plan.layout_keys)
+    if section and not new_meta.get("layout_section"):
+        new_meta["layout_section"] = section
+    # Enrichment ER-driven: entity/area/relation_hints
+    inferred_entity: Optional[str] = None
+    tag_candidates = _as_list_str(new_meta.get("tags")) + _as_list_str(new_meta.get("tags_raw"))
+    for t in tag_candidates:
+        inferred_entity = plan.vision_entities_by_lower.get(t.strip().lower())
+        if inferred_entity:
+            break
+    if inferred_entity and not new_meta.get("entity"):
+        new_meta["entity"] = inferred_entity
+    if not new_meta.get("relation_hints") and new_meta.get("entity"):
+        rel_hints = plan.relation_hints_by_entity.get(new_meta["entity"])
+        if rel_hints:
+            new_meta["relation_hints"] = [dict(hint) for hint in rel_hints]
+    # Arricchimento additivo da doc_entities (se presenti e approvate)
+    if plan.entities_error is not None and str(new_meta.get("doc_uid", "")).strip():
+        exc = plan.entities_error
+        err_line = str(exc).splitlines()[0].strip() if str(exc) else ""
+        raise ConfigError(
+            f"Arricchimento doc_entities fallito: {type(exc).__name__}: {err_line}",
+            slug=slug,
+            file_path=plan.tags_db,
+        ) from exc
+    if plan.entities_by_doc is not None:
+        new_meta = enrich_frontmatter_with_entities_index(
+            new_meta,
+            plan.entities_by_doc,
+            plan.semantic_mapping,
+            label_index=plan.entity_label_index,
+        )
+    if meta == new_meta:
+        return None
+    fm = _dump_frontmatter(new_meta)
+    try:
+        ensure_within(book_dir, md)
+        safe_write_text(md, fm + body, encoding="utf-8", atomic=True)
+    except OSError as exc:
+        raise PipelineError(
+            f"Frontmatter write failed for slug={slug}.",
+            slug=slug,
+            file_path=md,
+        ) from exc
+    return _FrontmatterUpdate(md=md, tags=tags, tags_raw=raw_list, canonical_from_raw=canonical_from_raw)
+
+
 def enrich_frontmatter(
     context: ClientContextProtocol,
     logger: logging.Logger,
@@ -320,7 +476,16 @@ def enrich_frontmatter(
     *,
     slug: str,
     allow_empty_vocab: bool = False,
+    workers: int | None = None,
 ) -> List[Path]:
+    """Arricchisce il frontmatter dei markdown del book.
+
+    Fase di preparazione unica (vocabolario inverso, entità Vision, relazioni indicizzate
+    per entità, doc_entities approvate lette con una sola connessione), poi elaborazione
+    per file con una sola scrittura atomica per file modificato. Con `workers > 1` i file
+    sono elaborati in parallelo; l'ordine dei risultati resta quello di `list_content_markdown`.
+    `workers=None` usa `semantic_defaults.enrich_workers` (0 = tutti i core).
+    """
     from pipeline.frontmatter_utils import read_frontmatter as _read_fm
 
     start_ts = time.perf_counter()
@@ -357,113 +522,111 @@ def enrich_frontmatter(
     relations_raw = mapping_all.get("relations")
     relations_all: list[Any] = relations_raw if isinstance(relations_raw, list) else []
 
+    tags_db = repo_root_dir / "semantic" / "tags.db"
     if not vocab:
-        tags_db = repo_root_dir / "semantic" / "tags.db"
         logger.info(
             "semantic.frontmatter.skip_tags",
             extra={"slug": slug, "reason": "empty_vocab_allowed", "file_path": str(tags_db)},
         )
 
-    mds = list_content_markdown(book_dir)
+    all_mds = list_content_markdown(book_dir)
+    # Rebuild incrementale: un file già arricchito con lo stesso vocabolario/config/layout non cambia.
+    manifest = StageFingerprints.load(layout.semantic_dir)
+    env = digest_json(
+        {
+            "vocab": vocab,
+            "config": semantic_config_digest(repo_root_dir),
+            "layout": file_sha256(repo_root_dir / "semantic" / "layout_proposal.yaml"),
+            "tags_db": file_signature(tags_db),
+        }
+    )
+    fingerprints = {md.relative_to(book_dir).as_posix(): file_sha256(md) for md in all_mds}
+    delta = manifest.delta(ENRICH_STAGE, env, fingerprints)
+    log_stage_delta(logger, ENRICH_STAGE, delta, slug=slug)
+    changed = set(delta.changed)
+    mds = [md for md in all_mds if md.relative_to(book_dir).as_posix() in changed]
     touched: List[Path] = []
-    inv = _build_inverse_index(vocab)
+    entities_by_doc, entities_error = _prefetch_doc_entities(tags_db)
+    semantic_mapping: Mapping[str, Any] = getattr(paths, "semantic_mapping", {})
+    plan = _EnrichmentPlan(
+        book_dir=book_dir,
+        vocab=vocab,
+        inv=_build_inverse_index(vocab),
+        layout_keys=layout_keys,
+        vision_entities_by_lower=_index_vision_entities(vision_entities),
+        relation_hints_by_entity=_index_relation_hints(relations_all),
+        tags_db=tags_db,
+        entities_by_doc=entities_by_doc,
+        entities_error=entities_error,
+        semantic_mapping=semantic_mapping,
+        entity_label_index=build_entity_label_index(semantic_mapping),
+    )
+    configured = int((getattr(cfg, "enrich_workers", 1) if workers is None else workers) or 0)
+    if configured <= 0:
+        configured = os.cpu_count() or 1
+    worker_count = max(1, min(configured, len(mds) or 1))
 
     with phase_scope(logger, stage="enrich_frontmatter", customer=slug) as scope:
-        for md in mds:
-            name = md.name
-            title = re.sub(r"[_\/\-\s]+", " ", Path(name).stem).strip().replace("  ", " ") or "Documento"
-            try:
-                meta, body = _read_fm(book_dir, md, encoding="utf-8", use_cache=True)
-            except OSError as exc:
-                raise PipelineError(
-                    f"Frontmatter read failed for slug={slug}.",
-                    slug=slug,
-                    file_path=md,
-                ) from exc
-
-            raw_list = _as_list_str(meta.get("tags_raw"))
-            canonical_from_raw = _canonicalize_tags(raw_list, inv)
-            tags = canonical_from_raw or _guess_tags_for_name(name, vocab, inv=inv)
-            new_meta = _merge_frontmatter(meta, title=title, tags=tags)
-            section = _layout_section_from_md(md, book_dir, layout_keys)
-            if section and not new_meta.get("layout_section"):
-                new_meta["layout_section"] = section
-            # Enrichment ER-driven: entity/area/relation_hints
-            inferred_entity: Optional[str] = None
-            tag_candidates = _as_list_str(new_meta.get("tags")) + _as_list_str(new_meta.get("tags_raw"))
-            for t in tag_candidates:
-                if t.strip().lower() in {e.lower() for e in vision_entities}:
-                    inferred_entity = next((e for e in vision_entities if e.lower() == t.strip().lower()), None)
-                    break
-            if inferred_entity and not new_meta.get("entity"):
-                new_meta["entity"] = inferred_entity
-            if not new_meta.get("relation_hints") and new_meta.get("entity"):
-                rel_hints: list[dict[str, str]] = []
-                for rel in relations_all:
-                    if isinstance(rel, dict):
-                        src = str(rel.get("from", "")).strip()
-                        dst = str(rel.get("to", "")).strip()
-                        rtype = str(rel.get("type", "")).strip()
-                        if src and dst and rtype:
-                            if src == new_meta["entity"]:
-                                rel_hints.append({"type": rtype, "target": dst})
-                            elif dst == new_meta["entity"]:
-                                rel_hints.append({"type": rtype, "target": src})
-                if rel_hints:
-                    new_meta["relation_hints"] = rel_hints
-            # Arricchimento additivo da doc_entities (se presenti e approvate)
-            tags_db = repo_root_dir / "semantic" / "tags.db"
-            try:
-                if tags_db.exists():
-                    with _get_tags_conn(str(tags_db)) as conn:
-                        new_meta = enrich_frontmatter_with_entities(
-                            new_meta,
-                            conn,
-                            getattr(paths, "semantic_mapping", {}),
-                        )
-            except Exception as exc:
-                err_line = str(exc).splitlines()[0].strip() if str(exc) else ""
-                err_type = type(exc).__name__
-                raise ConfigError(
-                    f"Arricchimento doc_entities fallito: {err_type}: {err_line}",
-                    slug=slug,
-                    file_path=tags_db,
-                ) from exc
-            if meta != new_meta:
-                fm = _dump_frontmatter(new_meta)
-                try:
-                    ensure_within(book_dir, md)
-                    safe_write_text(md, fm + body, encoding="utf-8", atomic=True)
-                    touched.append(md)
-                    logger.info(
-                        "semantic.frontmatter.updated",
-                        extra={
-                            "slug": slug,
-                            "file_path": str(md),
-                            "tags": tags,
-                            "tags_raw": raw_list,
-                            "canonical_from_raw": canonical_from_raw,
-                        },
-                    )
-                except OSError as exc:
-                    raise PipelineError(
-                        f"Frontmatter write failed for slug={slug}.",
-                        slug=slug,
-                        file_path=md,
-                    ) from exc
+
+        def _process(md: Path) -> Optional[_FrontmatterUpdate]:
+            return _enrich_markdown_file(md, plan, _read_fm, slug=slug)
+
+        if worker_count > 1:
+            with ThreadPoolExecutor(max_workers=worker_count) as executor:
+                updates: Iterable[Optional[_FrontmatterUpdate]] = list(executor.map(_process, mds))
+        else:
+            updates = map(_process, mds)
+        for update in updates:
+            if update is None:
+                continue
+            touched.append(update.md)
+            logger.info(
+                "semantic.frontmatter.updated",
+                extra={
+                    "slug": slug,
+                    "file_path": str(update.md),
+                    "tags": update.tags,
+                    "tags_raw": update.tags_raw,
+                    "canonical_from_raw": update.canonical_from_raw,
+                },
+            )
         try:
             scope.set_artifacts(len(touched))
         except Exception:
             scope.set_artifacts(None)
 
+    for md in touched:
+        fingerprints[md.relative_to(book_dir).as_posix()] = file_sha256(md)
+    manifest.record(ENRICH_STAGE, env, fingerprints)
+    manifest.save()
+
     ms = int((time.perf_counter() - start_ts) * 1000)
     logger.info(
         "semantic.enrich_frontmatter.done",
-        extra={"slug": slug, "ms": ms, "artifacts": {"updated": len(touched)}},
+        extra={"slug": slug, "ms": ms, "workers": worker_count, "artifacts": {"updated": len(touched)}},
     )
     return touched
 
 
+def _summary_env_digest(repo_root_dir: Path, book_dir: Path) -> str:
+    """Input di SUMMARY/README: config, Vision e contenuti del book (nomi e digest)."""
+    return digest_json(
+        {
+            "config": semantic_config_digest(repo_root_dir),
+            "vision": file_sha256(_get_vision_statement_path(repo_root_dir)),
+            "book": {md.relative_to(book_dir).as_posix(): file_sha256(md) for md in list_content_markdown(book_dir)},
+        }
+    )
+
+
+def _summary_outputs(layout: WorkspaceLayout) -> Dict[str, str]:
+    return {
+        "SUMMARY.md": file_sha256(layout.book_dir / "SUMMARY.md"),
+        "README.md": file_sha256(layout.book_dir / "README.md"),
+        "layout_proposal.yaml": file_sha256(layout.semantic_dir / "layout_proposal.yaml"),
+    }
+
+
 def write_summary_and_readme(context: ClientContextProtocol, logger: logging.Logger, *, slug: str) -> None:
     start_ts = time.perf_counter()
     layout = WorkspaceLayout.from_context(context)  # type: ignore[arg-type]
@@ -475,6 +638,18 @@ def write_summary_and_readme(context: ClientContextProtocol, logger: logging.Log
     readme_func = _gen_readme
     validate_func = _validate_md
 
+    manifest = StageFingerprints.load(layout.semantic_dir)
+    env = _summary_env_digest(repo_root_dir, book_dir)
+    delta = manifest.delta(SUMMARY_STAGE, env, _summary_outputs(layout))
+    if not delta.full and not delta.changed:
+        # Contenuti e config invariati e output non toccati dall'ultimo run: nulla da rigenerare.
+        log_stage_delta(logger, SUMMARY_STAGE, delta, slug=slug)
+        logger.info(
+            "semantic.summary_readme.done",
+            extra={"slug": slug, "ms": int((time.perf_counter() - start_ts) * 1000), "skipped": True},
+        )
+        return
+
     errors: List[str] = []
     with phase_scope(logger, stage="write_summary_and_readme", customer=slug) as scope:
         try:
@@ -519,6 +694,10 @@ def write_summary_and_readme(context: ClientContextProtocol, logger: logging.Log
         _persist_layout_proposal(layout, logger, slug=slug)
         scope.set_artifacts(2)
 
+    manifest.record(SUMMARY_STAGE, env, _summary_outputs(layout))
+    manifest.save()
+    invalidate_book_readiness(book_dir)
+
     ms = int((time.perf_counter() - start_ts) * 1000)
     logger.info(
         "semantic.summary_readme.done",
@@ -1,10 +1,10 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from pathlib import Path
 
-try:
-    from pypdf import PdfReader
-except Exception:  # pragma: no cover - dipendenza opzionale in alcuni ambienti
-    PdfReader = None
+from pipeline.capabilities.lazy import is_module_available, lazy_module
+
+# pypdf (~100ms) viene importato solo alla prima estrazione.
+_pypdf = lazy_module("pypdf")
 
 
 class PdfExtractError(Exception):
@@ -17,7 +17,7 @@ def extract_text_from_pdf(path: Path) -> list[str]:
     Solleva PdfExtractError per file mancanti, corrotti o non leggibili.
     Ritorna una lista di stringhe, una per pagina.
     """
-    if PdfReader is None:
+    if not is_module_available("pypdf"):
         raise PdfExtractError("Dipendenza 'pypdf' non disponibile: installare il pacchetto per l'estrazione PDF.")
 
     pdf_path = Path(path)
@@ -30,7 +30,7 @@ def extract_text_from_pdf(path: Path) -> list[str]:
         raise PdfExtractError(f"Impossibile leggere il PDF: {pdf_path}") from exc
 
     try:
-        reader = PdfReader(str(pdf_path))
+        reader = _pypdf.PdfReader(str(pdf_path))
         pages_text: list[str] = []
         for page in reader.pages:
             text = page.extract_text() or ""
@@ -12,7 +12,7 @@ from __future__ import annotations
 import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple, cast
 
 from pipeline.exceptions import ConfigError
 from pipeline.logging_utils import get_structured_logger
@@ -166,10 +166,13 @@ def extract_spacy_tags(
     *,
     model_name: str = "it_core_news_sm",
     logger: Optional[logging.Logger] = None,
+    only: Optional[Collection[Path]] = None,
 ) -> Dict[str, Dict[str, Any]]:
     """
     Estrae candidati tag dai documenti (Markdown derivati da raw/) usando SpaCy, mappandoli alle aree.
 
+    Con `only` si analizzano solo quei Markdown (rebuild incrementali); i documenti sono indipendenti.
+
     Ritorna un dict: relative_path -> {tags, entities, keyphrases, score, sources}
     """
     slug_value = cfg.slug
@@ -192,6 +195,7 @@ def extract_spacy_tags(
         err_type = type(exc).__name__
         raise ConfigError(f"SpaCy fallito (model={model_name}).") from exc
 
+    only_set = {Path(p).resolve() for p in only} if only is not None else None
     candidates: Dict[str, Dict[str, Any]] = {}
     for md_path in iter_safe_paths(
         normalized_dir,
@@ -199,6 +203,8 @@ def extract_spacy_tags(
         include_files=True,
         suffixes=(".md",),
     ):
+        if only_set is not None and md_path.resolve() not in only_set:
+            continue
         try:
             rel_path = md_path.relative_to(normalized_dir).as_posix()
         except Exception:
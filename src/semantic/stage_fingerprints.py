@@ -0,0 +1,181 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Manifest delle impronte (fingerprint) per stage della pipeline semantica.
+
+Per ogni stage (`convert_markdown`, `enrich_frontmatter`, `write_summary_and_readme`,
+`index_markdown_to_db`) si registra in `semantic/stage_fingerprints.json`:
+- `env`: digest degli input globali (config semantica, versione del vocabolario, ...);
+- `files`: digest per file dell'input (o dell'output già prodotto) dello stage.
+
+Al run successivo lo stage confronta le impronte correnti con quelle registrate e lavora solo sul
+sottoinsieme cambiato; se `env` cambia (o il manifest manca/non è leggibile) rifà tutto. Il manifest
+si aggiorna solo dopo il successo dello stage. `TIMMY_SEMANTIC_FULL_REBUILD=1` ignora il manifest.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from pipeline.file_utils import safe_write_text
+from pipeline.logging_utils import get_structured_logger
+from pipeline.path_utils import ensure_within_and_resolve, read_text_safe
+
+LOGGER = get_structured_logger("semantic.stage_fingerprints")
+
+MANIFEST_NAME = "stage_fingerprints.json"
+MANIFEST_VERSION = 1
+FULL_REBUILD_ENV = "TIMMY_SEMANTIC_FULL_REBUILD"
+_ABSENT = "absent"
+
+
+@dataclass(frozen=True)
+class StageDelta:
+    """Esito del confronto: `full` = nessuna impronta riusabile, rifare tutto."""
+
+    full: bool
+    changed: List[str]
+    unchanged: List[str]
+    removed: List[str]
+
+
+def file_sha256(path: Path) -> str:
+    """Digest SHA-256 del contenuto del file (`absent` se non esiste)."""
+    digest = hashlib.sha256()
+    try:
+        with Path(path).open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 16), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return _ABSENT
+    return digest.hexdigest()
+
+
+def file_signature(path: Path) -> str:
+    """Firma economica (mtime_ns:size) per file grandi come i DB SQLite."""
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return _ABSENT
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def digest_json(payload: Any) -> str:
+    """Digest stabile di una struttura JSON-serializzabile (set/tuple ordinati come liste)."""
+
+    def _default(value: Any) -> Any:
+        if isinstance(value, (set, frozenset)):
+            return sorted(str(item) for item in value)
+        if isinstance(value, Path):
+            return value.as_posix()
+        return str(value)
+
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_default, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def semantic_config_digest(repo_root_dir: Path) -> str:
+    """Digest di config cliente e semantic_mapping (input comuni a tutti gli stage)."""
+    root = Path(repo_root_dir)
+    return digest_json(
+        {
+            "config": file_sha256(root / "config" / "config.yaml"),
+            "mapping": file_sha256(root / "semantic" / "semantic_mapping.yaml"),
+        }
+    )
+
+
+def full_rebuild_forced() -> bool:
+    return os.getenv(FULL_REBUILD_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class StageFingerprints:
+    """Manifest caricato da `semantic/stage_fingerprints.json` (una istanza per stage/run)."""
+
+    def __init__(self, semantic_dir: Path, stages: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.semantic_dir = Path(semantic_dir)
+        self._stages: Dict[str, Dict[str, Any]] = stages or {}
+
+    @property
+    def path(self) -> Path:
+        return self.semantic_dir / MANIFEST_NAME
+
+    @classmethod
+    def load(cls, semantic_dir: Path) -> "StageFingerprints":
+        manifest = cls(semantic_dir)
+        path = manifest.path
+        if full_rebuild_forced() or not path.is_file():
+            return manifest
+        try:
+            payload = json.loads(read_text_safe(manifest.semantic_dir, path))
+            if int(payload.get("version", 0)) == MANIFEST_VERSION and isinstance(payload.get("stages"), dict):
+                manifest._stages = payload["stages"]
+        except Exception as exc:
+            LOGGER.warning(
+                "semantic.stage_fingerprints.load_failed",
+                extra={"file_path": str(path), "error": repr(exc)},
+            )
+        return manifest
+
+    def delta(self, stage: str, env: str, files: Mapping[str, str]) -> StageDelta:
+        """Confronta le impronte correnti `files` con quelle registrate per `stage`."""
+        entry = self._stages.get(stage)
+        current = sorted(files)
+        if not isinstance(entry, dict) or entry.get("env") != env or not isinstance(entry.get("files"), dict):
+            return StageDelta(full=True, changed=current, unchanged=[], removed=[])
+        previous: Mapping[str, str] = entry["files"]
+        changed = [rel for rel in current if previous.get(rel) != files[rel]]
+        unchanged = [rel for rel in current if previous.get(rel) == files[rel]]
+        removed = sorted(rel for rel in previous if rel not in files)
+        return StageDelta(full=False, changed=changed, unchanged=unchanged, removed=removed)
+
+    def record(self, stage: str, env: str, files: Mapping[str, str]) -> None:
+        self._stages[stage] = {"env": env, "files": dict(sorted(files.items()))}
+
+    def forget(self, stages: Iterable[str]) -> None:
+        for stage in stages:
+            self._stages.pop(stage, None)
+
+    def save(self) -> None:
+        """Scrittura atomica; un fallimento non blocca la pipeline (al prossimo run si rifà tutto)."""
+        try:
+            self.semantic_dir.mkdir(parents=True, exist_ok=True)
+            target = ensure_within_and_resolve(self.semantic_dir, self.path)
+            payload = {"version": MANIFEST_VERSION, "stages": self._stages}
+            safe_write_text(target, json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8", atomic=True)
+        except Exception as exc:
+            LOGGER.warning(
+                "semantic.stage_fingerprints.save_failed",
+                extra={"file_path": str(self.path), "error": repr(exc)},
+            )
+
+
+def log_stage_delta(logger: Any, stage: str, delta: StageDelta, *, slug: str) -> None:
+    logger.info(
+        "semantic.stage.incremental",
+        extra={
+            "slug": slug,
+            "stage": stage,
+            "full": delta.full,
+            "changed": len(delta.changed),
+            "unchanged": len(delta.unchanged),
+            "removed": len(delta.removed),
+        },
+    )
+
+
+__all__ = [
+    "FULL_REBUILD_ENV",
+    "MANIFEST_NAME",
+    "StageDelta",
+    "StageFingerprints",
+    "digest_json",
+    "file_sha256",
+    "file_signature",
+    "full_rebuild_forced",
+    "log_stage_delta",
+    "semantic_config_digest",
+]
@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Scheduler minimale per workflow a stage con dipendenze dichiarate (DAG).
+
+Ogni `Stage` dichiara gli output di altri stage che consuma (`inputs`) e gli stage che devono
+solo precederlo (`after`, es. conflitti su file condivisi). Gli stage pronti partono insieme su un
+pool di thread; l'ordine di dichiarazione resta quello di fallback (e di priorità a parità di
+prontezza), quindi con `max_workers=1` il comportamento coincide con l'esecuzione sequenziale.
+
+Errori: al primo fallimento non si avviano altri stage, si attendono quelli in volo e si rilancia
+l'eccezione dello stage fallito che compare per primo nella dichiarazione (deterministico).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+from pipeline.exceptions import PipelineError
+from pipeline.logging_utils import phase_scope
+
+StageRunner = Callable[[Mapping[str, Any]], Any]
+StageWrapper = Callable[[str, Callable[[], Any]], Any]
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: StageRunner
+    inputs: tuple[str, ...] = ()
+    after: tuple[str, ...] = ()
+    # Se valorizzato, lo scheduler apre `phase_scope(stage=phase)` attorno allo stage
+    # (solo per stage che non misurano già la propria fase).
+    phase: Optional[str] = None
+
+
+def _validate(stages: Sequence[Stage], *, slug: str | None) -> None:
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise PipelineError("Stage duplicati nel workflow.", slug=slug)
+    position = {name: idx for idx, name in enumerate(names)}
+    for stage in stages:
+        for dep in (*stage.inputs, *stage.after):
+            if dep not in position:
+                raise PipelineError(f"Dipendenza sconosciuta per lo stage {stage.name}: {dep}", slug=slug)
+            # Dichiarazione in ordine topologico: esclude i cicli e fissa l'ordine sequenziale.
+            if position[dep] >= position[stage.name]:
+                raise PipelineError(f"Stage {stage.name} dichiarato prima della dipendenza {dep}", slug=slug)
+
+
+def run_stage_graph(
+    stages: Sequence[Stage],
+    *,
+    logger: logging.Logger,
+    slug: str | None = None,
+    stage_wrapper: StageWrapper | None = None,
+    max_workers: int = 2,
+) -> Dict[str, Any]:
+    """Esegue gli stage rispettando le dipendenze; ritorna {nome_stage: output}."""
+    _validate(stages, slug=slug)
+    results: Dict[str, Any] = {}
+    timings: Dict[str, int] = {}
+    failures: Dict[str, BaseException] = {}
+    pending = list(stages)
+    running: Dict[Future[Any], Stage] = {}
+    t0 = time.perf_counter()
+
+    def _execute(stage: Stage, inputs: Mapping[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+
+            def _call() -> Any:
+                return stage.run(inputs)
+
+            def _wrapped() -> Any:
+                return _call() if stage_wrapper is None else stage_wrapper(stage.name, _call)
+
+            if stage.phase is None:
+                return _wrapped()
+            with phase_scope(logger, stage=stage.phase, customer=slug) as scope:
+                out = _wrapped()
+                if isinstance(out, (list, tuple, dict, set)):
+                    scope.set_artifacts(len(out))
+                return out
+        finally:
+            timings[stage.name] = int((time.perf_counter() - started) * 1000)
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="semantic-stage") as pool:
+        while pending or running:
+            if not failures:
+                done_names = set(results)
+                for stage in [s for s in pending if set(s.inputs) | set(s.after) <= done_names]:
+                    if len(running) >= max(1, int(max_workers)):
+                        break
+                    pending.remove(stage)
+                    inputs = {name: results[name] for name in stage.inputs}
+                    # Un contesto copiato per stage: trace/span e campi di log del chiamante restano visibili.
+                    ctx = contextvars.copy_context()
+                    running[pool.submit(ctx.run, _execute, stage, inputs)] = stage
+            if not running:
+                break
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    failures[stage.name] = exc
+                else:
+                    results[stage.name] = future.result()
+
+    logger.info(
+        "semantic.stage_graph.completed",
+        extra={
+            "slug": slug,
+            "status": "failed" if failures else "success",
+            "stages_ms": dict(timings),
+            "wall_ms": int((time.perf_counter() - t0) * 1000),
+        },
+    )
+    if failures:
+        first = next(stage.name for stage in stages if stage.name in failures)
+        raise failures[first]
+    return results
+
+
+__all__ = ["Stage", "StageRunner", "StageWrapper", "run_stage_graph"]
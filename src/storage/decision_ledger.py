@@ -6,7 +6,7 @@ import re
 import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Final, Mapping
+from typing import Any, Final, Mapping, Sequence
 
 from pipeline.exceptions import ConfigError, PipelineError
 from pipeline.path_utils import ensure_within_and_resolve
@@ -29,6 +29,7 @@ __all__ = [
     "STOP_CODE_QA_GATE_FAILED",
     "STOP_CODE_VISION_ARTIFACT_MISSING",
     "STOP_CODE_VISION_PROMPT_FAILURE",
+    "LEDGER_SCHEMA_VERSION",
     "NormativeDecisionRecord",
     "ledger_path_from_layout",
     "open_ledger",
@@ -105,8 +106,87 @@ CREATE TABLE IF NOT EXISTS events (
     payload_json TEXT,
     FOREIGN KEY(run_id) REFERENCES runs(run_id)
 );
+
+CREATE INDEX IF NOT EXISTS idx_runs_slug_started ON runs(slug, started_at, run_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_run_decided ON decisions(run_id, decided_at, decision_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_run_gate ON decisions(run_id, gate_name, decided_at, decision_id);
+CREATE INDEX IF NOT EXISTS idx_events_slug_occurred ON events(slug, occurred_at);
+
+-- Stato corrente materializzato (mantenuto da start_run/record_decision nella stessa transazione):
+-- ultimo run per slug con l'ultimo to_state ALLOW di quel run, e ultima decisione per (run, gate).
+CREATE TABLE IF NOT EXISTS current_state (
+    slug TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    state TEXT,
+    state_decided_at TEXT,
+    state_decision_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS current_gates (
+    run_id TEXT NOT NULL,
+    gate_name TEXT NOT NULL,
+    decision_id TEXT NOT NULL,
+    decided_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, gate_name)
+);
 """
 
+# PRAGMA user_version: 1 = indici + current_state/current_gates popolate (vedi _migrate_schema).
+LEDGER_SCHEMA_VERSION: Final[int] = 1
+
+# Backfill idempotente delle tabelle materializzate da runs/decisions (ledger creati prima della v1).
+_BACKFILL_SQL: Final[tuple[str, ...]] = (
+    "DELETE FROM current_state",
+    "DELETE FROM current_gates",
+    """
+    INSERT INTO current_state (slug, run_id, started_at)
+    SELECT r.slug, r.run_id, r.started_at
+    FROM runs AS r
+    WHERE r.run_id = (
+        SELECT r2.run_id FROM runs AS r2
+        WHERE r2.slug = r.slug
+        ORDER BY r2.started_at DESC, r2.run_id DESC
+        LIMIT 1
+    )
+    """,
+    """
+    UPDATE current_state SET (state, state_decided_at, state_decision_id) = (
+        SELECT d.to_state, d.decided_at, d.decision_id FROM decisions AS d
+        WHERE d.run_id = current_state.run_id AND d.verdict = 'ALLOW'
+        ORDER BY d.decided_at DESC, d.decision_id DESC
+        LIMIT 1
+    )
+    """,
+    """
+    INSERT INTO current_gates (run_id, gate_name, decision_id, decided_at)
+    SELECT d.run_id, d.gate_name, d.decision_id, d.decided_at
+    FROM decisions AS d
+    WHERE d.decision_id = (
+        SELECT d2.decision_id FROM decisions AS d2
+        WHERE d2.run_id = d.run_id AND d2.gate_name = d.gate_name
+        ORDER BY d2.decided_at DESC, d2.decision_id DESC
+        LIMIT 1
+    )
+    """,
+)
+
+# Aggiornamenti incrementali: l'ordinamento (timestamp, id) replica i tie-break delle query di stato.
+_CURRENT_RUN_SQL: Final[tuple[str, ...]] = (
+    "INSERT OR IGNORE INTO current_state (slug, run_id, started_at) VALUES (?, ?, ?)",
+    "UPDATE current_state SET run_id = ?, started_at = ?, state = NULL, state_decided_at = NULL, "
+    "state_decision_id = NULL WHERE slug = ? AND (started_at, run_id) < (?, ?)",
+)
+_CURRENT_GATE_SQL: Final[tuple[str, ...]] = (
+    "INSERT OR IGNORE INTO current_gates (run_id, gate_name, decision_id, decided_at) VALUES (?, ?, ?, ?)",
+    "UPDATE current_gates SET decision_id = ?, decided_at = ? "
+    "WHERE run_id = ? AND gate_name = ? AND (decided_at, decision_id) < (?, ?)",
+)
+_CURRENT_STATE_ALLOW_SQL: Final[str] = (
+    "UPDATE current_state SET state = ?, state_decided_at = ?, state_decision_id = ? "
+    "WHERE run_id = ? AND (state_decided_at IS NULL OR (state_decided_at, state_decision_id) < (?, ?))"
+)
+
 
 @dataclass(frozen=True)
 class NormativeDecisionRecord:
@@ -166,6 +246,10 @@ def start_run(
         (run_id, slug, started_at, metadata_json),
         hint="start_run",
         slug=slug,
+        follow_up=(
+            (_CURRENT_RUN_SQL[0], (slug, run_id, started_at)),
+            (_CURRENT_RUN_SQL[1], (run_id, started_at, slug, started_at, run_id)),
+        ),
     )
 
 
@@ -189,6 +273,14 @@ def record_decision(
     _validate_state(to_state, field_name="to_state")
     if verdict not in _DECISION_VALUES:
         raise ValueError(f"Verdetto non valido: {verdict}")
+    follow_up: list[tuple[str, tuple[object, ...]]] = [
+        (_CURRENT_GATE_SQL[0], (run_id, gate_name, decision_id, decided_at)),
+        (_CURRENT_GATE_SQL[1], (decision_id, decided_at, run_id, gate_name, decided_at, decision_id)),
+    ]
+    if verdict == DECISION_ALLOW:
+        follow_up.append(
+            (_CURRENT_STATE_ALLOW_SQL, (to_state, decided_at, decision_id, run_id, decided_at, decision_id))
+        )
     _insert_row(
         conn,
         "INSERT INTO decisions ("
@@ -210,6 +302,7 @@ def record_decision(
         ),
         hint="record_decision",
         slug=slug,
+        follow_up=follow_up,
     )
 
 
@@ -442,6 +535,7 @@ def _init_schema(conn: sqlite3.Connection, *, slug: str, db_path: Path) -> None:
     try:
         conn.execute("PRAGMA foreign_keys = ON")
         conn.executescript(_SCHEMA_SQL)
+        _migrate_schema(conn)
     except sqlite3.Error as exc:
         raise PipelineError(
             f"Errore inizializzazione ledger: {exc}",
@@ -450,6 +544,17 @@ def _init_schema(conn: sqlite3.Connection, *, slug: str, db_path: Path) -> None:
         ) from exc
 
 
+def _migrate_schema(conn: sqlite3.Connection) -> None:
+    """Porta un ledger esistente alla versione corrente (indici creati da `_SCHEMA_SQL`)."""
+    version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+    if version >= LEDGER_SCHEMA_VERSION:
+        return
+    with conn:
+        for statement in _BACKFILL_SQL:
+            conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {LEDGER_SCHEMA_VERSION:d}")
+
+
 def _insert_row(
     conn: sqlite3.Connection,
     sql: str,
@@ -457,11 +562,15 @@ def _insert_row(
     *,
     hint: str,
     slug: str | None = None,
+    follow_up: Sequence[tuple[str, tuple[object, ...]]] = (),
 ) -> None:
+    """Insert + aggiornamenti delle tabelle materializzate, atomici nella stessa transazione."""
     db_path = _resolve_db_path(conn)
     try:
         with conn:
             conn.execute(sql, params)
+            for follow_sql, follow_params in follow_up:
+                conn.execute(follow_sql, follow_params)
     except sqlite3.Error as exc:
         raise PipelineError(
             f"Errore insert ledger ({hint}): {exc}",
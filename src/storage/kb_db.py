@@ -5,6 +5,15 @@
 Espone:
 - insert_chunks(slug, scope, path, version, meta_dict, chunks, embeddings)
 - fetch_candidates(slug, scope, limit=64)
+- fetch_lexical_candidates(slug, scope, query, limit=200): top-N BM25 dall'indice FTS5 `chunks_fts`
+  (tabella external-content su `chunks.content`, sincronizzata da trigger)
+- fetch_quantized_candidates / fetch_candidates_by_ids: primo passaggio int8 e re-rank esatto
+  (vedi `storage.kb_quantization`); quantize_embeddings(...) popola le righe legacy
+- METADATA_FILTER_COLUMNS: chiavi di metadati filtrabili in SQL (`filters=` di fetch_*), esposte come
+  colonne generate indicizzate su `meta_json`
+- KbConnectionPool(db_path): connessioni per-thread riusabili (PRAGMA applicati una volta,
+  schema verificato una volta per db_path) da passare a insert_chunks/fetch_candidates;
+  con `candidate_cache_size` tiene in memoria i candidati già decodificati (processi long-lived).
 
 Questo modulo centralizza la gestione del path del DB e l'inizializzazione.
 Il contratto sul path e' formalizzato in `storage.kb_store.KbStore`, che risolve
@@ -17,15 +26,20 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Iterator, Optional
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Mapping, Optional, Sequence
 
 from pipeline.beta_flags import is_beta_strict
 from pipeline.exceptions import ConfigError
 from pipeline.logging_utils import get_structured_logger
+from storage.kb_quantization import quantize_int8
 
 if TYPE_CHECKING:
     from storage.kb_store import KbStore
@@ -39,6 +53,19 @@ for _handler in list(LOGGER.handlers):
         _handler.setLevel(logging.WARNING)
 
 _LEGACY_GLOBAL_DB_PARTS = ("data", "kb.sqlite")
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_FTS_MAX_TERMS = 32
+
+# Chiave filtro -> (colonna generata, JSON path in meta_json). Le colonne sono VIRTUAL (calcolate
+# on read) e indicizzate insieme a (slug, scope): i filtri scorrono un range d'indice invece di
+# decodificare meta_json di ogni candidato.
+METADATA_FILTER_COLUMNS: dict[str, tuple[str, str]] = {
+    "file": ("meta_file", "$.file"),
+    "entity": ("meta_entity", "$.entity"),
+    "area": ("meta_area", "$.area"),
+    "layout_section": ("meta_layout_section", "$.layout_section"),
+    "source_id": ("meta_source_id", "$.lineage.source_id"),
+}
 
 
 def _resolve_db_path(db_path: Optional[Path]) -> Path:
@@ -83,77 +110,334 @@ def connect_from_store(store: "KbStore") -> Iterator[sqlite3.Connection]:
     return connect(db_path=store.effective_db_path())
 
 
+def _open_connection(dbp: Path) -> sqlite3.Connection:
+    """Apre una connessione su un path già risolto e applica i PRAGMA."""
+    dbp.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(dbp), timeout=30, check_same_thread=False)
+    # Configurazioni di performance e integrità
+    try:
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute("PRAGMA foreign_keys=ON;")
+    except sqlite3.DatabaseError as e:
+        con.close()
+        message = str(e)
+        if "malformed" in message.lower():
+            raise ConfigError(
+                "DB SQLite corrotto (malformed): elimina/rigenera il DB del workspace prima di procedere.",
+                code="kb.db.malformed",
+                component="kb_db",
+                file_path=str(dbp),
+            ) from e
+        raise
+    return con
+
+
 @contextmanager
 def connect(db_path: Optional[Path] = None) -> Iterator[sqlite3.Connection]:
     """Context manager per una connessione SQLite con PRAGMA adeguati."""
-    dbp = _resolve_db_path(db_path)
-    dbp.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(str(dbp), timeout=30, check_same_thread=False)
+    con = _open_connection(_resolve_db_path(db_path))
     try:
-        # Configurazioni di performance e integrità
-        try:
-            con.execute("PRAGMA journal_mode=WAL;")
-            con.execute("PRAGMA synchronous=NORMAL;")
-            con.execute("PRAGMA foreign_keys=ON;")
-        except sqlite3.DatabaseError as e:
-            message = str(e)
-            if "malformed" in message.lower():
-                raise ConfigError(
-                    "DB SQLite corrotto (malformed): elimina/rigenera il DB del workspace prima di procedere.",
-                    code="kb.db.malformed",
-                    component="kb_db",
-                    file_path=str(dbp),
-                ) from e
-            raise
         yield con
     finally:
         con.close()
 
 
-def init_db(db_path: Optional[Path] = None) -> None:
-    """Crea tabelle e indici se mancanti."""
-    with connect(db_path) as con:
-        con.execute("""
-            CREATE TABLE IF NOT EXISTS chunks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                slug TEXT NOT NULL,
-                scope TEXT NOT NULL,
-                path TEXT NOT NULL,
-                version TEXT,
-                meta_json TEXT,
-                content TEXT NOT NULL,
-                embedding_json TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            );
-            """)
-        # Crea un indice composito per ricerche rapide su slug e scope
+def _create_schema(con: sqlite3.Connection, dbp: Path) -> None:
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            slug TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            path TEXT NOT NULL,
+            version TEXT,
+            meta_json TEXT,
+            content TEXT NOT NULL,
+            embedding_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        """)
+    # Crea un indice composito per ricerche rapide su slug e scope
+    con.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chunks_slug_scope
+        ON chunks(slug, scope);
+        """)
+    # Indice UNIQUE per idempotenza su chiave naturale (slug, scope, path, version, content)
+    # Strict init: su IntegrityError l'inizializzazione fallisce immediatamente, indicando la necessità
+    # di rigenerare il DB (non c'è recover o warn).
+    try:
         con.execute("""
-            CREATE INDEX IF NOT EXISTS idx_chunks_slug_scope
-            ON chunks(slug, scope);
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_chunks_natural
+            ON chunks(slug, scope, path, version, content);
             """)
-        # Indice UNIQUE per idempotenza su chiave naturale (slug, scope, path, version, content)
-        # Strict init: su IntegrityError l'inizializzazione fallisce immediatamente, indicando la necessità
-        # di rigenerare il DB (non c'è recover o warn).
-        try:
-            con.execute("""
-                CREATE UNIQUE INDEX IF NOT EXISTS ux_chunks_natural
-                ON chunks(slug, scope, path, version, content);
-                """)
-        except sqlite3.IntegrityError:
-            raise ConfigError(
-                "DB KB non conforme: duplicati presenti e indice UNIQUE non applicabile. "
-                "Rigenera il DB del workspace prima di procedere.",
-                code="kb.db.schema.invalid",
-                component="kb_db",
-                file_path=str(_resolve_db_path(db_path)),
-            )
-        con.commit()
+    except sqlite3.IntegrityError:
+        raise ConfigError(
+            "DB KB non conforme: duplicati presenti e indice UNIQUE non applicabile. "
+            "Rigenera il DB del workspace prima di procedere.",
+            code="kb.db.schema.invalid",
+            component="kb_db",
+            file_path=str(dbp),
+        )
+    _create_metadata_columns(con)
+    _create_quantization_columns(con)
+    _create_fts_index(con, dbp)
+    con.commit()
     LOGGER.debug(
         "kb_db.initialized",
-        extra={"db_path": str(_resolve_db_path(db_path))},
+        extra={"db_path": str(dbp)},
     )
 
 
+def _create_metadata_columns(con: sqlite3.Connection) -> None:
+    """Aggiunge (se mancanti) le colonne generate sui metadati filtrabili e i relativi indici."""
+    existing = {row[1] for row in con.execute("PRAGMA table_xinfo(chunks)")}
+    for column, json_path in METADATA_FILTER_COLUMNS.values():
+        if column not in existing:
+            # json_valid evita che un meta_json corrotto faccia fallire insert/indicizzazione.
+            con.execute(
+                f"ALTER TABLE chunks ADD COLUMN {column} TEXT GENERATED ALWAYS AS "
+                f"(CASE WHEN json_valid(meta_json) THEN json_extract(meta_json, '{json_path}') END) VIRTUAL"
+            )
+        con.execute(f"CREATE INDEX IF NOT EXISTS idx_chunks_{column} ON chunks(slug, scope, {column})")
+
+
+def _create_quantization_columns(con: sqlite3.Connection) -> None:
+    """Aggiunge (se mancanti) le colonne dell'embedding quantizzato int8 (blob + scale/offset)."""
+    existing = {row[1] for row in con.execute("PRAGMA table_xinfo(chunks)")}
+    for column, sql_type in (("embedding_q8", "BLOB"), ("embedding_q8_scale", "REAL"), ("embedding_q8_offset", "REAL")):
+        if column not in existing:
+            con.execute(f"ALTER TABLE chunks ADD COLUMN {column} {sql_type}")
+
+
+def _quantized_columns(vec: Any) -> tuple[Optional[bytes], Optional[float], Optional[float]]:
+    encoded = quantize_int8(vec) if isinstance(vec, (list, tuple)) else None
+    if encoded is None:
+        return None, None, None
+    return encoded
+
+
+def _metadata_filter_sql(filters: Optional[Mapping[str, Any]], *, alias: str = "") -> tuple[str, list[Any]]:
+    """Traduce `filters` in clausole SQL (AND) su colonne indicizzate; valori lista -> IN (...)."""
+    if not filters:
+        return "", []
+    clauses: list[str] = []
+    args: list[Any] = []
+    for key, value in filters.items():
+        spec = METADATA_FILTER_COLUMNS.get(key)
+        if spec is None:
+            raise ConfigError(
+                f"Filtro metadati non supportato: {key!r} (ammessi: {', '.join(sorted(METADATA_FILTER_COLUMNS))}).",
+                code="kb.db.filter_unknown",
+                component="kb_db",
+            )
+        column = f"{alias}{spec[0]}"
+        values = [value] if isinstance(value, str) else list(value)
+        if len(values) == 1:
+            clauses.append(f"{column} = ?")
+        else:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+        args.extend(str(v) for v in values)
+    return "".join(f" AND {clause}" for clause in clauses), args
+
+
+def _create_fts_index(con: sqlite3.Connection, dbp: Path) -> None:
+    """Crea l'indice FTS5 su `chunks.content` e i trigger che lo mantengono allineato.
+
+    I trigger coprono ogni scrittura su `chunks` (insert_chunks, indexer bulk, cleanup), quindi
+    nessun writer deve aggiornare l'indice a mano. Su DB preesistenti l'indice viene popolato
+    con un `rebuild` alla creazione. Se SQLite non è compilato con FTS5 la ricerca lessicale
+    resta disabilitata (fetch_lexical_candidates non restituisce nulla).
+    """
+    exists = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='chunks_fts'").fetchone()
+    if exists:
+        return
+    try:
+        con.execute("""
+            CREATE VIRTUAL TABLE chunks_fts USING fts5(
+                content,
+                content='chunks',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            """)
+    except sqlite3.OperationalError as exc:
+        LOGGER.warning("kb_db.fts.unavailable", extra={"db_path": str(dbp), "error": str(exc)})
+        return
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS chunks_fts_ai AFTER INSERT ON chunks BEGIN
+            INSERT INTO chunks_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+        """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS chunks_fts_ad AFTER DELETE ON chunks BEGIN
+            INSERT INTO chunks_fts(chunks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+        """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS chunks_fts_au AFTER UPDATE OF content ON chunks BEGIN
+            INSERT INTO chunks_fts(chunks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO chunks_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+        """)
+    con.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+    LOGGER.info("kb_db.fts.created", extra={"db_path": str(dbp)})
+
+
+def init_db(db_path: Optional[Path] = None) -> None:
+    """Crea tabelle e indici se mancanti."""
+    dbp = _resolve_db_path(db_path)
+    with connect(dbp) as con:
+        _create_schema(con, dbp)
+
+
+class KbConnectionPool:
+    """Pool minimale di connessioni SQLite per-thread su un singolo DB KB.
+
+    - una connessione per thread, aperta al primo uso con i PRAGMA applicati una sola volta;
+    - `ensure_schema()` esegue le CREATE una sola volta per istanza (flag schema verificato);
+    - `close()` (o l'uscita dal context manager) chiude tutte le connessioni aperte.
+
+    Pensato per la durata di un run (ingest) o di una sessione retriever: evita gli open/close
+    per file e per query di `init_db`/`connect`.
+
+    Con `candidate_cache_size > 0` il pool conserva (LRU) le righe già decodificate da
+    `fetch_candidates`/`fetch_quantized_candidates`, validate a ogni lettura sulla firma
+    (mtime/size) del DB e del suo WAL: qualunque commit, anche di altri processi, le invalida.
+    `candidate_cache_max_rows > 0` limita anche il totale delle righe in cache (le embedding
+    decodificate pesano ~50KB a riga con 1536 dimensioni): un risultato più grande non viene memorizzato.
+    """
+
+    def __init__(self, db_path: Path, *, candidate_cache_size: int = 0, candidate_cache_max_rows: int = 0) -> None:
+        self._db_path = _resolve_db_path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._schema_verified = False
+        self._closed = False
+        self._cache_size = max(0, int(candidate_cache_size))
+        self._cache_max_rows = max(0, int(candidate_cache_max_rows))
+        self._cache_rows = 0
+        self._cache: OrderedDict[tuple[Any, ...], tuple[tuple[int, ...], list[dict[str, Any]]]] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    @property
+    def schema_verified(self) -> bool:
+        return self._schema_verified
+
+    def connection(self) -> sqlite3.Connection:
+        """Restituisce la connessione del thread corrente (aperta al primo uso)."""
+        con: sqlite3.Connection | None = getattr(self._local, "con", None)
+        if con is not None:
+            return con
+        with self._lock:
+            if self._closed:
+                raise ConfigError(
+                    "KbConnectionPool chiuso: apri un nuovo pool per il DB del workspace.",
+                    code="kb.db.pool_closed",
+                    component="kb_db",
+                    file_path=str(self._db_path),
+                )
+            con = _open_connection(self._db_path)
+            self._connections.append(con)
+        self._local.con = con
+        return con
+
+    def ensure_schema(self) -> None:
+        """Crea tabelle e indici alla prima chiamata; le successive sono no-op."""
+        if self._schema_verified:
+            return
+        con = self.connection()
+        with self._lock:
+            if not self._schema_verified:
+                _create_schema(con, self._db_path)
+                self._schema_verified = True
+
+    @property
+    def caches_candidates(self) -> bool:
+        return self._cache_size > 0
+
+    def _db_signature(self) -> tuple[int, ...]:
+        parts: list[int] = []
+        for path in (self._db_path, self._db_path.with_name(self._db_path.name + "-wal")):
+            try:
+                st = path.stat()
+            except OSError:
+                parts.extend((0, 0))
+                continue
+            parts.extend((st.st_mtime_ns, st.st_size))
+        return tuple(parts)
+
+    def cached_rows(self, key: tuple[Any, ...]) -> list[dict[str, Any]] | None:
+        """Righe in cache per `key` se il DB non è cambiato dalla lettura, altrimenti None."""
+        if not self._cache_size:
+            return None
+        signature = self._db_signature()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] != signature:
+                self.cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return entry[1]
+
+    def store_rows(self, key: tuple[Any, ...], rows: list[dict[str, Any]], signature: tuple[int, ...]) -> None:
+        if not self._cache_size:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_rows -= len(previous[1])
+            if self._cache_max_rows and len(rows) > self._cache_max_rows:
+                return
+            self._cache[key] = (signature, rows)
+            self._cache_rows += len(rows)
+            while len(self._cache) > self._cache_size or (
+                self._cache_max_rows and self._cache_rows > self._cache_max_rows
+            ):
+                _key, (_sig, evicted) = self._cache.popitem(last=False)
+                self._cache_rows -= len(evicted)
+
+    @property
+    def cached_row_count(self) -> int:
+        with self._lock:
+            return self._cache_rows
+
+    def invalidate_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cache_rows = 0
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._closed = True
+            self._cache.clear()
+            self._cache_rows = 0
+        for con in connections:
+            try:
+                con.close()
+            except sqlite3.Error:
+                LOGGER.debug("kb_db.pool.close_failed", extra={"db_path": str(self._db_path)})
+        self._local = threading.local()
+
+    def __enter__(self) -> "KbConnectionPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
 def insert_chunks(
     slug: str,
     scope: str,
@@ -165,14 +449,26 @@ def insert_chunks(
     db_path: Optional[Path] = None,
     *,
     ensure_schema: bool = True,
+    connection: sqlite3.Connection | None = None,
+    pool: KbConnectionPool | None = None,
 ) -> int:
     """Inserisce righe (chunk + embedding). Restituisce il numero **effettivo** di righe inserite.
 
+    Con `connection` la scrittura riusa una connessione già aperta (es. writer unico dell'ingest
+    pipelined): niente open/close per chiamata, il commit resta per chiamata.
+    Con `pool` usa la connessione del thread corrente e verifica lo schema una sola volta per pool.
+
     Solleva ValueError se le lunghezze di chunks ed embeddings non coincidono.
     """
     if len(chunks) != len(embeddings):
         raise ValueError("il numero di chunks non coincide con il numero di embeddings")
-    if ensure_schema:
+    if pool is not None:
+        _check_pool_db_path(pool, db_path)
+        if ensure_schema:
+            pool.ensure_schema()
+        if connection is None:
+            connection = pool.connection()
+    elif ensure_schema:
         init_db(db_path)
     now = datetime.utcnow().isoformat()
     rows = [
@@ -185,22 +481,17 @@ def insert_chunks(
             chunk,
             json.dumps(vec, ensure_ascii=False),
             now,
+            *_quantized_columns(vec),
         )
         for chunk, vec in zip(chunks, embeddings, strict=False)
     ]
-    with connect(db_path) as con:
-        sql = (
-            "INSERT INTO chunks (slug, scope, path, version, meta_json, content, embedding_json, created_at) "
-            "SELECT ?, ?, ?, ?, ?, ?, ?, ? "
-            "WHERE NOT EXISTS ("
-            "  SELECT 1 FROM chunks WHERE slug=? AND scope=? AND path=? AND version=? AND content=? LIMIT 1"
-            ")"
-        )
-        params = [(pr, sc, pa, ve, mj, co, ej, ts, pr, sc, pa, ve, co) for (pr, sc, pa, ve, mj, co, ej, ts) in rows]
-        before = int(con.total_changes)
-        con.executemany(sql, params)
-        con.commit()
-        inserted = int(con.total_changes) - before  # numero reale di nuove righe
+    if connection is not None:
+        inserted = _insert_rows(connection, rows)
+    else:
+        with connect(db_path) as con:
+            inserted = _insert_rows(con, rows)
+    if pool is not None and inserted:
+        pool.invalidate_cache()
     LOGGER.info(
         "semantic.index.db_inserted",
         extra={
@@ -215,6 +506,22 @@ def insert_chunks(
     return inserted
 
 
+def _insert_rows(con: sqlite3.Connection, rows: list[tuple[Any, ...]]) -> int:
+    sql = (
+        "INSERT INTO chunks (slug, scope, path, version, meta_json, content, embedding_json, created_at, "
+        "embedding_q8, embedding_q8_scale, embedding_q8_offset) "
+        "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? "
+        "WHERE NOT EXISTS ("
+        "  SELECT 1 FROM chunks WHERE slug=? AND scope=? AND path=? AND version=? AND content=? LIMIT 1"
+        ")"
+    )
+    params = [(*row, row[0], row[1], row[2], row[3], row[5]) for row in rows]
+    # rowcount (sqlite3_changes) esclude le scritture dei trigger FTS, a differenza di total_changes.
+    cur = con.executemany(sql, params)
+    con.commit()
+    return max(0, int(cur.rowcount))  # numero reale di nuove righe
+
+
 def fetch_candidates(
     slug: str,
     scope: str,
@@ -222,46 +529,281 @@ def fetch_candidates(
     db_path: Optional[Path] = None,
     *,
     strict_mode: bool | None = None,
+    pool: KbConnectionPool | None = None,
+    include_ids: bool = False,
+    filters: Optional[Mapping[str, str | Sequence[str]]] = None,
 ) -> Iterator[dict[str, Any]]:
     """Restituisce (iterator) i candidati per (slug, scope).
 
-    Ogni dict prodotto contiene: content (str), meta (dict), embedding (list[float]).
+    Ogni dict prodotto contiene: content (str), meta (dict), embedding (list[float]); con
+    `include_ids` anche `id` (rowid di `chunks`), utile per unire più sorgenti di candidati.
     Ordinati dal più recente. Il LIMIT è applicato a livello SQL.
+    `filters` (chiavi di METADATA_FILTER_COLUMNS, valore o lista di valori) è applicato in SQL
+    sulle colonne indicizzate, prima del LIMIT. Chiavi sconosciute: ConfigError.
+    Con `pool` riusa la connessione del thread corrente e salta `init_db` dopo la prima verifica.
     """
-    resolved_db_path = _resolve_db_path(db_path)
-    init_db(resolved_db_path)
+    strict = is_beta_strict() if strict_mode is None else strict_mode
+    # filter_sql contiene solo nomi di colonna da METADATA_FILTER_COLUMNS; i valori sono parametri.
+    filter_sql, filter_args = _metadata_filter_sql(filters)
     sql = (
-        "SELECT content, meta_json, embedding_json FROM chunks " "WHERE slug = ? AND scope = ? ORDER BY id DESC LIMIT ?"
+        "SELECT id, content, meta_json, embedding_json FROM chunks "  # noqa: S608
+        f"WHERE slug = ? AND scope = ?{filter_sql} ORDER BY id DESC LIMIT ?"
     )
+    args = (slug, scope, *filter_args, int(limit))
+    if pool is not None and pool.caches_candidates:
+        key = ("candidates", sql, args, strict, include_ids)
+        yield from _iter_cached_rows(
+            pool,
+            db_path,
+            key,
+            lambda con: _iter_candidate_rows(con, sql, args, slug, scope, strict=strict, include_ids=include_ids),
+        )
+        return
+    with _scoped_connection(db_path, pool) as con:
+        yield from _iter_candidate_rows(con, sql, args, slug, scope, strict=strict, include_ids=include_ids)
+
+
+def fetch_quantized_candidates(
+    slug: str,
+    scope: str,
+    limit: int = 64,
+    db_path: Optional[Path] = None,
+    *,
+    pool: KbConnectionPool | None = None,
+    filters: Optional[Mapping[str, str | Sequence[str]]] = None,
+) -> Iterator[dict[str, Any]]:
+    """Come `fetch_candidates` ma legge solo id e embedding int8 (`q8`, `scale`, `offset`).
+
+    Nessuna decodifica JSON: pensato per il primo passaggio approssimato del retriever. Le righe
+    non ancora quantizzate hanno `q8=None` e vanno valutate in modo esatto.
+    """
+    filter_sql, filter_args = _metadata_filter_sql(filters)
+    sql = (
+        "SELECT id, embedding_q8, embedding_q8_scale, embedding_q8_offset FROM chunks "  # noqa: S608
+        f"WHERE slug = ? AND scope = ?{filter_sql} ORDER BY id DESC LIMIT ?"
+    )
+    args = (slug, scope, *filter_args, int(limit))
+
+    def _rows(con: sqlite3.Connection) -> Iterator[dict[str, Any]]:
+        for row_id, blob, scale, offset in con.execute(sql, args):
+            yield {"id": int(row_id), "q8": blob, "scale": scale, "offset": offset}
+
+    if pool is not None and pool.caches_candidates:
+        yield from _iter_cached_rows(pool, db_path, ("quantized", sql, args), _rows)
+        return
+    with _scoped_connection(db_path, pool) as con:
+        yield from _rows(con)
+
+
+def _iter_cached_rows(
+    pool: KbConnectionPool,
+    db_path: Optional[Path],
+    key: tuple[Any, ...],
+    load: Callable[[sqlite3.Connection], Iterator[dict[str, Any]]],
+) -> Iterator[dict[str, Any]]:
+    """Servono le righe dalla cache del pool (copie superficiali: i chiamanti possono annotarle)."""
+    rows = pool.cached_rows(key)
+    if rows is None:
+        with _scoped_connection(db_path, pool) as con:
+            # Firma presa a connessione aperta (schema/WAL già inizializzati) ma prima della lettura:
+            # un commit concorrente invalida la voce al giro successivo.
+            signature = pool._db_signature()
+            rows = list(load(con))
+        pool.store_rows(key, rows, signature)
+    for row in rows:
+        yield dict(row)
+
+
+def fetch_candidates_by_ids(
+    ids: Sequence[int],
+    db_path: Optional[Path] = None,
+    *,
+    strict_mode: bool | None = None,
+    pool: KbConnectionPool | None = None,
+) -> list[dict[str, Any]]:
+    """Carica i candidati completi (id, content, meta, embedding) per gli id dati, dal più recente."""
+    if not ids:
+        return []
     strict = is_beta_strict() if strict_mode is None else strict_mode
-    with connect(resolved_db_path) as con:
-        for content, meta_json, emb_json in con.execute(sql, (slug, scope, int(limit))):
-            corrupted = False
-            try:
-                meta = json.loads(meta_json) if meta_json else {}
-            except json.JSONDecodeError:
-                corrupted = True
-                _handle_corrupted_fetch(
-                    slug=slug,
-                    scope=scope,
-                    field="meta_json",
-                    event="kb_db.fetch.invalid_meta_json",
-                    strict=strict,
-                )
-            try:
-                emb = json.loads(emb_json) if emb_json else []
-            except json.JSONDecodeError:
-                corrupted = True
-                _handle_corrupted_fetch(
-                    slug=slug,
-                    scope=scope,
-                    field="embedding_json",
-                    event="kb_db.fetch.invalid_embedding_json",
-                    strict=strict,
+    out: list[dict[str, Any]] = []
+    unique = sorted({int(i) for i in ids}, reverse=True)
+    with _scoped_connection(db_path, pool) as con:
+        # A blocchi per restare sotto il limite di parametri SQLite.
+        for start in range(0, len(unique), 500):
+            block = unique[start : start + 500]
+            sql = (
+                "SELECT id, content, meta_json, embedding_json FROM chunks "  # noqa: S608
+                f"WHERE id IN ({', '.join('?' for _ in block)}) ORDER BY id DESC"
+            )
+            for item in _iter_candidate_rows(con, sql, tuple(block), "", "", strict=strict, include_ids=True):
+                out.append(item)
+    return out
+
+
+def quantize_embeddings(
+    slug: str,
+    scope: str,
+    db_path: Optional[Path] = None,
+    *,
+    pool: KbConnectionPool | None = None,
+    batch_size: int = 500,
+) -> int:
+    """Popola l'embedding int8 delle righe che ne sono prive (DB creati prima della quantizzazione).
+
+    Restituisce il numero di righe aggiornate; le embedding vuote o non valide restano NULL.
+    """
+    updated = 0
+    last_id = -1
+    with _scoped_connection(db_path, pool) as con:
+        while True:
+            batch = con.execute(
+                "SELECT id, embedding_json FROM chunks WHERE slug = ? AND scope = ? AND id > ? "
+                "AND embedding_q8 IS NULL ORDER BY id LIMIT ?",
+                (slug, scope, last_id, int(batch_size)),
+            ).fetchall()
+            if not batch:
+                break
+            last_id = int(batch[-1][0])
+            values = []
+            for row_id, emb_json in batch:
+                try:
+                    vec = json.loads(emb_json) if emb_json else None
+                except json.JSONDecodeError:
+                    vec = None
+                blob, scale, offset = _quantized_columns(vec)
+                if blob is not None:
+                    values.append((blob, scale, offset, int(row_id)))
+            if values:
+                cur = con.executemany(
+                    "UPDATE chunks SET embedding_q8 = ?, embedding_q8_scale = ?, embedding_q8_offset = ? WHERE id = ?",
+                    values,
                 )
-            if corrupted:
-                continue
-            yield {"content": content, "meta": meta, "embedding": emb}
+                updated += max(0, int(cur.rowcount))
+            con.commit()
+    if pool is not None and updated:
+        pool.invalidate_cache()
+    LOGGER.info("kb_db.quantize.completed", extra={"slug": slug, "scope": scope, "rows": updated})
+    return updated
+
+
+@contextmanager
+def _scoped_connection(db_path: Optional[Path], pool: KbConnectionPool | None) -> Iterator[sqlite3.Connection]:
+    """Connessione del pool (schema verificato una volta) o connessione dedicata con `init_db`."""
+    if pool is not None:
+        _check_pool_db_path(pool, db_path)
+        pool.ensure_schema()
+        yield pool.connection()
+        return
+    resolved_db_path = _resolve_db_path(db_path)
+    init_db(resolved_db_path)
+    with connect(resolved_db_path) as con:
+        yield con
+
+
+def fetch_lexical_candidates(
+    slug: str,
+    scope: str,
+    query: str,
+    limit: int = 200,
+    db_path: Optional[Path] = None,
+    *,
+    strict_mode: bool | None = None,
+    pool: KbConnectionPool | None = None,
+    filters: Optional[Mapping[str, str | Sequence[str]]] = None,
+) -> Iterator[dict[str, Any]]:
+    """Restituisce (iterator) i top-`limit` candidati BM25 per `query` su (slug, scope).
+
+    Ogni dict contiene: id, content, meta, embedding e `bm25` (più basso = più rilevante), in ordine
+    di rilevanza. I termini della query sono estratti come token alfanumerici e combinati in OR, quindi
+    la sintassi FTS5 dell'utente non viene interpretata. Senza termini utili o senza FTS5 non produce nulla.
+    """
+    match = _fts_match_expression(query)
+    if not match or int(limit) <= 0:
+        return
+    strict = is_beta_strict() if strict_mode is None else strict_mode
+    filter_sql, filter_args = _metadata_filter_sql(filters, alias="c.")
+    sql = (
+        "SELECT c.id, c.content, c.meta_json, c.embedding_json, bm25(chunks_fts) AS rank "  # noqa: S608
+        "FROM chunks_fts JOIN chunks AS c ON c.id = chunks_fts.rowid "
+        f"WHERE chunks_fts MATCH ? AND c.slug = ? AND c.scope = ?{filter_sql} ORDER BY rank LIMIT ?"
+    )
+    args = (match, slug, scope, *filter_args, int(limit))
+    with _scoped_connection(db_path, pool) as con:
+        if _has_fts_index(con):
+            yield from _iter_candidate_rows(con, sql, args, slug, scope, strict=strict, include_ids=True)
+
+
+def _fts_match_expression(query: str) -> str:
+    terms: list[str] = []
+    for token in _FTS_TOKEN_RE.findall(query or ""):
+        term = token.lower()
+        if term not in terms:
+            terms.append(term)
+        if len(terms) >= _FTS_MAX_TERMS:
+            break
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def _has_fts_index(con: sqlite3.Connection) -> bool:
+    row = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='chunks_fts'").fetchone()
+    return row is not None
+
+
+def _iter_candidate_rows(
+    con: sqlite3.Connection,
+    sql: str,
+    args: tuple[Any, ...],
+    slug: str,
+    scope: str,
+    *,
+    strict: bool,
+    include_ids: bool = False,
+) -> Iterator[dict[str, Any]]:
+    for row in con.execute(sql, args):
+        row_id, content, meta_json, emb_json = row[:4]
+        corrupted = False
+        try:
+            meta = json.loads(meta_json) if meta_json else {}
+        except json.JSONDecodeError:
+            corrupted = True
+            _handle_corrupted_fetch(
+                slug=slug,
+                scope=scope,
+                field="meta_json",
+                event="kb_db.fetch.invalid_meta_json",
+                strict=strict,
+            )
+        try:
+            emb = json.loads(emb_json) if emb_json else []
+        except json.JSONDecodeError:
+            corrupted = True
+            _handle_corrupted_fetch(
+                slug=slug,
+                scope=scope,
+                field="embedding_json",
+                event="kb_db.fetch.invalid_embedding_json",
+                strict=strict,
+            )
+        if corrupted:
+            continue
+        item: dict[str, Any] = {"content": content, "meta": meta, "embedding": emb}
+        if include_ids:
+            item["id"] = int(row_id)
+        if len(row) > 4:
+            item["bm25"] = float(row[4])
+        yield item
+
+
+def _check_pool_db_path(pool: KbConnectionPool, db_path: Optional[Path]) -> None:
+    if db_path is None:
+        return
+    if _resolve_db_path(db_path) != pool.db_path:
+        raise ConfigError(
+            "KbConnectionPool legato a un DB diverso da quello richiesto.",
+            code="kb.db.pool_mismatch",
+            component="kb_db",
+            file_path=str(db_path),
+        )
 
 
 def _handle_corrupted_fetch(slug: str, scope: str, field: str, event: str, *, strict: bool) -> None:
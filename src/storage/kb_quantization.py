@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# src/storage/kb_quantization.py
+"""Quantizzazione scalare int8 delle embedding della KB.
+
+Ogni vettore è codificato come int8 con `scale`/`offset` propri (x ≈ scale * q + offset, q in
+[-127, 127]): 1 byte per componente invece di 4 (float32) o ~20 (JSON). Lo scoring approssimato
+usa prodotti scalari interi tra la matrice dei candidati e la query anch'essa quantizzata; il
+retriever ri-ordina poi in float esatto solo i migliori N.
+
+Espone:
+- quantize_int8(vector) -> (blob, scale, offset) | None
+- dequantize_int8(blob, scale, offset) -> list[float]
+- approx_cosine_scores(query_vector, rows) -> list[float | None]
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Optional, Sequence
+
+_Q_MAX = 127
+
+
+def quantize_int8(vector: Sequence[float]) -> Optional[tuple[bytes, float, float]]:
+    """Codifica `vector` in int8 asimmetrico; None se vuoto o con valori non finiti."""
+    import numpy as np
+
+    try:
+        arr = np.asarray(vector, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    if arr.ndim != 1 or arr.size == 0 or not np.all(np.isfinite(arr)):
+        return None
+    lo = float(arr.min())
+    hi = float(arr.max())
+    offset = (hi + lo) / 2.0
+    scale = (hi - lo) / (2.0 * _Q_MAX)
+    if scale == 0.0:
+        # Vettore costante: tutto nell'offset, q = 0.
+        return bytes(arr.size), 0.0, offset
+    q = np.clip(np.rint((arr - offset) / scale), -_Q_MAX, _Q_MAX).astype(np.int8)
+    return q.tobytes(), scale, offset
+
+
+def dequantize_int8(blob: bytes, scale: float, offset: float) -> list[float]:
+    """Ricostruisce il vettore float approssimato da (blob, scale, offset)."""
+    import numpy as np
+
+    q = np.frombuffer(blob, dtype=np.int8).astype(np.float64)
+    return (q * float(scale) + float(offset)).tolist()
+
+
+def approx_cosine_scores(query_vector: Sequence[float], rows: Sequence[dict[str, Any]]) -> list[Optional[float]]:
+    """Coseno approssimato tra la query e ogni riga quantizzata (`q8`, `scale`, `offset`).
+
+    La query è quantizzata simmetricamente (offset 0); per riga x = s*q + o e query v = t*p:
+      x·v  = s*t*Σ(q·p) + o*t*Σp
+      |x|² = s²*Σq² + 2*s*o*Σq + n*o²
+    con Σ(q·p), Σq, Σq² calcolati in aritmetica intera (int32) sull'intera matrice.
+    Righe senza blob, di dimensione diversa dalla query o a norma nulla restituiscono None/0.0.
+    """
+    import numpy as np
+
+    scores: list[Optional[float]] = [None] * len(rows)
+    query = np.asarray(query_vector, dtype=np.float64)
+    dim = int(query.size)
+    if dim == 0 or not np.all(np.isfinite(query)):
+        return scores
+    t = float(np.abs(query).max()) / _Q_MAX
+    if t == 0.0:
+        return [0.0 if row.get("q8") is not None else None for row in rows]
+    p = np.clip(np.rint(query / t), -_Q_MAX, _Q_MAX).astype(np.int32)
+    query_norm = float(np.linalg.norm(query))
+
+    positions = [idx for idx, row in enumerate(rows) if isinstance(row.get("q8"), (bytes, bytearray, memoryview))]
+    positions = [idx for idx in positions if len(rows[idx]["q8"]) == dim]
+    if not positions:
+        return scores
+    q = np.frombuffer(b"".join(bytes(rows[idx]["q8"]) for idx in positions), dtype=np.int8)
+    q = q.reshape(len(positions), dim).astype(np.int32)
+    s = np.fromiter((float(rows[idx]["scale"]) for idx in positions), dtype=np.float64, count=len(positions))
+    o = np.fromiter((float(rows[idx]["offset"]) for idx in positions), dtype=np.float64, count=len(positions))
+
+    dot_qp = (q @ p).astype(np.float64)
+    sum_q = q.sum(axis=1, dtype=np.int64).astype(np.float64)
+    sum_q2 = np.einsum("ij,ij->i", q, q, dtype=np.int64).astype(np.float64)
+    dots = s * t * dot_qp + o * t * float(p.sum())
+    norms_sq = np.maximum(s * s * sum_q2 + 2.0 * s * o * sum_q + dim * o * o, 0.0)
+    norms = np.sqrt(norms_sq)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos = np.where(norms > 0.0, dots / (norms * query_norm), 0.0)
+    for idx, value in zip(positions, np.clip(cos, -1.0, 1.0).tolist(), strict=True):
+        scores[idx] = value if math.isfinite(value) else 0.0
+    return scores
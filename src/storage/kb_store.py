@@ -16,6 +16,7 @@ from typing import Optional
 from pipeline.beta_flags import is_test_mode
 from pipeline.exceptions import ConfigError
 from pipeline.path_utils import ensure_within, ensure_within_and_resolve
+from storage.kb_db import KbConnectionPool
 
 __all__ = ["KbStore"]
 
@@ -113,6 +114,15 @@ class KbStore:
 
         raise ConfigError("KbStore richiede slug/repo_root_dir espliciti; risoluzione globale implicita rimossa.")
 
+    def connection_pool(self, *, candidate_cache_size: int = 0) -> KbConnectionPool:
+        """
+        Apre un `KbConnectionPool` sul path effettivo (sessione di ingest/retriever).
+
+        Il chiamante ne possiede il ciclo di vita: usarlo come context manager o chiamare `close()`.
+        `candidate_cache_size` abilita la cache dei candidati decodificati (es. daemon retriever).
+        """
+        return KbConnectionPool(self.effective_db_path(), candidate_cache_size=candidate_cache_size)
+
     def _assert_canonical_path(self, resolved: Path, repo_root_dir: Path) -> None:
         canonical_semantic = (repo_root_dir / "semantic").resolve()
         if resolved.name != "kb.sqlite" or resolved.parent != canonical_semantic:
@@ -33,6 +33,16 @@ def _build_parser() -> argparse.ArgumentParser:
         default="",
         help="Annotazione opzionale (es. utente o host) dentro l'attestato.",
     )
+
+    serve_parser = subparsers.add_parser(
+        "retriever-serve",
+        help="Daemon locale del retriever con cache calde (HTTP su loopback).",
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interfaccia di ascolto")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Porta TCP")
+    serve_parser.add_argument("--cache-size", type=int, default=1, help="Voci LRU di candidati per workspace")
+    serve_parser.add_argument("--cache-max-rows", type=int, default=4000, help="Righe massime in cache per workspace")
+    serve_parser.add_argument("--max-workspaces", type=int, default=4, help="Workspace tenuti caldi (LRU)")
     return parser
 
 
@@ -52,6 +62,28 @@ def _run_env_attest(args: argparse.Namespace) -> int:
     return 0
 
 
+def _run_retriever_serve(args: argparse.Namespace) -> int:
+    ensure_strict_runtime(context="cli.__main__.retriever_serve", require_workspace_root=False)
+    from timmy_kb.cli import retriever_server
+
+    return int(
+        retriever_server.main(
+            [
+                "--host",
+                str(args.host),
+                "--port",
+                str(args.port),
+                "--cache-size",
+                str(args.cache_size),
+                "--cache-max-rows",
+                str(args.cache_max_rows),
+                "--max-workspaces",
+                str(args.max_workspaces),
+            ]
+        )
+    )
+
+
 def main() -> int:
     parser = _build_parser()
     args = parser.parse_args()
@@ -59,6 +91,8 @@ def main() -> int:
         return _run_ledger_status(args)
     if args.command == "env-attest":
         return _run_env_attest(args)
+    if args.command == "retriever-serve":
+        return _run_retriever_serve(args)
     parser.error(f"Comando non supportato: {args.command}")
     return 2
 
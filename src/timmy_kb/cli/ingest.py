@@ -17,7 +17,13 @@ from __future__ import annotations
 
 import hashlib
 import os
+import queue
+import sqlite3
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from functools import lru_cache
 from glob import iglob
 from pathlib import Path
@@ -30,11 +36,15 @@ from pipeline.exceptions import ConfigError, PathTraversalError
 from pipeline.logging_utils import get_structured_logger, phase_scope
 from pipeline.metrics import record_document_processed, start_metrics_server_once
 from pipeline.path_utils import ensure_within_and_resolve, read_text_safe
+from pipeline.text_chunking import iter_token_window_chunks
 from pipeline.tracing import start_decision_span, start_root_trace
 from pipeline.workspace_layout import WorkspaceLayout
 from semantic.types import EmbeddingsClient  # usa la SSoT del protocollo
 
 # Importa kb_db in modo locale senza alias storici
+from storage.kb_db import KbConnectionPool
+from storage.kb_db import connect as _connect_kb
+from storage.kb_db import init_db as _init_kb_db
 from storage.kb_db import insert_chunks
 from storage.kb_store import KbStore
 
@@ -166,6 +176,11 @@ def _batched_iterable(items: Iterable[Path], batch_size: int | None) -> Iterable
         yield batch
 
 
+def _chain_first(first: Path, rest: Iterable[Path]) -> Iterable[Path]:
+    yield first
+    yield from rest
+
+
 def _read_text_file(perimeter_root: Path, p: Path) -> str:
     try:
         # Prova prima con UTF-8
@@ -262,21 +277,17 @@ def load_and_chunk(
     return safe_path, chunks
 
 
-def embed_and_persist(
+def _prepare_file_meta(
     *,
     slug: str,
     scope: str,
     version: str,
     safe_path: Path,
-    chunks: list[str],
+    chunks: Sequence[str],
     meta: dict[str, Any],
     repo_root_dir: Path,
-    embeddings_client: EmbeddingsClient | None,
-    db_path: Path,
-    customer: str | None,
-) -> int:
-    """Calcola le embedding e persiste i chunk nel DB, restituendo il totale inserito."""
-    client: EmbeddingsClient = embeddings_client or cast(EmbeddingsClient, OpenAIEmbeddings())
+) -> tuple[dict[str, Any], dict[str, Any], str]:
+    """Costruisce meta/lineage del file ed emette gli eventi di input e di creazione chunk."""
     safe_rel_path = _relative_to(repo_root_dir, safe_path)
     meta_dict = dict(meta or {})
     lineage_meta = meta_dict.get("lineage")
@@ -312,11 +323,31 @@ def embed_and_persist(
                 "chunk_index": chunk.get("chunk_index"),
             },
         )
-    with phase_scope(LOGGER, stage="ingest.embed", customer=customer or slug) as phase_embed:
-        vectors_seq = client.embed_texts(chunks)
-        vectors: list[list[float]] = [list(map(float, v)) for v in vectors_seq]
-        phase_embed.set_artifacts(len(vectors))
+    return meta_dict, lineage_meta, safe_rel_path
+
 
+def _persist_embedded_file(
+    *,
+    slug: str,
+    scope: str,
+    version: str,
+    safe_path: Path,
+    safe_rel_path: str,
+    chunks: list[str],
+    vectors: list[list[float]],
+    meta_dict: dict[str, Any],
+    lineage_meta: dict[str, Any],
+    db_path: Path,
+    customer: str | None,
+    connection: sqlite3.Connection | None = None,
+    connection_pool: KbConnectionPool | None = None,
+) -> int:
+    """Persiste i chunk già embeddati di un file ed emette gli eventi di salvataggio/lineage."""
+    insert_kwargs: dict[str, Any] = {}
+    if connection is not None:
+        insert_kwargs = {"ensure_schema": False, "connection": connection}
+    elif connection_pool is not None:
+        insert_kwargs = {"pool": connection_pool}
     with phase_scope(LOGGER, stage="ingest.persist", customer=customer or slug) as phase_persist:
         inserted = int(
             insert_chunks(
@@ -328,6 +359,7 @@ def embed_and_persist(
                 chunks=chunks,
                 embeddings=vectors,
                 db_path=db_path,
+                **insert_kwargs,
             )
         )
         phase_persist.set_artifacts(inserted)
@@ -364,6 +396,52 @@ def embed_and_persist(
     return inserted
 
 
+def embed_and_persist(
+    *,
+    slug: str,
+    scope: str,
+    version: str,
+    safe_path: Path,
+    chunks: list[str],
+    meta: dict[str, Any],
+    repo_root_dir: Path,
+    embeddings_client: EmbeddingsClient | None,
+    db_path: Path,
+    customer: str | None,
+    connection_pool: KbConnectionPool | None = None,
+) -> int:
+    """Calcola le embedding e persiste i chunk nel DB, restituendo il totale inserito."""
+    client: EmbeddingsClient = embeddings_client or cast(EmbeddingsClient, OpenAIEmbeddings())
+    meta_dict, lineage_meta, safe_rel_path = _prepare_file_meta(
+        slug=slug,
+        scope=scope,
+        version=version,
+        safe_path=safe_path,
+        chunks=chunks,
+        meta=meta,
+        repo_root_dir=repo_root_dir,
+    )
+    with phase_scope(LOGGER, stage="ingest.embed", customer=customer or slug) as phase_embed:
+        vectors_seq = client.embed_texts(chunks)
+        vectors: list[list[float]] = [list(map(float, v)) for v in vectors_seq]
+        phase_embed.set_artifacts(len(vectors))
+
+    return _persist_embedded_file(
+        slug=slug,
+        scope=scope,
+        version=version,
+        safe_path=safe_path,
+        safe_rel_path=safe_rel_path,
+        chunks=chunks,
+        vectors=vectors,
+        meta_dict=meta_dict,
+        lineage_meta=lineage_meta,
+        db_path=db_path,
+        customer=customer,
+        connection_pool=connection_pool,
+    )
+
+
 @lru_cache(maxsize=1)
 def _get_encoder() -> Any:
     try:
@@ -380,15 +458,15 @@ def _get_encoder() -> Any:
 
 
 def _chunk_text(text: str, target_tokens: int = 400, overlap_tokens: int = 40) -> List[str]:
-    """Divide il testo in chunk basati su token quando possibile, altrimenti per caratteri."""
-    enc = _get_encoder()
-    tokens = enc.encode(text)
-    chunks = []
-    step = max(1, target_tokens - overlap_tokens)
-    for i in range(0, len(tokens), step):
-        piece = tokens[i : i + target_tokens]
-        chunks.append(enc.decode(piece))
-    return chunks
+    """Divide il testo in finestre di token sovrapposte (slice del testo originale, encode singolo)."""
+    return list(
+        iter_token_window_chunks(
+            text,
+            encoder=_get_encoder(),
+            target_tokens=target_tokens,
+            overlap_tokens=overlap_tokens,
+        )
+    )
 
 
 class OpenAIEmbeddings:
@@ -442,11 +520,13 @@ def ingest_path(
     context: ClientContext | None = None,
     repo_root_dir: Optional[Path] = None,
     db_path: Optional[Path] = None,
+    connection_pool: KbConnectionPool | None = None,
 ) -> int:
     """Ingest di un singolo file di testo: chunk, embedding, salvataggio. Restituisce il numero di chunk.
 
     Funzione di orchestrazione: delega path-safety/lettura a load_and_chunk e l'embed/persist a embed_and_persist.
-    Richiede un context valido per risolvere il layout canonico.
+    Richiede un context valido per risolvere il layout canonico. `connection_pool` (opzionale) riusa
+    connessioni e verifica schema del run invece di aprirne di nuove per ogni file.
     """
     layout = _require_layout(context, slug)
     layout_repo_root_dir = layout.repo_root_dir
@@ -484,9 +564,359 @@ def ingest_path(
         embeddings_client=embeddings_client,
         db_path=effective_db_path,
         customer=customer,
+        connection_pool=connection_pool,
     )
 
 
+@dataclass(frozen=True)
+class IngestPipelineOptions:
+    """Opzioni del percorso pipelined di `ingest_folder`.
+
+    Stadi: pool reader/chunker -> embedding a batch pieni (chunk di più file) -> writer SQLite unico,
+    collegati da code limitate.
+    """
+
+    reader_workers: int | None = None  # None -> min(8, cpu_count)
+    embed_batch_size: int = 256  # chunk per chiamata embed_texts
+    queue_size: int = 4  # batch/file in volo tra uno stadio e il successivo
+
+
+@dataclass
+class _PendingFile:
+    path: Path
+    safe_path: Path
+    chunks: list[str]
+    meta_dict: dict[str, Any]
+    lineage_meta: dict[str, Any]
+    safe_rel_path: str
+    vectors: list[list[float]] = field(default_factory=list)
+    failed: bool = False  # saltato per ConfigError: le slice successive non vanno embeddate
+
+
+@dataclass
+class _EmbedBatch:
+    # (file, start, end): slice dei chunk del file incluse nel batch
+    slices: list[tuple[_PendingFile, int, int]] = field(default_factory=list)
+    size: int = 0
+
+
+class _PipelineAborted(Exception):
+    """Uno stadio a valle è fallito: lo stadio corrente si ferma senza errori propri."""
+
+
+_QUEUE_POLL_S = 0.1
+
+
+def _put_or_abort(q: "queue.Queue[Any]", item: Any, abort: threading.Event) -> None:
+    while True:
+        if abort.is_set():
+            raise _PipelineAborted()
+        try:
+            q.put(item, timeout=_QUEUE_POLL_S)
+            return
+        except queue.Full:
+            continue
+
+
+def _get_or_abort(q: "queue.Queue[Any]", abort: threading.Event) -> Any:
+    while True:
+        if abort.is_set():
+            raise _PipelineAborted()
+        try:
+            return q.get(timeout=_QUEUE_POLL_S)
+        except queue.Empty:
+            continue
+
+
+def _pipeline_options_from_context(context: ClientContext | None) -> IngestPipelineOptions | None:
+    """Legge `pipeline.ingest` dal config del contesto: None se il percorso pipelined è disattivo."""
+    settings = getattr(context, "settings", None)
+    section = getattr(settings, "ingest_settings", None)
+    if section is None or not section.pipelined:
+        return None
+    return IngestPipelineOptions(
+        reader_workers=section.reader_workers or None,
+        embed_batch_size=section.embed_batch_size,
+        queue_size=section.queue_size,
+    )
+
+
+def _resolve_reader_workers(options: IngestPipelineOptions) -> int:
+    if options.reader_workers is not None:
+        return max(1, int(options.reader_workers))
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def _ingest_folder_pipelined(
+    candidates: Iterable[Path],
+    *,
+    slug: str,
+    scope: str,
+    version: str,
+    meta: dict[str, Any],
+    client: EmbeddingsClient,
+    repo_root_dir: Path,
+    db_path: Path,
+    customer: str | None,
+    max_files: Optional[int],
+    options: IngestPipelineOptions,
+) -> tuple[int, int, bool]:
+    """Esegue l'ingest a tre stadi. Restituisce (files, chunks, limit_reached).
+
+    L'ordine dei file (lettura, embedding, scrittura) resta quello della discovery. Come nel percorso
+    seriale, un ConfigError su un file (lettura, embedding o persistenza) salta solo quel file e
+    `max_files` conta i file effettivamente salvati: se i file in volo bastano a raggiungere il limite,
+    la lettura si ferma finché non se ne conosce l'esito.
+    """
+    reader_workers = _resolve_reader_workers(options)
+    batch_capacity = max(1, int(options.embed_batch_size))
+    queue_size = max(1, int(options.queue_size))
+    embed_q: "queue.Queue[_EmbedBatch | None]" = queue.Queue(maxsize=queue_size)
+    write_q: "queue.Queue[_PendingFile | None]" = queue.Queue(maxsize=queue_size)
+    abort = threading.Event()
+    errors: list[BaseException] = []
+    # `resolved` conta i file accettati di cui si conosce l'esito (salvati o saltati).
+    progress = threading.Condition()
+    totals = {"files": 0, "chunks": 0, "resolved": 0}
+
+    def _fail(exc: BaseException) -> None:
+        if not isinstance(exc, _PipelineAborted):
+            errors.append(exc)
+        abort.set()
+        with progress:
+            progress.notify_all()
+
+    def _resolve(inserted: int) -> None:
+        with progress:
+            totals["resolved"] += 1
+            if inserted > 0:
+                totals["files"] += 1
+                totals["chunks"] += inserted
+                if totals["files"] % 50 == 0:
+                    LOGGER.info(
+                        "pipeline.processing.progress",
+                        extra={
+                            "slug": slug,
+                            "scope": scope,
+                            "processed": totals["files"],
+                            "chunks": totals["chunks"],
+                        },
+                    )
+            progress.notify_all()
+
+    def _skip(pending: _PendingFile, exc: ConfigError) -> None:
+        pending.failed = True
+        LOGGER.warning(
+            "ingest.skip.config_error",
+            extra={"file": str(pending.path), "scope": scope, "slug": slug, "error": str(exc)},
+        )
+        _resolve(0)
+
+    def _embed(texts: list[str]) -> list[list[float]]:
+        with phase_scope(LOGGER, stage="ingest.embed", customer=customer or slug) as phase_embed:
+            vectors_seq = client.embed_texts(texts)
+            vectors = [list(map(float, v)) for v in vectors_seq]
+            phase_embed.set_artifacts(len(vectors))
+        if len(vectors) != len(texts):
+            raise ConfigError(
+                f"Embedding batch incoerente: attesi {len(texts)} vettori, ricevuti {len(vectors)}.",
+                slug=slug,
+            )
+        return vectors
+
+    def _embed_batch(slices: list[tuple[_PendingFile, int, int]]) -> None:
+        texts = [text for pending, start, end in slices for text in pending.chunks[start:end]]
+        try:
+            vectors = _embed(texts)
+        except ConfigError:
+            if len(slices) == 1:
+                raise
+            # Batch cross-file rifiutato: si ripete file per file per saltare solo quello colpevole.
+            for item in slices:
+                pending = item[0]
+                try:
+                    _embed_batch([item])
+                except ConfigError as exc:
+                    _skip(pending, exc)
+            return
+        except Exception:
+            LOGGER.exception(
+                "ingest.error",
+                extra={"file": str(slices[0][0].path), "scope": scope, "slug": slug},
+            )
+            raise
+        offset = 0
+        for pending, start, end in slices:
+            pending.vectors.extend(vectors[offset : offset + (end - start)])
+            offset += end - start
+
+    def _embed_stage() -> None:
+        try:
+            while True:
+                batch = _get_or_abort(embed_q, abort)
+                if batch is None:
+                    break
+                slices = [item for item in batch.slices if not item[0].failed]
+                if not slices:
+                    continue
+                try:
+                    _embed_batch(slices)
+                except ConfigError as exc:
+                    _skip(slices[0][0], exc)
+                for pending, _start, end in slices:
+                    if end == len(pending.chunks) and not pending.failed:
+                        _put_or_abort(write_q, pending, abort)
+            _put_or_abort(write_q, None, abort)
+        except BaseException as exc:
+            _fail(exc)
+
+    def _writer_stage() -> None:
+        try:
+            _init_kb_db(db_path)
+            with _connect_kb(db_path) as con:
+                while True:
+                    pending = _get_or_abort(write_q, abort)
+                    if pending is None:
+                        break
+                    try:
+                        n = _persist_embedded_file(
+                            slug=slug,
+                            scope=scope,
+                            version=version,
+                            safe_path=pending.safe_path,
+                            safe_rel_path=pending.safe_rel_path,
+                            chunks=pending.chunks,
+                            vectors=pending.vectors,
+                            meta_dict=pending.meta_dict,
+                            lineage_meta=pending.lineage_meta,
+                            db_path=db_path,
+                            customer=customer,
+                            connection=con,
+                        )
+                    except ConfigError as exc:
+                        _skip(pending, exc)
+                        continue
+                    except Exception:
+                        LOGGER.exception(
+                            "ingest.error",
+                            extra={"file": str(pending.path), "scope": scope, "slug": slug},
+                        )
+                        raise
+                    _resolve(n)
+        except BaseException as exc:
+            _fail(exc)
+
+    def _read(path: Path) -> tuple[Optional[Path], list[str]]:
+        return load_and_chunk(
+            path=path,
+            perimeter_root=repo_root_dir,
+            slug=slug,
+            scope=scope,
+            customer=customer,
+        )
+
+    embed_thread = threading.Thread(target=_embed_stage, name="ingest-embed", daemon=True)
+    writer_thread = threading.Thread(target=_writer_stage, name="ingest-writer", daemon=True)
+    embed_thread.start()
+    writer_thread.start()
+
+    accepted = 0
+    limit_reached = False
+    current = _EmbedBatch()
+    in_flight: deque[tuple[Path, Future[tuple[Optional[Path], list[str]]]]] = deque()
+    read_capacity = reader_workers * 2
+
+    def _flush() -> None:
+        nonlocal current
+        if current.slices:
+            _put_or_abort(embed_q, current, abort)
+            current = _EmbedBatch()
+
+    def _accept(path: Path, future: Future[tuple[Optional[Path], list[str]]]) -> None:
+        nonlocal accepted
+        try:
+            safe_path, chunks = future.result()
+        except ConfigError as exc:
+            LOGGER.warning(
+                "ingest.skip.config_error",
+                extra={"file": str(path), "scope": scope, "slug": slug, "error": str(exc)},
+            )
+            return
+        except Exception:
+            LOGGER.exception("ingest.error", extra={"file": str(path), "scope": scope, "slug": slug})
+            raise
+        if not chunks or safe_path is None:
+            return
+        accepted += 1
+        meta_dict, lineage_meta, safe_rel_path = _prepare_file_meta(
+            slug=slug,
+            scope=scope,
+            version=version,
+            safe_path=safe_path,
+            chunks=chunks,
+            meta=meta,
+            repo_root_dir=repo_root_dir,
+        )
+        pending = _PendingFile(
+            path=path,
+            safe_path=safe_path,
+            chunks=chunks,
+            meta_dict=meta_dict,
+            lineage_meta=lineage_meta,
+            safe_rel_path=safe_rel_path,
+        )
+        start = 0
+        while start < len(chunks):
+            end = min(len(chunks), start + batch_capacity - current.size)
+            current.slices.append((pending, start, end))
+            current.size += end - start
+            start = end
+            if current.size >= batch_capacity:
+                _flush()
+
+    def _limit_hit() -> bool:
+        if max_files is None or max_files < 0:
+            return False
+        with progress:
+            if totals["files"] + (accepted - totals["resolved"]) < max_files:
+                return False
+        # I file in volo possono bastare: si attende il loro esito prima di leggerne altri.
+        _flush()
+        with progress:
+            while totals["resolved"] < accepted and not abort.is_set():
+                progress.wait(timeout=_QUEUE_POLL_S)
+            if abort.is_set():
+                raise _PipelineAborted()
+            return totals["files"] >= max_files
+
+    executor = ThreadPoolExecutor(max_workers=reader_workers, thread_name_prefix="ingest-reader")
+    try:
+        for p in candidates:
+            if _limit_hit():
+                limit_reached = True
+                break
+            in_flight.append((p, executor.submit(_read, p)))
+            if len(in_flight) >= read_capacity:
+                _accept(*in_flight.popleft())
+        while in_flight and not _limit_hit():
+            _accept(*in_flight.popleft())
+        limit_reached = limit_reached or bool(in_flight)
+        _flush()
+        _put_or_abort(embed_q, None, abort)
+    except BaseException as exc:
+        _fail(exc)
+    finally:
+        for _path, future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+        embed_thread.join()
+        writer_thread.join()
+
+    if errors:
+        raise errors[0]
+    return totals["files"], totals["chunks"], limit_reached
+
+
 def ingest_folder(
     slug: str,
     scope: str,
@@ -499,6 +929,7 @@ def ingest_folder(
     repo_root_dir: Optional[Path] = None,
     max_files: Optional[int] = None,
     batch_size: Optional[int] = None,
+    pipeline_options: IngestPipelineOptions | None = None,
 ) -> dict[str, int]:
     """Ingest di tutti i file .md/.txt che corrispondono al glob indicato.
 
@@ -508,6 +939,9 @@ def ingest_folder(
         repo_root_dir: override del perimetro path-safety (deve coincidere con layout.repo_root_dir).
         max_files: limita il numero massimo di file elaborati (None -> tutti).
         batch_size: numero di file caricati per batch durante lo streaming (None -> 1).
+        pipeline_options: se valorizzato usa il percorso pipelined (reader pool, embedding a batch
+            cross-file, writer unico); se None vale `pipeline.ingest` del config del contesto
+            (`pipelined: true`), altrimenti elaborazione file per file via `ingest_path`.
 
     Restituisce un dizionario di riepilogo con i conteggi: {files, chunks}.
     """
@@ -526,6 +960,8 @@ def ingest_folder(
             glob_path.resolve().relative_to(repo_root_dir)
         except Exception as exc:
             raise ConfigError("folder_glob fuori dal workspace canonico.", slug=slug, file_path=str(glob_path)) from exc
+    if pipeline_options is None:
+        pipeline_options = _pipeline_options_from_context(context)
     client: EmbeddingsClient | None = embeddings_client
     store = KbStore.for_slug(slug, repo_root_dir=repo_root_dir)
     db_path = store.effective_db_path()
@@ -564,62 +1000,87 @@ def ingest_folder(
                 customer=customer,
                 on_count=_update,
             )
-            for batch in _batched_iterable(candidate_iter, batch_size):
-                for p in batch:
-                    if max_files is not None and max_files >= 0 and count_files >= max_files:
-                        limit_reached = True
-                        break
-                    try:
-                        with phase_scope(LOGGER, stage="ingest.process_file", customer=customer) as phase_file:
-                            if client is None:
-                                client = cast(EmbeddingsClient, OpenAIEmbeddings())
-                            n = ingest_path(
-                                slug=slug,
-                                scope=scope,
-                                path=str(p),
-                                version=version,
-                                meta=meta,
-                                embeddings_client=client,
-                                context=context,
-                                repo_root_dir=repo_root_dir,
-                                db_path=db_path,
-                            )
-                            phase_file.set_artifacts(n)
-                        if n > 0:
-                            total_chunks += n
-                            count_files += 1
-                            if count_files % 50 == 0:
-                                LOGGER.info(
-                                    "pipeline.processing.progress",
-                                    extra={
-                                        "slug": slug,
-                                        "scope": scope,
-                                        "processed": count_files,
-                                        "chunks": total_chunks,
-                                    },
-                                )
-                    except ConfigError as exc:
-                        LOGGER.warning(
-                            "ingest.skip.config_error",
-                            extra={
-                                "file": str(p),
-                                "scope": scope,
-                                "slug": slug,
-                                "error": str(exc),
-                            },
+            if pipeline_options is not None:
+                candidate_iter = iter(candidate_iter)
+                first = next(candidate_iter, None)
+                if first is not None:
+                    if client is None:
+                        client = cast(EmbeddingsClient, OpenAIEmbeddings())
+                    with phase_scope(LOGGER, stage="ingest.process_file", customer=customer) as phase_files:
+                        count_files, total_chunks, limit_reached = _ingest_folder_pipelined(
+                            _chain_first(first, candidate_iter),
+                            slug=slug,
+                            scope=scope,
+                            version=version,
+                            meta=meta,
+                            client=client,
+                            repo_root_dir=repo_root_dir,
+                            db_path=db_path,
+                            customer=customer,
+                            max_files=max_files,
+                            options=pipeline_options,
                         )
-                    except Exception:
-                        LOGGER.exception(
-                            "ingest.error",
-                            extra={
-                                "file": str(p),
-                                "scope": scope,
-                                "slug": slug,
-                            },
-                        )
-                        raise
-                if limit_reached:
-                    break
+                        phase_files.set_artifacts(count_files)
+                candidate_iter = iter(())
+            # Percorso seriale: un pool per l'intero run (connessione e verifica schema riusate tra i file).
+            with store.connection_pool() as kb_pool:
+                for batch in _batched_iterable(candidate_iter, batch_size):
+                    for p in batch:
+                        if max_files is not None and max_files >= 0 and count_files >= max_files:
+                            limit_reached = True
+                            break
+                        try:
+                            with phase_scope(LOGGER, stage="ingest.process_file", customer=customer) as phase_file:
+                                if client is None:
+                                    client = cast(EmbeddingsClient, OpenAIEmbeddings())
+                                n = ingest_path(
+                                    slug=slug,
+                                    scope=scope,
+                                    path=str(p),
+                                    version=version,
+                                    meta=meta,
+                                    embeddings_client=client,
+                                    context=context,
+                                    repo_root_dir=repo_root_dir,
+                                    db_path=db_path,
+                                    connection_pool=kb_pool,
+                                )
+                                phase_file.set_artifacts(n)
+                            if n > 0:
+                                total_chunks += n
+                                count_files += 1
+                                if count_files % 50 == 0:
+                                    LOGGER.info(
+                                        "pipeline.processing.progress",
+                                        extra={
+                                            "slug": slug,
+                                            "scope": scope,
+                                            "processed": count_files,
+                                            "chunks": total_chunks,
+                                        },
+                                    )
+                        except ConfigError as exc:
+                            LOGGER.warning(
+                                "ingest.skip.config_error",
+                                extra={
+                                    "file": str(p),
+                                    "scope": scope,
+                                    "slug": slug,
+                                    "error": str(exc),
+                                },
+                            )
+                        except Exception:
+                            LOGGER.exception(
+                                "ingest.error",
+                                extra={
+                                    "file": str(p),
+                                    "scope": scope,
+                                    "slug": slug,
+                                },
+                            )
+                            raise
+                    if limit_reached:
+                        break
             if discovered == 0 and count_files == 0 and not limit_reached:
                 phase_discover.set_artifacts(0)
 
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import hashlib
 import json
 from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
@@ -18,6 +19,10 @@ from pipeline.workspace_layout import WorkspaceLayout
 
 logger = get_structured_logger("kg_builder")
 
+_KG_CACHE_FILE = "kg.cache.json"
+_KG_CACHE_VERSION = 1
+_KG_CACHE_MAX_ENTRIES = 8
+
 
 # Prompt interno per il modello KGraph (Responses model-only).
 # NOTA: questo è il prompt effettivamente usato in runtime, indipendentemente
@@ -235,16 +240,24 @@ def _invoke_assistant(
     )
 
 
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Scrive solo se il contenuto cambia (evita riscritture e invalidazioni a valle)."""
+    if path.exists():
+        try:
+            if read_text_safe(path.parent, path, encoding="utf-8") == text:
+                logger.debug("semantic.kg_builder.output_unchanged", extra={"file_path": str(path)})
+                return False
+        except Exception as exc:
+            logger.debug("semantic.kg_builder.output_read_failed", extra={"file_path": str(path), "error": repr(exc)})
+    safe_write_text(path, text, encoding="utf-8", atomic=True)
+    return True
+
+
 def _save_outputs(semantic_dir: Path, kg: TagKnowledgeGraph) -> dict[str, str]:
     kg_json_path = ensure_within_and_resolve(semantic_dir, semantic_dir / "kg.tags.json")
     kg_md_path = ensure_within_and_resolve(semantic_dir, semantic_dir / "kg.tags.md")
 
-    safe_write_text(
-        kg_json_path,
-        json.dumps(kg.to_dict(), ensure_ascii=False, indent=2),
-        encoding="utf-8",
-        atomic=True,
-    )
+    _write_if_changed(kg_json_path, json.dumps(kg.to_dict(), ensure_ascii=False, indent=2))
 
     def _render_md(graph: TagKnowledgeGraph) -> str:
         lines = [
@@ -273,11 +286,197 @@ def _save_outputs(semantic_dir: Path, kg: TagKnowledgeGraph) -> dict[str, str]:
             )
         return "\n".join(lines)
 
-    safe_write_text(kg_md_path, _render_md(kg), encoding="utf-8", atomic=True)
+    _write_if_changed(kg_md_path, _render_md(kg))
 
     return {"kg_json": str(kg_json_path), "kg_md": str(kg_md_path)}
 
 
+# --------------------------- cache dei risultati KG --------------------------- #
+#
+# `semantic/kg.cache.json` conserva i grafi già ottenuti dall'assistant, indicizzati per digest
+# dell'input normalizzato (namespace, tag+contesti, contenuto di tags_context.jsonl, prompt),
+# più l'impronta per-tag dell'ultima build per la ri-sottomissione parziale.
+
+
+def _sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _tag_digest(tag: RawTag) -> str:
+    return _sha256_text(json.dumps(sorted(tag.contexts), ensure_ascii=False))
+
+
+def _normalized_tags(kg_input: TagKgInput) -> dict[str, str]:
+    """raw_label -> digest dei contesti (etichette duplicate fuse, ordine irrilevante)."""
+    merged: dict[str, list[str]] = {}
+    for tag in kg_input.tags:
+        merged.setdefault(tag.raw_label, []).extend(tag.contexts)
+    return {label: _tag_digest(RawTag(label, contexts)) for label, contexts in sorted(merged.items())}
+
+
+def _contexts_digest(kg_input: TagKgInput) -> str | None:
+    if not kg_input.contexts_file:
+        return None
+    path = Path(kg_input.contexts_file)
+    try:
+        return _sha256_text(read_text_safe(path.parent, path, encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def _input_key(kg_input: TagKgInput, tag_digests: Mapping[str, str]) -> str:
+    payload = {
+        "namespace": kg_input.namespace,
+        "prompt": _sha256_text(_KGRAPH_SYSTEM_PROMPT),
+        "contexts": _contexts_digest(kg_input),
+        "tags": tag_digests,
+    }
+    return _sha256_text(json.dumps(payload, sort_keys=True, ensure_ascii=False))
+
+
+def _load_cache(cache_path: Path) -> dict[str, Any]:
+    empty: dict[str, Any] = {"version": _KG_CACHE_VERSION, "entries": {}, "last": None}
+    if not cache_path.exists():
+        return empty
+    try:
+        data = json.loads(read_text_safe(cache_path.parent, cache_path, encoding="utf-8"))
+    except Exception as exc:
+        logger.warning("semantic.kg_builder.cache_invalid", extra={"file_path": str(cache_path), "error": repr(exc)})
+        return empty
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != _KG_CACHE_VERSION
+        or not isinstance(data.get("entries"), dict)
+    ):
+        return empty
+    return data
+
+
+def _store_cache(
+    cache_path: Path,
+    cache: dict[str, Any],
+    *,
+    key: str,
+    kg: TagKnowledgeGraph,
+    kg_input: TagKgInput,
+    tag_digests: Mapping[str, str],
+) -> None:
+    entries: dict[str, Any] = cache["entries"]
+    entries.pop(key, None)
+    entries[key] = kg.to_dict()
+    for stale in list(entries)[:-_KG_CACHE_MAX_ENTRIES]:
+        entries.pop(stale, None)
+    cache["last"] = {
+        "key": key,
+        "namespace": kg_input.namespace,
+        "prompt": _sha256_text(_KGRAPH_SYSTEM_PROMPT),
+        "contexts": _contexts_digest(kg_input),
+        "tags": dict(tag_digests),
+    }
+    try:
+        safe_write_text(cache_path, json.dumps(cache, ensure_ascii=False), encoding="utf-8", atomic=True)
+    except Exception as exc:
+        logger.warning(
+            "semantic.kg_builder.cache_write_failed", extra={"file_path": str(cache_path), "error": repr(exc)}
+        )
+
+
+def _new_labels(cache: Mapping[str, Any], kg_input: TagKgInput, tag_digests: Mapping[str, str]) -> list[str] | None:
+    """Etichette solo aggiunte rispetto all'ultima build, o None se serve una build completa.
+
+    Servono: ultimo grafo in cache, stesso namespace/prompt/contesti e tag precedenti tutti presenti
+    e invariati. Un tag rimosso o con contesti cambiati può alterare relazioni e merge con gli altri
+    tag, che il grafo non permette di ricondurre alle singole raw_label: si risottomette tutto.
+    """
+    last = cache.get("last")
+    if not isinstance(last, dict) or last.get("key") not in cache["entries"]:
+        return None
+    if (
+        last.get("namespace") != kg_input.namespace
+        or last.get("prompt") != _sha256_text(_KGRAPH_SYSTEM_PROMPT)
+        or last.get("contexts") != _contexts_digest(kg_input)
+    ):
+        return None
+    previous: Mapping[str, str] = last.get("tags") or {}
+    if any(tag_digests.get(label) != digest for label, digest in previous.items()):
+        return None
+    added = [label for label in tag_digests if label not in previous]
+    return added if 0 < len(added) < len(tag_digests) else None
+
+
+def _merge_graphs(base: TagKnowledgeGraph, delta: TagKnowledgeGraph) -> TagKnowledgeGraph:
+    """Unisce il grafo parziale in quello precedente: a parità di id (tag) o arco (relazione) vince il nuovo."""
+    tags = {tag.id: tag for tag in base.tags}
+    tags.update({tag.id: tag for tag in delta.tags})
+
+    def _rel_key(rel: Any) -> tuple[str, str, str]:
+        return (rel.source, rel.target, rel.type)
+
+    relations = {_rel_key(rel): rel for rel in base.relations}
+    relations.update({_rel_key(rel): rel for rel in delta.relations})
+    return TagKnowledgeGraph(
+        schema_version=delta.schema_version or base.schema_version,
+        namespace=base.namespace,
+        generated_by=delta.generated_by or base.generated_by,
+        generated_at=delta.generated_at or base.generated_at,
+        source=delta.source or base.source,
+        tags=list(tags.values()),
+        relations=list(relations.values()),
+    )
+
+
+def _resolve_kg(
+    kg_input: TagKgInput,
+    semantic_dir: Path,
+    *,
+    settings: Optional[Any],
+) -> TagKnowledgeGraph:
+    cache_path = ensure_within_and_resolve(semantic_dir, semantic_dir / _KG_CACHE_FILE)
+    cache = _load_cache(cache_path)
+    tag_digests = _normalized_tags(kg_input)
+    key = _input_key(kg_input, tag_digests)
+
+    cached = cache["entries"].get(key)
+    if isinstance(cached, dict):
+        logger.info(
+            "semantic.kg_builder.cache_hit",
+            extra={"namespace": kg_input.namespace, "tags": len(tag_digests)},
+        )
+        kg = TagKnowledgeGraph.from_dict(cached)
+        if (cache.get("last") or {}).get("key") != key:
+            _store_cache(cache_path, cache, key=key, kg=kg, kg_input=kg_input, tag_digests=tag_digests)
+        return kg
+
+    changed = _new_labels(cache, kg_input, tag_digests)
+    if changed is None:
+        raw_output = _invoke_assistant(kg_input.to_messages(), redact_logs=False, settings=settings)
+        kg = TagKnowledgeGraph.from_dict(raw_output)
+        submitted = len(tag_digests)
+    else:
+        wanted = set(changed)
+        partial = TagKgInput(
+            namespace=kg_input.namespace,
+            tags_file=kg_input.tags_file,
+            contexts_file=kg_input.contexts_file,
+            tags=[tag for tag in kg_input.tags if tag.raw_label in wanted],
+        )
+        raw_output = _invoke_assistant(partial.to_messages(), redact_logs=False, settings=settings)
+        previous = TagKnowledgeGraph.from_dict(cache["entries"][cache["last"]["key"]])
+        kg = _merge_graphs(previous, TagKnowledgeGraph.from_dict(raw_output))
+        submitted = len(changed)
+    logger.info(
+        "semantic.kg_builder.submitted",
+        extra={
+            "namespace": kg_input.namespace,
+            "mode": "full" if changed is None else "partial",
+            "tags_submitted": submitted,
+            "tags_total": len(tag_digests),
+        },
+    )
+    _store_cache(cache_path, cache, key=key, kg=kg, kg_input=kg_input, tag_digests=tag_digests)
+    return kg
+
+
 def build_kg_for_workspace(ctx: ClientContext, *, namespace: str | None = None) -> TagKnowledgeGraph:
     if ctx.repo_root_dir is None:
         raise ConfigError("ClientContext privo di repo_root_dir per il Tag KG Builder.")
@@ -293,10 +492,8 @@ def build_kg_for_workspace(ctx: ClientContext, *, namespace: str | None = None)
     )
 
     with phase_scope(logger, stage="semantic.tag_kg_builder", customer=namespace_resolved):
-        messages = _prepare_input(namespace_resolved, semantic_dir).to_messages()
-        raw_output = _invoke_assistant(messages, redact_logs=False, settings=ctx.settings)
-
-        kg = TagKnowledgeGraph.from_dict(raw_output)
+        kg_input = _prepare_input(namespace_resolved, semantic_dir)
+        kg = _resolve_kg(kg_input, semantic_dir, settings=ctx.settings)
         kg.namespace = namespace_resolved
         outputs = _save_outputs(layout.semantic_dir, kg)
 
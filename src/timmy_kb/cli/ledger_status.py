@@ -33,18 +33,42 @@ def _open_readonly(db_path: Path, *, slug: str) -> sqlite3.Connection:
         raise ConfigError("Errore apertura ledger.", slug=slug, file_path=db_path) from exc
 
 
-def _load_latest_run(conn: sqlite3.Connection) -> dict[str, str] | None:
-    row = conn.execute("SELECT run_id, started_at FROM runs ORDER BY started_at DESC, run_id DESC LIMIT 1").fetchone()
+def _has_materialized_state(conn: sqlite3.Connection) -> bool:
+    """True se il ledger è migrato: `current_state`/`current_gates` sono mantenute a ogni scrittura."""
+    version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+    return version >= decision_ledger.LEDGER_SCHEMA_VERSION
+
+
+def _load_latest_run(conn: sqlite3.Connection, *, materialized: bool = False) -> dict[str, str] | None:
+    # Con lo stato materializzato la tabella ha una riga per slug; altrimenti scansione di `runs`.
+    table = "current_state" if materialized else "runs"
+    row = conn.execute(
+        f"SELECT run_id, started_at FROM {table} ORDER BY started_at DESC, run_id DESC LIMIT 1"  # noqa: S608
+    ).fetchone()
     if row is None:
         return None
     return {"run_id": str(row[0]), "started_at": str(row[1])}
 
 
-def _load_latest_decisions(conn: sqlite3.Connection, *, run_id: str) -> list[dict[str, Any]]:
+_MATERIALIZED_DECISIONS_SQL = """
+    SELECT d.gate_name, d.verdict, d.from_state, d.to_state, d.decided_at, d.subject, d.evidence_json, d.decision_id
+    FROM current_gates AS g
+    JOIN decisions AS d ON d.decision_id = g.decision_id
+    WHERE g.run_id = ?
+    ORDER BY d.gate_name ASC
+"""
+
+
+def _load_latest_decisions(
+    conn: sqlite3.Connection, *, run_id: str, materialized: bool = False
+) -> list[dict[str, Any]]:
     if sqlite3.sqlite_version_info < (3, 25, 0):
         raise ConfigError(
             "ledger-status richiede window functions: " f"versione={sqlite3.sqlite_version} minima=3.25.0 richiesta",
         )
+    if materialized:
+        rows = conn.execute(_MATERIALIZED_DECISIONS_SQL, (run_id,)).fetchall()
+        return _decision_rows(rows)
     rows = conn.execute(
         """
         SELECT gate_name, verdict, from_state, to_state, decided_at, subject, evidence_json, decision_id
@@ -70,6 +94,10 @@ def _load_latest_decisions(conn: sqlite3.Connection, *, run_id: str) -> list[dic
         """,
         (run_id,),
     ).fetchall()
+    return _decision_rows(rows)
+
+
+def _decision_rows(rows: list[Any]) -> list[dict[str, Any]]:
     return [
         {
             "gate_name": str(row[0]),
@@ -84,7 +112,10 @@ def _load_latest_decisions(conn: sqlite3.Connection, *, run_id: str) -> list[dic
     ]
 
 
-def _load_current_state(conn: sqlite3.Connection, *, run_id: str) -> str:
+def _load_current_state(conn: sqlite3.Connection, *, run_id: str, materialized: bool = False) -> str:
+    if materialized:
+        row = conn.execute("SELECT state FROM current_state WHERE run_id = ?", (run_id,)).fetchone()
+        return "UNKNOWN" if row is None or row[0] is None else str(row[0])
     row = conn.execute(
         """
         SELECT to_state
@@ -165,12 +196,14 @@ def _collect_status(slug: str) -> dict[str, Any]:
     conn = _open_readonly(db_path, slug=slug)
     conn.row_factory = sqlite3.Row
     try:
-        latest_run = _load_latest_run(conn)
+        # Ledger non ancora migrati (aperti solo in lettura qui) usano le query sulle tabelle storiche.
+        materialized = _has_materialized_state(conn)
+        latest_run = _load_latest_run(conn, materialized=materialized)
         if latest_run is None:
             return {"slug": slug, "latest_run": None, "current_state": "UNKNOWN", "gates": []}
         run_id = str(latest_run["run_id"])
-        current_state = _load_current_state(conn, run_id=run_id)
-        decisions = _load_latest_decisions(conn, run_id=run_id)
+        current_state = _load_current_state(conn, run_id=run_id, materialized=materialized)
+        decisions = _load_latest_decisions(conn, run_id=run_id, materialized=materialized)
     except sqlite3.Error as exc:
         raise PipelineError(f"Errore lettura ledger: {exc}", slug=slug, file_path=db_path) from exc
     finally:
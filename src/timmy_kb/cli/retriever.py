@@ -6,9 +6,16 @@ Funzioni esposte:
 - cosine(a, b) -> float
 - retrieve_candidates(params) -> list[dict]
 - search(params, embeddings_client) -> list[SearchResult]
+  (`hybrid=True`: unione candidati recenti + top-N BM25 da FTS5, fusione con reciprocal rank fusion;
+   `quantized=True`: primo passaggio su embedding int8, re-rank esatto dei migliori N)
+- search_many(params_list, embeddings_client) -> list[list[SearchResult]]
+- configure_manifest_sink(sink) -> sink precedente
+  (manifest explainability accodati a un `AsyncManifestSink` invece che scritti nel percorso della query)
 - with_config_candidate_limit(params, config) -> params
 - choose_limit_for_budget(budget_ms) -> int
 - with_config_or_budget(params, config) -> params
+  (con `auto_by_budget` usa il limite misurato da `retriever_budget.LimitCalibrator` quando ha abbastanza
+   campioni per (db, scope) e `throttle.adaptive_limit: true`; altrimenti la tabella fissa)
 - search_with_config(params, config, embeddings_client) -> list[SearchResult]
 - preview_effective_candidate_limit(params, config)
   -> (limit:int, source:str, budget_ms:int)
@@ -22,15 +29,23 @@ Design:
 from __future__ import annotations
 
 import time
+from concurrent.futures import Future
 from contextlib import nullcontext
 from dataclasses import MISSING, dataclass, replace
+from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Mapping, Optional, TypedDict
+from typing import Any, Callable, Mapping, Optional, Sequence, TypedDict
 
 from pipeline.exceptions import RetrieverError  # modulo comune degli errori
 from pipeline.logging_utils import get_structured_logger as _get_structured_logger
 from semantic.types import EmbeddingsClient
-from storage.kb_db import fetch_candidates
+from storage.kb_db import (
+    fetch_candidates,
+    fetch_candidates_by_ids,
+    fetch_lexical_candidates,
+    fetch_quantized_candidates,
+)
+from timmy_kb.cli import retriever_budget as budget_mod
 from timmy_kb.cli import retriever_embeddings as embeddings_mod
 from timmy_kb.cli import retriever_errors as retriever_errors_mod
 from timmy_kb.cli import retriever_logging as retriever_logging_mod
@@ -38,6 +53,7 @@ from timmy_kb.cli import retriever_manifest as manifest_mod
 from timmy_kb.cli import retriever_ranking as ranking_mod
 from timmy_kb.cli import retriever_throttle as throttle_mod
 from timmy_kb.cli import retriever_validation as validation_mod
+from timmy_kb.cli.retriever_manifest import configure_manifest_sink
 from timmy_kb.cli.retriever_ranking import _rank_candidates, cosine
 from timmy_kb.cli.retriever_throttle import ThrottleSettings
 from timmy_kb.cli.retriever_validation import MAX_CANDIDATE_LIMIT, MIN_CANDIDATE_LIMIT, QueryParams, SearchResult
@@ -57,6 +73,12 @@ ERR_INVALID_QUERY = "retriever_invalid_query"
 ERR_EMBEDDING_FAILED = "retriever_embedding_failed"
 ERR_EMBEDDING_INVALID = "retriever_embedding_invalid"
 ERR_BUDGET_HIT_PARTIAL = "retriever_budget_hit_partial"
+# Modalità ibrida: top-N lessicale unito ai candidati recenti, fusione RRF con costante k.
+HYBRID_LEXICAL_LIMIT = 200
+HYBRID_RRF_K = 60
+# Modalità quantizzata: re-rank esatto di max(k * FACTOR, MIN) candidati dopo il passaggio int8.
+QUANTIZED_RERANK_FACTOR = 4
+QUANTIZED_RERANK_MIN = 50
 _safe_log = retriever_logging_mod._safe_log
 _safe_info = retriever_logging_mod._safe_info
 _safe_warning = retriever_logging_mod._safe_warning
@@ -92,6 +114,7 @@ class ThrottleConfig(TypedDict, total=False):
     parallelism: int
     sleep_ms_between_calls: int
     acquire_timeout_ms: int
+    adaptive_limit: bool
 
 
 class RetrieverConfig(TypedDict, total=False):
@@ -113,6 +136,9 @@ class _SearchRuntimeState:
     embedding_model: str | None
     explain_base_dir: Path | None
     common_extra: Mapping[str, Any]
+    concurrent_fetch: bool = False
+    hybrid: bool = False
+    quantized: bool = False
 
 
 # --------------------------- SSoT per il default limite ---------------------------
@@ -137,16 +163,62 @@ def _default_candidate_limit() -> int:
 # ----------------------------------- similarità -----------------------------------
 
 
-def _load_candidates(params: QueryParams) -> tuple[list[dict[str, Any]], float]:
-    """Carica tutti i candidati e restituisce (lista, ms)."""
+def _load_candidates(
+    params: QueryParams, *, hybrid: bool = False, quantized: bool = False
+) -> tuple[list[dict[str, Any]], float]:
+    """Carica tutti i candidati e restituisce (lista, ms).
+
+    Con `hybrid` unisce ai candidati recenti il top-N BM25 (dedup per id): ogni candidato lessicale
+    riceve `lexical_rank` (1-based) per la fusione RRF in ranking.
+    Con `quantized` carica solo id + embedding int8 (niente JSON): il re-rank esatto avviene in ranking.
+    """
     t0 = time.perf_counter()
-    fetched = fetch_candidates(
+    fetch_kwargs = embeddings_mod._fetch_kwargs(params)
+    if quantized:
+        rows = fetch_quantized_candidates(
+            params.slug,
+            params.scope,
+            limit=params.candidate_limit,
+            db_path=params.db_path,
+            **fetch_kwargs,
+        )
+        return list(rows), (time.perf_counter() - t0) * 1000.0
+    if not hybrid:
+        fetched = fetch_candidates(
+            params.slug,
+            params.scope,
+            limit=params.candidate_limit,
+            db_path=params.db_path,
+            **fetch_kwargs,
+        )
+        candidates = fetched if isinstance(fetched, list) else list(fetched)
+        return candidates, (time.perf_counter() - t0) * 1000.0
+
+    candidates = list(
+        fetch_candidates(
+            params.slug,
+            params.scope,
+            limit=params.candidate_limit,
+            db_path=params.db_path,
+            include_ids=True,
+            **fetch_kwargs,
+        )
+    )
+    by_id = {cand["id"]: cand for cand in candidates}
+    lexical = fetch_lexical_candidates(
         params.slug,
         params.scope,
-        limit=params.candidate_limit,
+        params.query,
+        limit=HYBRID_LEXICAL_LIMIT,
         db_path=params.db_path,
+        **fetch_kwargs,
     )
-    candidates = fetched if isinstance(fetched, list) else list(fetched)
+    for rank, cand in enumerate(lexical, start=1):
+        known = by_id.get(cand["id"])
+        if known is None:
+            known = by_id[cand["id"]] = cand
+            candidates.append(cand)
+        known["lexical_rank"] = rank
     return candidates, (time.perf_counter() - t0) * 1000.0
 
 
@@ -312,20 +384,31 @@ def _fetch_candidates_or_soft_fail(
     params: QueryParams,
     *,
     runtime: _SearchRuntimeState,
+    prefetch: Future[tuple[list[dict[str, Any]], float]] | None = None,
 ) -> tuple[list[dict[str, Any]], float] | None:
-    if throttle_mod._deadline_exceeded(runtime.deadline):
-        _safe_warning(
-            "retriever.latency_budget.hit",
-            extra={
-                "slug": params.slug,
-                "scope": params.scope,
-                "stage": "fetch_candidates",
-                "response_id": runtime.response_id,
-            },
+    if prefetch is not None:
+        fetched = embeddings_mod._join_candidate_prefetch(
+            prefetch,
+            deadline=runtime.deadline,
+            slug=params.slug,
+            scope=params.scope,
         )
-        return None
-
-    candidates, t_fetch_ms = _load_candidates(params)
+        if fetched is None:
+            return None
+        candidates, t_fetch_ms = fetched
+    else:
+        if throttle_mod._deadline_exceeded(runtime.deadline):
+            _safe_warning(
+                "retriever.latency_budget.hit",
+                extra={
+                    "slug": params.slug,
+                    "scope": params.scope,
+                    "stage": "fetch_candidates",
+                    "response_id": runtime.response_id,
+                },
+            )
+            return None
+        candidates, t_fetch_ms = _load_candidates(params, hybrid=runtime.hybrid, quantized=runtime.quantized)
     fetch_budget_hit = throttle_mod._deadline_exceeded(runtime.deadline)
 
     _safe_info(
@@ -335,6 +418,7 @@ def _fetch_candidates_or_soft_fail(
             "candidates_loaded": int(len(candidates)),
             "ms": float(t_fetch_ms),
             "budget_hit": bool(fetch_budget_hit),
+            **({"lexical_loaded": sum(1 for cand in candidates if "lexical_rank" in cand)} if runtime.hybrid else {}),
         },
     )
 
@@ -352,6 +436,44 @@ def _fetch_candidates_or_soft_fail(
     return candidates, t_fetch_ms
 
 
+def _load_exact_candidates(params: QueryParams, ids: list[int]) -> list[dict[str, Any]]:
+    pool = getattr(params, "connection_pool", None)
+    return fetch_candidates_by_ids(ids, db_path=params.db_path, **({"pool": pool} if pool is not None else {}))
+
+
+def _dispatch_ranking(
+    query_vector: list[float],
+    candidates: list[dict[str, Any]],
+    params: QueryParams,
+    *,
+    runtime: _SearchRuntimeState,
+) -> tuple[list[SearchResult], int, dict[str, int], float, int, bool]:
+    if runtime.hybrid:
+        return ranking_mod._rank_candidates_hybrid(
+            query_vector,
+            candidates,
+            params.k,
+            rrf_k=HYBRID_RRF_K,
+            deadline=runtime.deadline,
+        )
+    if runtime.quantized:
+        return ranking_mod._rank_candidates_quantized(
+            query_vector,
+            candidates,
+            params.k,
+            rerank_limit=max(int(params.k) * QUANTIZED_RERANK_FACTOR, QUANTIZED_RERANK_MIN),
+            load_exact=partial(_load_exact_candidates, params),
+            deadline=runtime.deadline,
+        )
+    return _rank_candidates(
+        query_vector,
+        candidates,
+        params.k,
+        deadline=runtime.deadline,
+        abort_if_deadline=True,
+    )
+
+
 def _rank_or_soft_fail(
     query_vector: list[float],
     candidates: list[dict[str, Any]],
@@ -366,13 +488,7 @@ def _rank_or_soft_fail(
         t_score_sort_ms,
         evaluated_count,
         rank_budget_hit,
-    ) = _rank_candidates(
-        query_vector,
-        candidates,
-        params.k,
-        deadline=runtime.deadline,
-        abort_if_deadline=True,
-    )
+    ) = _dispatch_ranking(query_vector, candidates, params, runtime=runtime)
 
     budget_hit = rank_budget_hit
     if budget_hit:
@@ -412,6 +528,7 @@ def _emit_post_metrics_and_manifest(
     t_score_sort_ms: float,
     total_ms: float,
     budget_hit: bool,
+    calibrate: bool = True,
 ) -> None:
     ranking_mod._log_retriever_metrics(
         params=params,
@@ -423,6 +540,7 @@ def _emit_post_metrics_and_manifest(
         evaluated_count=evaluated_count,
         coerce_stats=coerce_stats,
         response_id=response_id,
+        calibrate=calibrate,
     )
 
     evidence_ids = manifest_mod._build_evidence_ids(scored_items)
@@ -476,6 +594,9 @@ def _build_search_runtime_state(
     response_id: str | None,
     embedding_model: str | None,
     explain_base_dir: Path | None,
+    concurrent_fetch: bool = False,
+    hybrid: bool = False,
+    quantized: bool = False,
 ) -> _SearchRuntimeState:
     throttle_cfg = throttle_mod._normalize_throttle_settings(throttle)
     deadline = throttle_mod._deadline_from_settings(throttle_cfg)
@@ -486,6 +607,10 @@ def _build_search_runtime_state(
         "candidate_limit": int(params.candidate_limit),
         "response_id": response_id,
     }
+    if hybrid and quantized:
+        # La fusione RRF richiede i candidati completi: la modalità ibrida ha la precedenza.
+        _safe_info("retriever.quantized.ignored", extra={**common_extra, "reason": "hybrid"})
+        quantized = False
     return _SearchRuntimeState(
         deadline=deadline,
         throttle_cfg=throttle_cfg,
@@ -494,6 +619,9 @@ def _build_search_runtime_state(
         embedding_model=embedding_model,
         explain_base_dir=explain_base_dir,
         common_extra=common_extra,
+        concurrent_fetch=concurrent_fetch,
+        hybrid=hybrid,
+        quantized=quantized,
     )
 
 
@@ -517,18 +645,27 @@ def _execute_search_pipeline(
 ) -> list[SearchResult]:
     t_total_start = time.perf_counter()
 
+    # Il fetch non dipende dal vettore query: in modalità concorrente parte mentre l'embedding è in volo.
+    prefetch = None
+    if runtime.concurrent_fetch and not throttle_mod._deadline_exceeded(runtime.deadline):
+        prefetch = embeddings_mod._start_candidate_prefetch(
+            partial(_load_candidates, hybrid=runtime.hybrid, quantized=runtime.quantized), params
+        )
+
     embed_result = _compute_query_vector(
         params,
         embeddings_client,
         runtime=runtime,
     )
     if embed_result is None:
+        embeddings_mod._discard_prefetch(prefetch)
         return []
     query_vector, t_emb_ms = embed_result
 
     fetch_result = _load_and_filter_candidates(
         params,
         runtime=runtime,
+        prefetch=prefetch,
     )
     if fetch_result is None:
         return []
@@ -561,6 +698,7 @@ def _execute_search_pipeline(
         t_score_sort_ms=float(rank_meta["t_score_sort_ms"]),
         total_ms=float(total_ms),
         budget_hit=bool(rank_meta["budget_hit"]),
+        calibrate=not (runtime.hybrid or runtime.quantized),
     )
     return scored_items
 
@@ -578,8 +716,9 @@ def _load_and_filter_candidates(
     params: QueryParams,
     *,
     runtime: _SearchRuntimeState,
+    prefetch: Future[tuple[list[dict[str, Any]], float]] | None = None,
 ) -> tuple[list[dict[str, Any]], float] | None:
-    return _fetch_candidates_or_soft_fail(params, runtime=runtime)
+    return _fetch_candidates_or_soft_fail(params, runtime=runtime, prefetch=prefetch)
 
 
 def _rank_candidates_with_budget(
@@ -603,8 +742,19 @@ def search(
     response_id: str | None = None,
     embedding_model: str | None = None,
     explain_base_dir: Path | None = None,
+    concurrent_fetch: bool = False,
+    hybrid: bool = False,
+    quantized: bool = False,
 ) -> list[SearchResult]:
-    """Esegue una ricerca vettoriale sui chunk del workspace indicato."""
+    """Esegue una ricerca vettoriale sui chunk del workspace indicato.
+
+    `concurrent_fetch=True` sovrappone il caricamento dei candidati all'embedding della query
+    (join entro il deadline); eventi e timing per stadio restano invariati.
+    `hybrid=True` aggiunge ai `candidate_limit` candidati recenti il top-N BM25 dell'indice FTS5
+    (anche chunk più vecchi) e ordina per reciprocal rank fusion: `score` è lo score RRF, non il coseno.
+    `quantized=True` valuta i candidati sulle embedding int8 e ricalcola in float esatto solo i migliori
+    max(k * QUANTIZED_RERANK_FACTOR, QUANTIZED_RERANK_MIN); `score` resta il coseno esatto.
+    """
     runtime = _build_search_runtime_state(
         params=params,
         throttle=throttle,
@@ -612,6 +762,9 @@ def search(
         response_id=response_id,
         embedding_model=embedding_model,
         explain_base_dir=explain_base_dir,
+        concurrent_fetch=concurrent_fetch,
+        hybrid=hybrid,
+        quantized=quantized,
     )
     try:
         validation_mod._validate_params_logged(params)
@@ -649,6 +802,205 @@ def search(
         )
 
 
+def _log_budget_hit(params: QueryParams, *, stage: str, response_id: str | None) -> None:
+    _safe_warning(
+        "retriever.latency_budget.hit",
+        extra={"slug": params.slug, "scope": params.scope, "stage": stage, "response_id": response_id},
+    )
+
+
+def search_many(
+    params_list: Sequence[QueryParams],
+    embeddings_client: EmbeddingsClient,
+    *,
+    authorizer: Callable[[QueryParams], None] | None = None,
+    throttle_check: Callable[[QueryParams], None] | None = None,
+    throttle: Optional[ThrottleSettings] = None,
+    throttle_key: Optional[str] = None,
+    response_ids: Sequence[str | None] | None = None,
+    embedding_model: str | None = None,
+    explain_base_dir: Path | None = None,
+) -> list[list[SearchResult]]:
+    """Ricerche in batch: un solo `embed_texts`, un fetch per (db, slug, scope, filters), scoring matriciale.
+
+    Restituisce una lista di risultati per query, nello stesso ordine di `params_list`, equivalenti a
+    quelli di `search` sulla singola query. Eventi, metriche e manifest restano per query; il budget di
+    latenza (`throttle`) è unico per l'intero batch e l'embedding/fetch condivisi riportano lo stesso ms.
+    """
+    batch = list(params_list)
+    ids = list(response_ids) if response_ids is not None else [None] * len(batch)
+    if len(ids) != len(batch):
+        exc = RetrieverError("response_ids deve avere la stessa lunghezza di params_list")
+        _apply_error_context(exc, code="retriever_invalid_params")
+        raise exc
+
+    runtimes: list[_SearchRuntimeState] = []
+    for params, response_id in zip(batch, ids, strict=True):
+        runtime = _build_search_runtime_state(
+            params=params,
+            throttle=throttle,
+            throttle_key=throttle_key,
+            response_id=response_id,
+            embedding_model=embedding_model,
+            explain_base_dir=explain_base_dir,
+        )
+        # Un solo deadline per il batch: tutte le query condividono embedding e fetch.
+        runtimes.append(replace(runtime, deadline=runtimes[0].deadline) if runtimes else runtime)
+        try:
+            validation_mod._validate_params_logged(params)
+        except RetrieverError as exc:
+            _apply_error_context(exc, code="retriever_invalid_params", slug=params.slug, scope=params.scope)
+            raise
+
+    results: list[list[SearchResult]] = [[] for _ in batch]
+    if not batch:
+        return results
+    shared = runtimes[0]
+    preflight = [_preflight_deadline_soft_fail(p, runtime=rt) for p, rt in zip(batch, runtimes, strict=True)]
+    if any(outcome is not None for outcome in preflight):
+        return results
+
+    throttle_ctx = (
+        _throttle_guard(shared.throttle_key, shared.throttle_cfg, deadline=shared.deadline)
+        if shared.throttle_cfg
+        else nullcontext()
+    )
+    for params, runtime in zip(batch, runtimes, strict=True):
+        _log_query_started(params, embeddings_client, runtime)
+
+    with throttle_ctx:
+        active: list[int] = []
+        for idx, (params, runtime) in enumerate(zip(batch, runtimes, strict=True)):
+            _run_authorization_hooks(params, authorizer=authorizer, throttle_check=throttle_check)
+            if _preflight_input_soft_fail(params, runtime=runtime) is None:
+                active.append(idx)
+        if not active:
+            return results
+
+        t_total_start = time.perf_counter()
+        if throttle_mod._deadline_exceeded(shared.deadline):
+            for idx in active:
+                _log_budget_hit(batch[idx], stage="embedding", response_id=runtimes[idx].response_id)
+            return results
+        try:
+            vectors, t_emb_ms = embeddings_mod._materialize_query_vectors(
+                [batch[idx].query for idx in active],
+                embeddings_client,
+                embedding_model=embedding_model,
+                slug=batch[active[0]].slug,
+                scope=batch[active[0]].scope,
+            )
+        except RetrieverError as exc:
+            _apply_error_context(exc, code=ERR_EMBEDDING_FAILED)
+            for idx in active:
+                _safe_warning(
+                    "retriever.query.embed_failed",
+                    extra={
+                        **runtimes[idx].common_extra,
+                        "code": ERR_EMBEDDING_FAILED,
+                        "error": repr(getattr(exc, "__cause__", None) or exc),
+                    },
+                )
+            return results
+
+        query_vectors: dict[int, list[float]] = {}
+        for idx, vector in zip(active, vectors, strict=True):
+            params, runtime = batch[idx], runtimes[idx]
+            if vector is None:
+                _safe_warning(
+                    "retriever.query.invalid",
+                    extra={**runtime.common_extra, "reason": "empty_embedding", "code": ERR_EMBEDDING_INVALID},
+                )
+                continue
+            _safe_info(
+                "retriever.query.embedded",
+                extra={
+                    "slug": params.slug,
+                    "scope": params.scope,
+                    "response_id": runtime.response_id,
+                    "ms": float(t_emb_ms),
+                    "embedding_dims": len(vector),
+                    "embedding_model": _resolve_embedding_model(embeddings_client, embedding_model),
+                    "batch_size": len(active),
+                },
+            )
+            query_vectors[idx] = vector
+        if throttle_mod._deadline_exceeded(shared.deadline):
+            for idx in query_vectors:
+                _log_budget_hit(batch[idx], stage="embedding", response_id=runtimes[idx].response_id)
+            return results
+
+        groups: dict[tuple[Any, ...], list[int]] = {}
+        for idx in query_vectors:
+            params = batch[idx]
+            filters_key = tuple(
+                sorted((key, (v,) if isinstance(v, str) else tuple(v)) for key, v in (params.filters or {}).items())
+            )
+            groups.setdefault((Path(params.db_path), params.slug, params.scope, filters_key), []).append(idx)
+
+        for members in groups.values():
+            head = batch[members[0]]
+            if throttle_mod._deadline_exceeded(shared.deadline):
+                for idx in members:
+                    _log_budget_hit(batch[idx], stage="fetch_candidates", response_id=runtimes[idx].response_id)
+                continue
+            # I candidati arrivano dal più recente: il prefisso [:limit] coincide con il LIMIT della singola query.
+            max_limit = max(int(batch[idx].candidate_limit) for idx in members)
+            candidates, t_fetch_ms = _load_candidates(replace(head, candidate_limit=max_limit))
+            fetch_budget_hit = throttle_mod._deadline_exceeded(shared.deadline)
+            for idx in members:
+                _safe_info(
+                    "retriever.candidates.fetched",
+                    extra={
+                        **runtimes[idx].common_extra,
+                        "candidates_loaded": min(len(candidates), int(batch[idx].candidate_limit)),
+                        "ms": float(t_fetch_ms),
+                        "budget_hit": bool(fetch_budget_hit),
+                        "shared_fetch": len(members),
+                    },
+                )
+            if fetch_budget_hit:
+                for idx in members:
+                    _log_budget_hit(batch[idx], stage="fetch_candidates", response_id=runtimes[idx].response_id)
+                continue
+
+            ranked, coerce_stats, t_score_sort_ms, evaluated = ranking_mod._rank_candidates_batch(
+                [query_vectors[idx] for idx in members],
+                candidates,
+                [int(batch[idx].k) for idx in members],
+                [int(batch[idx].candidate_limit) for idx in members],
+            )
+            if throttle_mod._deadline_exceeded(shared.deadline):
+                for idx in members:
+                    _log_budget_hit(batch[idx], stage="ranking", response_id=runtimes[idx].response_id)
+                continue
+
+            total_ms = (time.perf_counter() - t_total_start) * 1000.0
+            for pos, idx in enumerate(members):
+                params, runtime = batch[idx], runtimes[idx]
+                results[idx] = ranked[pos]
+                _emit_post_metrics_and_manifest(
+                    params,
+                    ranked[pos],
+                    response_id=runtime.response_id,
+                    embeddings_client=embeddings_client,
+                    embedding_model=embedding_model,
+                    explain_base_dir=explain_base_dir,
+                    throttle_cfg=runtime.throttle_cfg,
+                    candidates_count=min(len(candidates), int(params.candidate_limit)),
+                    evaluated_count=int(evaluated[pos]),
+                    coerce_stats=coerce_stats,
+                    t_emb_ms=float(t_emb_ms),
+                    t_fetch_ms=float(t_fetch_ms),
+                    t_score_sort_ms=float(t_score_sort_ms),
+                    total_ms=float(total_ms),
+                    budget_hit=False,
+                    # Tempi di fetch/scoring condivisi dal gruppo: non rappresentano la singola query.
+                    calibrate=False,
+                )
+    return results
+
+
 def with_config_candidate_limit(
     params: QueryParams,
     config: Optional[Mapping[str, Any] | RetrieverConfig],
@@ -698,6 +1050,15 @@ def choose_limit_for_budget(budget_ms: int) -> int:
     return 8000
 
 
+def _limit_for_budget(params: QueryParams, throttle: Mapping[str, Any], budget_ms: int) -> tuple[int, bool]:
+    """Limite per il budget: stima misurata per (db, scope) se disponibile, altrimenti tabella fissa."""
+    if budget_mod.adaptive_enabled(throttle):
+        measured = budget_mod.get_limit_calibrator().suggest_limit(params.db_path, params.scope, budget_ms)
+        if measured is not None:
+            return int(measured), True
+    return choose_limit_for_budget(budget_ms), False
+
+
 def with_config_or_budget(params: QueryParams, config: Optional[Mapping[str, Any]]) -> QueryParams:
     """Applica candidate_limit da config, con supporto auto by budget se abilitato."""
     default_lim = _default_candidate_limit()
@@ -715,14 +1076,19 @@ def with_config_or_budget(params: QueryParams, config: Optional[Mapping[str, Any
         budget = 0
 
     if auto and budget > 0:
-        chosen = choose_limit_for_budget(budget)
+        chosen, calibrated = _limit_for_budget(params, throttle, budget)
         safe_chosen = max(MIN_CANDIDATE_LIMIT, min(int(chosen), MAX_CANDIDATE_LIMIT))
         if int(safe_chosen) != int(chosen):
             _safe_warning("retriever.limit.clamped", extra={"provided": int(chosen), "effective": int(safe_chosen)})
 
         _safe_info(
             "retriever.limit.source",
-            extra={"source": "auto_by_budget", "budget_ms": int(budget), "limit": int(safe_chosen)},
+            extra={
+                "source": "auto_by_budget",
+                "budget_ms": int(budget),
+                "limit": int(safe_chosen),
+                "calibrated": calibrated,
+            },
         )
         return replace(params, candidate_limit=int(safe_chosen))
 
@@ -760,9 +1126,15 @@ def search_with_config(
     throttle_check: Callable[[QueryParams], None] | None = None,
     response_id: str | None = None,
     embedding_model: str | None = None,
+    concurrent_fetch: bool = False,
+    hybrid: bool = False,
 ) -> list[SearchResult]:
-    """Esegue `with_config_or_budget(...)` e poi `search(...)`."""
+    """Esegue `with_config_or_budget(...)` e poi `search(...)`.
+
+    `retriever.quantization: int8` nel config del workspace attiva lo scoring quantizzato.
+    """
     effective = with_config_or_budget(params, config)
+    quantization = str(throttle_mod._coerce_retriever_section(config).get("quantization") or "none").lower()
     throttle_cfg = throttle_mod._normalize_throttle_settings(throttle_mod._build_throttle_settings(config))
     throttle_key = f"{params.slug}::{params.scope}"
     return search(
@@ -774,6 +1146,9 @@ def search_with_config(
         throttle_key=throttle_key,
         response_id=response_id,
         embedding_model=embedding_model,
+        concurrent_fetch=concurrent_fetch,
+        hybrid=hybrid,
+        quantized=quantization == "int8",
     )
 
 
@@ -800,7 +1175,7 @@ def preview_effective_candidate_limit(
         budget_ms = 0
 
     if auto and budget_ms > 0:
-        chosen = choose_limit_for_budget(budget_ms)
+        chosen, _calibrated = _limit_for_budget(params, throttle, budget_ms)
         safe_chosen = max(MIN_CANDIDATE_LIMIT, min(int(chosen), MAX_CANDIDATE_LIMIT))
         return int(safe_chosen), "auto_by_budget", int(budget_ms)
 
@@ -826,6 +1201,8 @@ __all__ = [
     "cosine",
     "retrieve_candidates",
     "search",
+    "search_many",
+    "configure_manifest_sink",
     "with_config_candidate_limit",
     "choose_limit_for_budget",
     "with_config_or_budget",
@@ -0,0 +1,227 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Scelta adattiva di `candidate_limit` a partire dalle latenze misurate.
+
+`choose_limit_for_budget` usa una tabella fissa (budget -> limite) che ignora dimensione degli
+embedding, hardware e tempi reali. Il `LimitCalibrator` tiene invece, per coppia (db, scope), medie
+mobili esponenziali (EWMA) di:
+- ms per candidato nel fetch da SQLite;
+- ms per candidato nello scoring/sort;
+- ms (fissi) dell'embedding della query.
+
+Con abbastanza campioni, il limite scelto è il più grande che sta nel budget:
+`(budget * (1 - headroom) - embed_ms) / (fetch_ms_per_cand + score_ms_per_cand)`, arrotondato per
+difetto a `LIMIT_STEP` e clampato in [MIN_CANDIDATE_LIMIT, MAX_CANDIDATE_LIMIT]. Senza stime
+affidabili il chiamante ricade sulla tabella.
+
+La calibrazione può essere persistita in un file JSON accanto al DB (`<db>.calibration.json`):
+`tools/retriever_calibrate.py --write-calibration` lo semina offline e il calibratore lo carica
+alla prima richiesta per quel DB.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from pipeline.file_utils import safe_write_text
+from pipeline.logging_utils import get_structured_logger
+from pipeline.path_utils import read_text_safe
+from timmy_kb.cli.retriever_validation import MAX_CANDIDATE_LIMIT, MIN_CANDIDATE_LIMIT
+
+LOGGER = get_structured_logger("timmy_kb.retriever")
+
+EWMA_ALPHA = 0.2
+MIN_SAMPLES = 5
+# Sotto questa soglia il costo fisso del fetch domina e la stima per-candidato non è significativa.
+MIN_OBSERVED_CANDIDATES = 100
+BUDGET_HEADROOM = 0.2
+LIMIT_STEP = 100
+CALIBRATION_SUFFIX = ".calibration.json"
+CALIBRATION_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LatencyEstimate:
+    fetch_ms_per_candidate: float = 0.0
+    score_ms_per_candidate: float = 0.0
+    embed_ms: float = 0.0
+    samples: int = 0
+
+
+def calibration_path_for(db_path: Path) -> Path:
+    """Path del file di calibrazione associato al DB."""
+    db = Path(db_path)
+    return db.with_name(db.name + CALIBRATION_SUFFIX)
+
+
+def _ewma(previous: float, value: float, *, first: bool) -> float:
+    return value if first else previous + EWMA_ALPHA * (value - previous)
+
+
+class LimitCalibrator:
+    """Stime EWMA per (db, scope) e scelta del `candidate_limit` massimo dentro un budget."""
+
+    def __init__(self, *, min_samples: int = MIN_SAMPLES, headroom: float = BUDGET_HEADROOM) -> None:
+        self._min_samples = max(1, int(min_samples))
+        self._headroom = min(0.9, max(0.0, float(headroom)))
+        self._lock = threading.Lock()
+        self._estimates: dict[tuple[str, str], LatencyEstimate] = {}
+        self._loaded: set[str] = set()
+
+    @staticmethod
+    def _db_key(db_path: Optional[Path]) -> str:
+        if db_path is None:
+            return ""
+        try:
+            return str(Path(db_path).resolve())
+        except OSError:
+            return str(db_path)
+
+    def estimate(self, db_path: Optional[Path], scope: str) -> Optional[LatencyEstimate]:
+        db_key = self._db_key(db_path)
+        self._ensure_loaded(db_key)
+        with self._lock:
+            return self._estimates.get((db_key, str(scope)))
+
+    def observe(
+        self,
+        db_path: Optional[Path],
+        scope: str,
+        *,
+        candidates: int,
+        fetch_ms: float,
+        score_ms: float,
+        embed_ms: float | None = None,
+        scored: int | None = None,
+    ) -> bool:
+        """Aggiorna le EWMA con una misura; False se il campione è troppo piccolo per essere utile.
+
+        `scored` è il numero di candidati effettivamente valutati: se il ranking si è fermato per
+        deadline/budget il costo di scoring va diviso per quelli, non per i candidati letti.
+        """
+        n = float(candidates)
+        n_scored = n if scored is None else float(scored)
+        if min(n, n_scored) < MIN_OBSERVED_CANDIDATES:
+            return False
+        db_key = self._db_key(db_path)
+        self._ensure_loaded(db_key)
+        key = (db_key, str(scope))
+        with self._lock:
+            prev = self._estimates.get(key, LatencyEstimate())
+            first = prev.samples == 0
+            self._estimates[key] = LatencyEstimate(
+                fetch_ms_per_candidate=_ewma(prev.fetch_ms_per_candidate, max(0.0, fetch_ms) / n, first=first),
+                score_ms_per_candidate=_ewma(prev.score_ms_per_candidate, max(0.0, score_ms) / n_scored, first=first),
+                embed_ms=(
+                    prev.embed_ms
+                    if embed_ms is None
+                    else _ewma(prev.embed_ms, max(0.0, embed_ms), first=first or prev.embed_ms == 0.0)
+                ),
+                samples=prev.samples + 1,
+            )
+        return True
+
+    def suggest_limit(self, db_path: Optional[Path], scope: str, budget_ms: int) -> Optional[int]:
+        """Limite massimo che sta nel budget; None se le stime non sono ancora affidabili."""
+        if int(budget_ms) <= 0:
+            return None
+        est = self.estimate(db_path, scope)
+        if est is None or est.samples < self._min_samples:
+            return None
+        per_candidate = est.fetch_ms_per_candidate + est.score_ms_per_candidate
+        if per_candidate <= 0.0:
+            return MAX_CANDIDATE_LIMIT
+        available = float(budget_ms) * (1.0 - self._headroom) - est.embed_ms
+        raw = int(available / per_candidate) if available > 0 else 0
+        stepped = (raw // LIMIT_STEP) * LIMIT_STEP
+        return max(MIN_CANDIDATE_LIMIT, min(stepped, MAX_CANDIDATE_LIMIT))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._estimates.clear()
+            self._loaded.clear()
+
+    # ---------------- Persistenza ----------------
+
+    def _ensure_loaded(self, db_key: str) -> None:
+        if not db_key:
+            return
+        with self._lock:
+            if db_key in self._loaded:
+                return
+            self._loaded.add(db_key)
+        path = calibration_path_for(Path(db_key))
+        if not path.is_file():
+            return
+        try:
+            payload = json.loads(read_text_safe(path.parent, path))
+            scopes = payload.get("scopes", {}) if int(payload.get("version", 0)) == CALIBRATION_VERSION else {}
+            loaded = {
+                (db_key, str(scope)): LatencyEstimate(
+                    fetch_ms_per_candidate=float(raw.get("fetch_ms_per_candidate", 0.0)),
+                    score_ms_per_candidate=float(raw.get("score_ms_per_candidate", 0.0)),
+                    embed_ms=float(raw.get("embed_ms", 0.0)),
+                    samples=int(raw.get("samples", 0)),
+                )
+                for scope, raw in scopes.items()
+            }
+        except Exception as exc:
+            LOGGER.warning("retriever.calibration.load_failed", extra={"path": str(path), "error": repr(exc)})
+            return
+        with self._lock:
+            for key, est in loaded.items():
+                # Le misure online già raccolte hanno la precedenza sul seed su disco.
+                self._estimates.setdefault(key, est)
+        LOGGER.info("retriever.calibration.loaded", extra={"path": str(path), "scopes": len(loaded)})
+
+    def persist(self, db_path: Path) -> Path:
+        """Scrive (atomicamente) le stime del DB nel file di calibrazione e ne ritorna il path."""
+        db_key = self._db_key(db_path)
+        self._ensure_loaded(db_key)
+        with self._lock:
+            scopes = {scope: asdict(est) for (key, scope), est in self._estimates.items() if key == db_key}
+        path = calibration_path_for(Path(db_key))
+        payload = {"version": CALIBRATION_VERSION, "scopes": scopes}
+        safe_write_text(path, json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8", atomic=True)
+        LOGGER.info("retriever.calibration.persisted", extra={"path": str(path), "scopes": len(scopes)})
+        return path
+
+    def seed(self, db_path: Optional[Path], scope: str, estimate: LatencyEstimate) -> None:
+        """Imposta direttamente una stima (calibrazione offline)."""
+        db_key = self._db_key(db_path)
+        self._ensure_loaded(db_key)
+        with self._lock:
+            self._estimates[(db_key, str(scope))] = estimate
+
+
+_CALIBRATOR: LimitCalibrator = LimitCalibrator()
+
+
+def get_limit_calibrator() -> LimitCalibrator:
+    return _CALIBRATOR
+
+
+def configure_limit_calibrator(calibrator: LimitCalibrator) -> LimitCalibrator:
+    """Sostituisce il calibratore di processo; ritorna il precedente."""
+    global _CALIBRATOR
+    previous = _CALIBRATOR
+    _CALIBRATOR = calibrator
+    return previous
+
+
+def adaptive_enabled(throttle: Mapping[str, Any]) -> bool:
+    """`retriever.throttle.adaptive_limit` (opt-in, default False) abilita il limite misurato con auto_by_budget."""
+    return bool(throttle.get("adaptive_limit", False))
+
+
+__all__ = [
+    "LatencyEstimate",
+    "LimitCalibrator",
+    "adaptive_enabled",
+    "calibration_path_for",
+    "configure_limit_calibrator",
+    "get_limit_calibrator",
+]
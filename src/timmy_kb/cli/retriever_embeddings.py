@@ -17,15 +17,21 @@ Design:
 - Carica fino a `candidate_limit` candidati da SQLite (default: 4000).
 - Calcola la similarità coseno in Python sui candidati.
 - Restituisce i top-k come dict con: content, meta, score.
+- Con `concurrent_fetch=True` il fetch dei candidati parte su un worker mentre
+  l'embedding della query è in volo (latenza ~ max(embed, fetch) + rank).
 """
 
 from __future__ import annotations
 
+import contextvars
 import os
 import time
 from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from contextlib import nullcontext
 from dataclasses import MISSING, replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Literal, Mapping, Optional, TypedDict
 
@@ -33,6 +39,7 @@ from pipeline.exceptions import RetrieverError  # modulo comune degli errori
 from pipeline.logging_utils import get_structured_logger
 from semantic.types import EmbeddingsClient
 from storage.kb_db import fetch_candidates
+from timmy_kb.cli import retriever_budget as budget_mod
 from timmy_kb.cli import retriever_manifest as manifest_mod
 from timmy_kb.cli import retriever_ranking as ranking_mod
 from timmy_kb.cli import retriever_throttle as throttle_mod
@@ -172,44 +179,83 @@ def _is_flat_numeric_sequence(value: Any) -> bool:
     return length > 0
 
 
-def _materialize_query_vector(
-    params: QueryParams,
+def _invoke_embed_texts(
     embeddings_client: EmbeddingsClient,
+    texts: list[str],
     *,
-    embedding_model: str | None = None,
-) -> tuple[list[float] | None, float]:
-    """Invoca `embed_texts` e normalizza il primo vettore restituito."""
-    t0 = time.time()
-    args = ([params.query],)
+    embedding_model: str | None,
+    slug: str,
+    scope: str,
+) -> Any:
+    """Chiama `embed_texts` (con `model` se indicato) incapsulando i fallimenti in RetrieverError."""
+    args = (texts,)
     kwargs: dict[str, str | None] = {}
     if embedding_model is not None:
         kwargs["model"] = embedding_model
     allow_model_fallback = os.getenv("TIMMY_ALLOW_EMBEDDING_MODEL_FALLBACK", "0") == "1"
 
     try:
-        payload = embeddings_client.embed_texts(*args, **kwargs)  # type: ignore[call-arg]
+        return embeddings_client.embed_texts(*args, **kwargs)  # type: ignore[call-arg]
     except TypeError as exc:
         # Beta strict: fallback implicito disabilitato di default.
         if kwargs and allow_model_fallback and "unexpected keyword argument" in str(exc) and "model" in str(exc):
             _safe_log(
                 "retriever.query.embed_model_fallback.enabled",
                 level="warning",
-                extra={"slug": params.slug, "scope": params.scope, "model": embedding_model},
+                extra={"slug": slug, "scope": scope, "model": embedding_model},
             )
             try:
-                payload = embeddings_client.embed_texts(*args)
+                return embeddings_client.embed_texts(*args)
             except Exception as inner_exc:
                 raise RetrieverError("embedding client failure") from inner_exc
-        else:
-            raise RetrieverError("embedding client failure") from exc
+        raise RetrieverError("embedding client failure") from exc
     except Exception as exc:
         raise RetrieverError("embedding client failure") from exc
 
+
+def _materialize_query_vector(
+    params: QueryParams,
+    embeddings_client: EmbeddingsClient,
+    *,
+    embedding_model: str | None = None,
+) -> tuple[list[float] | None, float]:
+    """Invoca `embed_texts` e normalizza il primo vettore restituito."""
+    t0 = time.time()
+    payload = _invoke_embed_texts(
+        embeddings_client,
+        [params.query],
+        embedding_model=embedding_model,
+        slug=params.slug,
+        scope=params.scope,
+    )
     elapsed_ms = (time.time() - t0) * 1000.0
     vector = _normalize_vector(_extract_embedding(payload))
     return vector, elapsed_ms
 
 
+def _materialize_query_vectors(
+    texts: list[str],
+    embeddings_client: EmbeddingsClient,
+    *,
+    embedding_model: str | None,
+    slug: str,
+    scope: str,
+) -> tuple[list[list[float] | None], float]:
+    """Una sola chiamata `embed_texts` per più query; un vettore normalizzato (o None) per testo.
+
+    Solleva RetrieverError se il client fallisce o restituisce un numero di vettori diverso dai testi.
+    """
+    t0 = time.time()
+    payload = _maybe_tolist(
+        _invoke_embed_texts(embeddings_client, texts, embedding_model=embedding_model, slug=slug, scope=scope)
+    )
+    rows = list(payload) if isinstance(payload, Sequence) and not isinstance(payload, (str, bytes)) else []
+    if len(rows) != len(texts):
+        raise RetrieverError("embedding client failure: numero di vettori diverso dalle query")
+    vectors = [_normalize_vector(_maybe_tolist(row)) for row in rows]
+    return vectors, (time.time() - t0) * 1000.0
+
+
 def _coerce_candidate_vector(raw_embedding: Any, *, idx: int, stats: dict[str, int]) -> list[float] | None:
     """Normalizza l'embedding candidato per ranking."""
     if raw_embedding is None:
@@ -237,6 +283,7 @@ class ThrottleConfig(TypedDict, total=False):
     parallelism: int
     sleep_ms_between_calls: int
     acquire_timeout_ms: int
+    adaptive_limit: bool
 
 
 class RetrieverConfig(TypedDict, total=False):
@@ -265,6 +312,18 @@ def _default_candidate_limit() -> int:
         return 4000
 
 
+def _fetch_kwargs(params: QueryParams) -> dict[str, Any]:
+    """Kwargs opzionali per `fetch_candidates`: pool e filtri metadati solo se presenti."""
+    kwargs: dict[str, Any] = {}
+    pool = getattr(params, "connection_pool", None)
+    if pool is not None:
+        kwargs["pool"] = pool
+    filters = getattr(params, "filters", None)
+    if filters:
+        kwargs["filters"] = filters
+    return kwargs
+
+
 def _load_candidates(params: QueryParams) -> tuple[list[dict[str, Any]], float]:
     """Carica tutti i candidati e restituisce (lista, ms)."""
     t0 = time.time()
@@ -274,11 +333,56 @@ def _load_candidates(params: QueryParams) -> tuple[list[dict[str, Any]], float]:
             params.scope,
             limit=params.candidate_limit,
             db_path=params.db_path,
+            **_fetch_kwargs(params),
         )
     )
     return candidates, (time.time() - t0) * 1000.0
 
 
+_PREFETCH_WORKERS = 4
+
+
+@lru_cache(maxsize=1)
+def _prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=_PREFETCH_WORKERS, thread_name_prefix="retriever-prefetch")
+
+
+def _start_candidate_prefetch(
+    loader: Callable[[QueryParams], tuple[list[dict[str, Any]], float]],
+    params: QueryParams,
+) -> Future[tuple[list[dict[str, Any]], float]]:
+    """Avvia `loader(params)` su un worker, propagando il contesto (trace/log) del chiamante."""
+    ctx = contextvars.copy_context()
+    return _prefetch_executor().submit(ctx.run, loader, params)
+
+
+def _join_candidate_prefetch(
+    future: Future[tuple[list[dict[str, Any]], float]],
+    *,
+    deadline: float | None,
+    slug: str,
+    scope: str,
+) -> tuple[list[dict[str, Any]], float] | None:
+    """Attende il prefetch entro il deadline residuo; None (con log budget) se scade prima."""
+    timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        _safe_log(
+            "retriever.latency_budget.hit",
+            level="warning",
+            extra={"slug": slug, "scope": scope, "stage": "fetch_candidates"},
+        )
+        return None
+
+
+def _discard_prefetch(future: Future[Any] | None) -> None:
+    # Soft-fail prima del join: il risultato non serve; se il fetch è già in corso termina da solo.
+    if future is not None:
+        future.cancel()
+
+
 def _budget_hit(deadline: float | None, *, stage: str, slug: str, scope: str) -> bool:
     if not throttle_mod._deadline_exceeded(deadline):
         return False
@@ -302,6 +406,7 @@ def retrieve_candidates(params: QueryParams) -> list[dict[str, Any]]:
             params.scope,
             limit=params.candidate_limit,
             db_path=params.db_path,
+            **_fetch_kwargs(params),
         )
     )
     dt_ms = (time.time() - t0) * 1000.0
@@ -330,8 +435,14 @@ def search(
     response_id: str | None = None,
     embedding_model: str | None = None,
     explain_base_dir: Path | None = None,
+    concurrent_fetch: bool = False,
 ) -> list[SearchResult]:
-    """Esegue una ricerca vettoriale sui chunk del workspace indicato."""
+    """Esegue una ricerca vettoriale sui chunk del workspace indicato.
+
+    Con `concurrent_fetch=True` il caricamento dei candidati (indipendente dal vettore query)
+    parte prima dell'embedding e viene atteso dopo, entro il deadline; eventi e timing per stadio
+    restano gli stessi del percorso sequenziale.
+    """
     throttle_cfg = throttle_mod._normalize_throttle_settings(throttle)
     deadline = throttle_mod._deadline_from_settings(throttle_cfg)
     _validate_or_raise(params, code="retriever_invalid_params")
@@ -388,6 +499,8 @@ def search(
         if _budget_hit(deadline, stage="pre_embedding", slug=params.slug, scope=params.scope):
             return []
 
+        prefetch = _start_candidate_prefetch(_load_candidates, params) if concurrent_fetch else None
+
         query_vector, t_emb_ms = _embed_or_softfail(
             params,
             embeddings_client,
@@ -395,6 +508,7 @@ def search(
             embedding_model=embedding_model,
         )
         if query_vector is None:
+            _discard_prefetch(prefetch)
             return []
 
         _safe_log(
@@ -413,12 +527,18 @@ def search(
         )
 
         if _budget_hit(deadline, stage="post_embedding", slug=params.slug, scope=params.scope):
+            _discard_prefetch(prefetch)
             return []
 
-        if _budget_hit(deadline, stage="pre_fetch_candidates", slug=params.slug, scope=params.scope):
-            return []
-
-        candidates, t_fetch_ms = _load_candidates(params)
+        if prefetch is not None:
+            fetched = _join_candidate_prefetch(prefetch, deadline=deadline, slug=params.slug, scope=params.scope)
+            if fetched is None:
+                return []
+            candidates, t_fetch_ms = fetched
+        else:
+            if _budget_hit(deadline, stage="pre_fetch_candidates", slug=params.slug, scope=params.scope):
+                return []
+            candidates, t_fetch_ms = _load_candidates(params)
         fetch_budget_hit = throttle_mod._deadline_exceeded(deadline)
 
         _safe_log(
@@ -675,6 +795,14 @@ def choose_limit_for_budget(budget_ms: int) -> int:
     return 8000
 
 
+def _limit_for_budget(params: QueryParams, throttle: Mapping[str, Any], budget_ms: int) -> tuple[int, bool]:
+    if budget_mod.adaptive_enabled(throttle):
+        measured = budget_mod.get_limit_calibrator().suggest_limit(params.db_path, params.scope, budget_ms)
+        if measured is not None:
+            return int(measured), True
+    return choose_limit_for_budget(budget_ms), False
+
+
 def with_config_or_budget(params: QueryParams, config: Optional[Mapping[str, Any]]) -> QueryParams:
     default_lim = _default_candidate_limit()
 
@@ -693,14 +821,19 @@ def with_config_or_budget(params: QueryParams, config: Optional[Mapping[str, Any
         budget = 0
 
     if auto and budget > 0:
-        chosen = choose_limit_for_budget(budget)
+        chosen, calibrated = _limit_for_budget(params, throttle, budget)
         safe_chosen = max(MIN_CANDIDATE_LIMIT, min(int(chosen), MAX_CANDIDATE_LIMIT))
         if int(safe_chosen) != int(chosen):
             _safe_log("limit.clamped", level="warning", extra={"provided": int(chosen), "effective": int(safe_chosen)})
         _safe_log(
             "retriever.limit.source",
             level="info",
-            extra={"source": "auto_by_budget", "budget_ms": int(budget), "limit": int(safe_chosen)},
+            extra={
+                "source": "auto_by_budget",
+                "budget_ms": int(budget),
+                "limit": int(safe_chosen),
+                "calibrated": calibrated,
+            },
         )
         return replace(params, candidate_limit=int(safe_chosen))
 
@@ -734,6 +867,7 @@ def search_with_config(
     throttle_check: Callable[[QueryParams], None] | None = None,
     response_id: str | None = None,
     embedding_model: str | None = None,
+    concurrent_fetch: bool = False,
 ) -> list[SearchResult]:
     effective = with_config_or_budget(params, config)
     throttle_cfg = throttle_mod._normalize_throttle_settings(throttle_mod._build_throttle_settings(config))
@@ -747,6 +881,7 @@ def search_with_config(
         throttle_key=throttle_key,
         response_id=response_id,
         embedding_model=embedding_model,
+        concurrent_fetch=concurrent_fetch,
     )
 
 
@@ -770,7 +905,7 @@ def preview_effective_candidate_limit(
         budget_ms = 0
 
     if auto and budget_ms > 0:
-        return choose_limit_for_budget(budget_ms), "auto_by_budget", int(budget_ms)
+        return _limit_for_budget(params, throttle, budget_ms)[0], "auto_by_budget", int(budget_ms)
 
     throttle = throttle_mod._coerce_throttle_section(retr)
     try:
@@ -6,6 +6,7 @@ import time
 from pathlib import Path
 from typing import Any, Mapping, Sequence
 
+from explainability.manifest_sink import AsyncManifestSink
 from explainability.serialization import safe_write_manifest
 from pipeline.exceptions import PipelineError
 from pipeline.logging_utils import get_structured_logger
@@ -18,6 +19,20 @@ LOGGER = get_structured_logger("timmy_kb.retriever")
 QueryParams = validation_mod.QueryParams
 ThrottleSettings = throttle_mod.ThrottleSettings
 
+# Sink opzionale: se configurato, i manifest sono accodati e scritti da un thread dedicato.
+_MANIFEST_SINK: AsyncManifestSink | None = None
+
+
+def configure_manifest_sink(sink: AsyncManifestSink | None) -> AsyncManifestSink | None:
+    """Installa (o rimuove con None) il sink asincrono dei manifest; restituisce il precedente.
+
+    Senza sink la scrittura resta sincrona e un errore solleva `PipelineError`; con il sink gli
+    errori di scrittura sono solo loggati/contati (`search` non attende il disco).
+    """
+    global _MANIFEST_SINK
+    previous, _MANIFEST_SINK = _MANIFEST_SINK, sink
+    return previous
+
 
 def _log_logging_failure(event: str, exc: Exception) -> None:
     payload = {"event": event, "error": repr(exc)}
@@ -150,6 +165,18 @@ def _write_manifest_if_configured(
         "lineage_refs": [{"source_id": e.get("source_id"), "chunk_id": e.get("chunk_id")} for e in evidence_ids],
         "flags": {"budget_hit": bool(budget_hit)},
     }
+    sink = _MANIFEST_SINK
+    if sink is not None:
+        queued = sink.submit(manifest, output_dir=Path(explain_base_dir), response_id=response_id)
+        _log_manifest_event(
+            params,
+            scored_items,
+            response_id=response_id,
+            manifest_path=sink.target_path(Path(explain_base_dir), response_id),
+            evidence_ids=evidence_ids,
+            queued=queued,
+        )
+        return
     expected_path = Path(explain_base_dir) / f"{response_id}.json"
     try:
         manifest_path = safe_write_manifest(manifest, output_dir=explain_base_dir, response_id=response_id)
@@ -171,18 +198,36 @@ def _write_manifest_if_configured(
             slug=params.slug,
             file_path=str(expected_path),
         ) from exc
+    _log_manifest_event(
+        params,
+        scored_items,
+        response_id=response_id,
+        manifest_path=manifest_path,
+        evidence_ids=evidence_ids,
+    )
+
+
+def _log_manifest_event(
+    params: QueryParams,
+    scored_items: Sequence[Mapping[str, Any]],
+    *,
+    response_id: str,
+    manifest_path: Path,
+    evidence_ids: Sequence[Mapping[str, Any]],
+    queued: bool | None = None,
+) -> None:
+    extra: dict[str, Any] = {
+        "slug": params.slug,
+        "scope": params.scope,
+        "response_id": response_id,
+        "manifest_path": str(manifest_path),
+        "evidence_ids": list(evidence_ids),
+        "k": int(params.k),
+        "selected_count": len(scored_items),
+    }
+    if queued is not None:
+        extra["queued"] = queued
     try:
-        LOGGER.info(
-            "retriever.response.manifest",
-            extra={
-                "slug": params.slug,
-                "scope": params.scope,
-                "response_id": response_id,
-                "manifest_path": str(manifest_path),
-                "evidence_ids": list(evidence_ids),
-                "k": int(params.k),
-                "selected_count": len(scored_items),
-            },
-        )
+        LOGGER.info("retriever.response.manifest", extra=extra)
     except Exception as exc:
         _log_logging_failure("retriever.response.manifest", exc)
@@ -5,9 +5,11 @@ import heapq
 import math
 import time
 from itertools import tee
-from typing import Any, Iterable, Mapping, Optional, Sequence
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
 
 from pipeline.logging_utils import get_structured_logger
+from storage.kb_quantization import approx_cosine_scores
+from timmy_kb.cli import retriever_budget as budget_mod
 from timmy_kb.cli import retriever_throttle as throttle_mod
 from timmy_kb.cli import retriever_validation as validation_mod
 
@@ -153,6 +155,170 @@ def _rank_candidates(
     return results, total_candidates, stats, elapsed_ms, evaluated, budget_hit
 
 
+def _rank_candidates_hybrid(
+    query_vector: Sequence[float],
+    candidates: Sequence[dict[str, Any]],
+    k: int,
+    *,
+    rrf_k: int = 60,
+    deadline: Optional[float] = None,
+) -> tuple[list[SearchResult], int, dict[str, int], float, int, bool]:
+    """Reciprocal rank fusion tra ranking vettoriale e ranking lessicale (BM25).
+
+    `lexical_rank` (1-based) sui candidati indica la posizione nel top-N BM25; il ranking vettoriale
+    è calcolato qui sui candidati con embedding valido. Score restituito: somma di 1/(rrf_k + rank)
+    sulle due liste. Stessa tupla di ritorno di `_rank_candidates`.
+    """
+    stats: dict[str, int] = {"short": 0, "normalized": 0, "skipped": 0}
+    total_candidates = len(candidates)
+    top_k = max(0, int(k))
+    budget_hit = False
+    t0 = time.time()
+    if top_k == 0 or total_candidates == 0:
+        return [], total_candidates, stats, (time.time() - t0) * 1000.0, 0, False
+
+    cosines: list[tuple[float, int]] = []
+    for idx, cand in enumerate(candidates):
+        if _deadline_exceeded(deadline):
+            budget_hit = True
+            break
+        vec = _coerce_candidate_vector(cand.get("embedding"), idx=idx, stats=stats)
+        if vec is None:
+            continue
+        cosines.append((float(cosine(query_vector, vec)), idx))
+    cosines.sort(key=lambda t: (-t[0], t[1]))
+
+    fused: list[tuple[float, int]] = []
+    for vector_rank, (_score, idx) in enumerate(cosines, start=1):
+        score = 1.0 / (rrf_k + vector_rank)
+        lexical_rank = candidates[idx].get("lexical_rank")
+        if isinstance(lexical_rank, int) and lexical_rank > 0:
+            score += 1.0 / (rrf_k + lexical_rank)
+        fused.append((score, idx))
+    results: list[SearchResult] = [
+        {"content": candidates[idx]["content"], "meta": candidates[idx].get("meta", {}), "score": score}
+        for score, idx in heapq.nsmallest(top_k, fused, key=lambda t: (-t[0], t[1]))
+    ]
+    return results, total_candidates, stats, (time.time() - t0) * 1000.0, len(cosines), budget_hit
+
+
+def _rank_candidates_quantized(
+    query_vector: Sequence[float],
+    rows: Sequence[dict[str, Any]],
+    k: int,
+    *,
+    rerank_limit: int,
+    load_exact: Callable[[list[int]], list[dict[str, Any]]],
+    deadline: Optional[float] = None,
+) -> tuple[list[SearchResult], int, dict[str, int], float, int, bool]:
+    """Primo passaggio int8 su tutte le righe, poi re-rank esatto in float dei migliori `rerank_limit`.
+
+    `rows` arriva da `fetch_quantized_candidates` (id, q8, scale, offset); `load_exact(ids)` carica i
+    candidati completi dal più recente. Le righe senza embedding quantizzato (o di dimensione diversa
+    dalla query) entrano sempre nel re-rank. Stessa tupla di ritorno di `_rank_candidates`.
+    """
+    t0 = time.time()
+    approx = approx_cosine_scores(query_vector, rows)
+    scored = [(score, idx) for idx, score in enumerate(approx) if score is not None]
+    shortlist = heapq.nsmallest(max(0, int(rerank_limit)), scored, key=lambda t: (-t[0], t[1]))
+    ids = [int(rows[idx]["id"]) for _score, idx in shortlist]
+    ids.extend(int(row["id"]) for row, score in zip(rows, approx, strict=True) if score is None)
+    stats: dict[str, int] = {"short": 0, "normalized": 0, "skipped": 0}
+    if _deadline_exceeded(deadline):
+        return [], len(rows), stats, (time.time() - t0) * 1000.0, len(scored), True
+    results, _total, stats, _ms, evaluated, budget_hit = _rank_candidates(
+        query_vector,
+        load_exact(ids) if ids else [],
+        k,
+        deadline=deadline,
+        abort_if_deadline=True,
+    )
+    evaluated_total = len(scored) + max(0, evaluated - len(shortlist))
+    return results, len(rows), stats, (time.time() - t0) * 1000.0, evaluated_total, budget_hit
+
+
+def _cosine_matrix(query_vectors: Sequence[Sequence[float]], vectors: Sequence[list[float] | None]) -> Any | None:
+    """Matrice (query x candidati) di similarità coseno con un unico prodotto matrice-matrice.
+
+    Restituisce None se le dimensioni non sono omogenee (il coseno scalare tronca a `zip`, qui non
+    replicabile) o se le norme non sono finite: il chiamante ripiega sul ranking per singola query.
+    Candidati senza vettore o con vettore vuoto ottengono score 0.0, come `cosine`.
+    """
+    import numpy as np
+
+    dims = {len(v) for v in vectors if v} | {len(q) for q in query_vectors}
+    if len(dims) != 1:
+        return None
+    dim = dims.pop()
+    cand = np.zeros((len(vectors), dim), dtype=np.float64)
+    for idx, vec in enumerate(vectors):
+        if vec:
+            cand[idx] = vec
+    queries = np.asarray(query_vectors, dtype=np.float64)
+    cand_norms = np.linalg.norm(cand, axis=1)
+    query_norms = np.linalg.norm(queries, axis=1)
+    if not (np.all(np.isfinite(cand_norms)) and np.all(np.isfinite(query_norms))):
+        return None
+    denom = np.outer(query_norms, cand_norms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(denom > 0.0, (queries @ cand.T) / denom, 0.0)
+    return np.clip(scores, -1.0, 1.0)
+
+
+def _rank_candidates_batch(
+    query_vectors: Sequence[Sequence[float]],
+    candidates: Sequence[dict[str, Any]],
+    ks: Sequence[int],
+    limits: Sequence[int],
+) -> tuple[list[list[SearchResult]], dict[str, int], float, list[int]]:
+    """Ranking di più query sugli stessi candidati: coercizione una volta, scoring matrice-matrice.
+
+    La query `i` considera solo i primi `limits[i]` candidati (ordinati dal più recente, come il
+    LIMIT SQL) e restituisce i top `ks[i]` con lo stesso ordinamento/tie-break di `_rank_candidates`.
+    Restituisce (risultati per query, stats coercizione, ms, valutati per query).
+    """
+    import numpy as np
+
+    t0 = time.time()
+    stats: dict[str, int] = {"short": 0, "normalized": 0, "skipped": 0}
+    vectors = [_coerce_candidate_vector(c.get("embedding"), idx=idx, stats=stats) for idx, c in enumerate(candidates)]
+    valid = np.fromiter((v is not None for v in vectors), dtype=bool, count=len(vectors))
+    scores = _cosine_matrix(query_vectors, vectors) if query_vectors else None
+
+    results: list[list[SearchResult]] = []
+    evaluated: list[int] = []
+    for row, (query_vector, k, limit) in enumerate(zip(query_vectors, ks, limits, strict=True)):
+        top_k = max(0, int(k))
+        window = min(max(0, int(limit)), len(candidates))
+        if scores is None:
+            items, _total, _stats, _ms, n_eval, _hit = _rank_candidates(query_vector, candidates[:window], top_k)
+            results.append(items)
+            evaluated.append(n_eval)
+            continue
+        idx = np.flatnonzero(valid[:window])
+        evaluated.append(int(idx.size))
+        if top_k == 0 or idx.size == 0:
+            results.append([])
+            continue
+        row_scores = scores[row, idx]
+        if top_k < idx.size:
+            # Come lo heap di `_rank_candidates`: a parità di score al confine vince l'indice più alto.
+            keep = np.lexsort((-idx, -row_scores))[:top_k]
+            idx, row_scores = idx[keep], row_scores[keep]
+        order = np.lexsort((idx, -row_scores))
+        results.append(
+            [
+                {
+                    "content": candidates[int(i)]["content"],
+                    "meta": candidates[int(i)].get("meta", {}),
+                    "score": float(score),
+                }
+                for i, score in zip(idx[order], row_scores[order], strict=True)
+            ]
+        )
+    return results, stats, (time.time() - t0) * 1000.0, evaluated
+
+
 def _log_retriever_metrics(
     params: QueryParams,
     total_ms: float,
@@ -163,6 +329,7 @@ def _log_retriever_metrics(
     evaluated_count: int,
     coerce_stats: Mapping[str, int],
     response_id: str | None = None,
+    calibrate: bool = True,
 ) -> None:
     try:
         LOGGER.info(
@@ -203,3 +370,19 @@ def _log_retriever_metrics(
             t_score_sort_ms,
             evaluated_count,
         )
+    # Le stesse misure alimentano il calibratore del candidate_limit adattivo (auto_by_budget), solo per
+    # query singole su vettori: nei batch fetch/scoring sono condivisi, hybrid/int8 hanno costi diversi.
+    if not calibrate:
+        return
+    try:
+        budget_mod.get_limit_calibrator().observe(
+            params.db_path,
+            params.scope,
+            candidates=int(candidates_count),
+            fetch_ms=float(t_fetch_ms),
+            score_ms=float(t_score_sort_ms),
+            embed_ms=float(t_emb_ms),
+            scored=int(evaluated_count),
+        )
+    except Exception as exc:  # noqa: BLE001 - le metriche non devono mai far fallire una query
+        LOGGER.warning("retriever.calibrator.observe_failed", extra={"slug": params.slug, "error": repr(exc)})
@@ -0,0 +1,521 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# src/timmy_kb/cli/retriever_server.py
+"""Daemon locale del retriever con cache calde, più client sottile.
+
+Un processo long-lived mantiene per workspace: `KbConnectionPool` con cache dei candidati
+decodificati (invalidata da ogni commit sul DB, limitata per voci e righe), config del workspace
+(rivalidata su mtime/size via `pipeline.settings_snapshot`) e un unico client embeddings già
+inizializzato. I workspace caldi sono in LRU (`--max-workspaces`). Le query non pagano più import,
+apertura DB, parsing JSON delle embedding e bootstrap del client a ogni invocazione.
+
+Uso:
+  py -m timmy_kb.cli.retriever_server [--host 127.0.0.1] [--port 8765] [--cache-size 1] [--cache-max-rows 4000]
+  py -m timmy_kb.cli retriever-serve ...
+
+Endpoint (JSON su HTTP, solo loopback per default):
+- GET  /health       -> {"status": "ok", "workspaces": n}
+- POST /search       {slug, scope?, query, k?, candidate_limit?, filters?, hybrid?, response_id?}
+                     -> {"results": [SearchResult, ...]}
+- POST /search_many  {"queries": [<payload /search>, ...]} -> {"results": [[...], ...]}
+
+Se `TIMMY_RETRIEVER_TOKEN` è impostato, ogni richiesta deve avere `Authorization: Bearer <token>`.
+Errori: {"error": {"code", "message"}} con 400 (input/config), 401 (token), 404, 500.
+
+Espone:
+- RetrieverService: cache per workspace + search/search_many (authorizer/throttle_check lato server)
+- serve(service, host, port, token) -> ThreadingHTTPServer
+- RetrieverClient(base_url, token): client HTTP sottile (stdlib)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hmac
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+from pipeline.exceptions import ConfigError, RetrieverError
+from pipeline.logging_utils import get_structured_logger
+from semantic.types import EmbeddingsClient
+from storage.kb_db import KbConnectionPool
+from timmy_kb.cli import retriever as retriever_mod
+from timmy_kb.cli import retriever_throttle as throttle_mod
+from timmy_kb.cli.retriever_errors import _apply_error_context
+from timmy_kb.cli.retriever_validation import QueryParams, SearchResult
+
+LOGGER = get_structured_logger("timmy_kb.retriever_server")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Una voce da 4000 candidati a 1536 dimensioni occupa ~200MB di float Python: cache minima per default.
+DEFAULT_CACHE_SIZE = 1
+DEFAULT_CACHE_MAX_ROWS = 4000
+DEFAULT_MAX_WORKSPACES = 4
+DEFAULT_SCOPE = "kb"
+TOKEN_ENV = "TIMMY_RETRIEVER_TOKEN"  # noqa: S105 - nome della variabile d'ambiente, non un segreto
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH_QUERIES = 64
+
+ERR_BAD_REQUEST = "retriever_server_bad_request"
+ERR_UNAUTHORIZED = "retriever_server_unauthorized"
+ERR_NOT_FOUND = "retriever_server_not_found"
+ERR_INTERNAL = "retriever_server_internal"
+
+
+ConfigLoader = Callable[[], Mapping[str, Any]]
+
+
+@dataclass(frozen=True)
+class WorkspaceHandle:
+    """Risorse calde di un workspace: DB effettivo, pool con cache e loader del config `pipeline`."""
+
+    slug: str
+    db_path: Path
+    pool: KbConnectionPool
+    config_loader: ConfigLoader
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Config `pipeline` corrente (il loader di default rilegge il file solo se cambia)."""
+        return self.config_loader()
+
+
+# Il resolver restituisce il config statico oppure un loader da invocare a ogni query.
+WorkspaceResolver = Callable[[str], tuple[Path, Mapping[str, Any] | ConfigLoader]]
+
+
+def _pipeline_section(raw: Any) -> Mapping[str, Any]:
+    pipeline_cfg = raw.get("pipeline") if isinstance(raw, Mapping) else None
+    return pipeline_cfg if isinstance(pipeline_cfg, Mapping) else {}
+
+
+def _snapshot_pipeline_config(slug: str, config_path: Path, repo_root: Path) -> Mapping[str, Any]:
+    from pipeline.settings_snapshot import get_settings_snapshot
+
+    # Sola lettura: lo snapshot è condiviso nel processo (ricaricato quando mtime/size cambiano).
+    return _pipeline_section(get_settings_snapshot(slug, config_path, repo_root=repo_root).settings.data)
+
+
+def _resolve_workspace(slug: str) -> tuple[Path, ConfigLoader]:
+    """Risolve (db_path, loader del config pipeline) dal `ClientContext` del workspace, senza env Drive."""
+    from pipeline.context import ClientContext
+    from storage.kb_store import KbStore
+
+    ctx = ClientContext.load(slug=slug, require_drive_env=False, run_id=None, bootstrap_config=False)
+    if ctx.repo_root_dir is None:
+        raise ConfigError("Workspace senza repo_root_dir.", slug=slug)
+    store = KbStore.for_slug(slug, repo_root_dir=Path(ctx.repo_root_dir))
+    if ctx.config_path is None:
+        settings = ctx.settings
+        static = _pipeline_section(settings.as_dict() if settings is not None else {})
+        return store.effective_db_path(), lambda: static
+    return store.effective_db_path(), partial(
+        _snapshot_pipeline_config, slug, Path(ctx.config_path), Path(ctx.repo_root_dir)
+    )
+
+
+def _default_embeddings_client() -> EmbeddingsClient:
+    from timmy_kb.cli.ingest import OpenAIEmbeddings
+
+    return OpenAIEmbeddings()
+
+
+class RetrieverService:
+    """Stato caldo condiviso tra le richieste del daemon (thread-safe).
+
+    `authorizer`/`throttle_check` sono applicati lato server a ogni query, come in `search`;
+    il throttle del workspace (`retriever.throttle`) arriva dal config risolto.
+    Al più `max_workspaces` workspace restano caldi (LRU); per ciascuno la cache dei candidati
+    tiene `candidate_cache_size` voci e `candidate_cache_max_rows` righe in totale.
+    """
+
+    def __init__(
+        self,
+        *,
+        embeddings_factory: Callable[[], EmbeddingsClient] = _default_embeddings_client,
+        resolve_workspace: WorkspaceResolver = _resolve_workspace,
+        authorizer: Callable[[QueryParams], None] | None = None,
+        throttle_check: Callable[[QueryParams], None] | None = None,
+        candidate_cache_size: int = DEFAULT_CACHE_SIZE,
+        candidate_cache_max_rows: int = DEFAULT_CACHE_MAX_ROWS,
+        max_workspaces: int = DEFAULT_MAX_WORKSPACES,
+    ) -> None:
+        self._embeddings_factory = embeddings_factory
+        self._resolve_workspace = resolve_workspace
+        self._authorizer = authorizer
+        self._throttle_check = throttle_check
+        self._cache_size = max(0, int(candidate_cache_size))
+        self._cache_max_rows = max(0, int(candidate_cache_max_rows))
+        self._max_workspaces = max(1, int(max_workspaces))
+        self._lock = threading.Lock()
+        self._workspaces: OrderedDict[str, WorkspaceHandle] = OrderedDict()
+        self._embeddings: EmbeddingsClient | None = None
+
+    @property
+    def workspace_count(self) -> int:
+        with self._lock:
+            return len(self._workspaces)
+
+    def embeddings_client(self) -> EmbeddingsClient:
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = self._embeddings_factory()
+            return self._embeddings
+
+    def workspace(self, slug: str) -> WorkspaceHandle:
+        with self._lock:
+            handle = self._workspaces.get(slug)
+            if handle is not None:
+                self._workspaces.move_to_end(slug)
+                return handle
+        db_path, config = self._resolve_workspace(slug)
+        loader: ConfigLoader = config if callable(config) else (lambda: config)
+        evicted: list[WorkspaceHandle] = []
+        with self._lock:
+            handle = self._workspaces.get(slug)
+            if handle is None:
+                pool = KbConnectionPool(
+                    db_path,
+                    candidate_cache_size=self._cache_size,
+                    candidate_cache_max_rows=self._cache_max_rows,
+                )
+                handle = WorkspaceHandle(slug=slug, db_path=pool.db_path, pool=pool, config_loader=loader)
+                self._workspaces[slug] = handle
+                while len(self._workspaces) > self._max_workspaces:
+                    evicted.append(self._workspaces.popitem(last=False)[1])
+                LOGGER.info(
+                    "retriever_server.workspace.loaded",
+                    extra={"slug": slug, "db_path": str(handle.db_path), "cache_size": self._cache_size},
+                )
+        for old in evicted:
+            # Niente close(): query in corso possono ancora usare il pool; si libera subito la cache,
+            # le connessioni si chiudono quando il pool non è più referenziato.
+            old.pool.invalidate_cache()
+            LOGGER.info("retriever_server.workspace.evicted", extra={"slug": old.slug})
+        return handle
+
+    def _params(self, payload: Mapping[str, Any]) -> tuple[QueryParams, WorkspaceHandle]:
+        slug = str(payload.get("slug") or "").strip()
+        if not slug:
+            raise _bad_request("slug mancante")
+        handle = self.workspace(slug)
+        filters = payload.get("filters")
+        if filters is not None and not isinstance(filters, Mapping):
+            raise _bad_request("filters deve essere un oggetto")
+        try:
+            params = QueryParams(
+                db_path=handle.db_path,
+                slug=slug,
+                scope=str(payload.get("scope") or DEFAULT_SCOPE),
+                query=str(payload.get("query") or ""),
+                k=int(payload.get("k", 8)),
+                candidate_limit=int(payload.get("candidate_limit", retriever_mod._default_candidate_limit())),
+                connection_pool=handle.pool,
+                filters=dict(filters) if filters is not None else None,
+            )
+        except (TypeError, ValueError) as exc:
+            raise _bad_request(f"parametri non validi: {exc}") from exc
+        return params, handle
+
+    def search(self, payload: Mapping[str, Any]) -> list[SearchResult]:
+        params, handle = self._params(payload)
+        return self._search_single(params, handle, payload)
+
+    def _search_single(
+        self, params: QueryParams, handle: WorkspaceHandle, payload: Mapping[str, Any]
+    ) -> list[SearchResult]:
+        return retriever_mod.search_with_config(
+            params,
+            handle.config,
+            self.embeddings_client(),
+            authorizer=self._authorizer,
+            throttle_check=self._throttle_check,
+            response_id=_response_id(payload),
+            hybrid=bool(payload.get("hybrid", False)),
+        )
+
+    def search_many(self, payloads: Sequence[Mapping[str, Any]]) -> list[list[SearchResult]]:
+        """Batch di query: un `search_many` per (slug, scope) con config e throttle del proprio workspace.
+
+        Le query `hybrid` e i workspace con `retriever.quantization` seguono la stessa via di `/search`
+        (`search_with_config`), perché il percorso batch non li supporta.
+        """
+        if len(payloads) > MAX_BATCH_QUERIES:
+            raise _bad_request(f"troppe query nel batch (max {MAX_BATCH_QUERIES})")
+        prepared: list[tuple[QueryParams, WorkspaceHandle, Mapping[str, Any]]] = []
+        for payload in payloads:
+            if not isinstance(payload, Mapping):
+                raise _bad_request("ogni query del batch deve essere un oggetto")
+            params, handle = self._params(payload)
+            prepared.append((params, handle, payload))
+
+        results: list[list[SearchResult]] = [[] for _ in prepared]
+        groups: dict[tuple[str, str], list[int]] = {}
+        for index, (params, handle, payload) in enumerate(prepared):
+            if bool(payload.get("hybrid", False)) or _quantization(handle.config) != "none":
+                results[index] = self._search_single(params, handle, payload)
+            else:
+                groups.setdefault((params.slug, params.scope), []).append(index)
+
+        for (slug, scope), indexes in groups.items():
+            config = prepared[indexes[0]][1].config
+            throttle = throttle_mod._normalize_throttle_settings(throttle_mod._build_throttle_settings(config))
+            grouped = retriever_mod.search_many(
+                [retriever_mod.with_config_or_budget(prepared[i][0], config) for i in indexes],
+                self.embeddings_client(),
+                authorizer=self._authorizer,
+                throttle_check=self._throttle_check,
+                throttle=throttle,
+                throttle_key=f"{slug}::{scope}",
+                response_ids=[_response_id(prepared[i][2]) for i in indexes],
+            )
+            for index, items in zip(indexes, grouped, strict=True):
+                results[index] = items
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            handles, self._workspaces = list(self._workspaces.values()), {}
+        for handle in handles:
+            handle.pool.close()
+
+
+def _response_id(payload: Mapping[str, Any]) -> str | None:
+    response_id = payload.get("response_id")
+    return str(response_id) if response_id else None
+
+
+def _quantization(config: Mapping[str, Any]) -> str:
+    return str(throttle_mod._coerce_retriever_section(config).get("quantization") or "none").lower()
+
+
+def _bad_request(message: str) -> RetrieverError:
+    return _apply_error_context(RetrieverError(message), code=ERR_BAD_REQUEST)
+
+
+def _error_payload(code: str, message: str) -> dict[str, Any]:
+    return {"error": {"code": code, "message": message}}
+
+
+class _RetrieverHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: RetrieverService, token: str | None) -> None:
+        super().__init__(address, _RequestHandler)
+        self.service = service
+        self.token = token
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: _RetrieverHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - firma stdlib
+        LOGGER.debug("retriever_server.http", extra={"line": format % args})
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        # Confronto a tempo costante: il tempo di risposta non rivela il prefisso corretto del token.
+        provided = self.headers.get("Authorization", "").encode("utf-8")
+        return hmac.compare_digest(provided, f"Bearer {token}".encode("utf-8"))
+
+    def _read_json(self) -> Any:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError as exc:
+            raise _bad_request("Content-Length non valido") from exc
+        if length <= 0 or length > MAX_BODY_BYTES:
+            raise _bad_request("body JSON mancante o troppo grande")
+        try:
+            return json.loads(self.rfile.read(length).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise _bad_request("body JSON non valido") from exc
+
+    def do_GET(self) -> None:  # noqa: N802 - firma stdlib
+        if not self._authorized():
+            self._send_json(401, _error_payload(ERR_UNAUTHORIZED, "token mancante o non valido"))
+            return
+        if self.path != "/health":
+            self._send_json(404, _error_payload(ERR_NOT_FOUND, self.path))
+            return
+        self._send_json(200, {"status": "ok", "workspaces": self.server.service.workspace_count})
+
+    def do_POST(self) -> None:  # noqa: N802 - firma stdlib
+        if not self._authorized():
+            self._send_json(401, _error_payload(ERR_UNAUTHORIZED, "token mancante o non valido"))
+            return
+        if self.path not in {"/search", "/search_many"}:
+            self._send_json(404, _error_payload(ERR_NOT_FOUND, self.path))
+            return
+        service = self.server.service
+        try:
+            payload = self._read_json()
+            if not isinstance(payload, Mapping):
+                raise _bad_request("il body deve essere un oggetto JSON")
+            if self.path == "/search":
+                result: Any = service.search(payload)
+            else:
+                queries = payload.get("queries")
+                if not isinstance(queries, list):
+                    raise _bad_request("queries deve essere una lista")
+                result = service.search_many(queries)
+        except (RetrieverError, ConfigError) as exc:
+            code = str(getattr(exc, "code", None) or ERR_BAD_REQUEST)
+            LOGGER.warning("retriever_server.request.rejected", extra={"path": self.path, "code": code})
+            self._send_json(400, _error_payload(code, str(exc)))
+            return
+        except Exception as exc:  # pragma: no cover - difesa ultima: il daemon non deve cadere
+            LOGGER.exception("retriever_server.request.failed", extra={"path": self.path, "error": repr(exc)})
+            self._send_json(500, _error_payload(ERR_INTERNAL, "errore interno"))
+            return
+        self._send_json(200, {"results": result})
+
+
+def serve(
+    service: RetrieverService,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    token: str | None = None,
+) -> ThreadingHTTPServer:
+    """Crea il server HTTP (non avviato): il chiamante esegue `serve_forever()` e `shutdown()`."""
+    server = _RetrieverHTTPServer((host, int(port)), service, token or None)
+    if host not in {"127.0.0.1", "localhost", "::1"} and not token:
+        LOGGER.warning("retriever_server.non_loopback_without_token", extra={"host": host})
+    return server
+
+
+class RetrieverClient:
+    """Client HTTP sottile verso il daemon; gli errori diventano `RetrieverError` con `code`."""
+
+    def __init__(
+        self,
+        base_url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}",
+        *,
+        token: str | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._token = token if token is not None else os.getenv(TOKEN_ENV)
+        self._timeout = float(timeout)
+
+    def _request(self, path: str, payload: Mapping[str, Any] | None = None) -> Any:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        # URL costruito da `base_url` del daemon (http locale): nessuno schema arbitrario dall'input.
+        req = urllib.request.Request(self._base_url + path, data=data, method="POST" if data else "GET")  # noqa: S310
+        req.add_header("Content-Type", "application/json")
+        if self._token:
+            req.add_header("Authorization", f"Bearer {self._token}")
+        try:
+            with urllib.request.urlopen(req, timeout=self._timeout) as resp:  # noqa: S310 - URL del daemon locale
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as exc:
+            try:
+                error = json.loads(exc.read().decode("utf-8")).get("error") or {}
+            except (ValueError, AttributeError):
+                error = {}
+            message = str(error.get("message") or f"HTTP {exc.code}")
+            raise _apply_error_context(RetrieverError(message), code=str(error.get("code") or ERR_INTERNAL)) from exc
+        except (urllib.error.URLError, OSError) as exc:
+            message = f"daemon retriever non raggiungibile: {exc}"
+            raise _apply_error_context(RetrieverError(message), code=ERR_INTERNAL) from exc
+
+    def health(self) -> dict[str, Any]:
+        return dict(self._request("/health"))
+
+    def search(
+        self,
+        slug: str,
+        query: str,
+        *,
+        scope: str = DEFAULT_SCOPE,
+        k: int = 8,
+        candidate_limit: int | None = None,
+        filters: Mapping[str, Any] | None = None,
+        hybrid: bool = False,
+        response_id: str | None = None,
+    ) -> list[SearchResult]:
+        payload: dict[str, Any] = {"slug": slug, "scope": scope, "query": query, "k": int(k), "hybrid": hybrid}
+        if candidate_limit is not None:
+            payload["candidate_limit"] = int(candidate_limit)
+        if filters is not None:
+            payload["filters"] = dict(filters)
+        if response_id is not None:
+            payload["response_id"] = response_id
+        return list(self._request("/search", payload)["results"])
+
+    def search_many(self, queries: Sequence[Mapping[str, Any]]) -> list[list[SearchResult]]:
+        return [
+            list(items) for items in self._request("/search_many", {"queries": [dict(q) for q in queries]})["results"]
+        ]
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Daemon locale del retriever con cache calde")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interfaccia di ascolto (default: loopback)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Porta TCP")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Voci LRU di candidati decodificati per workspace (0 = disabilitata)",
+    )
+    parser.add_argument(
+        "--cache-max-rows",
+        type=int,
+        default=DEFAULT_CACHE_MAX_ROWS,
+        help="Righe massime in cache per workspace (0 = nessun limite oltre --cache-size)",
+    )
+    parser.add_argument(
+        "--max-workspaces",
+        type=int,
+        default=DEFAULT_MAX_WORKSPACES,
+        help="Workspace tenuti caldi (LRU)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    service = RetrieverService(
+        candidate_cache_size=int(args.cache_size),
+        candidate_cache_max_rows=int(args.cache_max_rows),
+        max_workspaces=int(args.max_workspaces),
+    )
+    server = serve(service, host=str(args.host), port=int(args.port), token=os.getenv(TOKEN_ENV))
+    LOGGER.info(
+        "retriever_server.started",
+        extra={"host": args.host, "port": server.server_address[1], "cache_size": int(args.cache_size)},
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        LOGGER.info("retriever_server.stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
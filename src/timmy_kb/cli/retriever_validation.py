@@ -1,12 +1,16 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, Mapping, Sequence, TypedDict
 
 from pipeline.exceptions import RetrieverError
 from pipeline.logging_utils import get_structured_logger
+from storage.kb_db import METADATA_FILTER_COLUMNS
+
+if TYPE_CHECKING:
+    from storage.kb_db import KbConnectionPool
 
 LOGGER = get_structured_logger("timmy_kb.retriever")
 
@@ -23,6 +27,10 @@ class QueryParams:
     - `query`: testo naturale da embeddare e confrontare con i candidati.
     - `k`: numero di risultati da restituire (top-k).
     - `candidate_limit`: massimo numero di candidati da caricare dal DB.
+    - `connection_pool`: opzionale, `KbConnectionPool` (vedi `KbStore.connection_pool()`) per
+      riusare connessioni e verifica schema tra query della stessa sessione.
+    - `filters`: opzionale, filtri esatti sui metadati (`file`, `entity`, `area`, `layout_section`,
+      `source_id`; valore o lista di valori) applicati in SQL prima del `candidate_limit`.
     """
 
     db_path: Path
@@ -31,6 +39,8 @@ class QueryParams:
     query: str
     k: int = 8
     candidate_limit: int = 4000
+    connection_pool: "KbConnectionPool | None" = field(default=None, compare=False, repr=False)
+    filters: Mapping[str, str | Sequence[str]] | None = field(default=None, hash=False)
 
 
 class SearchMeta(TypedDict, total=False):
@@ -67,6 +77,12 @@ def _validate_params(params: QueryParams) -> None:
         raise RetrieverError(f"candidate_limit fuori range [{MIN_CANDIDATE_LIMIT}, {MAX_CANDIDATE_LIMIT}]")
     if params.k < 0:
         raise RetrieverError("k negativo")
+    for key, value in (params.filters or {}).items():
+        if key not in METADATA_FILTER_COLUMNS:
+            raise RetrieverError(f"filtro metadati non supportato: {key}")
+        values = [value] if isinstance(value, str) else list(value)
+        if not values or not all(isinstance(v, str) and v for v in values):
+            raise RetrieverError(f"filtro metadati non valido: {key}")
 
 
 def _validate_params_logged(params: QueryParams) -> None:
@@ -5,14 +5,19 @@ from __future__ import annotations
 
 from typing import Any, Callable, Dict, Optional, cast
 
+from .workspace_snapshot import invalidate_raw_snapshot
+
 RenderTreeCallable = Callable[[str], Dict[str, Dict[str, Any]]]
 
 try:
+    from ..components.drive_tree import clear_drive_listing_cache as _clear_listing
     from ..components.drive_tree import render_drive_tree as _render_drive_tree
 except Exception:  # pragma: no cover
     render_drive_tree: Optional[RenderTreeCallable] = None
+    clear_drive_listing_cache: Optional[Callable[[], None]] = None
 else:
     render_drive_tree = cast(RenderTreeCallable, _render_drive_tree)
+    clear_drive_listing_cache = _clear_listing
 
 
 def _drive_tree_uncached(slug: str) -> Dict[str, Dict[str, Any]]:
@@ -29,7 +34,10 @@ _drive_tree_cached: RenderTreeCallable = _drive_tree_uncached
 
 
 def _clear_drive_tree_cache(*args: Any, **kwargs: Any) -> None:
-    """Svuota la cache dell'albero di Drive."""
+    """Svuota la cache dell'albero di Drive (listing TTL e snapshot locale di raw/ inclusi)."""
+    if clear_drive_listing_cache is not None:
+        clear_drive_listing_cache()
+    invalidate_raw_snapshot()
     clear_fn = getattr(_drive_tree_cached, "clear", None)
     if callable(clear_fn):
         try:
@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+"""Snapshot riusabile di `raw/` (directory + file con stat) per la UI.
+
+Una sola visita con `os.scandir` produce directory e file con size/mtime, nello stesso ordine
+(e con la stessa path-safety: niente symlink, niente uscite dal root) di `iter_safe_paths`.
+Lo snapshot è tenuto in cache per root e aggiornato in modo incrementale: a ogni richiesta si
+fa `stat` solo delle directory e si ri-scandiscono quelle con mtime cambiato; le altre riusano
+le voci già note.
+
+Limite noto: riscrivere un file *in place* non cambia la mtime della directory padre. Le scritture
+della pipeline sono atomiche (temp + replace) e quindi visibili; per il resto `max_age_s` forza
+una scansione completa e `invalidate_raw_snapshot` azzera la cache dopo operazioni note.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from pipeline.logging_utils import get_structured_logger
+from pipeline.path_utils import ensure_within_and_resolve
+
+_LOGGER = get_structured_logger("ui.workspace_snapshot")
+
+SNAPSHOT_CACHE_CAPACITY = 8
+SNAPSHOT_MAX_AGE_S = 300.0
+# Directory modificate da meno di così (ns) non sono affidabili su FS a mtime grossolana: si ri-scansionano.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class _DirListing:
+    mtime_ns: int
+    mtime: float
+    racy: bool
+    subdirs: tuple[str, ...]
+    files: tuple[tuple[str, Optional[int], Optional[float]], ...]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    created_at: float
+    dirs: Dict[str, _DirListing]
+    index: Dict[str, Dict[str, Any]]
+
+
+_CACHE: "OrderedDict[Path, _Snapshot]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def invalidate_raw_snapshot(root: Path | None = None) -> None:
+    """Svuota la cache degli snapshot (tutta o per un root specifico)."""
+    with _LOCK:
+        if root is None:
+            _CACHE.clear()
+            return
+        try:
+            _CACHE.pop(Path(root).resolve(), None)
+        except OSError:
+            return
+
+
+def _scan_dir(path: Path) -> Optional[_DirListing]:
+    try:
+        st = path.stat()
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name.lower())
+    except OSError:
+        return None
+    subdirs: list[str] = []
+    files: list[tuple[str, Optional[int], Optional[float]]] = []
+    for entry in entries:
+        try:
+            if entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+                continue
+            est = entry.stat(follow_symlinks=False)
+            files.append((entry.name, int(est.st_size), float(est.st_mtime)))
+        except OSError:
+            files.append((entry.name, None, None))
+    racy = time.time_ns() - st.st_mtime_ns < _RACY_WINDOW_NS
+    return _DirListing(st.st_mtime_ns, float(st.st_mtime), racy, tuple(subdirs), tuple(files))
+
+
+def _walk(
+    root: Path,
+    previous: Dict[str, _DirListing],
+) -> tuple[Dict[str, _DirListing], list[str], list[tuple[str, Optional[int], Optional[float]]], int]:
+    """DFS in ordine nome (case-insensitive); ri-scansiona solo le directory con mtime cambiata."""
+    dirs: Dict[str, _DirListing] = {}
+    dir_order: list[str] = []
+    file_order: list[tuple[str, Optional[int], Optional[float]]] = []
+    rescanned = 0
+
+    def _visit(rel: str) -> None:
+        nonlocal rescanned
+        path = root / rel if rel else root
+        cached = previous.get(rel)
+        listing: Optional[_DirListing] = None
+        if cached is not None and not cached.racy:
+            try:
+                if path.stat().st_mtime_ns == cached.mtime_ns:
+                    listing = cached
+            except OSError:
+                return
+        if listing is None:
+            rescanned += 1
+            listing = _scan_dir(path)
+            if listing is None:
+                return
+        dirs[rel] = listing
+        # Ordine come iter_safe_paths: voci della directory ordinate, ricorsione subito dopo ogni dir.
+        names = sorted(
+            [(name, True) for name in listing.subdirs] + [(f[0], False) for f in listing.files],
+            key=lambda item: item[0].lower(),
+        )
+        file_meta = {f[0]: f for f in listing.files}
+        for name, is_dir in names:
+            child = f"{rel}/{name}" if rel else name
+            if is_dir:
+                try:
+                    ensure_within_and_resolve(root, root / child)
+                except Exception:
+                    continue
+                dir_order.append(child)
+                _visit(child)
+            else:
+                _name, size, mtime = file_meta[name]
+                file_order.append((child, size, mtime))
+
+    _visit("")
+    return dirs, dir_order, file_order, rescanned
+
+
+def raw_snapshot(raw_dir: Path, *, max_age_s: float = SNAPSHOT_MAX_AGE_S) -> Dict[str, Dict[str, Any]]:
+    """Indice `raw`/`raw/<rel>` -> {type, size, mtime} (stesso formato dell'indice Drive).
+
+    Restituisce una copia: i chiamanti possono modificarla senza sporcare la cache.
+    """
+    try:
+        root = Path(raw_dir).resolve()
+        root_stat = root.stat()
+    except OSError:
+        return {}
+    if not root.is_dir():
+        return {}
+
+    now = time.time()
+    with _LOCK:
+        cached = _CACHE.get(root)
+    previous: Dict[str, _DirListing] = {}
+    if cached is not None and now - cached.created_at <= max_age_s:
+        previous = cached.dirs
+
+    dirs, dir_order, file_order, rescanned = _walk(root, previous)
+    if cached is not None and previous and rescanned == 0:
+        index = cached.index
+        created_at = cached.created_at
+    else:
+        index = {"raw": {"type": "dir", "size": None, "mtime": float(root_stat.st_mtime)}}
+        for rel in dir_order:
+            index[f"raw/{rel}"] = {"type": "dir", "size": None, "mtime": dirs[rel].mtime}
+        for rel, size, mtime in file_order:
+            index[f"raw/{rel}"] = {"type": "file", "size": size, "mtime": mtime}
+        created_at = cached.created_at if previous and cached is not None else now
+        _LOGGER.debug(
+            "ui.workspace_snapshot.refreshed",
+            extra={"root": str(root), "dirs_rescanned": rescanned, "dirs": len(dirs), "files": len(file_order)},
+        )
+
+    with _LOCK:
+        _CACHE[root] = _Snapshot(created_at, dirs, index)
+        _CACHE.move_to_end(root)
+        while len(_CACHE) > SNAPSHOT_CACHE_CAPACITY:
+            _CACHE.popitem(last=False)
+    return {key: dict(meta) for key, meta in index.items()}
+
+
+__all__ = ["invalidate_raw_snapshot", "raw_snapshot"]
@@ -14,6 +14,7 @@ from pipeline.path_utils import (
     iter_safe_paths,
     validate_slug,
 )
+from ui.app_services.workspace_snapshot import invalidate_raw_snapshot, raw_snapshot
 
 try:
     import streamlit as st
@@ -32,44 +33,9 @@ class DiffDataset:
     differences: List[Dict[str, Any]]
 
 
-def _safe_mtime(path: Path) -> Optional[float]:
-    try:
-        return path.stat().st_mtime
-    except OSError:  # pragma: no cover
-        return None
-
-
 def _build_local_index(raw_dir: Path) -> Dict[str, Dict[str, Any]]:
-    index: Dict[str, Dict[str, Any]] = {}
-    if not raw_dir.exists():
-        return index
-
-    # Indichiamo sempre la radice "raw" (come fa l'indice Drive)
-    index["raw"] = {"type": "dir", "size": None, "mtime": _safe_mtime(raw_dir)}
-
-    for directory in iter_safe_paths(raw_dir, include_dirs=True, include_files=False):
-        rel_dir = directory.relative_to(raw_dir).as_posix()
-        if not rel_dir:
-            continue
-        key = f"raw/{rel_dir}"
-        index[key] = {"type": "dir", "size": None, "mtime": _safe_mtime(directory)}
-
-    for file_path in iter_safe_paths(raw_dir, include_dirs=False, include_files=True):
-        rel = file_path.relative_to(raw_dir).as_posix()
-        if not rel:
-            continue
-        key = f"raw/{rel}"
-        try:
-            stat = file_path.stat()
-            index[key] = {
-                "type": "file",
-                "size": int(stat.st_size),
-                "mtime": float(stat.st_mtime),
-            }
-        except OSError:  # pragma: no cover
-            index[key] = {"type": "file", "size": None, "mtime": None}
-
-    return index
+    # Snapshot a visita singola, in cache e aggiornato solo sulle directory cambiate (rerun Streamlit).
+    return raw_snapshot(raw_dir)
 
 
 def _human_size(size: Optional[int]) -> str:
@@ -227,6 +193,7 @@ def _clear_raw_subfolders_content(slug: str) -> tuple[int, int]:
                 continue
 
     clear_iter_safe_pdfs_cache(root=raw_dir)
+    invalidate_raw_snapshot(raw_dir)
     return removed, errors
 
 
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import io
+import threading
+import time
 from typing import Any, Dict, Iterable, List, Optional, cast
 
 from pipeline.drive_utils import delete_drive_file as _delete_drive_file
@@ -18,6 +20,19 @@ except Exception:  # pragma: no cover
 _LOGGER = get_structured_logger("ui.components.drive_tree")
 _FIELDS_MINIMAL = "nextPageToken, files(id, name, mimeType, size, modifiedTime)"
 
+# Listing Drive per cartella con TTL: i rerun Streamlit non ripetono le chiamate API.
+# Invalidazione esplicita dopo download/upload/refresh via `clear_drive_listing_cache`
+# (chiamata da `_clear_drive_tree_cache`).
+DRIVE_LISTING_TTL_S = 60.0
+_LISTING_CACHE: Dict[str, tuple[float, List[Dict[str, Any]]]] = {}
+_LISTING_LOCK = threading.Lock()
+
+
+def clear_drive_listing_cache() -> None:
+    """Svuota la cache TTL dei listing Drive."""
+    with _LISTING_LOCK:
+        _LISTING_CACHE.clear()
+
 
 def _parse_mtime(value: Optional[str]) -> Optional[float]:
     if not value:
@@ -60,6 +75,11 @@ def _human_size(size: Optional[int]) -> str:
 
 
 def _list_children(service: Any, parent_id: str) -> List[Dict[str, Any]]:
+    now = time.monotonic()
+    with _LISTING_LOCK:
+        cached = _LISTING_CACHE.get(parent_id)
+    if cached is not None and now - cached[0] < DRIVE_LISTING_TTL_S:
+        return [dict(item) for item in cached[1]]
     files: List[Dict[str, Any]] = []
     if not callable(list_drive_files):  # pragma: no cover
         raise CapabilityUnavailableError(
@@ -68,6 +88,8 @@ def _list_children(service: Any, parent_id: str) -> List[Dict[str, Any]]:
     for item in list_drive_files(service, parent_id, fields=_FIELDS_MINIMAL):
         files.append(item)
     files.sort(key=lambda f: (0 if f.get("mimeType") == MIME_FOLDER else 1, (f.get("name") or "").lower()))
+    with _LISTING_LOCK:
+        _LISTING_CACHE[parent_id] = (now, [dict(item) for item in files])
     return files
 
 
@@ -3,12 +3,12 @@
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
 from typing import Any, TypedDict, cast
 
 import yaml
 
-from pipeline.config_utils import load_client_settings
 from pipeline.context import ClientContext
 from pipeline.env_constants import UI_CONFIG_FILE_ENV
 from pipeline.exceptions import ConfigError
@@ -16,6 +16,7 @@ from pipeline.file_utils import safe_write_text
 from pipeline.logging_utils import get_structured_logger
 from pipeline.path_utils import ensure_within_and_resolve
 from pipeline.settings import Settings
+from pipeline.settings_snapshot import SettingsSnapshot, get_settings_snapshot, invalidate_settings_snapshots
 from ui.utils.context_cache import get_client_context
 from ui.utils.repo_root import get_repo_root
 from ui.utils.stubs import get_streamlit
@@ -43,6 +44,10 @@ DEFAULT_THROTTLE_SLEEP_MS: int = 0
 
 _logger = get_structured_logger("ui.config_store")
 
+# slug -> (repo_root, config_path): evita di ricostruire il ClientContext a ogni lettura.
+_CLIENT_CONFIG_LOCATIONS: dict[str, tuple[Path, Path]] = {}
+_CLIENT_CONFIG_LOCK = threading.Lock()
+
 
 def _coerce_int(value: Any, default: int) -> int:
     try:
@@ -67,13 +72,17 @@ class GlobalConfig(TypedDict, total=False):
     integrations: dict[str, Any]
 
 
-def _load_client_config(slug: str) -> tuple[Path, GlobalConfig]:
-    """
-    Carica il config specifico del cliente, garantendo path-safety.
+def _client_config_location(slug: str) -> tuple[Path, Path]:
+    """(repo_root, config_path) del cliente; il ClientContext si costruisce solo al primo accesso.
 
     Raises:
-        ConfigError: se il contesto non è disponibile o il file è illeggibile.
+        ConfigError: se il contesto non è disponibile o incompleto.
     """
+    with _CLIENT_CONFIG_LOCK:
+        cached = _CLIENT_CONFIG_LOCATIONS.get(slug)
+    if cached is not None and cached[1].is_file():
+        return cached
+
     ctx: Any | None = None
     try:
         if hasattr(ClientContext, "load"):
@@ -99,30 +108,39 @@ def _load_client_config(slug: str) -> tuple[Path, GlobalConfig]:
     if ctx.config_path is None:
         raise ConfigError("Config path non disponibile", slug=slug)
 
-    cfg_path = ensure_within_and_resolve(ctx.config_path.parent, ctx.config_path)
+    cfg_path = Path(ensure_within_and_resolve(ctx.config_path.parent, ctx.config_path))
+    location = (Path(ctx.repo_root_dir), cfg_path)
+    with _CLIENT_CONFIG_LOCK:
+        _CLIENT_CONFIG_LOCATIONS[slug] = location
+    return location
+
+
+def invalidate_client_config_cache(slug: str | None = None) -> None:
+    """Dimentica path e snapshot del config cliente (tutti o per uno slug)."""
+    with _CLIENT_CONFIG_LOCK:
+        if slug is None:
+            _CLIENT_CONFIG_LOCATIONS.clear()
+        else:
+            _CLIENT_CONFIG_LOCATIONS.pop(slug, None)
+    invalidate_settings_snapshots(slug)
+
+
+def _load_client_snapshot(slug: str) -> SettingsSnapshot:
+    """
+    Snapshot (sola lettura) delle `Settings` cliente, garantendo path-safety.
 
+    Le `Settings` parse arrivano dalla cache di processo (`pipeline.settings_snapshot`): YAML e
+    validazione si ripetono solo quando il file cambia.
+
+    Raises:
+        ConfigError: se il contesto non è disponibile o il file è illeggibile.
+    """
+    repo_root, cfg_path = _client_config_location(slug)
     try:
-        settings = load_client_settings(ctx, reload=True, logger=_logger)
-        if hasattr(settings, "as_dict"):
-            return Path(cfg_path), cast(GlobalConfig, settings.as_dict())
-        if isinstance(settings, dict):
-            return Path(cfg_path), cast(GlobalConfig, settings)
-        try:
-            raw = dict(vars(settings))
-        except Exception as exc:  # noqa: BLE001
-            raise ConfigError(
-                "Impossibile convertire le settings cliente in dict (as_dict/dict/vars falliti).",
-                slug=slug,
-                file_path=str(cfg_path),
-            ) from exc
-        if not raw:
-            raise ConfigError(
-                "Impossibile convertire le settings cliente in dict (as_dict/dict/vars falliti).",
-                slug=slug,
-                file_path=str(cfg_path),
-            )
-        return Path(cfg_path), cast(GlobalConfig, raw)
+        return get_settings_snapshot(slug, cfg_path, repo_root=repo_root)
     except Exception as exc:  # noqa: BLE001
+        with _CLIENT_CONFIG_LOCK:
+            _CLIENT_CONFIG_LOCATIONS.pop(slug, None)
         _logger.error(
             "ui.config_store.client_config_load_failed",
             extra={"slug": slug, "file_path": str(cfg_path), "error": str(exc)},
@@ -134,6 +152,12 @@ def _load_client_config(slug: str) -> tuple[Path, GlobalConfig]:
         ) from exc
 
 
+def _load_client_config(slug: str) -> tuple[Path, GlobalConfig]:
+    """Path e copia modificabile del config cliente (vedi `_load_client_snapshot`)."""
+    snapshot = _load_client_snapshot(slug)
+    return snapshot.config_path, cast(GlobalConfig, snapshot.as_dict())
+
+
 def _load_config_override_path() -> Path | None:
     """Ritorna il path sovrascritto via env (utile per i dummy/workspace)."""
     override = os.environ.get(UI_CONFIG_FILE_ENV)
@@ -268,7 +292,8 @@ def get_retriever_settings(slug: str | None = None) -> tuple[int, int, bool]:
 
     if slug:
         try:
-            _, client_cfg = _load_client_config(slug)
+            # Sola lettura: niente copia del dict, lo snapshot è condiviso tra le richieste.
+            client_cfg = cast(GlobalConfig, _load_client_snapshot(slug).settings.data)
             if client_cfg:
                 source_cfg = client_cfg
         except ConfigError:
@@ -354,5 +379,6 @@ def set_retriever_settings(
     if target_path is not None:
         payload: str = yaml.safe_dump(target_cfg, allow_unicode=True, sort_keys=False)
         safe_write_text(target_path, payload, encoding="utf-8", atomic=True)
+        invalidate_settings_snapshots(slug)
     else:
         _save_config(cfg)
@@ -1,18 +1,19 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-import importlib
+import hashlib
 import json
+import os
 import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterable, List, Tuple, cast
-
-try:
-    import streamlit as st
-except Exception:  # pragma: no cover
-    st = None
+from typing import Any, Iterable, List, Optional, Tuple, cast
 
 import pipeline.env_utils as _env_utils
+from pipeline.capabilities.lazy import is_module_available
 from pipeline.env_attestation import validate_env_attestation
 from pipeline.env_utils import ensure_dotenv_loaded, get_env_var
 from pipeline.exceptions import ConfigError
@@ -51,11 +52,8 @@ def _maybe_load_dotenv() -> None:
 
 
 def _is_importable(mod: str) -> bool:
-    try:
-        importlib.import_module(mod)
-        return True
-    except Exception:
-        return False
+    """Scoperta via spec/filesystem: nessun import del modulo (né dei package padre)."""
+    return is_module_available(mod)
 
 
 def _docker_ok() -> tuple[bool, str]:
@@ -132,6 +130,8 @@ def _run_optional_import_checks(defs: Iterable[tuple[str, str, str]]) -> list[Ch
 def _has_openai_key() -> bool:
     if get_env_var("OPENAI_API_KEY", default=None):
         return True
+    # st.secrets solo se Streamlit è già caricato (UI): la CLI non paga l'import di streamlit.
+    st = sys.modules.get("streamlit")
     if st is not None:
         try:
             return bool(st.secrets.get("OPENAI_API_KEY", ""))
@@ -177,7 +177,7 @@ def _vision_schema_ok() -> tuple[bool, str]:
             return False, "; ".join(parts)
         return True, "Vision schema allineato"
 
-    repo_root = Path(__file__).resolve().parents[2]
+    repo_root = _repo_root()
     schema_path = _resolve_schema_path(repo_root)
 
     ok, payload = _load_schema_text(repo_root, schema_path)
@@ -196,15 +196,6 @@ def _collect_schema_checks() -> list[CheckItem]:
     return [("Vision schema", schema_ok, schema_msg)]
 
 
-def _collect_docker_and_pipeline_checks() -> tuple[list[CheckItem], bool]:
-    docker_ok, hint = _docker_ok()
-    pipe_ok, pipe_hint = _pipeline_origin_ok()
-    return [
-        ("Docker", docker_ok, hint or "OK"),
-        ("Pipeline install", pipe_ok, pipe_hint),
-    ], docker_ok
-
-
 def _collect_dependency_checks() -> list[CheckItem]:
     return _run_optional_import_checks(DEPENDENCY_CHECKS)
 
@@ -247,28 +238,182 @@ def _collect_port_check(docker_ok: bool) -> bool:
     return _port_in_use(port_num) if docker_ok else False
 
 
-def run_preflight() -> tuple[List[CheckItem], bool]:
-    """Esegue i check di preflight (import-safe, dipendenze, schema, porte)."""
-    _logger().info("ui.preflight.run_start")
-    _maybe_load_dotenv()
-    results: List[CheckItem] = []
+# ---------------------------------------------------------------------------
+# Cache per-ambiente dei check stabili (schema, origine pipeline, dipendenze)
+# ---------------------------------------------------------------------------
+#
+# I check che dipendono solo da interprete, pacchetti installati e sorgenti del repo sono
+# memorizzati (in processo e in `.timmy_kb/preflight_cache.json`) sotto un'impronta
+# dell'ambiente; Docker, porta, chiave OpenAI e attestazione restano sempre live.
+
+PREFLIGHT_CACHE_RELATIVE_PATH = Path(".timmy_kb") / "preflight_cache.json"
+_CACHE_VERSION = 1
+_STABLE_CACHE: dict[str, dict[str, list[CheckItem]]] = {}
+_STABLE_CACHE_LOCK = threading.Lock()
 
-    results.extend(_collect_attestation_checks())
-    results.extend(_collect_schema_checks())
 
-    docker_and_pipe_checks, docker_ok = _collect_docker_and_pipeline_checks()
-    results.extend(docker_and_pipe_checks)
+def _repo_root() -> Path:
+    """Root del repo via SSoT (`REPO_ROOT_DIR` prima dei sentinel); fallback: albero dei sorgenti."""
+    from ui.utils.repo_root import get_repo_root
 
-    results.extend(_collect_dependency_checks())
-    results.extend(_collect_env_checks())
+    try:
+        return get_repo_root()
+    except ConfigError:
+        return Path(__file__).resolve().parents[2]
+
+
+def _cache_path() -> Optional[Path]:
+    from pipeline.path_utils import ensure_within_and_resolve
+
+    root = _repo_root()
+    try:
+        return cast(Path, ensure_within_and_resolve(root, root / PREFLIGHT_CACHE_RELATIVE_PATH))
+    except Exception:
+        return None
+
+
+def _mtime_ns(path: str | Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _environment_fingerprint() -> str:
+    """Impronta di interprete, search path (install/uninstall cambiano l'mtime) e input dei check stabili."""
+    repo_root = _repo_root()
+    parts: list[str] = [
+        sys.executable,
+        sys.version,
+        sys.prefix,
+        json.dumps(DEPENDENCY_CHECKS),
+        str(_mtime_ns(Path(__file__))),
+        str(_mtime_ns(repo_root / "src" / "ai" / "schemas" / "VisionOutput.schema.json")),
+    ]
+    for entry in sys.path:
+        parts.append(f"{entry}:{_mtime_ns(entry or '.')}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _load_cached_stable(fingerprint: str) -> Optional[dict[str, list[CheckItem]]]:
+    with _STABLE_CACHE_LOCK:
+        cached = _STABLE_CACHE.get(fingerprint)
+    if cached is not None:
+        return cached
+    cache_path = _cache_path()
+    if cache_path is None or not cache_path.is_file():
+        return None
+    try:
+        from pipeline.path_utils import read_text_safe
+
+        payload = json.loads(read_text_safe(cache_path.parent, cache_path, encoding="utf-8"))
+        if payload.get("version") != _CACHE_VERSION or payload.get("fingerprint") != fingerprint:
+            return None
+        stable = {
+            group: [(str(name), bool(ok), str(hint)) for name, ok, hint in items]
+            for group, items in payload["checks"].items()
+        }
+    except Exception as exc:
+        _logger().debug("ui.preflight.cache_invalid", extra={"file_path": str(cache_path), "error": repr(exc)})
+        return None
+    with _STABLE_CACHE_LOCK:
+        _STABLE_CACHE[fingerprint] = stable
+    return stable
+
+
+def _store_cached_stable(fingerprint: str, stable: dict[str, list[CheckItem]]) -> None:
+    with _STABLE_CACHE_LOCK:
+        _STABLE_CACHE.clear()
+        _STABLE_CACHE[fingerprint] = stable
+    cache_path = _cache_path()
+    if cache_path is None:
+        return
+    try:
+        from pipeline.file_utils import safe_write_text
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": _CACHE_VERSION, "fingerprint": fingerprint, "checks": stable}
+        safe_write_text(cache_path, json.dumps(payload, ensure_ascii=False), encoding="utf-8", atomic=True)
+    except Exception as exc:
+        _logger().debug("ui.preflight.cache_write_failed", extra={"file_path": str(cache_path), "error": repr(exc)})
+
+
+def invalidate_preflight_cache() -> None:
+    """Svuota la cache in processo e rimuove quella su disco."""
+    with _STABLE_CACHE_LOCK:
+        _STABLE_CACHE.clear()
+    cache_path = _cache_path()
+    if cache_path is not None:
+        try:
+            cache_path.unlink(missing_ok=True)
+        except OSError as exc:
+            _logger().debug(
+                "ui.preflight.cache_remove_failed", extra={"file_path": str(cache_path), "error": repr(exc)}
+            )
+
+
+def _collect_stable_checks() -> dict[str, list[CheckItem]]:
+    pipe_ok, pipe_hint = _pipeline_origin_ok()
+    return {
+        "schema": _collect_schema_checks(),
+        "pipeline": [("Pipeline install", pipe_ok, pipe_hint)],
+        "dependencies": _collect_dependency_checks(),
+    }
+
+
+def _collect_docker_checks() -> tuple[list[CheckItem], bool]:
+    docker_ok, hint = _docker_ok()
+    return [("Docker", docker_ok, hint or "OK")], _collect_port_check(docker_ok)
+
+
+def run_preflight(*, use_cache: bool = True) -> tuple[List[CheckItem], bool]:
+    """Esegue i check di preflight (import-safe, dipendenze, schema, porte).
+
+    I check indipendenti girano in parallelo (Docker, attestazione, check stabili); le
+    dipendenze sono verificate via spec senza importarle. Con `use_cache=True` i check
+    stabili vengono riusati finché l'impronta dell'ambiente non cambia.
+    """
+    started = time.perf_counter()
+    _logger().info("ui.preflight.run_start")
+    _maybe_load_dotenv()
 
-    port_busy = _collect_port_check(docker_ok)
+    fingerprint = _environment_fingerprint() if use_cache else ""
+    stable = _load_cached_stable(fingerprint) if use_cache else None
+    cache_hit = stable is not None
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="preflight") as pool:
+        docker_future = pool.submit(_collect_docker_checks)
+        attestation_future = pool.submit(_collect_attestation_checks)
+        stable_future = pool.submit(_collect_stable_checks) if stable is None else None
+        # La chiave OpenAI può leggere st.secrets: resta sul thread dello script.
+        env_checks = _collect_env_checks()
+        docker_checks, port_busy = docker_future.result()
+        attestation_checks = attestation_future.result()
+        if stable_future is not None:
+            stable = stable_future.result()
+    stable = cast(dict[str, list[CheckItem]], stable)
+    if use_cache and not cache_hit:
+        _store_cached_stable(fingerprint, stable)
+
+    results: List[CheckItem] = [
+        *attestation_checks,
+        *stable["schema"],
+        *docker_checks,
+        *stable["pipeline"],
+        *stable["dependencies"],
+        *env_checks,
+    ]
     for name, ok, hint in results:
         if not ok:
             _logger().warning("ui.preflight.check_failed", extra={"check": name, "hint": hint})
 
     _logger().info(
         "ui.preflight.run_complete",
-        extra={"checks": len(results), "port_busy": port_busy},
+        extra={
+            "checks": len(results),
+            "port_busy": port_busy,
+            "cache": "hit" if cache_hit else ("miss" if use_cache else "off"),
+            "ms": int((time.perf_counter() - started) * 1000),
+        },
     )
     return results, port_busy
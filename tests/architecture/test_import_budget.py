@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import pytest
+
+from tools.import_budget import ENTRYPOINT_BUDGETS_MS, format_violation, measure_entrypoint, parse_importtime
+
+pytestmark = pytest.mark.arch
+
+
+def test_parse_importtime_reads_cumulative_microseconds() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     yaml.error\n"
+        "import time:      2000 |       5300 |   pipeline.context\n"
+        "import time:        90 |      91000 | timmy_kb.cli.retriever\n"
+    )
+    assert parse_importtime(stderr) == {"yaml.error": 120, "pipeline.context": 5300, "timmy_kb.cli.retriever": 91000}
+
+
+@pytest.mark.parametrize("entrypoint", sorted(ENTRYPOINT_BUDGETS_MS))
+def test_entrypoint_import_budget(entrypoint: str) -> None:
+    measure = measure_entrypoint(entrypoint, budget_ms=ENTRYPOINT_BUDGETS_MS[entrypoint], runs=3)
+    assert measure.ok, format_violation(measure)
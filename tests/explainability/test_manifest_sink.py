@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from explainability.manifest_sink import AsyncManifestSink
+from timmy_kb.cli.retriever import QueryParams, configure_manifest_sink, search
+
+
+class _DummyEmbeddingsClient:
+    def embed_texts(self, texts: list[str], *, model: str | None = None) -> list[list[float]]:
+        return [[1.0, 0.0] for _ in texts]
+
+
+def _candidates(*_: Any, **__: Any) -> list[dict[str, Any]]:
+    return [{"content": "a", "meta": {"lineage": {"source_id": "s1"}}, "embedding": [1.0, 0.0]}]
+
+
+@pytest.fixture()
+def sink_jsonl() -> Iterator[AsyncManifestSink]:
+    sink = AsyncManifestSink(store="jsonl", batch_size=8)
+    previous = configure_manifest_sink(sink)
+    try:
+        yield sink
+    finally:
+        configure_manifest_sink(previous)
+        sink.close()
+
+
+def test_search_queues_manifest_and_flush_writes_jsonl(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture, sink_jsonl: AsyncManifestSink
+) -> None:
+    monkeypatch.setattr("timmy_kb.cli.retriever.fetch_candidates", _candidates, raising=True)
+    params = QueryParams(db_path=tmp_path / "kb.sqlite", slug="dummy", scope="kb", query="q", k=1)
+
+    with caplog.at_level(logging.INFO):
+        for idx in range(5):
+            search(params, _DummyEmbeddingsClient(), response_id=f"r{idx}", explain_base_dir=tmp_path)
+    assert sink_jsonl.flush(timeout=5)
+
+    events = [rec for rec in caplog.records if rec.getMessage() == "retriever.response.manifest"]
+    assert [getattr(rec, "queued") for rec in events] == [True] * 5
+    (jsonl,) = tmp_path.glob("manifests-*.jsonl")
+    assert Path(getattr(events[0], "manifest_path")) == jsonl
+    rows = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+    assert [row["response_id"] for row in rows] == [f"r{idx}" for idx in range(5)]
+    assert rows[0]["lineage_refs"][0]["source_id"] == "s1"
+    assert sink_jsonl.stats() == {"enqueued": 5, "written": 5, "dropped": 0, "failed": 0, "queue_depth": 0}
+
+
+def test_sink_drops_when_queue_full_and_close_drains(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    gate = threading.Event()
+    written: list[str] = []
+
+    def _slow_write(manifest: Any, *, output_dir: Path, response_id: str) -> Path:
+        gate.wait(5)
+        written.append(response_id)
+        return output_dir / f"{response_id}.json"
+
+    monkeypatch.setattr("explainability.manifest_sink.safe_write_manifest", _slow_write, raising=True)
+    sink = AsyncManifestSink(store="files", max_queue=2, batch_size=1)
+
+    accepted = [sink.submit({"response_id": f"r{idx}"}, output_dir=tmp_path, response_id=f"r{idx}") for idx in range(6)]
+    gate.set()
+    sink.close()
+
+    # Al più un manifest è in scrittura (batch 1) e due restano in coda: il resto viene scartato.
+    assert accepted[:2] == [True, True]
+    assert written == [f"r{idx}" for idx, ok in enumerate(accepted) if ok]
+    stats = sink.stats()
+    assert stats["dropped"] == accepted.count(False) >= 3
+    assert stats["written"] == len(written)
+    assert not sink.submit({}, output_dir=tmp_path, response_id="late")
+
+
+def test_sink_close_waits_for_in_flight_submit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    written: list[str] = []
+    monkeypatch.setattr(
+        "explainability.manifest_sink.safe_write_manifest",
+        lambda manifest, *, output_dir, response_id: written.append(response_id) or output_dir / response_id,
+        raising=True,
+    )
+    sink = AsyncManifestSink(store="files")
+    assert sink.submit({}, output_dir=tmp_path, response_id="r0")
+    real_put = sink._queue.put_nowait
+    closer = threading.Thread(target=sink.close)
+
+    def _put_racing_close(item: Any) -> None:
+        # close() parte fra il controllo di `_closed` e l'accodamento.
+        closer.start()
+        closer.join(0.2)
+        real_put(item)
+
+    monkeypatch.setattr(sink._queue, "put_nowait", _put_racing_close)
+    assert sink.submit({}, output_dir=tmp_path, response_id="r1")
+    closer.join(5)
+
+    # close() attende l'accodamento in corso: il manifest accettato precede `_STOP` ed è scritto.
+    assert written == ["r0", "r1"]
+    assert sink.stats()["queue_depth"] == 0
+
+
+def test_jsonl_sink_survives_unserializable_manifest(tmp_path: Path) -> None:
+    sink = AsyncManifestSink(store="jsonl", max_queue=2, batch_size=1)
+    try:
+        assert sink.submit({"bad": object()}, output_dir=tmp_path, response_id="bad")
+        assert sink.flush(5)
+        for idx in range(3):
+            assert sink.submit({"response_id": f"ok{idx}"}, output_dir=tmp_path, response_id=f"ok{idx}")
+            assert sink.flush(5)
+    finally:
+        sink.close(timeout=5)
+
+    rows = [json.loads(line) for path in tmp_path.glob("manifests-*.jsonl") for line in path.read_text().splitlines()]
+    assert [row["response_id"] for row in rows] == ["ok0", "ok1", "ok2"]
+    stats = sink.stats()
+    assert (stats["failed"], stats["written"], stats["dropped"]) == (1, 3, 0)
+
+
+def test_close_does_not_hang_when_writer_is_dead(tmp_path: Path) -> None:
+    sink = AsyncManifestSink(store="files", max_queue=1)
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    sink._thread = dead
+    sink._queue.put_nowait(({}, tmp_path, "orfano", 0.0))  # coda piena, nessuno la svuota
+
+    closer = threading.Thread(target=sink.close, kwargs={"timeout": 0.2})
+    closer.start()
+    closer.join(5)
+    assert not closer.is_alive()
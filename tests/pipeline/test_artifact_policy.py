@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from pipeline import normalized_index
+from pipeline.artifact_policy import enforce_core_artifacts
+from pipeline.exceptions import ArtifactPolicyViolation
+from pipeline.workspace_layout import WorkspaceLayout
+from tests.utils.workspace import ensure_minimal_workspace_layout
+
+
+def _layout(tmp_path: Path) -> WorkspaceLayout:
+    base = tmp_path / "ws"
+    ensure_minimal_workspace_layout(base, client_name="dummy")
+    (base / "config" / "ledger.db").write_bytes(b"")
+    return WorkspaceLayout.from_workspace(base, slug="dummy")
+
+
+def test_semantic_onboarding_reports_missing_and_non_file_artifacts(tmp_path: Path) -> None:
+    layout = _layout(tmp_path)
+    (layout.book_dir / "SUMMARY.md").unlink()
+    (layout.book_dir / "SUMMARY.md").mkdir()
+    (layout.config_path.parent / "ledger.db").unlink()
+
+    with pytest.raises(ArtifactPolicyViolation) as excinfo:
+        enforce_core_artifacts("semantic_onboarding", layout=layout)
+    assert excinfo.value.evidence_refs[1:] == [
+        "artifact:book/SUMMARY.md:not_a_file",
+        "artifact:config/ledger.db:missing",
+        "artifact:book/<content>.md:missing",
+    ]
+
+    (layout.book_dir / "SUMMARY.md").rmdir()
+    (layout.book_dir / "SUMMARY.md").write_text("# Summary\n", encoding="utf-8")
+    (layout.config_path.parent / "ledger.db").write_bytes(b"")
+    nested = layout.book_dir / "area" / "sub"
+    nested.mkdir(parents=True)
+    (nested / "doc.md").write_text("# Doc\n", encoding="utf-8")
+    enforce_core_artifacts("semantic_onboarding", layout=layout)
+
+
+def test_raw_ingest_checks_index_records_against_one_scan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    layout = _layout(tmp_path)
+    records = []
+    for idx in range(300):
+        rel = f"area-{idx % 7}/doc-{idx}.md"
+        target = layout.normalized_dir / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("x", encoding="utf-8")
+        records.append({"status": "OK", "normalized_path": rel})
+    records.append({"status": "SKIP", "normalized_path": None})
+    index_path = layout.normalized_dir / "INDEX.json"
+    index_path.write_text(json.dumps(records), encoding="utf-8")
+
+    resolved: list[Path] = []
+    original = normalized_index.ensure_within_and_resolve
+
+    def _counting(base: Path, candidate: Path) -> Path:
+        resolved.append(candidate)
+        return original(base, candidate)
+
+    monkeypatch.setattr(normalized_index, "ensure_within_and_resolve", _counting)
+    enforce_core_artifacts("raw_ingest", layout=layout)
+    # Solo INDEX.json viene risolto: i record OK sono verificati sulla scansione.
+    assert resolved == [index_path]
+
+    index_path.write_text(json.dumps([*records, {"status": "OK", "normalized_path": "gone.md"}]), encoding="utf-8")
+    with pytest.raises(ArtifactPolicyViolation) as excinfo:
+        enforce_core_artifacts("raw_ingest", layout=layout)
+    assert excinfo.value.evidence_refs[1:] == ["artifact:normalized/INDEX.json:index_invalid"]
@@ -57,3 +57,20 @@ Body B
     meta3, body3 = read_frontmatter(base, md, encoding="utf-8", use_cache=True)
     assert meta3.get("title") == "Hello2"
     assert "Body B" in body3
+
+
+def test_frontmatter_cache_is_consistent_under_concurrent_reads(tmp_path: Path) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from pipeline.frontmatter_utils import clear_frontmatter_cache
+
+    base = tmp_path / "ws"
+    paths = [base / "book" / f"doc{idx}.md" for idx in range(20)]
+    for idx, md in enumerate(paths):
+        _write(md, f"---\ntitle: Doc {idx}\n---\nBody {idx}\n")
+    clear_frontmatter_cache()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda md: read_frontmatter(base, md, use_cache=True), paths * 5))
+
+    assert [meta["title"] for meta, _ in results] == [f"Doc {idx}" for idx in range(20)] * 5
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import pytest
+import yaml
+
+import ui.config_store as config_store
+from pipeline.settings_snapshot import SettingsSnapshotCache, invalidate_settings_snapshots, settings_snapshot_stats
+
+
+def _write_config(path: Path, limit: int, *, age_s: float = 60.0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"pipeline": {"retriever": {"auto_by_budget": True, "throttle": {"candidate_limit": limit}}}}
+    path.write_text(yaml.safe_dump(payload), encoding="utf-8")
+    past = time.time() - age_s
+    os.utime(path, (past, past))
+
+
+def test_snapshot_reloads_only_when_file_changes(tmp_path: Path) -> None:
+    cfg = tmp_path / "config" / "config.yaml"
+    _write_config(cfg, 3000)
+    cache = SettingsSnapshotCache()
+
+    first = cache.get("acme", cfg, repo_root=tmp_path)
+    second = cache.get("acme", cfg, repo_root=tmp_path)
+    assert second is first
+    assert first.retriever.throttle.candidate_limit == 3000
+    copy = first.as_dict()
+    copy["pipeline"]["retriever"]["throttle"]["candidate_limit"] = 1
+    assert first.settings.data["pipeline"]["retriever"]["throttle"]["candidate_limit"] == 3000
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    _write_config(cfg, 6000, age_s=30.0)
+    assert cache.get("acme", cfg, repo_root=tmp_path).retriever.throttle.candidate_limit == 6000
+    assert cache.stats()["misses"] == 2
+
+    # Appena scritto (mtime nella finestra "racy"): niente cache, ogni lettura ricarica.
+    _write_config(cfg, 7000, age_s=0.0)
+    cache.get("acme", cfg, repo_root=tmp_path)
+    cache.get("acme", cfg, repo_root=tmp_path)
+    assert cache.stats()["misses"] == 4
+
+
+@pytest.fixture()
+def client_workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[tuple[Path, list[str]]]:
+    cfg = tmp_path / "config" / "config.yaml"
+    _write_config(cfg, 3000)
+    loads: list[str] = []
+
+    def _load(*, slug: str, **_kwargs: Any) -> Any:
+        loads.append(slug)
+        return SimpleNamespace(repo_root_dir=tmp_path, config_path=cfg)
+
+    monkeypatch.setattr(config_store.ClientContext, "load", _load)
+    config_store.invalidate_client_config_cache()
+    try:
+        yield cfg, loads
+    finally:
+        config_store.invalidate_client_config_cache()
+
+
+def test_get_retriever_settings_reuses_context_and_snapshot(client_workspace: tuple[Path, list[str]]) -> None:
+    cfg, loads = client_workspace
+    invalidate_settings_snapshots()
+    before = settings_snapshot_stats()
+
+    assert config_store.get_retriever_settings("acme") == (3000, 0, True)
+    assert config_store.get_retriever_settings("acme") == (3000, 0, True)
+    stats = settings_snapshot_stats()
+    assert loads == ["acme"]
+    assert (stats["hits"] - before["hits"], stats["misses"] - before["misses"]) == (1, 1)
+
+    config_store.set_retriever_settings(5000, 300, False, slug="acme")
+    assert (
+        yaml.safe_load(cfg.read_text(encoding="utf-8"))["pipeline"]["retriever"]["throttle"]["candidate_limit"] == 5000
+    )
+    assert config_store.get_retriever_settings("acme") == (5000, 300, False)
+    assert loads == ["acme"]
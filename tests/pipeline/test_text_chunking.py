@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+from typing import Sequence
+
+import pytest
+
+from pipeline.text_chunking import (
+    iter_char_window_chunks,
+    iter_markdown_heading_segments,
+    iter_token_window_chunks,
+    iter_window_spans,
+)
+
+
+class _ByteEncoder:
+    """Encoder fittizio: un token per byte UTF-8 (i caratteri multi-byte finiscono su più token)."""
+
+    def encode(self, text: str) -> list[int]:
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+    def decode_bytes(self, tokens: Sequence[int]) -> bytes:
+        return bytes(tokens)
+
+    def decode_single_token_bytes(self, token: int) -> bytes:
+        return bytes([token])
+
+
+class _DecodeOnlyEncoder:
+    def encode(self, text: str) -> list[int]:
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+
+def _legacy_chunks(text: str, enc: _ByteEncoder | _DecodeOnlyEncoder, target: int, overlap: int) -> list[str]:
+    tokens = enc.encode(text)
+    step = max(1, target - overlap)
+    return [enc.decode(tokens[i : i + target]) for i in range(0, len(tokens), step)]
+
+
+def test_window_spans_match_legacy_range_semantics() -> None:
+    assert list(iter_window_spans(10, size=4, overlap=1)) == [(0, 4), (3, 7), (6, 10), (9, 10)]
+    assert list(iter_window_spans(0, size=4)) == []
+    with pytest.raises(ValueError):
+        list(iter_window_spans(3, size=0))
+
+
+@pytest.mark.parametrize("target,overlap", [(7, 2), (16, 0), (5, 5)])
+def test_token_windows_match_legacy_decode_on_ascii(target: int, overlap: int) -> None:
+    text = "lorem ipsum dolor sit amet, consectetur adipiscing elit " * 9
+    enc = _ByteEncoder()
+
+    chunks = iter_token_window_chunks(text, encoder=enc, target_tokens=target, overlap_tokens=overlap)
+
+    assert not isinstance(chunks, list)
+    assert list(chunks) == _legacy_chunks(text, enc, target, overlap)
+
+
+def test_token_windows_keep_multibyte_chars_whole() -> None:
+    text = "caffè perché città"
+    chunks = list(iter_token_window_chunks(text, encoder=_ByteEncoder(), target_tokens=5, overlap_tokens=0))
+
+    assert "".join(chunks) == text
+    assert all("\ufffd" not in chunk for chunk in chunks)
+    # Con overlap i confini a metà carattere restano allineati all'inizio del carattere.
+    overlapped = list(iter_token_window_chunks(text, encoder=_ByteEncoder(), target_tokens=4, overlap_tokens=1))
+    assert overlapped[0] == "caff"
+    assert overlapped[1] == "fè "
+    assert all("\ufffd" not in chunk for chunk in overlapped)
+
+
+def test_token_windows_fallback_without_offsets_api() -> None:
+    text = "alpha beta gamma delta epsilon"
+    enc = _DecodeOnlyEncoder()
+
+    assert list(iter_token_window_chunks(text, encoder=enc, target_tokens=6, overlap_tokens=2)) == _legacy_chunks(
+        text, enc, 6, 2
+    )
+    assert list(iter_token_window_chunks("", encoder=enc)) == []
+
+
+def test_char_windows_and_heading_segments() -> None:
+    assert list(iter_char_window_chunks("abcdefg", size=3)) == ["abc", "def", "g"]
+
+    md = "intro\n# Uno\ntesto 1\n\n## Due\r\ntesto 2\n"
+    assert list(iter_markdown_heading_segments(md)) == [
+        (None, "intro"),
+        ("Uno", "# Uno\ntesto 1"),
+        ("Due", "## Due\ntesto 2"),
+    ]
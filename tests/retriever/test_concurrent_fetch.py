@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Sequence
+
+import pytest
+
+from timmy_kb.cli import retriever, retriever_embeddings
+
+_CANDIDATES = [
+    {"content": "alpha", "meta": {}, "embedding": [1.0, 0.0]},
+    {"content": "beta", "meta": {}, "embedding": [0.0, 1.0]},
+]
+
+
+def _params(tmp_path: Path) -> retriever.QueryParams:
+    return retriever.QueryParams(
+        db_path=(tmp_path / "kb.sqlite").resolve(),
+        slug="dummy",
+        scope="kb",
+        query="hello",
+        k=1,
+        candidate_limit=retriever.MIN_CANDIDATE_LIMIT,
+    )
+
+
+class _Rendezvous:
+    """Embedding e fetch si attendono a vicenda: completano solo se eseguiti in parallelo."""
+
+    def __init__(self) -> None:
+        self.embed_started = threading.Event()
+        self.fetch_started = threading.Event()
+
+    def fetch(self, *_a: Any, **_k: Any) -> list[dict[str, Any]]:
+        self.fetch_started.set()
+        assert self.embed_started.wait(timeout=5)
+        return list(_CANDIDATES)
+
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        self.embed_started.set()
+        assert self.fetch_started.wait(timeout=5)
+        return [[1.0, 0.0]]
+
+
+@pytest.mark.parametrize("module", [retriever, retriever_embeddings])
+def test_concurrent_fetch_overlaps_embedding_and_fetch(
+    module: Any, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    rendezvous = _Rendezvous()
+    monkeypatch.setattr(module, "fetch_candidates", rendezvous.fetch)
+    caplog.set_level(logging.INFO, logger=module.LOGGER.name)
+
+    out = module.search(_params(tmp_path), rendezvous, concurrent_fetch=True)
+
+    assert [item["content"] for item in out] == ["alpha"]
+    messages = [rec.getMessage() for rec in caplog.records]
+    assert messages.index("retriever.query.embedded") < messages.index("retriever.candidates.fetched")
+
+
+@pytest.mark.parametrize("module", [retriever, retriever_embeddings])
+def test_concurrent_fetch_join_respects_deadline(
+    module: Any, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    release = threading.Event()
+
+    def _slow_fetch(*_a: Any, **_k: Any) -> list[dict[str, Any]]:
+        release.wait(timeout=5)
+        return list(_CANDIDATES)
+
+    class _FastEmb:
+        def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+            return [[1.0, 0.0]]
+
+    monkeypatch.setattr(module, "_throttle_guard", lambda *_a, **_k: nullcontext())
+    monkeypatch.setattr(module, "fetch_candidates", _slow_fetch)
+    caplog.set_level(logging.INFO, logger=module.LOGGER.name)
+
+    try:
+        out = module.search(
+            _params(tmp_path),
+            _FastEmb(),
+            throttle=retriever.ThrottleSettings(latency_budget_ms=150),
+            concurrent_fetch=True,
+        )
+    finally:
+        release.set()
+
+    assert out == []
+    hits = [rec for rec in caplog.records if rec.getMessage() == "retriever.latency_budget.hit"]
+    assert [getattr(rec, "stage", None) for rec in hits] == ["fetch_candidates"]
+    assert "retriever.candidates.fetched" not in [rec.getMessage() for rec in caplog.records]
@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+import storage.kb_db as kb
+from timmy_kb.cli.retriever import (
+    QueryParams,
+    preview_effective_candidate_limit,
+    search,
+    search_many,
+    with_config_or_budget,
+)
+from timmy_kb.cli.retriever_budget import LimitCalibrator, calibration_path_for, configure_limit_calibrator
+from tools.retriever_calibrate import seed_limit_calibration
+
+_AUTO = {"retriever": {"auto_by_budget": True, "throttle": {"latency_budget_ms": 250, "adaptive_limit": True}}}
+
+
+@pytest.fixture()
+def calibrator() -> Iterator[LimitCalibrator]:
+    fresh = LimitCalibrator(min_samples=3)
+    previous = configure_limit_calibrator(fresh)
+    try:
+        yield fresh
+    finally:
+        configure_limit_calibrator(previous)
+
+
+def test_suggest_limit_uses_ewma_and_needs_min_samples(tmp_path: Path, calibrator: LimitCalibrator) -> None:
+    db = tmp_path / "kb.sqlite"
+    # 1000 candidati: fetch 20ms + score 30ms => 0.05 ms/candidato; embedding 40ms.
+    for _ in range(2):
+        assert calibrator.observe(db, "kb", candidates=1000, fetch_ms=20.0, score_ms=30.0, embed_ms=40.0)
+    assert calibrator.suggest_limit(db, "kb", 250) is None
+    assert not calibrator.observe(db, "kb", candidates=10, fetch_ms=500.0, score_ms=500.0)
+    # Ranking interrotto dalla deadline: pochi candidati valutati, campione scartato.
+    assert not calibrator.observe(db, "kb", candidates=1000, fetch_ms=20.0, score_ms=500.0, scored=50)
+    calibrator.observe(db, "kb", candidates=1000, fetch_ms=20.0, score_ms=30.0, embed_ms=40.0)
+
+    # (250 * 0.8 - 40) / 0.05 = 3200
+    assert calibrator.suggest_limit(db, "kb", 250) == 3200
+    assert calibrator.suggest_limit(db, "altro", 250) is None
+    assert calibrator.suggest_limit(db, "kb", 10_000) == 20000
+    assert calibrator.suggest_limit(db, "kb", 40) == 500
+
+    params = QueryParams(db_path=db, slug="p", scope="kb", query="q")
+    assert with_config_or_budget(params, _AUTO).candidate_limit == 3200
+    assert preview_effective_candidate_limit(params, _AUTO) == (3200, "auto_by_budget", 250)
+    fixed = {"retriever": {"auto_by_budget": True, "throttle": {"latency_budget_ms": 250, "adaptive_limit": False}}}
+    assert with_config_or_budget(params, fixed).candidate_limit == 2000
+    # Opt-in: senza `adaptive_limit` auto_by_budget resta sulla tabella fissa.
+    legacy = {"retriever": {"auto_by_budget": True, "throttle": {"latency_budget_ms": 250}}}
+    assert with_config_or_budget(params, legacy).candidate_limit == 2000
+    # Senza misure per (db, scope) resta la tabella fissa.
+    other = QueryParams(db_path=tmp_path / "altro.sqlite", slug="p", scope="kb", query="q")
+    assert with_config_or_budget(other, _AUTO).candidate_limit == 2000
+
+
+def test_search_metrics_feed_calibrator(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, calibrator: LimitCalibrator, caplog: pytest.LogCaptureFixture
+) -> None:
+    class _Emb:
+        def embed_texts(self, texts: list[str], *, model: str | None = None) -> list[list[float]]:
+            return [[1.0, 0.0] for _ in texts]
+
+    def _candidates(*_: Any, **__: Any) -> list[dict[str, Any]]:
+        return [{"content": f"c{i}", "meta": {}, "embedding": [1.0, float(i)]} for i in range(200)]
+
+    monkeypatch.setattr("timmy_kb.cli.retriever.fetch_candidates", _candidates, raising=True)
+    db = tmp_path / "kb.sqlite"
+    params = QueryParams(db_path=db, slug="p", scope="kb", query="q", k=3)
+    for _ in range(3):
+        search(params, _Emb())
+
+    est = calibrator.estimate(db, "kb")
+    assert est is not None and est.samples == 3
+    with caplog.at_level(logging.INFO):
+        out = with_config_or_budget(params, _AUTO)
+    assert out.candidate_limit == calibrator.suggest_limit(db, "kb", 250)
+    sources = [rec for rec in caplog.records if rec.getMessage() == "retriever.limit.source"]
+    assert getattr(sources[-1], "calibrated") is True
+
+
+def test_batch_and_hybrid_searches_do_not_feed_calibrator(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, calibrator: LimitCalibrator
+) -> None:
+    class _Emb:
+        def embed_texts(self, texts: list[str], *, model: str | None = None) -> list[list[float]]:
+            return [[1.0, 0.0] for _ in texts]
+
+    def _candidates(*_: Any, **__: Any) -> list[dict[str, Any]]:
+        return [{"content": f"c{i}", "meta": {}, "embedding": [1.0, float(i)]} for i in range(200)]
+
+    monkeypatch.setattr("timmy_kb.cli.retriever.fetch_candidates", _candidates, raising=True)
+    db = tmp_path / "kb.sqlite"
+    params = QueryParams(db_path=db, slug="p", scope="kb", query="q", k=3)
+    search_many([params, params], _Emb())
+    assert calibrator.estimate(db, "kb") is None
+
+    def _boom(*_: Any, **__: Any) -> bool:
+        raise RuntimeError("calibrazione rotta")
+
+    monkeypatch.setattr(calibrator, "observe", _boom)
+    assert len(search(params, _Emb())) == 3
+
+
+def test_offline_seed_is_persisted_and_loaded(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    texts = [f"chunk {i}" for i in range(150)]
+    kb.insert_chunks("acme", "book", "a.md", "v1", {}, texts, [[1.0, float(i)] for i in range(150)], db_path=db)
+
+    path = seed_limit_calibration(
+        slug="acme", scope="book", db_path=db, limits=[500, 1000], repetitions=3, log=logging.getLogger("test")
+    )
+
+    assert path == calibration_path_for(db) and path.is_file()
+    loaded = LimitCalibrator(min_samples=1)
+    est = loaded.estimate(db, "book")
+    assert est is not None and est.samples == 6
+    assert est.fetch_ms_per_candidate > 0
+    assert loaded.suggest_limit(db, "book", 300) is not None
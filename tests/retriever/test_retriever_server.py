@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Sequence
+
+import pytest
+
+import storage.kb_db as kb
+from pipeline.exceptions import RetrieverError
+from timmy_kb.cli.retriever_server import RetrieverClient, RetrieverService, serve
+
+_TOKEN = "segreto"  # noqa: S105 - token fittizio del test
+
+
+class _AxisEmb:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        self.calls += 1
+        return [[1.0, 0.0] for _ in texts]
+
+
+def test_pool_candidate_cache_hits_and_invalidates_on_commit(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    kb.insert_chunks("p", "s", "a.md", "v1", {}, ["uno", "due"], [[1.0, 0.0], [0.0, 1.0]], db_path=db)
+
+    with kb.KbConnectionPool(db, candidate_cache_size=4) as pool:
+        first = list(kb.fetch_candidates("p", "s", db_path=db, pool=pool))
+        first[0]["score"] = 1.0  # annotazioni del chiamante non sporcano la cache
+        second = list(kb.fetch_candidates("p", "s", db_path=db, pool=pool))
+        assert [c["content"] for c in second] == ["due", "uno"]
+        assert "score" not in second[0]
+        assert (pool.cache_hits, pool.cache_misses) == (1, 1)
+
+        # Commit da un'altra connessione (altro processo): la firma del DB cambia.
+        kb.insert_chunks("p", "s", "b.md", "v1", {}, ["tre"], [[1.0, 1.0]], db_path=db)
+        third = list(kb.fetch_candidates("p", "s", db_path=db, pool=pool))
+        assert [c["content"] for c in third] == ["tre", "due", "uno"]
+        assert pool.cache_misses == 2
+
+
+def test_pool_candidate_cache_is_bounded_by_rows(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    kb.insert_chunks("p", "s", "a.md", "v1", {}, ["uno", "due", "tre"], [[1.0, 0.0]] * 3, db_path=db)
+    kb.insert_chunks("p", "t", "b.md", "v1", {}, ["quattro", "cinque"], [[0.0, 1.0]] * 2, db_path=db)
+
+    with kb.KbConnectionPool(db, candidate_cache_size=8, candidate_cache_max_rows=4) as pool:
+        list(kb.fetch_candidates("p", "s", db_path=db, pool=pool))
+        assert pool.cached_row_count == 3
+        # Le due voci insieme superano 4 righe: la meno recente esce.
+        list(kb.fetch_candidates("p", "t", db_path=db, pool=pool))
+        assert pool.cached_row_count == 2
+        list(kb.fetch_candidates("p", "t", db_path=db, pool=pool))
+        assert pool.cache_hits == 1
+
+    with kb.KbConnectionPool(db, candidate_cache_size=8, candidate_cache_max_rows=2) as pool:
+        list(kb.fetch_candidates("p", "s", db_path=db, pool=pool))
+        assert pool.cached_row_count == 0  # risultato più grande del limite: non memorizzato
+
+
+def test_service_evicts_workspaces_and_reloads_config(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    kb.insert_chunks("acme", "kb", "a.md", "v1", {}, ["contratto"], [[1.0, 0.0]], db_path=db)
+    current: dict[str, Any] = {"retriever": {"throttle": {"candidate_limit": 500}}}
+    resolved: list[str] = []
+
+    def _resolve(slug: str) -> tuple[Path, Any]:
+        resolved.append(slug)
+        return db, lambda: current
+
+    service = RetrieverService(embeddings_factory=_AxisEmb, resolve_workspace=_resolve, max_workspaces=2)
+    try:
+        first = service.workspace("acme")
+        assert first.config["retriever"]["throttle"]["candidate_limit"] == 500
+        current = {"retriever": {"throttle": {"candidate_limit": 700}}}
+        assert service.workspace("acme").config["retriever"]["throttle"]["candidate_limit"] == 700
+
+        service.workspace("beta")
+        service.workspace("gamma")
+        assert service.workspace_count == 2
+        assert service.workspace("acme") is not first
+        assert resolved == ["acme", "beta", "gamma", "acme"]
+    finally:
+        service.close()
+
+
+@pytest.fixture()
+def daemon(tmp_path: Path) -> Iterator[tuple[RetrieverClient, RetrieverService, _AxisEmb, list[str]]]:
+    db = tmp_path / "kb.sqlite"
+    meta = {"area": "legale"}
+    kb.insert_chunks("acme", "kb", "a.md", "v1", meta, ["contratto", "verbale"], [[1.0, 0.0], [0.0, 1.0]], db_path=db)
+    emb = _AxisEmb()
+    resolved: list[str] = []
+
+    def _resolve(slug: str) -> tuple[Path, Mapping[str, Any]]:
+        resolved.append(slug)
+        return db, {"retriever": {"throttle": {"candidate_limit": 500}}}
+
+    def _authorizer(params: Any) -> None:
+        if params.scope == "privato":
+            raise RetrieverError("scope non autorizzato")
+
+    service = RetrieverService(
+        embeddings_factory=lambda: emb, resolve_workspace=_resolve, authorizer=_authorizer, candidate_cache_size=8
+    )
+    server = serve(service, host="127.0.0.1", port=0, token=_TOKEN)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = RetrieverClient(f"http://127.0.0.1:{server.server_address[1]}", token=_TOKEN)
+        yield client, service, emb, resolved
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_daemon_search_roundtrip_reuses_warm_state(daemon: Any) -> None:
+    client, service, emb, resolved = daemon
+
+    assert client.health() == {"status": "ok", "workspaces": 0}
+    first = client.search("acme", "q", k=1)
+    again = client.search("acme", "q", k=1, filters={"area": "legale"})
+    many = client.search_many([{"slug": "acme", "query": "a", "k": 2}, {"slug": "acme", "query": "b", "k": 1}])
+
+    assert [r["content"] for r in first] == ["contratto"]
+    assert again == first
+    assert [[r["content"] for r in items] for items in many] == [["contratto", "verbale"], ["contratto"]]
+    assert resolved == ["acme"]
+    assert emb.calls == 3
+    assert service.workspace("acme").pool.cache_hits >= 1
+
+
+def test_daemon_maps_errors_and_enforces_token(daemon: Any) -> None:
+    client, _service, _emb, _resolved = daemon
+    base_url = client._base_url
+
+    with pytest.raises(RetrieverError) as excinfo:
+        client.search("acme", "q", scope="privato")
+    assert str(excinfo.value) == "scope non autorizzato"
+
+    with pytest.raises(RetrieverError) as excinfo:
+        client.search("acme", "q", filters={"colore": "rosso"})
+    assert str(excinfo.value) == "filtro metadati non supportato: colore"
+
+    with pytest.raises(RetrieverError) as excinfo:
+        RetrieverClient(base_url, token=_TOKEN + "-errato").health()
+    assert excinfo.value.code == "retriever_server_unauthorized"
+
+
+def test_search_many_resolves_config_and_throttle_per_workspace(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import timmy_kb.cli.retriever as retriever_mod
+
+    dbs = {"acme": tmp_path / "acme.sqlite", "beta": tmp_path / "beta.sqlite"}
+    for slug, db in dbs.items():
+        kb.insert_chunks(slug, "kb", "a.md", "v1", {}, [f"{slug}-doc"], [[1.0, 0.0]], db_path=db)
+    configs: dict[str, Mapping[str, Any]] = {
+        "acme": {"retriever": {"throttle": {"candidate_limit": 500, "latency_budget_ms": 0}}},
+        "beta": {"retriever": {"throttle": {"candidate_limit": 600}, "quantization": "int8"}},
+    }
+    batches: list[tuple[list[str], str | None]] = []
+    singles: list[tuple[str, bool]] = []
+    real_many = retriever_mod.search_many
+    real_single = retriever_mod.search_with_config
+
+    def _spy_many(params_list: Any, *args: Any, **kwargs: Any) -> Any:
+        batches.append(([p.query for p in params_list], kwargs.get("throttle_key")))
+        return real_many(params_list, *args, **kwargs)
+
+    def _spy_single(params: Any, config: Any, *args: Any, **kwargs: Any) -> Any:
+        singles.append((params.query, bool(kwargs.get("hybrid"))))
+        return real_single(params, config, *args, **kwargs)
+
+    monkeypatch.setattr(retriever_mod, "search_many", _spy_many)
+    monkeypatch.setattr(retriever_mod, "search_with_config", _spy_single)
+    service = RetrieverService(embeddings_factory=_AxisEmb, resolve_workspace=lambda s: (dbs[s], configs[s]))
+    try:
+        out = service.search_many(
+            [
+                {"slug": "acme", "query": "a1"},
+                {"slug": "beta", "query": "b1"},
+                {"slug": "acme", "query": "a2", "hybrid": True},
+                {"slug": "acme", "query": "a3"},
+            ]
+        )
+    finally:
+        service.close()
+
+    assert [[r["content"] for r in items] for items in out] == [["acme-doc"], ["beta-doc"], ["acme-doc"], ["acme-doc"]]
+    # Solo le query "plain" dello stesso workspace viaggiano insieme, con il throttle del proprio slug.
+    assert batches == [(["a1", "a3"], "acme::kb")]
+    # Query hybrid e workspace quantizzati passano da search_with_config, come /search.
+    assert sorted(singles) == [("a2", True), ("b1", False)]
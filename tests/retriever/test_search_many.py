@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Sequence
+
+import pytest
+
+from timmy_kb.cli import retriever, retriever_ranking
+
+_CANDIDATES = [
+    {"content": "c0", "meta": {"i": 0}, "embedding": [1.0, 0.0, 0.0]},
+    {"content": "c1", "meta": {"i": 1}, "embedding": [0.6, 0.8, 0.0]},
+    {"content": "c2", "meta": {"i": 2}, "embedding": [1.0, 0.0, 0.0]},
+    {"content": "c3", "meta": {"i": 3}, "embedding": None},
+    {"content": "c4", "meta": {"i": 4}, "embedding": [0.0, 0.0, 2.0]},
+    {"content": "c5", "meta": {"i": 5}, "embedding": [0.0, 1.0, 0.0]},
+]
+_QUERIES = {"x": [1.0, 0.0, 0.0], "y": [0.0, 1.0, 0.0], "xz": [1.0, 0.0, 1.0]}
+
+
+class _Emb:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [list(_QUERIES[text]) for text in texts]
+
+
+def _params(tmp_path: Path, query: str, *, k: int, limit: int = 500, scope: str = "kb") -> retriever.QueryParams:
+    return retriever.QueryParams(
+        db_path=(tmp_path / "kb.sqlite").resolve(),
+        slug="dummy",
+        scope=scope,
+        query=query,
+        k=k,
+        candidate_limit=max(retriever.MIN_CANDIDATE_LIMIT, limit),
+    )
+
+
+def _install_fetch(monkeypatch: pytest.MonkeyPatch, candidates: list[dict[str, Any]]) -> list[tuple[Any, ...]]:
+    calls: list[tuple[Any, ...]] = []
+
+    def _fetch(slug: str, scope: str, limit: int, db_path: Path) -> list[dict[str, Any]]:
+        calls.append((slug, scope, limit))
+        return [dict(c) for c in candidates[:limit]]
+
+    monkeypatch.setattr(retriever, "fetch_candidates", _fetch)
+    return calls
+
+
+def test_search_many_matches_single_search(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    fetch_calls = _install_fetch(monkeypatch, _CANDIDATES)
+    batch = [
+        _params(tmp_path, "x", k=2),
+        _params(tmp_path, "y", k=10),
+        _params(tmp_path, "xz", k=3),
+        _params(tmp_path, "x", k=4, scope="other"),
+    ]
+    emb = _Emb()
+
+    many = retriever.search_many(batch, emb)
+
+    assert emb.calls == [["x", "y", "xz", "x"]]
+    assert sorted(fetch_calls) == [("dummy", "kb", 500), ("dummy", "other", 500)]
+    for params, got in zip(batch, many, strict=True):
+        expected = retriever.search(params, _Emb())
+        assert [item["content"] for item in got] == [item["content"] for item in expected]
+        assert [item["score"] for item in got] == pytest.approx([item["score"] for item in expected])
+
+
+def test_search_many_skips_invalid_queries_and_soft_fails_embedding(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    _install_fetch(monkeypatch, _CANDIDATES)
+    emb = _Emb()
+    caplog.set_level(logging.INFO, logger=retriever.LOGGER.name)
+
+    out = retriever.search_many([_params(tmp_path, "x", k=0), _params(tmp_path, "   ", k=1)], emb)
+    assert out == [[], []]
+    assert emb.calls == []
+
+    class _Boom:
+        def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+            raise RuntimeError("down")
+
+    out = retriever.search_many([_params(tmp_path, "x", k=1), _params(tmp_path, "y", k=1)], _Boom())
+    assert out == [[], []]
+    failed = [rec for rec in caplog.records if rec.getMessage() == "retriever.query.embed_failed"]
+    assert len(failed) == 2
+
+
+def test_rank_candidates_batch_falls_back_on_mixed_dimensions() -> None:
+    candidates = [
+        {"content": "short", "meta": {}, "embedding": [1.0, 0.0]},
+        {"content": "long", "meta": {}, "embedding": [0.0, 1.0, 0.0]},
+    ]
+    ranked, _stats, _ms, evaluated = retriever_ranking._rank_candidates_batch(
+        [[0.0, 1.0, 0.0]], candidates, ks=[2], limits=[2]
+    )
+    expected = retriever_ranking._rank_candidates([0.0, 1.0, 0.0], candidates, 2)[0]
+
+    assert ranked == [expected]
+    assert evaluated == [2]
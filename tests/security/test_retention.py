@@ -5,7 +5,7 @@ import os
 import time
 from pathlib import Path
 
-from security.retention import purge_old_artifacts
+from security.retention import RetentionSweep, purge_old_artifacts, sweep_old_artifacts
 from tests._helpers.workspace_paths import local_workspace_dir
 
 
@@ -32,3 +32,54 @@ def test_purge_old_artifacts_removes_old_snapshot(tmp_path: Path) -> None:
 def test_purge_old_artifacts_handles_missing_base(tmp_path: Path) -> None:
     missing = tmp_path / "nope"
     assert purge_old_artifacts(missing, days=7) == 0
+
+
+def _age(path: Path, days: float) -> None:
+    ts = time.time() - days * 86400
+    os.utime(path, (ts, ts))
+
+
+def test_sweep_dry_run_reports_reclaimable_bytes_without_removing(tmp_path: Path) -> None:
+    perimeter_root = tmp_path / "ws"
+    semantic = perimeter_root / "semantic"
+    semantic.mkdir(parents=True)
+    for idx in range(5):
+        target = semantic / f"v{idx}.snapshot.txt"
+        target.write_text("x" * (idx + 1), encoding="utf-8")
+        _age(target, 10 if idx % 2 == 0 else 1)
+    (semantic / "notes.txt").write_text("skip", encoding="utf-8")
+    _age(semantic / "notes.txt", 30)
+
+    report = sweep_old_artifacts(perimeter_root, days=7, dry_run=True)
+
+    assert (report.complete, report.scanned, report.expired, report.removed) == (True, 5, 3, 0)
+    assert report.reclaimable_bytes == 1 + 3 + 5
+    assert len(list(semantic.glob("*.snapshot.txt"))) == 5
+
+
+def test_sweep_runs_in_count_bounded_slices_and_skips_symlinks(tmp_path: Path) -> None:
+    perimeter_root = tmp_path / "ws"
+    nested = perimeter_root / "semantic" / "archive" / "2024"
+    nested.mkdir(parents=True)
+    outside = tmp_path / "outside.snapshot.txt"
+    outside.write_text("keep", encoding="utf-8")
+    _age(outside, 30)
+    for idx in range(7):
+        target = nested / f"s{idx}.snapshot.txt"
+        target.write_text("old", encoding="utf-8")
+        _age(target, 30)
+    try:
+        (nested / "link.snapshot.txt").symlink_to(outside)
+    except OSError:  # pragma: no cover - symlink non disponibili (Windows senza privilegi)
+        pass
+
+    sweep = RetentionSweep(perimeter_root, 7, patterns=["semantic/**/*.snapshot.txt"], batch_size=2)
+    slices = 0
+    while not sweep.done:
+        sweep.run(max_files=3)
+        slices += 1
+
+    assert sweep.report.removed == 7
+    assert slices == 3
+    assert outside.exists()
+    assert not list(nested.glob("s*.snapshot.txt"))
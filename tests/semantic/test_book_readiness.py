@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from semantic import book_readiness
+from semantic.book_readiness import check_book_dir, invalidate_book_readiness, is_book_ready
+
+
+def _aged(path: Path, seconds: float = 60.0) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def _book(tmp_path: Path) -> Path:
+    book = tmp_path / "book"
+    (book / "area" / "sub").mkdir(parents=True)
+    (book / "README.md").write_text("# KB\n", encoding="utf-8")
+    (book / "SUMMARY.md").write_text("# Summary\n", encoding="utf-8")
+    for idx in range(50):
+        (book / "area" / "sub" / f"doc-{idx}.md").write_text("x", encoding="utf-8")
+    for directory in (book / "area" / "sub", book / "area", book):
+        _aged(directory)
+    invalidate_book_readiness()
+    return book
+
+
+def test_probe_stops_at_first_content_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    book = _book(tmp_path)
+    (book / "area" / "other").mkdir()
+    (book / "area" / "other" / "late.md").write_text("x", encoding="utf-8")
+    _aged(book / "area")
+    scanned: list[str] = []
+    real_scandir = os.scandir
+
+    def _scandir(path: str):  # type: ignore[no-untyped-def]
+        scanned.append(Path(path).name)
+        return real_scandir(path)
+
+    monkeypatch.setattr(book_readiness.os, "scandir", _scandir)
+    assert check_book_dir(book) == (True, [])
+    assert scanned == ["book", "area", "other"]
+
+
+def test_cached_verdict_follows_directory_mtimes_and_invalidation(tmp_path: Path) -> None:
+    book = _book(tmp_path)
+    assert is_book_ready(book)
+    cached = book_readiness._CACHE[str(book)]
+    assert is_book_ready(book)
+    assert book_readiness._CACHE[str(book)] is cached
+
+    (book / "SUMMARY.md").unlink()
+    assert check_book_dir(book) == (False, ["File SUMMARY mancante: SUMMARY.md"])
+
+    (book / "SUMMARY.md").write_text("# Summary\n", encoding="utf-8")
+    for doc in (book / "area" / "sub").iterdir():
+        doc.unlink()
+    assert check_book_dir(book)[1] == ["Nessun file Markdown di contenuto trovato in book/ (solo README/SUMMARY)."]
+
+    (book / "area" / "sub" / "new.md").write_text("x", encoding="utf-8")
+    _aged(book / "area" / "sub")
+    _aged(book)
+    invalidate_book_readiness(book)
+    assert is_book_ready(book)
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from pipeline.exceptions import ConfigError
+from pipeline.frontmatter_utils import read_frontmatter
+from semantic import frontmatter_service as front
+from storage.tags_store import DocEntityRecord, get_conn, save_doc_entities
+from tests.support.contexts import TestClientCtx
+from tests.utils.workspace import ensure_minimal_workspace_layout
+
+
+def _ctx(base: Path) -> TestClientCtx:
+    return TestClientCtx(
+        slug="dummy",
+        repo_root_dir=base,
+        semantic_dir=base / "semantic",
+        config_dir=base / "config",
+    )
+
+
+def _prepare_workspace(tmp_path: Path, docs: int) -> tuple[Path, list[Path]]:
+    base = tmp_path / "output" / "timmy-kb-dummy"
+    ensure_minimal_workspace_layout(base, client_name="dummy")
+    mapping = base / "semantic" / "semantic_mapping.yaml"
+    mapping.write_text(
+        "entities:\n"
+        "  - name: Contratto\n"
+        "relations:\n"
+        "  - from: Contratto\n"
+        "    to: Fornitore\n"
+        "    type: riguarda\n",
+        encoding="utf-8",
+    )
+    paths: list[Path] = []
+    for idx in range(docs):
+        md_path = base / "book" / f"doc{idx}.md"
+        md_path.write_text(
+            f"---\ntitle:\ndoc_uid: uid-{idx}\ntags_raw: [contratto]\n---\nbody {idx}\n",
+            encoding="utf-8",
+        )
+        paths.append(md_path)
+    return base, paths
+
+
+def test_enrich_frontmatter_prefetches_doc_entities_with_single_connection(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    base, md_paths = _prepare_workspace(tmp_path, docs=6)
+    tags_db = base / "semantic" / "tags.db"
+    save_doc_entities(
+        tags_db,
+        [
+            DocEntityRecord(
+                doc_uid="uid-1", area_key="area", entity_id="ent", confidence=0.9, origin="t", status="approved"
+            ),
+            DocEntityRecord(doc_uid="uid-2", area_key="area", entity_id="ent", confidence=0.9, origin="t"),
+        ],
+    )
+    opened: list[str] = []
+
+    @contextmanager
+    def _counting_conn(db_path: str) -> Iterator[Any]:
+        opened.append(db_path)
+        with get_conn(db_path) as conn:
+            yield conn
+
+    monkeypatch.setattr(front, "_get_tags_conn", _counting_conn)
+
+    touched = front.enrich_frontmatter(
+        _ctx(base),
+        logging.getLogger("test.frontmatter.prefetch"),
+        {"contratto": {"aliases": []}},
+        slug="dummy",
+        workers=3,
+    )
+
+    assert opened == [str(tags_db)]
+    assert touched == md_paths
+    meta1, _ = read_frontmatter(base / "book", md_paths[1], use_cache=False)
+    assert meta1["entities"] == [{"id": "ent", "label": "ent", "area_key": "area"}]
+    meta2, _ = read_frontmatter(base / "book", md_paths[2], use_cache=False)
+    assert "entities" not in meta2
+    assert meta2["entity"] == "Contratto"
+    assert meta2["relation_hints"] == [{"type": "riguarda", "target": "Fornitore"}]
+
+
+def test_enrich_frontmatter_reads_workers_from_semantic_defaults(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    base, md_paths = _prepare_workspace(tmp_path, docs=4)
+    config_yaml = base / "config" / "config.yaml"
+    config_yaml.write_text(
+        config_yaml.read_text(encoding="utf-8") + "semantic_defaults:\n  enrich_workers: 3\n",
+        encoding="utf-8",
+    )
+    pools: list[int] = []
+    real_executor = front.ThreadPoolExecutor
+
+    def _spy_executor(max_workers: int) -> Any:
+        pools.append(max_workers)
+        return real_executor(max_workers=max_workers)
+
+    monkeypatch.setattr(front, "ThreadPoolExecutor", _spy_executor)
+
+    touched = front.enrich_frontmatter(
+        _ctx(base),
+        logging.getLogger("test.frontmatter.workers"),
+        {"contratto": {"aliases": []}},
+        slug="dummy",
+    )
+
+    assert pools == [3]
+    assert touched == md_paths
+
+
+def test_enrich_frontmatter_doc_entities_failure_still_hard_fails(tmp_path: Path) -> None:
+    base, _md_paths = _prepare_workspace(tmp_path, docs=1)
+    # tags.db senza tabella doc_entities: il prefetch fallisce, il documento con doc_uid deve fallire.
+    (base / "semantic" / "tags.db").write_bytes(b"")
+
+    with pytest.raises(ConfigError, match="Arricchimento doc_entities fallito"):
+        front.enrich_frontmatter(
+            _ctx(base),
+            logging.getLogger("test.frontmatter.prefetch_fail"),
+            {"contratto": {"aliases": []}},
+            slug="dummy",
+        )
@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from pipeline.file_utils import safe_write_text
+from semantic import convert_service, embedding_service
+from semantic.stage_fingerprints import FULL_REBUILD_ENV, StageFingerprints
+from tests.support.contexts import TestClientCtx
+
+
+def test_manifest_delta_roundtrip_and_env_invalidation(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manifest = StageFingerprints.load(tmp_path)
+    assert manifest.delta("s", "env-1", {"a.md": "1"}).full
+
+    manifest.record("s", "env-1", {"a.md": "1", "b.md": "2", "c.md": "3"})
+    manifest.save()
+
+    delta = StageFingerprints.load(tmp_path).delta("s", "env-1", {"a.md": "1", "b.md": "9", "d.md": "4"})
+    assert (delta.full, delta.changed, delta.unchanged, delta.removed) == (False, ["b.md", "d.md"], ["a.md"], ["c.md"])
+    assert StageFingerprints.load(tmp_path).delta("s", "env-2", {"a.md": "1"}).full
+
+    monkeypatch.setenv(FULL_REBUILD_ENV, "1")
+    assert StageFingerprints.load(tmp_path).delta("s", "env-1", {"a.md": "1"}).full
+
+
+def _workspace(tmp_path: Path) -> tuple[Path, TestClientCtx]:
+    base = tmp_path / "kb"
+    for name in ("raw", "normalized", "book", "logs", "config", "semantic"):
+        (base / name).mkdir(parents=True, exist_ok=True)
+    (base / "config" / "config.yaml").write_text("meta:\n  client_name: test\n", encoding="utf-8")
+    (base / "semantic" / "semantic_mapping.yaml").write_text("{}\n", encoding="utf-8")
+    safe_write_text(base / "book" / "README.md", "# KB\n", encoding="utf-8", atomic=True)
+    safe_write_text(base / "book" / "SUMMARY.md", "# Summary\n", encoding="utf-8", atomic=True)
+    ctx = TestClientCtx(
+        slug="dummy",
+        repo_root_dir=base,
+        semantic_dir=base / "semantic",
+        config_dir=base / "config",
+    )
+    return base, ctx
+
+
+def test_convert_reextracts_only_changed_normalized_markdown(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    base, ctx = _workspace(tmp_path)
+    normalized = base / "normalized"
+    safe_write_text(normalized / "a.md", "# A\n\nuno\n", encoding="utf-8", atomic=True)
+    safe_write_text(normalized / "b.md", "# B\n\ndue\n", encoding="utf-8", atomic=True)
+    calls: list[Any] = []
+
+    def _fake_candidates(_normalized_dir: Path, _cfg: Any, **kwargs: Any) -> dict[str, Any]:
+        calls.append(sorted(p.name for p in kwargs["only"]) if "only" in kwargs else "all")
+        return {}
+
+    monkeypatch.setattr(convert_service, "extract_semantic_candidates", _fake_candidates)
+    logger = logging.getLogger("test")
+
+    first = convert_service.convert_markdown(ctx, logger, slug="dummy")
+    second = convert_service.convert_markdown(ctx, logger, slug="dummy")
+    safe_write_text(normalized / "b.md", "# B\n\ndue, rivisto\n", encoding="utf-8", atomic=True)
+    third = convert_service.convert_markdown(ctx, logger, slug="dummy")
+
+    assert calls == ["all", ["b.md"]]
+    assert first == second == third == [base / "book" / "a.md", base / "book" / "b.md"]
+    assert "rivisto" in (base / "book" / "b.md").read_text(encoding="utf-8")
+
+
+class _CountingEmbeddings:
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def embed_texts(self, texts: Any, *, model: Any = None) -> list[list[float]]:
+        self.batches.append(len(texts))
+        return [[float(len(t) % 5), 1.0, 0.5] for t in texts]
+
+
+def test_index_reembeds_only_changed_files(tmp_path: Path) -> None:
+    base, _ctx = _workspace(tmp_path)
+    book = base / "book"
+    (book / "A.md").write_text("---\ntitle: A\n---\n# A\ncontenuto uno", encoding="utf-8")
+    (book / "B.md").write_text("---\ntitle: B\n---\n# B\ncontenuto due", encoding="utf-8")
+    client = _CountingEmbeddings()
+
+    def _index() -> int:
+        return embedding_service.index_markdown_to_db(
+            repo_root_dir=base,
+            book_dir=book,
+            slug="dummy",
+            logger=logging.getLogger("test"),
+            scope="book",
+            embeddings_client=client,
+            db_path=base / "semantic" / "kb.sqlite",
+            semantic_dir=base / "semantic",
+        )
+
+    assert _index() == 2
+    assert _index() == 0
+    (book / "B.md").write_text("---\ntitle: B\n---\n# B\ncontenuto due aggiornato", encoding="utf-8")
+    assert _index() == 1
+    assert client.batches == [2, 1]
+
+    (base / "semantic" / "kb.sqlite").unlink()
+    assert _index() == 2
+
+
+class _EmptyForMarkerEmbeddings:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.fail_marker = True
+
+    def embed_texts(self, texts: Any, **_kwargs: Any) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [[] if self.fail_marker and "instabile" in t else [1.0, 0.5, 0.25] for t in texts]
+
+
+def test_index_does_not_record_files_with_dropped_chunks(tmp_path: Path) -> None:
+    base, _ctx = _workspace(tmp_path)
+    book = base / "book"
+    (book / "A.md").write_text("---\ntitle: A\n---\n# A\ncontenuto stabile", encoding="utf-8")
+    (book / "B.md").write_text("---\ntitle: B\n---\n# B\ncontenuto instabile", encoding="utf-8")
+    client = _EmptyForMarkerEmbeddings()
+
+    def _index() -> int:
+        return embedding_service.index_markdown_to_db(
+            repo_root_dir=base,
+            book_dir=book,
+            slug="dummy",
+            logger=logging.getLogger("test"),
+            scope="book",
+            embeddings_client=client,
+            db_path=base / "semantic" / "kb.sqlite",
+            semantic_dir=base / "semantic",
+        )
+
+    # B ha un embedding vuoto: solo A è persistito e registrato nel manifest.
+    assert _index() == 1
+    recorded = StageFingerprints.load(base / "semantic")._stages[embedding_service.INDEX_STAGE]["files"]
+    assert sorted(recorded) == ["A.md"]
+
+    # Al run successivo B viene ricalcolato anche se il file non è cambiato.
+    client.fail_marker = False
+    assert _index() == 1
+    assert len(client.batches[-1]) == 1 and "instabile" in client.batches[-1][0]
+    assert _index() == 0
@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable
+
+import pytest
+
+from pipeline.exceptions import ConfigError, PipelineError
+from pipeline.logging_utils import get_structured_logger
+from semantic import api
+from semantic.stage_graph import Stage, run_stage_graph
+
+
+def _workspace(tmp_path: Path, slug: str) -> Path:
+    workspace = tmp_path / slug
+    for directory in ("raw", "normalized", "book", "semantic", "logs", "config"):
+        (workspace / directory).mkdir(parents=True, exist_ok=True)
+    (workspace / "config" / "config.yaml").write_text("meta: client")
+    (workspace / "book" / "README.md").write_text("# demo")
+    (workspace / "book" / "SUMMARY.md").write_text("# summary")
+    (workspace / "semantic" / "semantic_mapping.yaml").write_text("mapping: {}")
+    return workspace
+
+
+def test_build_workflow_overlaps_vocab_with_convert_and_keeps_wrapper_names(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    slug = "dummy"
+    workspace = _workspace(tmp_path, slug)
+    monkeypatch.setattr("pipeline.content_utils.clear_frontmatter_cache", lambda *a, **k: None)
+    context = SimpleNamespace(repo_root_dir=workspace, slug=slug, run_id="run-1")
+    vocab_started = threading.Event()
+    order: list[str] = []
+
+    def _convert(*_: Any, **__: Any) -> list[Path]:
+        # La conversione termina solo se il vocabolario è già partito: gli stage si sovrappongono.
+        assert vocab_started.wait(5)
+        order.append("convert")
+        return [workspace / "book" / "a.md"]
+
+    def _vocab(*_: Any, **__: Any) -> dict[str, Any]:
+        vocab_started.set()
+        order.append("vocab")
+        return {"canon": {"aliases": []}}
+
+    def _enrich(_ctx: Any, _logger: Any, vocab: Any, *, slug: str) -> list[Path]:
+        assert vocab == {"canon": {"aliases": []}}
+        order.append("enrich")
+        return [workspace / "book" / "a.md"]
+
+    def _summary(*_: Any, **__: Any) -> None:
+        order.append("summary")
+
+    wrapped: list[str] = []
+
+    def _wrapper(name: str, func: Callable[[], Any]) -> Any:
+        wrapped.append(name)
+        return func()
+
+    caplog.set_level(logging.INFO)
+    out = api._run_build_workflow(
+        context,
+        get_structured_logger("tests.semantic.stage_graph"),
+        slug=slug,
+        stage_wrapper=_wrapper,
+        convert_fn=_convert,
+        vocab_fn=_vocab,
+        enrich_fn=_enrich,
+        summary_fn=_summary,
+    )
+
+    assert out == (workspace, [workspace / "book" / "a.md"], [workspace / "book" / "a.md"])
+    assert order == ["vocab", "convert", "enrich", "summary"]
+    assert sorted(wrapped) == sorted(
+        ["convert_markdown", "require_reviewed_vocab", "enrich_frontmatter", "write_summary_and_readme"]
+    )
+    assert any(r.getMessage() == "phase_completed" and r.phase == "require_reviewed_vocab" for r in caplog.records)
+    (graph,) = [r for r in caplog.records if r.getMessage() == "semantic.stage_graph.completed"]
+    assert set(graph.stages_ms) == set(wrapped)
+
+
+def test_stage_graph_stops_scheduling_and_raises_first_declared_failure() -> None:
+    ran: list[str] = []
+
+    def _fail(message: str) -> Callable[[Any], Any]:
+        def _run(_inputs: Any) -> Any:
+            ran.append(message)
+            raise ConfigError(message)
+
+        return _run
+
+    stages = [
+        Stage("a", _fail("a")),
+        Stage("b", _fail("b")),
+        Stage("c", lambda inputs: ran.append("c"), inputs=("a",)),
+    ]
+    with pytest.raises(ConfigError, match="^a$"):
+        run_stage_graph(stages, logger=logging.getLogger("test"))
+    assert sorted(ran) == ["a", "b"]
+
+    with pytest.raises(PipelineError, match="dichiarato prima"):
+        run_stage_graph(
+            [Stage("x", lambda _i: None, after=("y",)), Stage("y", lambda _i: None)], logger=logging.getLogger("t")
+        )
+
+
+_CALLER_VAR: contextvars.ContextVar[str | None] = contextvars.ContextVar("caller_var", default=None)
+
+
+def test_stage_graph_propagates_caller_contextvars() -> None:
+    token = _CALLER_VAR.set("root-trace")
+    try:
+        out = run_stage_graph(
+            [
+                Stage("a", lambda _i: _CALLER_VAR.get()),
+                Stage("b", lambda i: (i["a"], _CALLER_VAR.get()), inputs=("a",)),
+            ],
+            logger=logging.getLogger("test"),
+        )
+    finally:
+        _CALLER_VAR.reset(token)
+    assert out == {"a": "root-trace", "b": ("root-trace", "root-trace")}
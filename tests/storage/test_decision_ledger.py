@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 import uuid
 from pathlib import Path
+from typing import Any
 
 import pytest
 
 from pipeline.workspace_layout import WorkspaceLayout
 from storage import decision_ledger
+from timmy_kb.cli import ledger_status
 
 
 def _prepare_workspace(root: Path) -> Path:
@@ -256,3 +259,98 @@ def test_normative_decision_rejects_absolute_paths_in_evidence_refs(tmp_path: Pa
             decision_ledger.record_normative_decision(conn, record)
     finally:
         conn.close()
+
+
+def _seed_history(conn: sqlite3.Connection) -> None:
+    # Run e decisioni fuori ordine, con timestamp a pari merito: lo stato materializzato deve
+    # replicare i tie-break (timestamp, id) delle query storiche.
+    for run_id, started_at in (("run-b", "2026-01-02T00:00:00Z"), ("run-a", "2026-01-01T00:00:00Z")):
+        decision_ledger.start_run(conn, run_id=run_id, slug="acme", started_at=started_at)
+    decisions = [
+        ("d-1", "run-b", "gate_x", "SEMANTIC_INGEST", decision_ledger.DECISION_ALLOW, "2026-01-02T00:00:05Z"),
+        ("d-3", "run-b", "gate_x", "FRONTMATTER_ENRICH", decision_ledger.DECISION_ALLOW, "2026-01-02T00:00:05Z"),
+        ("d-2", "run-b", "gate_x", "PREVIEW_READY", decision_ledger.DECISION_ALLOW, "2026-01-02T00:00:05Z"),
+        ("d-4", "run-b", "gate_y", "PREVIEW_READY", decision_ledger.DECISION_DENY, "2026-01-02T00:00:09Z"),
+        ("d-0", "run-a", "gate_x", "PREVIEW_READY", decision_ledger.DECISION_ALLOW, "2026-01-03T00:00:00Z"),
+    ]
+    for decision_id, run_id, gate, to_state, verdict, decided_at in decisions:
+        decision_ledger.record_decision(
+            conn,
+            decision_id=decision_id,
+            run_id=run_id,
+            slug="acme",
+            gate_name=gate,
+            from_state="SEMANTIC_INGEST",
+            to_state=to_state,
+            verdict=verdict,
+            stop_code=None if verdict == decision_ledger.DECISION_ALLOW else "QA_GATE_FAILED",
+            subject=gate,
+            decided_at=decided_at,
+        )
+
+
+def _status(conn: sqlite3.Connection, *, materialized: bool) -> tuple[Any, ...]:
+    run = ledger_status._load_latest_run(conn, materialized=materialized)
+    assert run is not None
+    return (
+        run,
+        ledger_status._load_current_state(conn, run_id=run["run_id"], materialized=materialized),
+        ledger_status._load_latest_decisions(conn, run_id=run["run_id"], materialized=materialized),
+    )
+
+
+def test_materialized_current_state_matches_history_queries(tmp_path: Path) -> None:
+    layout = WorkspaceLayout.from_workspace(_prepare_workspace(tmp_path / "acme"), slug="acme")
+    conn = decision_ledger.open_ledger(layout)
+    try:
+        _seed_history(conn)
+        fast = _status(conn, materialized=True)
+        slow = _status(conn, materialized=False)
+    finally:
+        conn.close()
+
+    assert fast == slow
+    assert fast[0]["run_id"] == "run-b"
+    assert fast[1] == "FRONTMATTER_ENRICH"
+    assert [(d["gate_name"], d["to_state"]) for d in fast[2]] == [
+        ("gate_x", "FRONTMATTER_ENRICH"),
+        ("gate_y", "PREVIEW_READY"),
+    ]
+
+
+def test_open_ledger_migrates_legacy_db(tmp_path: Path) -> None:
+    layout = WorkspaceLayout.from_workspace(_prepare_workspace(tmp_path / "acme"), slug="acme")
+    db_path = decision_ledger.ledger_path_from_layout(layout)
+    legacy_sql = decision_ledger._SCHEMA_SQL.split("CREATE INDEX", 1)[0]
+    with sqlite3.connect(db_path) as legacy:
+        legacy.executescript(legacy_sql)
+        legacy.execute("PRAGMA foreign_keys = ON")
+        _seed_history_raw(legacy)
+
+    conn = decision_ledger.open_ledger(layout)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == decision_ledger.LEDGER_SCHEMA_VERSION
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_runs_slug_started", "idx_decisions_run_decided", "idx_events_slug_occurred"} <= indexes
+        assert _status(conn, materialized=True) == _status(conn, materialized=False)
+        plan = " ".join(
+            str(row[-1])
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + ledger_status._MATERIALIZED_DECISIONS_SQL.strip(), ("run-b",)
+            )
+        )
+    finally:
+        conn.close()
+    assert "SCAN d" not in plan
+
+
+def _seed_history_raw(conn: sqlite3.Connection) -> None:
+    """Popola un ledger legacy (senza tabelle materializzate) con le stesse righe di `_seed_history`."""
+    scratch = sqlite3.connect(":memory:")
+    scratch.executescript(decision_ledger._SCHEMA_SQL)
+    _seed_history(scratch)
+    for table in ("runs", "decisions"):
+        rows = scratch.execute(f"SELECT * FROM {table}").fetchall()  # noqa: S608 - tabelle fisse del test
+        marks = ", ".join("?" for _ in rows[0])
+        conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)  # noqa: S608 - tabelle fisse del test
+    scratch.close()
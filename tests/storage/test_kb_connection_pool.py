@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Sequence
+
+import pytest
+
+import storage.kb_db as kb
+import timmy_kb.cli.retriever as retr
+from pipeline.exceptions import ConfigError
+from storage.kb_store import KbStore
+from timmy_kb.cli.retriever import QueryParams
+
+
+class _AxisEmb:
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        return [[1.0, 0.0] for _ in texts]
+
+
+def _count_calls(monkeypatch: pytest.MonkeyPatch, name: str) -> list[Any]:
+    calls: list[Any] = []
+    real = getattr(kb, name)
+
+    def _wrapped(*args: Any, **kwargs: Any) -> Any:
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(kb, name, _wrapped)
+    return calls
+
+
+def test_pool_opens_one_connection_and_verifies_schema_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db = tmp_path / "semantic" / "kb.sqlite"
+    opened = _count_calls(monkeypatch, "_open_connection")
+    schema = _count_calls(monkeypatch, "_create_schema")
+
+    with kb.KbConnectionPool(db) as pool:
+        for idx in range(3):
+            kb.insert_chunks("p", "s", f"doc{idx}.md", "v1", {}, [f"c{idx}"], [[1.0, 0.0]], db_path=db, pool=pool)
+        items = list(kb.fetch_candidates("p", "s", limit=10, pool=pool))
+        assert pool.schema_verified
+
+    assert [item["content"] for item in items] == ["c2", "c1", "c0"]
+    assert len(opened) == 1
+    assert len(schema) == 1
+    with pytest.raises(ConfigError) as excinfo:
+        pool.connection()
+    assert excinfo.value.code == "kb.db.pool_closed"
+
+
+def test_pool_keeps_one_connection_per_thread(tmp_path: Path) -> None:
+    pool = kb.KbConnectionPool(tmp_path / "kb.sqlite")
+    seen: list[Any] = []
+
+    def _worker() -> None:
+        seen.append(pool.connection())
+        seen.append(pool.connection())
+
+    try:
+        main_con = pool.connection()
+        thread = threading.Thread(target=_worker)
+        thread.start()
+        thread.join()
+    finally:
+        pool.close()
+
+    assert seen[0] is seen[1]
+    assert seen[0] is not main_con
+
+
+def test_pool_rejects_mismatched_db_path(tmp_path: Path) -> None:
+    with kb.KbConnectionPool(tmp_path / "a" / "kb.sqlite") as pool:
+        with pytest.raises(ConfigError) as excinfo:
+            list(kb.fetch_candidates("p", "s", db_path=tmp_path / "b" / "kb.sqlite", pool=pool))
+    assert excinfo.value.code == "kb.db.pool_mismatch"
+
+
+def test_retriever_search_reuses_store_pool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = KbStore.for_slug("p", repo_root_dir=tmp_path)
+    db = store.effective_db_path()
+    kb.insert_chunks("p", "s", "doc.md", "v1", {}, ["alpha", "beta"], [[1.0, 0.0], [0.0, 1.0]], db_path=db)
+    init_calls = _count_calls(monkeypatch, "init_db")
+    opened = _count_calls(monkeypatch, "_open_connection")
+
+    with store.connection_pool() as pool:
+        params = QueryParams(db, "p", "s", "q", k=1, candidate_limit=retr.MIN_CANDIDATE_LIMIT, connection_pool=pool)
+        first = retr.search(params, _AxisEmb())
+        second = retr.search(params, _AxisEmb())
+
+    assert [r["content"] for r in first] == ["alpha"]
+    assert second == first
+    assert init_calls == []
+    assert len(opened) == 1
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Sequence
+
+import storage.kb_db as kb
+import timmy_kb.cli.retriever as retr
+from timmy_kb.cli.retriever import QueryParams
+
+
+class _AxisEmb:
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        return [[1.0, 0.0] for _ in texts]
+
+
+def _lexical(db: Path, query: str, **kwargs: object) -> list[str]:
+    return [item["content"] for item in kb.fetch_lexical_candidates("p", "s", query, db_path=db, **kwargs)]
+
+
+def test_fts_index_follows_inserts_and_deletes(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    inserted = kb.insert_chunks(
+        "p",
+        "s",
+        "doc.md",
+        "v1",
+        {},
+        ["Contratto di fornitura annuale", "Verbale riunione", "Città e perché"],
+        [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]],
+        db_path=db,
+    )
+    assert inserted == 3
+    assert kb.insert_chunks("p", "s", "doc.md", "v1", {}, ["Verbale riunione"], [[0.0, 1.0]], db_path=db) == 0
+
+    assert _lexical(db, 'contratto OR "fornitura') == ["Contratto di fornitura annuale"]
+    assert _lexical(db, "citta") == ["Città e perché"]
+    assert _lexical(db, "  ") == []
+
+    with kb.connect(db) as con:
+        con.execute("DELETE FROM chunks WHERE content LIKE 'Contratto%'")
+        con.commit()
+    assert _lexical(db, "contratto") == []
+
+
+def test_fts_index_is_rebuilt_on_existing_db(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    con = sqlite3.connect(db)
+    con.execute(
+        "CREATE TABLE chunks (id INTEGER PRIMARY KEY AUTOINCREMENT, slug TEXT NOT NULL, scope TEXT NOT NULL, "
+        "path TEXT NOT NULL, version TEXT, meta_json TEXT, content TEXT NOT NULL, embedding_json TEXT NOT NULL, "
+        "created_at TEXT NOT NULL)"
+    )
+    con.execute(
+        "INSERT INTO chunks (slug, scope, path, version, meta_json, content, embedding_json, created_at) "
+        "VALUES ('p', 's', 'a.md', 'v1', '{}', 'procedura legacy', '[1.0, 0.0]', 'x')"
+    )
+    con.commit()
+    con.close()
+
+    with kb.KbConnectionPool(db) as pool:
+        assert _lexical(db, "legacy", pool=pool) == ["procedura legacy"]
+
+
+def test_hybrid_search_reaches_old_lexical_matches(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    kb.insert_chunks("p", "s", "old.md", "v1", {}, ["clausola penale contratto"], [[0.0, 1.0]], db_path=db)
+    recent = [f"nota {i}" for i in range(retr.MIN_CANDIDATE_LIMIT)]
+    kb.insert_chunks("p", "s", "new.md", "v1", {}, recent, [[1.0, 0.0]] * len(recent), db_path=db)
+    params = QueryParams(db, "p", "s", "clausola penale", k=3, candidate_limit=retr.MIN_CANDIDATE_LIMIT)
+
+    plain = retr.search(params, _AxisEmb())
+    hybrid = retr.search(params, _AxisEmb(), hybrid=True)
+
+    assert "clausola penale contratto" not in [item["content"] for item in plain]
+    assert hybrid[0]["content"] == "clausola penale contratto"
+    assert len(hybrid) == 3
+    assert hybrid[0]["score"] > hybrid[1]["score"]
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Sequence
+
+import pytest
+
+import storage.kb_db as kb
+import timmy_kb.cli.retriever as retr
+from pipeline.exceptions import ConfigError, RetrieverError
+from timmy_kb.cli.retriever import QueryParams
+
+
+class _AxisEmb:
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        return [[1.0, 0.0] for _ in texts]
+
+
+def _seed(db: Path) -> None:
+    for area, entity in (("legale", "contratto"), ("hr", "dipendente"), ("legale", "fornitore")):
+        meta = {
+            "file": f"{area}/{entity}.md",
+            "area": area,
+            "entity": entity,
+            "lineage": {"source_id": f"src-{entity}"},
+        }
+        kb.insert_chunks("p", "s", f"{area}/{entity}.md", "v1", meta, [f"testo {entity}"], [[1.0, 0.0]], db_path=db)
+
+
+def test_filters_are_pushed_down_to_indexed_columns(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    _seed(db)
+
+    def _contents(**filters: object) -> list[str]:
+        return [c["content"] for c in kb.fetch_candidates("p", "s", limit=10, db_path=db, filters=filters)]
+
+    assert _contents(area="legale") == ["testo fornitore", "testo contratto"]
+    assert _contents(area="legale", entity=["contratto", "dipendente"]) == ["testo contratto"]
+    assert _contents(source_id="src-dipendente") == ["testo dipendente"]
+    assert _contents(layout_section="x") == []
+    with pytest.raises(ConfigError) as excinfo:
+        _contents(colore="rosso")
+    assert excinfo.value.code == "kb.db.filter_unknown"
+
+    with sqlite3.connect(db) as con:
+        plan = " ".join(
+            str(row[-1])
+            for row in con.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM chunks WHERE slug=? AND scope=? AND meta_area=? "
+                "ORDER BY id DESC LIMIT 5",
+                ("p", "s", "legale"),
+            )
+        )
+    assert "idx_chunks_meta_area" in plan
+
+
+def test_corrupted_meta_json_does_not_break_generated_columns(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    kb.init_db(db)
+    with kb.connect(db) as con:
+        con.execute(
+            "INSERT INTO chunks (slug, scope, path, version, meta_json, content, embedding_json, created_at) "
+            "VALUES ('p', 's', 'x.md', 'v1', '{not json', 'rotto', '[1.0]', 'x')"
+        )
+        con.commit()
+
+    assert list(kb.fetch_candidates("p", "s", db_path=db, filters={"area": "legale"})) == []
+
+
+def test_retriever_search_applies_query_filters(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    _seed(db)
+    params = QueryParams(db, "p", "s", "q", k=5, candidate_limit=retr.MIN_CANDIDATE_LIMIT, filters={"area": "hr"})
+
+    assert [r["content"] for r in retr.search(params, _AxisEmb())] == ["testo dipendente"]
+    with pytest.raises(RetrieverError):
+        retr.search(QueryParams(db, "p", "s", "q", filters={"colore": "rosso"}), _AxisEmb())
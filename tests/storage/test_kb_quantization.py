@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import logging
+import random
+from pathlib import Path
+from typing import Sequence
+
+import pytest
+
+import storage.kb_db as kb
+import timmy_kb.cli.retriever as retr
+from storage.kb_quantization import approx_cosine_scores, dequantize_int8, quantize_int8
+from timmy_kb.cli.retriever import QueryParams
+from timmy_kb.cli.retriever_ranking import cosine
+from tools.retriever_calibrate import evaluate_quantized_recall
+
+
+def _vectors(n: int, dim: int, seed: int = 7) -> list[list[float]]:
+    rng = random.Random(seed)
+    return [[rng.uniform(-1.0, 1.0) for _ in range(dim)] for _ in range(n)]
+
+
+class _FixedEmb:
+    def __init__(self, vector: list[float]) -> None:
+        self.vector = vector
+
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None) -> list[list[float]]:
+        return [list(self.vector) for _ in texts]
+
+
+def test_int8_roundtrip_and_approx_cosine() -> None:
+    vecs = _vectors(20, 64)
+    rows = []
+    for vec in vecs:
+        encoded = quantize_int8(vec)
+        assert encoded is not None
+        blob, scale, offset = encoded
+        assert len(blob) == len(vec)
+        assert (
+            max(abs(a - b) for a, b in zip(dequantize_int8(blob, scale, offset), vec, strict=True)) <= scale / 2 + 1e-9
+        )
+        rows.append({"q8": blob, "scale": scale, "offset": offset})
+    rows.append({"q8": None, "scale": None, "offset": None})
+
+    approx = approx_cosine_scores(vecs[0], rows)
+
+    assert approx[-1] is None
+    for vec, score in zip(vecs, approx[:-1], strict=True):
+        assert score == pytest.approx(cosine(vecs[0], vec), abs=0.02)
+    assert quantize_int8([]) is None
+    assert quantize_int8([float("nan"), 1.0]) is None
+
+
+def test_insert_writes_int8_and_backfill_covers_legacy_rows(tmp_path: Path) -> None:
+    db = tmp_path / "kb.sqlite"
+    kb.insert_chunks("p", "s", "a.md", "v1", {}, ["uno", "due"], [[0.1, 0.2], []], db_path=db)
+    with kb.connect(db) as con:
+        con.execute("UPDATE chunks SET embedding_q8 = NULL WHERE content = 'uno'")
+        con.commit()
+
+    assert [row["q8"] is None for row in kb.fetch_quantized_candidates("p", "s", db_path=db)] == [True, True]
+    assert kb.quantize_embeddings("p", "s", db_path=db) == 1
+    assert [row["q8"] is None for row in kb.fetch_quantized_candidates("p", "s", db_path=db)] == [True, False]
+
+
+def test_quantized_search_matches_exact_search(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    db = tmp_path / "kb.sqlite"
+    vecs = _vectors(300, 32)
+    kb.insert_chunks("p", "s", "a.md", "v1", {}, [f"c{i}" for i in range(len(vecs))], vecs, db_path=db)
+    with kb.connect(db) as con:
+        # Righe legacy senza int8: devono comunque entrare nel re-rank esatto.
+        con.execute("UPDATE chunks SET embedding_q8 = NULL WHERE content IN ('c3', 'c150')")
+        con.commit()
+    query = _vectors(1, 32, seed=11)[0]
+    params = QueryParams(db, "p", "s", "q", k=8, candidate_limit=retr.MIN_CANDIDATE_LIMIT)
+
+    exact = retr.search(params, _FixedEmb(query))
+    quantized = retr.search(params, _FixedEmb(query), quantized=True)
+    configured = retr.search_with_config(params, {"retriever": {"quantization": "int8"}}, _FixedEmb(query))
+
+    assert [r["content"] for r in quantized] == [r["content"] for r in exact]
+    assert [r["score"] for r in quantized] == pytest.approx([r["score"] for r in exact])
+    assert configured == quantized
+
+    log = logging.getLogger("test.quantization_recall")
+    report = evaluate_quantized_recall(slug="p", scope="s", db_path=db, limit=500, samples=10, k=5, log=log)
+    assert report is not None
+    assert report["recall_at_k"] >= 0.95
+    assert report["bytes_per_vector_int8"] < report["bytes_per_vector_float32"]
@@ -0,0 +1,46 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from pipeline.capabilities import lazy
+from pipeline.capabilities.lazy import LazyModule, is_module_available, lazy_module
+from pipeline.exceptions import CapabilityUnavailableError
+
+
+def test_lazy_module_imports_on_first_attribute_access(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    (tmp_path / "lazy_probe_mod.py").write_text("VALUE = 42\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_probe_mod", raising=False)
+
+    proxy = LazyModule("lazy_probe_mod")
+    assert "lazy_probe_mod" not in sys.modules
+    assert not proxy.is_loaded
+    assert proxy.VALUE == 42
+    assert proxy.is_loaded and "lazy_probe_mod" in sys.modules
+    assert lazy_module("json") is lazy_module("json")
+
+
+def test_lazy_module_missing_dependency_raises_capability_error() -> None:
+    proxy = LazyModule("keybert_absent_for_test", hint="pip install keybert", capability="nlp")
+    with pytest.raises(CapabilityUnavailableError, match="pip install keybert") as excinfo:
+        proxy.KeyBERT  # noqa: B018
+    assert excinfo.value.capability == "nlp"
+
+
+def test_is_module_available_does_not_import_parent_packages(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    pkg = tmp_path / "lazy_heavy_pkg"
+    (pkg / "sub").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("raise RuntimeError('import pesante')\n", encoding="utf-8")
+    (pkg / "sub" / "__init__.py").write_text("", encoding="utf-8")
+    (pkg / "sub" / "leaf.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert is_module_available("lazy_heavy_pkg.sub.leaf")
+    assert not is_module_available("lazy_heavy_pkg.sub.missing")
+    assert not is_module_available("lazy_heavy_pkg.sub.leaf.deeper")
+    assert not is_module_available("lazy_missing_pkg_for_test")
+    assert "lazy_heavy_pkg" not in sys.modules
+    assert "spacy" in lazy.HEAVY_OPTIONAL_MODULES
@@ -236,3 +236,48 @@ def test_write_markdown_for_pdf_inserts_chunk_sections(tmp_path: Path, monkeypat
     assert "### Chunk 1" in body
     assert meta.get("content_chunks")
     assert meta["content_chunks"][0].startswith("chunk")
+
+
+def test_iter_extracted_pdf_texts_preserves_input_order(tmp_path: Path, monkeypatch: Any) -> None:
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    pdfs = [tmp_path / f"doc{idx}.pdf" for idx in range(6)]
+
+    def _fake_extract(path: str) -> str:
+        idx = int(Path(path).stem[3:])
+        time.sleep(0.01 * (6 - idx))  # i primi PDF terminano per ultimi
+        return f"  testo   {idx} "
+
+    monkeypatch.setattr("nlp.nlp_keywords.extract_text_from_pdf", _fake_extract)
+    monkeypatch.setattr(cu, "_make_pdf_executor", lambda workers: ThreadPoolExecutor(max_workers=workers))
+
+    out = list(cu._iter_extracted_pdf_texts(pdfs, workers=3, slug="dummy", logger=logging.getLogger("test")))
+
+    assert [pdf for pdf, _ in out] == pdfs
+    assert [text for _, text in out] == [f"testo {idx}" for idx in range(6)]
+
+
+def test_iter_extracted_pdf_texts_raises_pipeline_error(tmp_path: Path, monkeypatch: Any) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _boom(_path: str) -> str:
+        raise RuntimeError("kaputt")
+
+    monkeypatch.setattr("nlp.nlp_keywords.extract_text_from_pdf", _boom)
+    monkeypatch.setattr(cu, "_make_pdf_executor", lambda workers: ThreadPoolExecutor(max_workers=workers))
+
+    with pytest.raises(PipelineError, match="PDF text extraction failed"):
+        list(
+            cu._iter_extracted_pdf_texts(
+                [tmp_path / "a.pdf", tmp_path / "b.pdf"], workers=2, slug="dummy", logger=logging.getLogger("test")
+            )
+        )
+
+
+def test_resolve_convert_workers_bounds(monkeypatch: Any) -> None:
+    monkeypatch.setattr(cu.os, "cpu_count", lambda: 8)
+    assert cu._resolve_convert_workers(SemanticConfig(convert_workers=1), 10) == 1
+    assert cu._resolve_convert_workers(SemanticConfig(convert_workers=4), 2) == 2
+    assert cu._resolve_convert_workers(SemanticConfig(convert_workers=0), 100) == 8
+    assert cu._resolve_convert_workers(SemanticConfig(convert_workers=0), 0) == 1
@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 import threading
+import time
 from collections import Counter
 from pathlib import Path
+from typing import Callable
 
 import pytest
 
@@ -66,18 +68,17 @@ def test_safe_append_text_failure_leaves_file_intact(tmp_path: Path, monkeypatch
     file_utils.safe_append_text(base, target, "seed\n")
     original = target.read_text(encoding="utf-8")
 
-    # Simula failure in append (open/append) senza leggere l'intero file
-    import builtins as _bi  # local import per monkeypatch selettivo
+    # Simula failure in append (apertura O_APPEND) senza leggere l'intero file
+    from pipeline import append_writer
 
-    _orig_open = _bi.open
+    _orig_open = append_writer._open_append
 
-    def flaky_open(path, mode="r", *args, **kwargs):  # type: ignore[no-untyped-def]
-        candidate = strip_extended_length_path(path)
-        if candidate == target and "a" in str(mode):
-            raise ConfigError("simulated failure", file_path=str(candidate))
-        return _orig_open(path, mode, *args, **kwargs)
+    def flaky_open(path: str) -> int:
+        if Path(strip_extended_length_path(path)) == target:
+            raise OSError("simulated failure")
+        return _orig_open(path)
 
-    monkeypatch.setattr(_bi, "open", flaky_open)
+    monkeypatch.setattr(append_writer, "_open_append", flaky_open)
 
     with pytest.raises(ConfigError):
         file_utils.safe_append_text(base, target, "second\n", lock_timeout=0.1)
@@ -87,6 +88,128 @@ def test_safe_append_text_failure_leaves_file_intact(tmp_path: Path, monkeypatch
     assert not lock_path.exists()
 
     # Ripristina open originale e verifica append successivo
-    monkeypatch.setattr(_bi, "open", _orig_open)
+    monkeypatch.setattr(append_writer, "_open_append", _orig_open)
     file_utils.safe_append_text(base, target, "tail\n")
     assert target.read_text(encoding="utf-8") == original + "tail\n"
+
+
+def _process_writer(base: str, target: str, pid: int, count: int) -> None:
+    for i in range(count):
+        # Alterna record piccoli e record oltre la soglia del lock advisory.
+        pad = "x" * (10_000 if i % 2 else 100)
+        file_utils.safe_append_text(Path(base), Path(target), f"{pid}-{i}-{pad}\n")
+
+
+def test_safe_append_text_concurrent_processes_keep_lines_whole(tmp_path: Path) -> None:
+    import multiprocessing
+
+    base = tmp_path / "ws"
+    base.mkdir()
+    target = base / "logs" / "audit.log"
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_process_writer, args=(str(base), str(target), pid, 40)) for pid in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+    assert [proc.exitcode for proc in procs] == [0, 0, 0, 0]
+
+    lines = target.read_text(encoding="utf-8").splitlines()
+    tokens = []
+    for line in lines:
+        pid, idx, pad = line.split("-")
+        assert pad == "x" * (10_000 if int(idx) % 2 else 100)
+        tokens.append((int(pid), int(idx)))
+    assert sorted(tokens) == [(pid, i) for pid in range(4) for i in range(40)]
+    assert not (target.parent / f"{target.name}.lock").exists()
+
+
+def _wait_until(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condizione non raggiunta"
+        time.sleep(0.001)
+
+
+def test_appender_batches_records_queued_during_a_write(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from pipeline import append_writer
+
+    target = tmp_path / "audit.log"
+    appender = append_writer.BatchingAppender(str(target))
+    release = threading.Event()
+    real_write = append_writer.write_record
+
+    def slow_write(path: str, data: bytes, **kwargs: object) -> None:
+        if data.startswith(b"first"):
+            assert release.wait(5)
+        real_write(path, data, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(append_writer, "write_record", slow_write)
+    first = threading.Thread(target=appender.append, args=(b"first\n",))
+    first.start()
+    _wait_until(lambda: appender._flushing)
+    others = [threading.Thread(target=appender.append, args=(f"r{i}\n".encode(),)) for i in range(7)]
+    for thread in others:
+        thread.start()
+    _wait_until(lambda: len(appender._pending) == 7)
+    release.set()
+    for thread in [first, *others]:
+        thread.join(5)
+
+    assert appender.stats() == {"records": 8, "writes": 2}
+    assert sorted(target.read_text(encoding="utf-8").split()) == sorted(["first"] + [f"r{i}" for i in range(7)])
+
+
+def test_write_record_without_fcntl_serializes_on_lock_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from pipeline import append_writer
+
+    calls: list[tuple[str, int]] = []
+    held: set[int] = set()
+
+    class _FakeMsvcrt:
+        LK_NBLCK = 2
+        LK_UNLCK = 0
+
+        @staticmethod
+        def locking(fd: int, mode: int, nbytes: int) -> None:
+            name = Path(f"/proc/self/fd/{fd}").resolve().name
+            calls.append((name, mode))
+            if mode == _FakeMsvcrt.LK_NBLCK and held:
+                raise OSError("locked")
+            if mode == _FakeMsvcrt.LK_NBLCK:
+                held.add(fd)
+            else:
+                held.discard(fd)
+
+    monkeypatch.setattr(append_writer, "_fcntl", None)
+    monkeypatch.setattr(append_writer, "_msvcrt", _FakeMsvcrt)
+    target = tmp_path / "audit.jsonl"
+    append_writer.write_record(str(target), b"riga\n", advisory_lock=True)
+
+    assert target.read_bytes() == b"riga\n"
+    assert calls == [("audit.jsonl.lock", _FakeMsvcrt.LK_NBLCK), ("audit.jsonl.lock", _FakeMsvcrt.LK_UNLCK)]
+
+    held.add(-1)  # lock tenuto da un altro processo
+    with pytest.raises(ConfigError):
+        append_writer.write_record(str(target), b"altra\n", advisory_lock=True, lock_timeout=0.01)
+    assert target.read_bytes() == b"riga\n"
+
+
+def test_get_appender_keys_on_lock_timeout_and_evicts_lru(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from collections import OrderedDict
+
+    from pipeline import append_writer
+
+    monkeypatch.setattr(append_writer, "_APPENDERS", OrderedDict())
+    monkeypatch.setattr(append_writer, "MAX_CACHED_APPENDERS", 2)
+    path = str(tmp_path / "a.jsonl")
+
+    fast = append_writer.get_appender(path, lock_timeout=0.5)
+    assert append_writer.get_appender(path, lock_timeout=5.0) is not fast
+    assert append_writer.get_appender(path, lock_timeout=0.5) is fast
+
+    append_writer.get_appender(str(tmp_path / "b.jsonl"))
+    assert len(append_writer._APPENDERS) == 2
+    # L'ultimo accesso a `fast` lo ha reso recente: è stato rimosso l'appender con timeout 5.0.
+    assert (path, False, None, 5.0) not in append_writer._APPENDERS
+    assert append_writer.get_appender(path, lock_timeout=0.5) is fast
@@ -92,3 +92,221 @@ def test_ingest_folder_short_circuit_on_empty(monkeypatch, tmp_path: Path):
     )
     assert summary == {"files": 0, "chunks": 0}
     assert _SpyEmb.instances == 0
+
+
+class _BatchSpyEmb:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None):  # type: ignore[override]
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _three_chunks(text: str, *args, **kwargs) -> list[str]:
+    return [f"{text}#{idx}" for idx in range(3)]
+
+
+def test_ingest_folder_pipelined_packs_chunks_across_files(monkeypatch, tmp_path: Path):
+    import sqlite3
+
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    for idx in range(5):
+        (root / f"doc{idx}.md").write_text(f"Doc {idx}", encoding="utf-8")
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+    opened: list[Path] = []
+    real_connect = ing._connect_kb
+
+    def _counting_connect(db_path=None):
+        opened.append(db_path)
+        return real_connect(db_path)
+
+    monkeypatch.setattr(ing, "_connect_kb", _counting_connect)
+    client = _BatchSpyEmb()
+
+    summary = ing.ingest_folder(
+        slug="p",
+        scope="s",
+        folder_glob=str(root / "*.md"),
+        version="v1",
+        meta={},
+        embeddings_client=client,
+        context=ctx,
+        pipeline_options=ing.IngestPipelineOptions(reader_workers=2, embed_batch_size=4),
+    )
+
+    assert summary == {"files": 5, "chunks": 15}
+    assert [len(call) for call in client.calls] == [4, 4, 4, 3]
+    assert len(opened) == 1
+    with sqlite3.connect(base / "semantic" / "kb.sqlite") as con:
+        rows = con.execute("SELECT path, content, embedding_json, meta_json FROM chunks ORDER BY id").fetchall()
+    assert len(rows) == 15
+    for path, content, emb_json, meta_json in rows:
+        assert content.startswith(Path(path).read_text(encoding="utf-8"))
+        assert emb_json == f"[{float(len(content))}, 1.0]"
+        assert '"source_id": "p:s:v1:raw' in meta_json
+
+
+def test_ingest_folder_pipelined_respects_max_files(monkeypatch, tmp_path: Path):
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    for idx in range(6):
+        (root / f"doc{idx}.md").write_text(f"Doc {idx}", encoding="utf-8")
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+
+    summary = ing.ingest_folder(
+        slug="p",
+        scope="s",
+        folder_glob=str(root / "*.md"),
+        version="v1",
+        meta={},
+        embeddings_client=_BatchSpyEmb(),
+        context=ctx,
+        max_files=2,
+        pipeline_options=ing.IngestPipelineOptions(reader_workers=3, embed_batch_size=100),
+    )
+
+    assert summary == {"files": 2, "chunks": 6}
+
+
+def test_ingest_folder_pipelined_propagates_embedding_errors(monkeypatch, tmp_path: Path):
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    for idx in range(4):
+        (root / f"doc{idx}.md").write_text(f"Doc {idx}", encoding="utf-8")
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+
+    class _BoomEmb:
+        def embed_texts(self, texts: Sequence[str], *, model: str | None = None):  # type: ignore[override]
+            raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError, match="provider down"):
+        ing.ingest_folder(
+            slug="p",
+            scope="s",
+            folder_glob=str(root / "*.md"),
+            version="v1",
+            meta={},
+            embeddings_client=_BoomEmb(),
+            context=ctx,
+            pipeline_options=ing.IngestPipelineOptions(embed_batch_size=2, queue_size=1),
+        )
+
+
+class _RejectingEmb(_BatchSpyEmb):
+    """Rifiuta con ConfigError ogni batch che contiene chunk di `doc1`."""
+
+    def embed_texts(self, texts: Sequence[str], *, model: str | None = None):  # type: ignore[override]
+        if any(text.startswith("Doc 1#") for text in texts):
+            raise ing.ConfigError("chunk rifiutato dal provider")
+        return super().embed_texts(texts, model=model)
+
+
+def test_ingest_folder_pipelined_skips_file_on_embedding_config_error(monkeypatch, tmp_path: Path):
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    for idx in range(4):
+        (root / f"doc{idx}.md").write_text(f"Doc {idx}", encoding="utf-8")
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+
+    summary = ing.ingest_folder(
+        slug="p",
+        scope="s",
+        folder_glob=str(root / "*.md"),
+        version="v1",
+        meta={},
+        embeddings_client=_RejectingEmb(),
+        context=ctx,
+        pipeline_options=ing.IngestPipelineOptions(reader_workers=2, embed_batch_size=4),
+    )
+
+    assert summary == {"files": 3, "chunks": 9}
+
+
+def test_ingest_folder_pipelined_max_files_counts_saved_files(monkeypatch, tmp_path: Path):
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    for idx in range(5):
+        (root / f"doc{idx}.md").write_text(f"Doc {idx}", encoding="utf-8")
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+
+    def _run(pipeline_options):
+        return ing.ingest_folder(
+            slug="p",
+            scope="s",
+            folder_glob=str(root / "*.md"),
+            version="v1",
+            meta={},
+            embeddings_client=_RejectingEmb(),
+            context=ctx,
+            max_files=2,
+            pipeline_options=pipeline_options,
+        )
+
+    pipelined = _run(ing.IngestPipelineOptions(reader_workers=3, embed_batch_size=100))
+    serial = _run(None)
+
+    assert pipelined == serial == {"files": 2, "chunks": 6}
+
+
+def test_ingest_folder_enables_pipeline_from_config(monkeypatch, tmp_path: Path):
+    from pipeline.settings import IngestSection
+
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    (root / "a.md").write_text("Hello A", encoding="utf-8")
+    ctx.settings = SimpleNamespace(ingest_settings=IngestSection(pipelined=True, reader_workers=2))
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+    seen: list[ing.IngestPipelineOptions] = []
+    real_pipelined = ing._ingest_folder_pipelined
+
+    def _spy(candidates, **kwargs):
+        seen.append(kwargs["options"])
+        return real_pipelined(candidates, **kwargs)
+
+    monkeypatch.setattr(ing, "_ingest_folder_pipelined", _spy)
+
+    summary = ing.ingest_folder(
+        slug="p",
+        scope="s",
+        folder_glob=str(root / "*.md"),
+        version="v1",
+        meta={},
+        embeddings_client=_SpyEmb(),
+        context=ctx,
+    )
+
+    assert summary == {"files": 1, "chunks": 3}
+    assert seen == [ing.IngestPipelineOptions(reader_workers=2, embed_batch_size=256, queue_size=4)]
+
+
+def test_ingest_folder_serial_reuses_one_kb_connection(monkeypatch, tmp_path: Path):
+    import storage.kb_db as kb
+
+    base, ctx = _prepare_workspace(tmp_path, slug="p")
+    root = base / "raw"
+    for idx in range(4):
+        (root / f"doc{idx}.md").write_text(f"Doc {idx}", encoding="utf-8")
+    monkeypatch.setattr(ing, "_chunk_text", _three_chunks)
+    opened: list[Path] = []
+    real_open = kb._open_connection
+
+    def _counting_open(dbp):
+        opened.append(dbp)
+        return real_open(dbp)
+
+    monkeypatch.setattr(kb, "_open_connection", _counting_open)
+
+    summary = ing.ingest_folder(
+        slug="p",
+        scope="s",
+        folder_glob=str(root / "*.md"),
+        version="v1",
+        meta={},
+        embeddings_client=_BatchSpyEmb(),
+        context=ctx,
+    )
+
+    assert summary == {"files": 4, "chunks": 12}
+    assert len(opened) == 1
@@ -21,8 +21,7 @@ def test_drive_provider_requires_drive_utils(monkeypatch, tmp_path):
     raw_dir = tmp_path / "raw"
     raw_dir.mkdir(parents=True)
 
-    monkeypatch.setattr(ingest_module, "get_drive_service", None)
-    monkeypatch.setattr(ingest_module, "download_drive_pdfs_to_local", None)
+    monkeypatch.setattr(ingest_module, "is_module_available", lambda name: name != "googleapiclient")
     monkeypatch.setattr(
         ingest_module,
         "get_client_config",
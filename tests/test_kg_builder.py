@@ -152,3 +152,59 @@ def test_build_kg_requires_tags_raw(tmp_path: Path, allow_workspace_override: No
 
     with pytest.raises(FileNotFoundError):
         kg_builder.build_kg_for_workspace(ctx, namespace="dummy")
+
+
+def test_build_kg_reuses_cache_and_submits_only_new_tags(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    allow_workspace_override: None,
+) -> None:
+    workspace = _create_minimal_workspace(tmp_path)
+    semantic = workspace / "semantic"
+    submitted: list[list[str]] = []
+
+    def _stub(messages, **_kwargs):  # type: ignore[no-untyped-def]
+        labels = [tag["raw_label"] for tag in json.loads(messages[1]["content"][0]["text"])["tags"]]
+        submitted.append(labels)
+        return {
+            "schema_version": "kg-tags-0.1",
+            "namespace": "dummy",
+            "tags": [{"id": f"tag:{label}", "label": label, "description": label} for label in labels],
+            "relations": [],
+        }
+
+    def _write(tags: dict[str, list[str]]) -> None:
+        items = [{"raw_label": label, "contexts": contexts} for label, contexts in tags.items()]
+        _write_json(semantic / "tags_raw.json", {"namespace": "dummy", "tags": items})
+
+    monkeypatch.setattr(kg_builder, "invoke_kgraph_messages", _stub)
+    ctx = _create_client_context(workspace)
+
+    _write({"alpha": ["a"], "beta": ["b"]})
+    kg_builder.build_kg_for_workspace(ctx, namespace="dummy")
+    written: list[Path] = []
+    monkeypatch.setattr(kg_builder, "safe_write_text", lambda path, *_a, **_k: written.append(Path(path).name))
+    kg = kg_builder.build_kg_for_workspace(ctx, namespace="dummy")
+    assert submitted == [["alpha", "beta"]]
+    assert written == []
+    assert [tag.id for tag in kg.tags] == ["tag:alpha", "tag:beta"]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(kg_builder, "invoke_kgraph_messages", _stub)
+    _write({"alpha": ["a"], "beta": ["b"], "gamma": ["c"]})
+    kg = kg_builder.build_kg_for_workspace(ctx, namespace="dummy")
+    assert submitted[-1] == ["gamma"]
+    assert sorted(tag.id for tag in kg.tags) == ["tag:alpha", "tag:beta", "tag:gamma"]
+    assert len(json.loads((semantic / "kg.tags.json").read_text(encoding="utf-8"))["tags"]) == 3
+
+    # Contesti cambiati per un tag già noto (anche insieme a un tag nuovo): ri-sottomissione completa.
+    _write({"alpha": ["a"], "beta": ["b2"], "gamma": ["c"], "delta": ["d"]})
+    kg = kg_builder.build_kg_for_workspace(ctx, namespace="dummy")
+    assert submitted[-1] == ["alpha", "beta", "gamma", "delta"]
+    assert sorted(tag.id for tag in kg.tags) == ["tag:alpha", "tag:beta", "tag:delta", "tag:gamma"]
+
+    # Un tag rimosso non è attribuibile nel grafo: ri-sottomissione completa.
+    _write({"alpha": ["a"], "beta": ["b2"], "gamma": ["c"]})
+    kg = kg_builder.build_kg_for_workspace(ctx, namespace="dummy")
+    assert submitted[-1] == ["alpha", "beta", "gamma"]
+    assert sorted(tag.id for tag in kg.tags) == ["tag:alpha", "tag:beta", "tag:gamma"]
@@ -5,7 +5,7 @@ import sys
 import types
 
 
-def test_preflight_no_side_effect_import(monkeypatch) -> None:
+def test_preflight_no_side_effect_import(monkeypatch, tmp_path) -> None:
     """Verifica che ui.preflight non carichi .env a import-time."""
     fake_state = {"called": False}
 
@@ -22,6 +22,7 @@ def test_preflight_no_side_effect_import(monkeypatch) -> None:
     assert hasattr(mod, "_maybe_load_dotenv")
     assert fake_state["called"] is False  # nessuna chiamata durante l'import
 
+    monkeypatch.setattr(mod, "_cache_path", lambda: tmp_path / "preflight_cache.json")
     mod.run_preflight()
     assert fake_state["called"] is True  # invocato solo durante run_preflight
 
@@ -37,3 +38,71 @@ def test_preflight_attestation_check_degrades_on_unexpected_error(monkeypatch) -
     assert name == "Environment attestation"
     assert ok is False
     assert "Check attestazione fallito in modo inatteso." in hint
+
+
+def test_dependency_probe_uses_specs_without_importing(monkeypatch, tmp_path) -> None:
+    pkg = tmp_path / "heavy_probe_pkg"
+    (pkg / "models").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("raise RuntimeError('import pesante')\n", encoding="utf-8")
+    (pkg / "models" / "__init__.py").write_text("", encoding="utf-8")
+    (pkg / "loader.py").write_text("", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    mod = importlib.import_module("ui.preflight")
+
+    assert mod._is_importable("heavy_probe_pkg")
+    assert mod._is_importable("heavy_probe_pkg.loader")
+    assert mod._is_importable("heavy_probe_pkg.models")
+    assert not mod._is_importable("heavy_probe_pkg.missing")
+    assert not mod._is_importable("heavy_probe_pkg.loader.inner")
+    assert not mod._is_importable("heavy_probe_pkg_absent")
+    assert "heavy_probe_pkg" not in sys.modules
+
+
+def test_preflight_caches_stable_checks_per_environment(monkeypatch, tmp_path) -> None:
+    mod = importlib.import_module("ui.preflight")
+    cache_file = tmp_path / "preflight_cache.json"
+    fingerprint = {"value": "env-a"}
+    calls = {"stable": 0}
+    real_stable = mod._collect_stable_checks
+
+    def _counting_stable():
+        calls["stable"] += 1
+        return real_stable()
+
+    monkeypatch.setattr(mod, "_cache_path", lambda: cache_file)
+    monkeypatch.setattr(mod, "_environment_fingerprint", lambda: fingerprint["value"])
+    monkeypatch.setattr(mod, "_collect_stable_checks", _counting_stable)
+    monkeypatch.setattr(mod, "_docker_ok", lambda: (False, "docker assente"))
+    mod.invalidate_preflight_cache()
+
+    cold, _ = mod.run_preflight()
+    warm, _ = mod.run_preflight()
+    assert calls["stable"] == 1
+    assert warm == cold
+    assert [name for name, _ok, _hint in cold][:4] == [
+        "Environment attestation",
+        "Vision schema",
+        "Docker",
+        "Pipeline install",
+    ]
+
+    mod._STABLE_CACHE.clear()  # nuovo processo: la cache su disco basta
+    assert mod.run_preflight()[0] == cold
+    assert calls["stable"] == 1
+
+    fingerprint["value"] = "env-b"
+    mod.run_preflight()
+    assert calls["stable"] == 2
+    mod.run_preflight(use_cache=False)
+    assert calls["stable"] == 3
+    mod.invalidate_preflight_cache()
+    assert not cache_file.exists()
+
+
+def test_preflight_cache_follows_repo_root_env(monkeypatch, tmp_path) -> None:
+    import ui.preflight as mod
+
+    (tmp_path / "pyproject.toml").write_text("[project]\nname='x'\n", encoding="utf-8")
+    monkeypatch.setenv("REPO_ROOT_DIR", str(tmp_path))
+
+    assert mod._cache_path() == (tmp_path / ".timmy_kb" / "preflight_cache.json").resolve()
@@ -92,6 +92,7 @@ def test_settings_loads_config(sample_config: Path) -> None:
     assert settings.openai_settings.http2_enabled is True
     assert settings.retriever_throttle.candidate_limit == 2000
     assert settings.retriever_throttle.parallelism == 2
+    assert settings.retriever_throttle.adaptive_limit is False
     assert settings.ops_log_level == "DEBUG"
 
 
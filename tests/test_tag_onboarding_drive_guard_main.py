@@ -12,7 +12,7 @@ from timmy_kb.cli import tag_onboarding_raw as raw_mod
 
 def test_tag_onboarding_main_raises_capability_error_when_drive_utils_missing(tmp_path, monkeypatch):
     """
-    Quando l'import opzionale delle funzioni Drive fallisce (funzioni = None),
+    Quando le dipendenze Drive (googleapiclient) non sono installate,
     il ramo source=="drive" deve sollevare ConfigError con istruzioni chiare,
     non TypeError da chiamata su None.
     """
@@ -25,8 +25,7 @@ def test_tag_onboarding_main_raises_capability_error_when_drive_utils_missing(tm
         settings={"integrations": {"drive": {"raw_folder_id": "RAW_FOLDER_ID"}}},
     )
 
-    monkeypatch.setattr(ingest_provider, "get_drive_service", None)
-    monkeypatch.setattr(ingest_provider, "download_drive_pdfs_to_local", None)
+    monkeypatch.setattr(ingest_provider, "is_module_available", lambda name: name != "googleapiclient")
 
     with pytest.raises(CapabilityUnavailableError) as exc:
         raw_mod.download_from_drive(
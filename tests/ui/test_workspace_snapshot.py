@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from pipeline.path_utils import iter_safe_paths
+from ui.app_services import workspace_snapshot
+from ui.app_services.workspace_snapshot import invalidate_raw_snapshot, raw_snapshot
+
+
+def _legacy_index(raw_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Indice calcolato come faceva `_build_local_index` (due passate `iter_safe_paths` + stat)."""
+    index: Dict[str, Dict[str, Any]] = {"raw": {"type": "dir", "size": None, "mtime": raw_dir.stat().st_mtime}}
+    for directory in iter_safe_paths(raw_dir, include_dirs=True, include_files=False):
+        index[f"raw/{directory.relative_to(raw_dir).as_posix()}"] = {
+            "type": "dir",
+            "size": None,
+            "mtime": directory.stat().st_mtime,
+        }
+    for file_path in iter_safe_paths(raw_dir, include_dirs=False, include_files=True):
+        st = file_path.stat()
+        index[f"raw/{file_path.relative_to(raw_dir).as_posix()}"] = {
+            "type": "file",
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+        }
+    return index
+
+
+def _age_tree(root: Path, seconds: float = 60.0) -> None:
+    past = time.time() - seconds
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, (past, past))
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache() -> None:
+    invalidate_raw_snapshot()
+
+
+def test_snapshot_matches_legacy_walk_and_skips_symlinks(tmp_path: Path) -> None:
+    raw = tmp_path / "raw"
+    (raw / "Beta" / "deep").mkdir(parents=True)
+    (raw / "alpha").mkdir()
+    (raw / "alpha" / "b.pdf").write_bytes(b"12345")
+    (raw / "alpha" / "A.pdf").write_bytes(b"1")
+    (raw / "Beta" / "deep" / "c.pdf").write_bytes(b"123")
+    (raw / "root.pdf").write_bytes(b"")
+    outside = tmp_path / "outside.pdf"
+    outside.write_bytes(b"x")
+    try:
+        (raw / "alpha" / "link.pdf").symlink_to(outside)
+    except OSError:  # pragma: no cover - symlink non supportati sull'host
+        pass
+
+    snapshot = raw_snapshot(raw)
+
+    assert list(snapshot.items()) == list(_legacy_index(raw).items())
+    assert "raw/alpha/link.pdf" not in snapshot
+
+
+def test_snapshot_refreshes_only_changed_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    raw = tmp_path / "raw"
+    for category in ("a", "b", "c"):
+        (raw / category).mkdir(parents=True)
+        (raw / category / "doc.pdf").write_bytes(b"x" * 10)
+    _age_tree(raw)
+
+    scanned: list[Path] = []
+    real_scan = workspace_snapshot._scan_dir
+
+    def _tracking_scan(path: Path) -> Any:
+        scanned.append(path)
+        return real_scan(path)
+
+    monkeypatch.setattr(workspace_snapshot, "_scan_dir", _tracking_scan)
+
+    first = raw_snapshot(raw)
+    assert len(scanned) == 4
+
+    scanned.clear()
+    first["raw/a/doc.pdf"]["size"] = -1  # copia: la cache non cambia
+    assert raw_snapshot(raw) == _legacy_index(raw)
+    assert scanned == []
+
+    (raw / "b" / "new.pdf").write_bytes(b"abc")
+    updated = raw_snapshot(raw)
+    assert scanned == [raw.resolve() / "b"]
+    assert updated["raw/b/new.pdf"]["size"] == 3
+    assert updated == _legacy_index(raw)
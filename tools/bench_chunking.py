@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+"""
+Micro-benchmark del chunker a finestre di token usato dall'ingest.
+
+Confronta, su input sintetici multi-MB (taglie S/M/L):
+  - legacy: encode + ``decode`` di ogni finestra sovrapposta
+  - offsets: encode singolo + slice del testo originale sugli offset dei confini
+
+Usa l'encoding tiktoken ``cl100k_base`` quando disponibile; offline degrada a un
+encoder byte-level (un token per byte UTF-8), segnalato nel campo ``encoder``.
+
+Uso:
+  py -m tools.bench_chunking [--json out/bench_chunking.json] [--rounds 3]
+
+Nota: benchmark leggero e non scientifico; utile per regression check locale.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from pipeline.exceptions import ConfigError
+from pipeline.file_utils import safe_write_text
+from pipeline.text_chunking import iter_token_window_chunks
+
+_SIZES_MB: Dict[str, int] = {"S": 1, "M": 4, "L": 8}
+_PARAGRAPH = (
+    "La knowledge base di Timmy raccoglie contratti, procedure e verbali; ogni documento è "
+    "normalizzato in markdown, arricchito con tag e indicizzato per la ricerca semantica. "
+)
+
+
+class _ByteEncoder:
+    def encode(self, text: str) -> List[int]:
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+    def decode_bytes(self, tokens: Sequence[int]) -> bytes:
+        return bytes(tokens)
+
+    def decode_single_token_bytes(self, token: int) -> bytes:
+        return bytes([token])
+
+
+def _load_encoder() -> Tuple[Any, str]:
+    from timmy_kb.cli.ingest import _get_encoder
+
+    try:
+        return _get_encoder(), "cl100k_base"
+    except ConfigError:
+        return _ByteEncoder(), "bytes-fallback"
+
+
+def _timeit(fn: Callable[[], object], rounds: int) -> float:
+    times: list[float] = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def _legacy_chunks(text: str, enc: Any, target: int, overlap: int) -> List[str]:
+    tokens = enc.encode(text)
+    step = max(1, target - overlap)
+    return [enc.decode(tokens[i : i + target]) for i in range(0, len(tokens), step)]
+
+
+def _offset_chunks(text: str, enc: Any, target: int, overlap: int) -> int:
+    # Consuma il generatore senza materializzare la lista (come farebbe un consumer streaming).
+    count = 0
+    for _chunk in iter_token_window_chunks(text, encoder=enc, target_tokens=target, overlap_tokens=overlap):
+        count += 1
+    return count
+
+
+def _bench(rounds: int, target: int, overlap: int) -> Dict[str, Any]:
+    enc, encoder_name = _load_encoder()
+    results: Dict[str, Dict[str, float]] = {}
+    for label, size_mb in _SIZES_MB.items():
+        repeats = max(1, (size_mb * 1024 * 1024) // len(_PARAGRAPH.encode("utf-8")))
+        text = _PARAGRAPH * repeats
+        t_legacy = _timeit(lambda: _legacy_chunks(text, enc, target, overlap), rounds)
+        t_offsets = _timeit(lambda: _offset_chunks(text, enc, target, overlap), rounds)
+        results[label] = {
+            "size_mb": float(size_mb),
+            "chunks": float(_offset_chunks(text, enc, target, overlap)),
+            "legacy_s": t_legacy,
+            "offsets_s": t_offsets,
+            "speedup": (t_legacy / t_offsets) if t_offsets > 0 else 0.0,
+        }
+    return {"encoder": encoder_name, "target_tokens": target, "overlap_tokens": overlap, "sizes": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark chunker a finestre di token")
+    parser.add_argument("--json", dest="json_path", default=None, help="Percorso file JSON di output")
+    parser.add_argument("--rounds", type=int, default=3, help="Ripetizioni per misura (best-of-N)")
+    parser.add_argument("--target-tokens", type=int, default=400, help="Token per finestra")
+    parser.add_argument("--overlap-tokens", type=int, default=40, help="Token di overlap tra finestre")
+    args = parser.parse_args()
+
+    report = _bench(max(1, args.rounds), args.target_tokens, args.overlap_tokens)
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json_path:
+        out = Path(args.json_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        safe_write_text(out, payload + "\n", encoding="utf-8", atomic=True)
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
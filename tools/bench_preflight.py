@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+"""
+Micro-benchmark dello startup del preflight UI/CLI (`ui.preflight.run_preflight`).
+
+Ogni misura gira in un interprete nuovo, come all'avvio dell'app (import e run riportati a parte):
+  - cold: cache del preflight invalidata (check stabili ricalcolati e salvati)
+  - warm: cache valida per l'ambiente corrente (solo Docker/porta/env/attestazione live)
+  - legacy_import_probe: costo del vecchio probe dipendenze (`importlib.import_module` reale)
+
+Uso:
+  py -m tools.bench_preflight [--runs 3] [--json out/bench_preflight.json]
+
+Nota: benchmark leggero e non scientifico; utile per regression check locale.
+Scrive `.timmy_kb/preflight_cache.json` nella root del repo (come la UI).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pipeline.file_utils import safe_write_text
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_TIMED_RUN = """
+import time
+t0 = time.perf_counter()
+from ui import preflight
+t1 = time.perf_counter()
+if {cold}:
+    preflight.invalidate_preflight_cache()
+    t1 = time.perf_counter()
+preflight.run_preflight()
+print(t1 - t0, time.perf_counter() - t1)
+"""
+
+_LEGACY_PROBE = """
+import importlib, time
+from ui.preflight import DEPENDENCY_CHECKS
+t0 = time.perf_counter()
+for _name, module, _hint in DEPENDENCY_CHECKS:
+    try:
+        importlib.import_module(module)
+    except Exception:
+        pass
+print(0.0, time.perf_counter() - t0)
+"""
+
+
+def _run_snippet(code: str) -> tuple[float, float]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_REPO_ROOT / "src"), env.get("PYTHONPATH")]))
+    proc = subprocess.run(  # noqa: S603 - interprete corrente, snippet statico
+        [sys.executable, "-c", code],
+        cwd=_REPO_ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    import_s, run_s = proc.stdout.strip().splitlines()[-1].split()
+    return float(import_s), float(run_s)
+
+
+def _series(code: str, runs: int) -> Dict[str, Any]:
+    samples: List[tuple[float, float]] = [_run_snippet(code) for _ in range(runs)]
+    return {
+        "import_median_s": statistics.median(sample[0] for sample in samples),
+        "run_median_s": statistics.median(sample[1] for sample in samples),
+        "samples_s": samples,
+    }
+
+
+def _bench(runs: int) -> Dict[str, Any]:
+    cold = _series(_TIMED_RUN.format(cold=True), runs)
+    warm = _series(_TIMED_RUN.format(cold=False), runs)
+    legacy = _series(_LEGACY_PROBE, runs)
+    return {
+        "runs": runs,
+        "cold": cold,
+        "warm": warm,
+        "legacy_import_probe": legacy,
+        "warm_run_speedup": (cold["run_median_s"] / warm["run_median_s"]) if warm["run_median_s"] > 0 else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark startup preflight (cold vs warm)")
+    parser.add_argument("--runs", type=int, default=3, help="Ripetizioni per misura (mediana)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Percorso file JSON di output")
+    args = parser.parse_args()
+
+    report = _bench(max(1, args.runs))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json_path:
+        out = Path(args.json_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        safe_write_text(out, payload + "\n", encoding="utf-8", atomic=True)
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
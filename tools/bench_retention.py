@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+"""
+Micro-benchmark della retention su un perimetro sintetico (default 100k snapshot).
+
+Confronta, sullo stesso perimetro rigenerato per ogni misura:
+  - legacy: ``Path.glob`` + ``ensure_within_and_resolve`` + ``stat`` + ``os.remove`` per file
+  - streaming: ``security.retention.sweep_old_artifacts`` (scandir, stat cache, unlink a batch)
+  - dry_run: report dei byte/file recuperabili senza rimozioni
+
+Metà dei file è più vecchia della soglia di retention.
+
+Uso:
+  py -m tools.bench_retention [--files 100000] [--json out/bench_retention.json]
+
+Nota: benchmark leggero e non scientifico; utile per regression check locale.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from pipeline.file_utils import safe_write_text
+from pipeline.path_utils import ensure_within_and_resolve
+from security.retention import sweep_old_artifacts
+
+_DAYS = 7
+
+
+def _make_perimeter(root: Path, files: int) -> None:
+    semantic = root / "semantic"
+    semantic.mkdir(parents=True, exist_ok=True)
+    old_ts = time.time() - (_DAYS + 3) * 86400
+    for idx in range(files):
+        target = semantic / f"vision-{idx:06d}.snapshot.txt"
+        with open(target, "wb") as handle:
+            handle.write(b"snapshot")
+        if idx % 2 == 0:
+            os.utime(target, (old_ts, old_ts))
+
+
+def _legacy_purge(base: Path) -> int:
+    cutoff = time.time() - _DAYS * 86400
+    removed = 0
+    for candidate in base.glob("semantic/*.snapshot.txt"):
+        safe_path = ensure_within_and_resolve(base, candidate)
+        if safe_path.stat().st_mtime >= cutoff:
+            continue
+        os.remove(safe_path)
+        removed += 1
+    return removed
+
+
+def _measure(files: int, fn: Callable[[Path], Any]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="bench-retention-") as tmp:
+        base = Path(tmp) / "timmy-kb-bench"
+        _make_perimeter(base, files)
+        t0 = time.perf_counter()
+        out = fn(base)
+        return {"seconds": time.perf_counter() - t0, "result": out}
+
+
+def _bench(files: int) -> Dict[str, Any]:
+    legacy = _measure(files, _legacy_purge)
+    streaming = _measure(files, lambda base: sweep_old_artifacts(base, _DAYS).removed)
+    dry_run = _measure(files, lambda base: sweep_old_artifacts(base, _DAYS, dry_run=True).__dict__)
+    return {
+        "files": files,
+        "legacy_s": legacy["seconds"],
+        "streaming_s": streaming["seconds"],
+        "dry_run_s": dry_run["seconds"],
+        "removed": {"legacy": legacy["result"], "streaming": streaming["result"]},
+        "dry_run_report": dry_run["result"],
+        "speedup": (legacy["seconds"] / streaming["seconds"]) if streaming["seconds"] > 0 else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark retention snapshot (purge streaming)")
+    parser.add_argument("--files", type=int, default=100_000, help="Numero di snapshot sintetici")
+    parser.add_argument("--json", dest="json_path", default=None, help="Percorso file JSON di output")
+    args = parser.parse_args()
+
+    report = _bench(max(1, args.files))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json_path:
+        out = Path(args.json_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        safe_write_text(out, payload + "\n", encoding="utf-8", atomic=True)
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
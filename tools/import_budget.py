@@ -0,0 +1,186 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+"""
+Budget di import-time per gli entrypoint (CLI e UI), misurato con `python -X importtime`.
+
+Per ogni entrypoint, in un interprete nuovo:
+  - tempo cumulativo di import del modulo (riga `-X importtime` del modulo stesso)
+  - nessuna dipendenza opzionale pesante (spaCy, KeyBERT, sentence_transformers, pypdf,
+    googleapiclient, opentelemetry, openai, ...) deve essere importata a import-time:
+    vanno caricate via `pipeline.capabilities.lazy` o import locali.
+
+Il tempo è rumoroso: un entrypoint oltre budget viene rimisurato (best-of `--runs`).
+I moduli vietati invece sono deterministici.
+
+Uso:
+  py -m tools.import_budget [--runs 3] [--json out/import_budget.json] [entrypoint ...]
+
+Exit code 1 se almeno un entrypoint sfora il budget o importa un modulo vietato.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Sequence
+
+from pipeline.file_utils import safe_write_text
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+# Dipendenze opzionali pesanti: mai a import-time negli entrypoint.
+HEAVY_MODULES: FrozenSet[str] = frozenset(
+    {
+        "spacy",
+        "keybert",
+        "sentence_transformers",
+        "torch",
+        "transformers",
+        "pypdf",
+        "fitz",
+        "googleapiclient",
+        "opentelemetry.sdk",
+        "opentelemetry.exporter",
+        "openai",
+    }
+)
+# Le CLI non devono caricare nemmeno Streamlit.
+CLI_FORBIDDEN: FrozenSet[str] = HEAVY_MODULES | {"streamlit"}
+
+# Budget in millisecondi (~3x il valore misurato in locale, margine per CI lente).
+ENTRYPOINT_BUDGETS_MS: Dict[str, int] = {
+    "timmy_kb.cli.__main__": 700,
+    "timmy_kb.cli.pre_onboarding": 1200,
+    "timmy_kb.cli.raw_ingest": 1500,
+    "timmy_kb.cli.tag_onboarding": 1600,
+    "timmy_kb.cli.semantic_onboarding": 1800,
+    "timmy_kb.cli.semantic_headless": 1600,
+    "timmy_kb.cli.kg_build": 700,
+    "timmy_kb.cli.retriever": 800,
+    "timmy_kb.cli.retriever_server": 900,
+    "semantic.api": 1400,
+    "ui.preflight": 700,
+    "timmy_kb.ui.onboarding_ui": 800,
+}
+_UI_ENTRYPOINTS: FrozenSet[str] = frozenset({"ui.preflight", "timmy_kb.ui.onboarding_ui"})
+
+
+@dataclass
+class ImportMeasure:
+    entrypoint: str
+    budget_ms: int
+    import_ms: float
+    forbidden: List[str] = field(default_factory=list)
+    runs: int = 1
+
+    @property
+    def over_budget(self) -> bool:
+        return self.import_ms > self.budget_ms
+
+    @property
+    def ok(self) -> bool:
+        return not self.over_budget and not self.forbidden
+
+
+def _forbidden_for(entrypoint: str) -> FrozenSet[str]:
+    return HEAVY_MODULES if entrypoint in _UI_ENTRYPOINTS else CLI_FORBIDDEN
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Modulo -> tempo cumulativo (µs) dalle righe `-X importtime`."""
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(3)] = int(match.group(2))
+    return cumulative
+
+
+def _matches(module: str, prefixes: FrozenSet[str]) -> bool:
+    return any(module == prefix or module.startswith(prefix + ".") for prefix in prefixes)
+
+
+def _run_importtime(entrypoint: str) -> Dict[str, int]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_REPO_ROOT / "src"), env.get("PYTHONPATH")]))
+    env.setdefault("PYTHONUTF8", "1")
+    proc = subprocess.run(  # noqa: S603 - interprete corrente, nome modulo dal registro statico
+        [sys.executable, "-X", "importtime", "-c", f"import {entrypoint}"],
+        cwd=_REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"Import di {entrypoint} fallito (rc={proc.returncode}):\n{tail}")
+    return parse_importtime(proc.stderr)
+
+
+def measure_entrypoint(entrypoint: str, *, budget_ms: int, runs: int = 3) -> ImportMeasure:
+    """Misura un entrypoint; se sfora il budget ripete fino a `runs` volte e tiene il minimo."""
+    forbidden_prefixes = _forbidden_for(entrypoint)
+    samples: List[float] = []
+    forbidden: set[str] = set()
+    for _ in range(max(1, runs)):
+        cumulative = _run_importtime(entrypoint)
+        forbidden.update(name for name in cumulative if _matches(name, forbidden_prefixes))
+        samples.append(cumulative.get(entrypoint, 0) / 1000.0)
+        if min(samples) <= budget_ms:
+            break
+    return ImportMeasure(
+        entrypoint=entrypoint,
+        budget_ms=budget_ms,
+        import_ms=min(samples),
+        forbidden=sorted(forbidden),
+        runs=len(samples),
+    )
+
+
+def check_import_budgets(entrypoints: Sequence[str] | None = None, *, runs: int = 3) -> List[ImportMeasure]:
+    names = list(entrypoints) if entrypoints else list(ENTRYPOINT_BUDGETS_MS)
+    return [measure_entrypoint(name, budget_ms=ENTRYPOINT_BUDGETS_MS.get(name, 1000), runs=runs) for name in names]
+
+
+def format_violation(measure: ImportMeasure) -> str:
+    parts = []
+    if measure.over_budget:
+        parts.append(f"{measure.import_ms:.0f}ms > budget {measure.budget_ms}ms")
+    if measure.forbidden:
+        roots = sorted({name.split(".")[0] for name in measure.forbidden})
+        parts.append(f"importa a import-time: {', '.join(roots)}")
+    return f"{measure.entrypoint}: {'; '.join(parts)}"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Budget di import-time degli entrypoint (-X importtime)")
+    parser.add_argument("entrypoints", nargs="*", help="Moduli da misurare (default: tutti quelli a budget)")
+    parser.add_argument("--runs", type=int, default=3, help="Tentativi massimi per entrypoint oltre budget")
+    parser.add_argument("--json", dest="json_path", default=None, help="Percorso file JSON di output")
+    args = parser.parse_args(argv)
+
+    measures = check_import_budgets(args.entrypoints, runs=args.runs)
+    report = [{**asdict(m), "ok": m.ok} for m in measures]
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json_path:
+        out = Path(args.json_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        safe_write_text(out, payload + "\n", encoding="utf-8", atomic=True)
+    for measure in measures:
+        status = "OK " if measure.ok else "KO "
+        print(f"{status}{measure.entrypoint:36s}{measure.import_ms:8.0f}ms / {measure.budget_ms}ms")
+    violations = [format_violation(m) for m in measures if not m.ok]
+    for line in violations:
+        print(f"  - {line}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
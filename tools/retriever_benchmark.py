@@ -10,6 +10,8 @@ Caratteristiche:
     - "relevant_contains": ["substring1", "substring2", ...]
     - oppure "expected_contains": alias della chiave sopra
 - Parametri: --runs N, --k, --candidates "500,1000,...", --slug, --scope, --db, --out.
+- --batch: esegue tutte le query di un run con `search_many` (embedding e fetch condivisi);
+  la latenza per query è il tempo del batch diviso per il numero di query.
 - Output: stampa una tabella riassuntiva e salva un JSON (default: bench.json).
 
 Nota: nessuna rete; usa un client embedding fittizio.
@@ -26,7 +28,7 @@ from typing import Any, Iterable, List
 from pipeline.beta_flags import is_test_mode
 from pipeline.context import ClientContext
 from storage.kb_store import KbStore
-from timmy_kb.cli.retriever import QueryParams, search
+from timmy_kb.cli.retriever import QueryParams, search, search_many
 
 
 class _DummyEmbeddings:
@@ -86,6 +88,7 @@ def main() -> None:
     ap.add_argument("--scope", type=str, default="book", help="scope da usare per il DB")
     ap.add_argument("--db", type=Path, default=None, help="Percorso DB (opzionale)")
     ap.add_argument("--out", type=Path, default=Path("bench.json"), help="File risultati JSON")
+    ap.add_argument("--batch", action="store_true", help="Esegue le query di ogni run con search_many")
     args = ap.parse_args()
 
     if args.db is not None and not is_test_mode():
@@ -118,6 +121,7 @@ def main() -> None:
         "runs": int(args.runs),
         "k": int(args.k),
         "candidates": candidates_list,
+        "batch": bool(args.batch),
         "results": [],
     }
 
@@ -126,8 +130,8 @@ def main() -> None:
         hits: int = 0
         eval_count: int = 0
         for _ in range(int(args.runs)):
-            for q in queries:
-                params = QueryParams(
+            params_list = [
+                QueryParams(
                     db_path=db_path,
                     slug=args.slug,
                     scope=args.scope,
@@ -135,11 +139,21 @@ def main() -> None:
                     k=int(args.k),
                     candidate_limit=int(cand),
                 )
+                for q in queries
+            ]
+            outputs: list[list[Any]] = []
+            if args.batch:
                 t0 = time.perf_counter()
-                out = search(params, emb)
-                dt_ms = (time.perf_counter() - t0) * 1000.0
-                timings.append(dt_ms)
-
+                outputs = list(search_many(params_list, emb))
+                per_query_ms = (time.perf_counter() - t0) * 1000.0 / max(1, len(params_list))
+                timings.extend([per_query_ms] * len(params_list))
+            else:
+                for params in params_list:
+                    t0 = time.perf_counter()
+                    outputs.append(search(params, emb))
+                    timings.append((time.perf_counter() - t0) * 1000.0)
+
+            for q, out in zip(queries, outputs, strict=True):
                 # hit@k opzionale
                 truth = q.get("relevant_contains") or q.get("expected_contains")
                 if isinstance(truth, list) and truth:
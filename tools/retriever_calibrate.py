@@ -47,6 +47,17 @@ def _parse_args() -> argparse.Namespace:
         default="",
         help="Percorso per il JSONL di sample top-k (vuoto = nessun dump)",
     )
+    parser.add_argument(
+        "--quantization-recall",
+        type=int,
+        default=0,
+        help="Valuta la perdita di recall dello scoring int8 usando N chunk della KB come query (0 = off)",
+    )
+    parser.add_argument(
+        "--write-calibration",
+        action="store_true",
+        help="Misura fetch/scoring per candidato e scrive la calibrazione del candidate_limit adattivo accanto al DB",
+    )
     return parser.parse_args()
 
 
@@ -187,6 +198,125 @@ def run_single_calibration(
     return rows, dump_records
 
 
+def evaluate_quantized_recall(
+    *,
+    slug: str,
+    scope: str,
+    db_path: Path,
+    limit: int,
+    samples: int,
+    k: int,
+    log,
+) -> dict[str, float] | None:
+    """Misura recall@k dello scoring int8 (primo passaggio e dopo re-rank esatto) rispetto al float esatto.
+
+    Non usa un client embedding: come query prende `samples` embedding della KB stessa (equispaziate
+    tra i candidati), escludendo il chunk di provenienza dal ground truth.
+    """
+    import numpy as np
+
+    from storage.kb_db import fetch_candidates, fetch_quantized_candidates
+    from storage.kb_quantization import approx_cosine_scores
+    from timmy_kb.cli.retriever import QUANTIZED_RERANK_FACTOR, QUANTIZED_RERANK_MIN
+    from timmy_kb.cli.retriever_ranking import _cosine_matrix
+
+    exact = list(fetch_candidates(slug, scope, limit=limit, db_path=db_path, include_ids=True))
+    rows = {row["id"]: row for row in fetch_quantized_candidates(slug, scope, limit=limit, db_path=db_path)}
+    exact = [cand for cand in exact if cand.get("embedding") and rows.get(cand["id"], {}).get("q8") is not None]
+    if len(exact) <= k or samples <= 0:
+        log.warning("retriever_calibrate.quantization_recall.skipped", extra={"slug": slug, "scope": scope})
+        return None
+
+    vectors = [[float(v) for v in cand["embedding"]] for cand in exact]
+    q_rows = [rows[cand["id"]] for cand in exact]
+    rerank_limit = max(k * QUANTIZED_RERANK_FACTOR, QUANTIZED_RERANK_MIN)
+    picks = sorted({int(i) for i in np.linspace(0, len(exact) - 1, num=min(samples, len(exact)))})
+    exact_scores = _cosine_matrix([vectors[i] for i in picks], vectors)
+    if exact_scores is None:
+        log.warning("retriever_calibrate.quantization_recall.mixed_dims", extra={"slug": slug, "scope": scope})
+        return None
+
+    first_pass_hits = 0
+    rerank_hits = 0
+    for row, pick in enumerate(picks):
+        exact_row = np.array(exact_scores[row], dtype=np.float64)
+        exact_row[pick] = -np.inf  # il chunk sorgente non conta come risultato
+        truth = set(np.argsort(-exact_row, kind="stable")[:k].tolist())
+        approx = np.array(
+            [(-np.inf if score is None else score) for score in approx_cosine_scores(vectors[pick], q_rows)]
+        )
+        approx[pick] = -np.inf
+        order = np.argsort(-approx, kind="stable")
+        first_pass_hits += len(truth & set(order[:k].tolist()))
+        shortlist = order[:rerank_limit]
+        reranked = shortlist[np.argsort(-exact_row[shortlist], kind="stable")][:k]
+        rerank_hits += len(truth & set(reranked.tolist()))
+
+    total = float(len(picks) * k)
+    dim = len(vectors[0])
+    report = {
+        "samples": float(len(picks)),
+        "k": float(k),
+        "rerank_limit": float(rerank_limit),
+        "first_pass_recall_at_k": first_pass_hits / total,
+        "recall_at_k": rerank_hits / total,
+        "bytes_per_vector_float32": float(4 * dim),
+        "bytes_per_vector_int8": float(dim + 16),
+    }
+    log.info("retriever_calibrate.quantization_recall", extra={"slug": slug, "scope": scope, **report})
+    return report
+
+
+def seed_limit_calibration(
+    *,
+    slug: str,
+    scope: str,
+    db_path: Path,
+    limits: list[int],
+    repetitions: int,
+    log,
+) -> Path | None:
+    """Semina offline la calibrazione di `retriever_budget` (ms/candidato per fetch e scoring).
+
+    Non serve un client embedding: il vettore query è l'embedding del primo candidato. Il costo
+    dell'embedding della query resta da misurare online (EWMA alimentata da `retriever.metrics`).
+    """
+    from storage.kb_db import fetch_candidates
+    from timmy_kb.cli.retriever_budget import LimitCalibrator
+    from timmy_kb.cli.retriever_ranking import _rank_candidates
+
+    calibrator = LimitCalibrator(min_samples=1)
+    observed = 0
+    for limit in limits:
+        for _ in range(max(1, repetitions)):
+            t0 = time.perf_counter()
+            candidates = list(fetch_candidates(slug, scope, limit=limit, db_path=db_path))
+            fetch_ms = (time.perf_counter() - t0) * 1000.0
+            query_vector = next((c.get("embedding") for c in candidates if c.get("embedding")), None)
+            if query_vector is None:
+                continue
+            _items, count, _stats, score_ms, _evaluated, _hit = _rank_candidates(list(query_vector), candidates, 5)
+            if calibrator.observe(db_path, scope, candidates=count, fetch_ms=fetch_ms, score_ms=score_ms):
+                observed += 1
+    if not observed:
+        log.warning("retriever_calibrate.calibration.skipped", extra={"slug": slug, "scope": scope})
+        return None
+    path = calibrator.persist(db_path)
+    est = calibrator.estimate(db_path, scope)
+    log.info(
+        "retriever_calibrate.calibration.written",
+        extra={
+            "slug": slug,
+            "scope": scope,
+            "path": str(path),
+            "samples": observed,
+            "fetch_ms_per_candidate": est.fetch_ms_per_candidate if est else None,
+            "score_ms_per_candidate": est.score_ms_per_candidate if est else None,
+        },
+    )
+    return path
+
+
 def aggregate_results(
     *,
     slug: str,
@@ -295,6 +425,27 @@ def main() -> int:
         log=log,
     )
 
+    if args.write_calibration:
+        seed_limit_calibration(
+            slug=slug,
+            scope=scope,
+            db_path=store.effective_db_path(),
+            limits=limits,
+            repetitions=repetitions,
+            log=log,
+        )
+
+    if int(args.quantization_recall) > 0:
+        evaluate_quantized_recall(
+            slug=slug,
+            scope=scope,
+            db_path=store.effective_db_path(),
+            limit=max(limits),
+            samples=int(args.quantization_recall),
+            k=max(q.k for q in queries),
+            log=log,
+        )
+
     return 0
 
 